@@ -0,0 +1,88 @@
+/*
+ * ιldb 性能基准的被调试程序（由 bench/run.py 用 cc 编译，不使用 PIE，运行时地址与 IDA 地址相同）
+ *
+ * - generated.h 由 bench/run.py 生成：大量函数（大代码范围，mark / dis / xref 使用）和被引用的字符串（strfind 使用）
+ * - chain_head：CHAIN_DEPTH 层的链表（memread -ptr 多层指针）
+ * - big_buffer：HEAP_SIZE 字节的堆内存（memread 大块读取、regions）
+ * - 准备完成后调用 bench_ready()（基准在这里停止），之后长时间执行 hot_function（stepuntil / itrace 使用）
+ */
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#include "generated.h"
+
+#define CHAIN_DEPTH 64
+#define HEAP_SIZE (64u << 20)
+#define HOT_ITERATIONS 2000000000L
+
+struct node {
+    struct node *next;
+    uint64_t value;
+    char payload[48];
+};
+
+struct node *chain_head;
+unsigned char *big_buffer;
+volatile uint64_t hot_sink;
+
+__attribute__((noinline)) void bench_ready(void)
+{
+    __asm__ volatile("" ::: "memory");
+}
+
+__attribute__((noinline)) uint64_t hot_function(uint64_t x)
+{
+    x ^= x << 13;
+    x ^= x >> 7;
+    x ^= x << 17;
+    return x;
+}
+
+static struct node *build_chain(int depth)
+{
+    struct node *head = NULL;
+    for (int i = 0; i < depth; i++) {
+        struct node *node = malloc(sizeof(*node));
+        node->next = head;
+        node->value = (uint64_t)i;
+        snprintf(node->payload, sizeof(node->payload), "node-%d", i);
+        head = node;
+    }
+    return head;
+}
+
+static unsigned char *build_buffer(size_t size)
+{
+    uint64_t *words = malloc(size);
+    for (size_t i = 0; i < size / sizeof(*words); i++) {
+        words[i] = i * 0x9E3779B97F4A7C15ull;
+    }
+    return (unsigned char *)words;
+}
+
+int main(int argc, char **argv)
+{
+    (void)argv;
+    chain_head = build_chain(CHAIN_DEPTH);
+    big_buffer = build_buffer(HEAP_SIZE);
+
+    /* 生成的函数只在不可能的条件下调用，保证它们被链接进来但不会执行（nop 基准会修改它们） */
+    if (argc > 1000) {
+        int sum = 0;
+        for (int i = 0; i < BENCH_FUNCTION_COUNT; i++) {
+            sum += bench_functions[i](argc);
+        }
+        printf("%d\n", sum);
+    }
+
+    bench_ready();
+
+    uint64_t x = 1;
+    for (long i = 0; i < HOT_ITERATIONS; i++) {
+        x = hot_function(x + (uint64_t)i);
+    }
+    hot_sink = x;
+    return 0;
+}
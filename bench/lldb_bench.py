@@ -0,0 +1,39 @@
+import json
+import lldb
+import time
+
+"""
+    类功能：基准计时命令（由 bench/run.py 在 lldb -b 中通过 command script import 加载）
+
+    用法：benchtime {"name": "<名称>", "command": "<命令>", "repeat": <次数>, "reset": "<每次执行后的恢复命令>"}
+
+    - 命令通过 SBCommandInterpreter.HandleCommand 执行，只计算命令本身的耗时（不包括 reset 命令）
+    - 结果输出为一行 BENCH <JSON>，bench/run.py 从 lldb 的输出中收集这些行
+"""
+
+
+def benchtime(debugger, command, exe_ctx, result, internal_dict):
+    """[ 重复执行命令并输出每次的耗时 ]"""
+    try:
+        spec = json.loads(command)
+    except ValueError as e:
+        print(f'BENCH {json.dumps({"name": None, "error": str(e)})}')
+        return
+
+    interpreter = debugger.GetCommandInterpreter()
+    runs = []
+    succeeded = True
+    for _ in range(spec.get('repeat', 1)):
+        return_obj = lldb.SBCommandReturnObject()
+        start_time = time.perf_counter()
+        interpreter.HandleCommand(spec['command'], return_obj)
+        runs.append(time.perf_counter() - start_time)
+        succeeded = succeeded and return_obj.Succeeded()
+        if spec.get('reset'):
+            interpreter.HandleCommand(spec['reset'], lldb.SBCommandReturnObject())
+
+    print(f'BENCH {json.dumps({"name": spec["name"], "runs": runs, "ok": succeeded})}')
+
+
+def __lldb_init_module(debugger, internal_dict):
+    debugger.HandleCommand(f'command script add -f {__name__}.benchtime benchtime')
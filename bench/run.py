@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from src.utils.signature_scan import Signature, SignatureScanner
+
+"""
+    类功能：ιldb 端到端性能基准
+
+    用法：
+        python3 bench/run.py [--save] [--baseline <文件>] [--threshold 1.25] [-k <名称子串>] [--lldb <lldb 路径>] [--cc <编译器>]
+
+    - 用 cc 编译 bench/fixtures/bench_target.c（不使用 PIE），生成的 generated.h 包含大量函数和字符串（--functions 指定个数）
+    - 在 lldb -b 中 command script import ιldb.py 和 bench/lldb_bench.py，停在 bench_ready 后依次用 benchtime 计时各个命令：
+      mark（-f 数千个偏移 / 多个参数）、memread -ptr 多层指针、大块 memread、regions、dis、strfind / xref 建立索引、nop 地址范围、
+      stepuntil、itrace 及其查询；ιldb-scan 的离线扫描直接在本进程中计时
+    - 每项记录每次的耗时、第一次（冷）、最小值和中位数，结果保存为 JSON 基线（默认 bench/baselines/<系统>-<架构>.json）；
+      与基线比较时中位数超过 基线 × threshold（且至少慢 MIN_REGRESSION 秒）的项视为退化，退出码为 1
+    - 基线只在同一台机器、同一个 lldb 版本之间比较才有意义，meta 中记录了这些信息
+"""
+
+FIXTURE_SOURCE = os.path.join(BENCH_DIR, 'fixtures', 'bench_target.c')
+BUILD_DIR = os.path.join(BENCH_DIR, 'build')
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+BINARY_NAME = 'bench_target'
+
+# 生成的函数个数、mark 使用的偏移个数
+DEFAULT_FUNCTIONS = 4096
+MARK_FILE_OFFSETS = 4096
+MARK_ARG_OFFSETS = 256
+
+# 与 bench_target.c 中的 CHAIN_DEPTH 一致
+CHAIN_DEPTH = 64
+
+# nop 地址范围的大小
+NOP_RANGE_SIZE = 0x1000
+
+# 单步基准的步数
+STEP_COUNT = 20000
+
+# 退化判定：中位数超过基线的倍数，且至少慢这么多秒（过滤计时噪声）
+DEFAULT_THRESHOLD = 1.25
+MIN_REGRESSION = 0.005
+
+# lldb 运行所有基准的超时时间（秒）
+LLDB_TIMEOUT = 1800
+
+BENCH_LINE_PATTERN = re.compile(r'^BENCH (.*)$', re.MULTILINE)
+
+
+def generateFixture(count: int) -> str:
+    """[ 生成 generated.h：count 个函数（每个引用一个字符串）和函数指针表 ]"""
+    lines = ['/* 由 bench/run.py 生成，不要手动修改 */', '#define BENCH_FUNCTION_COUNT %d' % count, '']
+    for i in range(count):
+        lines.append('int bench_fn_%d(int x)\n{\n'
+                     '    int y = x * %d + %d;\n'
+                     '    for (int i = 0; i < (x & 7); i++) {\n'
+                     '        y = (y << 3) ^ (y >> 2) ^ %d;\n'
+                     '    }\n'
+                     '    if (y == %d) {\n'
+                     '        puts("bench_string_%d");\n'
+                     '    }\n'
+                     '    return y;\n}\n' % (i, i * 2 + 1, i, i * 7919, i * 31, i))
+    lines.append('int (*const bench_functions[BENCH_FUNCTION_COUNT])(int) = {')
+    lines.extend('    bench_fn_%d,' % i for i in range(count))
+    lines.append('};')
+    path = os.path.join(BUILD_DIR, 'generated.h')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def compileFixture(cc: str, count: int) -> str:
+    """[ 编译被调试程序，返回可执行文件路径 ]"""
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    generateFixture(count)
+    binary = os.path.join(BUILD_DIR, BINARY_NAME)
+    command = [cc, '-O1', '-g0', '-fno-pie', '-no-pie', '-I', BUILD_DIR, '-o', binary, FIXTURE_SOURCE]
+    subprocess.run(command, check=True)
+    return binary
+
+
+def readSymbols(binary: str) -> Dict[str, int]:
+    """[ 通过 nm 读取已定义符号的地址（不使用 PIE，即运行时地址和 IDA 地址） ]"""
+    output = subprocess.run(['nm', '--defined-only', binary], check=True, capture_output=True, text=True).stdout
+    symbols = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 3:
+            symbols[parts[2]] = int(parts[0], 16)
+    return symbols
+
+
+def benchmarks(symbols: Dict[str, int], machine: str) -> List[Dict]:
+    """[ 在 lldb 中执行的基准：[{name, command, repeat, reset}, ...]，按顺序执行（修改进程状态的放在最后） ]"""
+    functions = sorted(address for name, address in symbols.items() if name.startswith('bench_fn_'))
+    offsets_path = os.path.join(BUILD_DIR, 'offsets.txt')
+    with open(offsets_path, 'w', encoding='utf-8') as f:
+        f.write(''.join('0x%x\n' % address for address in functions[:MARK_FILE_OFFSETS]))
+
+    # CHAIN_DEPTH - 1 层解引用得到倒数第二个节点，memread -ptr 再读取一层
+    chain = '[' * (CHAIN_DEPTH - 1) + '0x%x' % symbols['chain_head'] + ']' * (CHAIN_DEPTH - 1)
+    trace_path = os.path.join(BUILD_DIR, 'bench.trace')
+    nop_start = functions[len(functions) // 2]
+    delete_breakpoints = 'breakpoint delete -f'
+
+    specs = [
+        {'name': 'mark_file_%d' % min(len(functions), MARK_FILE_OFFSETS), 'command': 'mark -f %s' % offsets_path,
+         'repeat': 3, 'reset': delete_breakpoints},
+        {'name': 'mark_args_%d' % MARK_ARG_OFFSETS,
+         'command': 'mark ' + ' '.join('0x%x' % address for address in functions[-MARK_ARG_OFFSETS:]),
+         'repeat': 3, 'reset': delete_breakpoints},
+        {'name': 'memread_ptr_chain_%d' % CHAIN_DEPTH, 'command': 'memread -ptr %s' % chain, 'repeat': 20},
+        {'name': 'memread_heap_4m',
+         'command': 'memread -c 0x400000 -o %s [0x%x]' % (os.path.join(BUILD_DIR, 'heap.txt'), symbols['big_buffer']),
+         'repeat': 3},
+        {'name': 'regions', 'command': 'regions', 'repeat': 5},
+        {'name': 'dis_2000', 'command': 'dis 0x%x -c 2000' % functions[0], 'repeat': 3},
+        {'name': 'strfind_rebuild', 'command': 'strfind --rebuild --max 10 bench_string_1', 'repeat': 2},
+    ]
+    if machine in ('arm64', 'aarch64'):
+        # xref 只支持 arm64 / aarch64
+        specs.append({'name': 'xref_rebuild', 'command': 'xref --rebuild 0x%x' % functions[1], 'repeat': 2})
+    specs += [
+        {'name': 'nop_range_4k', 'command': 'nop [0x%x, 0x%x]' % (nop_start, nop_start + NOP_RANGE_SIZE - 4), 'repeat': 1},
+        {'name': 'stepuntil_20k', 'command': 'stepuntil --if "pc == 0" --max %d' % STEP_COUNT, 'repeat': 3},
+        {'name': 'itrace_20k', 'command': 'itrace %d -o %s' % (STEP_COUNT, trace_path), 'repeat': 3},
+        {'name': 'itrace_query', 'command': 'itrace --query %s sp -l 0' % trace_path, 'repeat': 5},
+    ]
+    return specs
+
+
+def runLLDB(lldb_path: str, binary: str, specs: List[Dict]) -> Dict[str, Dict]:
+    """[ 在一个 lldb -b 会话中执行所有基准，返回 {名称: {runs, ok}} ]"""
+    commands = [
+        'command script import %s' % os.path.join(ROOT_DIR, 'ιldb.py'),
+        'command script import %s' % os.path.join(BENCH_DIR, 'lldb_bench.py'),
+        'breakpoint set -n bench_ready',
+        'process launch',
+        'breakpoint delete -f',
+        'using %s' % BINARY_NAME,
+    ]
+    commands += ['benchtime ' + json.dumps(spec, ensure_ascii=False) for spec in specs]
+    commands.append('process kill')
+
+    argv = [lldb_path, '-b', '-x', binary]
+    for command in commands:
+        argv += ['-o', command]
+    completed = subprocess.run(argv, capture_output=True, text=True, timeout=LLDB_TIMEOUT)
+
+    results = {}
+    for line in BENCH_LINE_PATTERN.findall(completed.stdout):
+        item = json.loads(line)
+        if item.get('name'):
+            results[item['name']] = item
+    missing = [spec['name'] for spec in specs if spec['name'] not in results]
+    if missing:
+        print('[ lldb 没有输出以下基准的结果: %s ]' % ', '.join(missing), file=sys.stderr)
+        print(completed.stdout[-4000:], file=sys.stderr)
+        print(completed.stderr[-4000:], file=sys.stderr)
+    return results
+
+
+def runOffline(binary: str) -> Dict[str, Dict]:
+    """[ ιldb-scan 的离线扫描（不需要 lldb）：单进程和默认进程数各计时 3 次 ]"""
+    signatures = [Signature.parse('1F 20 03 D5'), Signature.parse('48 8B ?? ?? C3'), Signature.constant('0x9E3779B9')]
+    results = {}
+    for name, workers in (('scan_offline_serial', 1), ('scan_offline_parallel', None)):
+        runs = []
+        for _ in range(3):
+            start_time = time.perf_counter()
+            SignatureScanner.scan(binary, signatures, workers)
+            runs.append(time.perf_counter() - start_time)
+        results[name] = {'name': name, 'runs': runs, 'ok': True}
+    return results
+
+
+def summarize(item: Dict) -> Dict:
+    runs = item['runs']
+    return {
+        'runs': runs,
+        'first': runs[0],
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'ok': item.get('ok', True),
+    }
+
+
+def environment(lldb_path: str, cc: str, functions: int) -> Dict:
+    """[ 基线的环境信息：只有相同环境下的结果才可比较 ]"""
+
+    def output(argv: List[str]) -> str:
+        try:
+            completed = subprocess.run(argv, capture_output=True, text=True, cwd=ROOT_DIR)
+            return completed.stdout.strip().splitlines()[0] if completed.stdout.strip() else ''
+        except OSError:
+            return ''
+
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'node': platform.node(),
+        'lldb': output([lldb_path, '--version']),
+        'cc': output([cc, '--version']),
+        'commit': output(['git', 'rev-parse', '--short', 'HEAD']),
+        'functions': functions,
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """[ 输出与基线的对比，返回退化的基准名称 ]"""
+    regressions = []
+    print('%-26s %10s %10s %10s %10s %8s' % ('基准', '第一次', '最小', '中位数', '基线中位数', '倍数'))
+    for name, summary in results.items():
+        line = '%-26s %10.4f %10.4f %10.4f' % (name, summary['first'], summary['min'], summary['median'])
+        base = baseline.get(name)
+        if base:
+            ratio = summary['median'] / base['median'] if base['median'] else 0.0
+            line += ' %10.4f %7.2fx' % (base['median'], ratio)
+            if ratio > threshold and summary['median'] - base['median'] > MIN_REGRESSION:
+                line += '  <- 退化'
+                regressions.append(name)
+        if not summary['ok']:
+            line += '  (命令执行失败)'
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bench/run.py', description='ιldb 端到端性能基准（编译 C 程序并在 lldb -b 中计时各个命令）')
+    parser.add_argument('--lldb', default='lldb', help='lldb 可执行文件（默认 PATH 中的 lldb）')
+    parser.add_argument('--cc', default='cc', help='C 编译器（默认 cc）')
+    parser.add_argument('--functions', type=int, default=DEFAULT_FUNCTIONS, help='生成的函数个数（默认 %d）' % DEFAULT_FUNCTIONS)
+    parser.add_argument('-k', '--filter', help='只运行名称包含该子串的基准')
+    parser.add_argument('--baseline', help='基线文件（默认 bench/baselines/<系统>-<架构>.json）')
+    parser.add_argument('--save', action='store_true', help='把本次结果保存为基线')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='退化判定倍数（默认 %.2f）' % DEFAULT_THRESHOLD)
+    parser.add_argument('-o', '--output', help='同时把本次结果写入文件')
+    args = parser.parse_args(argv)
+
+    lldb_path = shutil.which(args.lldb)
+    if lldb_path is None:
+        parser.error('找不到 lldb: %s' % args.lldb)
+    if shutil.which(args.cc) is None:
+        parser.error('找不到 C 编译器: %s' % args.cc)
+
+    binary = compileFixture(args.cc, args.functions)
+    machine = platform.machine().lower()
+    specs = benchmarks(readSymbols(binary), machine)
+    if args.filter:
+        specs = [spec for spec in specs if args.filter in spec['name']]
+
+    raw = runLLDB(lldb_path, binary, specs) if specs else {}
+    if not args.filter or 'scan' in args.filter:
+        raw.update(runOffline(binary))
+    results = {name: summarize(item) for name, item in raw.items()}
+
+    report = {'meta': environment(lldb_path, args.cc, args.functions), 'results': results}
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, '%s-%s.json' % (platform.system().lower(), machine))
+    baseline = {}
+    if os.path.isfile(baseline_path) and not args.save:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print('[ 基线已保存到 %s ]' % baseline_path)
+    elif not baseline:
+        print('[ 没有基线文件 %s，可以用 --save 保存本次结果 ]' % baseline_path)
+
+    if regressions:
+        print('[ %d 项基准退化: %s ]' % (len(regressions), ', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,9 +6,13 @@ BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
 CMD_CONFIG_PATH =  BASE_DIR/ "../config/cmd_config.json"
 CMD_RECORD_PATH = BASE_DIR/ "../config/cmd_record.json"
 
+# 按模块 UUID 持久化的索引（xref 等）目录
+INDEX_CACHE_PATH = BASE_DIR/ "../cache"
+
 # 转换为字符串路径
 CMD_CONFIG_PATH_STR = str(CMD_CONFIG_PATH)
 CMD_RECORD_PATH_STR = str(CMD_RECORD_PATH)
+INDEX_CACHE_PATH_STR = str(INDEX_CACHE_PATH)
 
 # lldb 脚本名
 LLDB_SCRIPT_NAME = "ιldb"
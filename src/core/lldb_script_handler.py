@@ -2,8 +2,35 @@ import lldb
 import re
 import os
 import shlex
+import time
 from src.utils import Utils
+from src.utils.symbolicator import Symbolicator
+from src.utils.read_planner import ReadPlanner
+from src.utils.memory_regions import MemoryRegionMap
+from src.utils.instance_finder import InstanceFinder
+from src.utils.step_until import StepUntil, DEFAULT_MAX_STEPS, RESULT_EXITED, RESULT_ERROR
+from src.utils.instruction_trace import InstructionTracer, TraceFile, DEFAULT_MAX_STEPS as DEFAULT_TRACE_STEPS, RESULT_ERROR as TRACE_RESULT_ERROR
+from src.utils.hexdump import HexDump, PAGE_SIZE
+from src.utils.disassembler import Disassembler
+from src.utils.xref import XrefIndex, KIND_NAMES
+from src.utils.string_index import StringIndex, KIND_NAMES as STRING_KIND_NAMES
+from src.utils.batch_breakpoint import BatchBreakpoint
+from src.utils.objc_metadata import ObjCMethodIndex
+from src.utils.segment_map import SegmentMap
+from src.utils.dashboard import StopDashboard, SECTIONS
+from src.utils.json_output import JSONOutput
+from src.utils.sampler import StackSampler
+from src.utils.coverage import CoverageSession
+from src.utils.objc_decoder import ObjCDecoder
+from src.utils.swift_decoder import SwiftDecoder, SwiftCollection, ELEMENT_STRIDES, OBJECT_ADDRESS_MASK
+from src.utils.breakpoint_condition import BreakpointCondition
+from src.utils.expr_evaluator import ExprEvaluator, ExprSyntaxError
 from src.handler.data_handler import DataHandler
+from src.handler.register_handler import RegisterHandler
+from src.config import LLDB_SCRIPT_NAME
+
+# mark 命令中的 ObjC 方法：-[类 selector] / +[类 selector]，可以带引号
+OBJC_METHOD_PATTERN = re.compile(r'(["\']?)([-+]\[\S+ [^\]]+\])\1')
 
 class LLDBScriptHandler:
     _data_handler = None
@@ -14,35 +41,126 @@ class LLDBScriptHandler:
     >> 使用方法：using <module_name>
     >> 例如：using libloader"""
 
-        cls._data_handler = cls._data_handler if cls._data_handler is not None else DataHandler()
+        target = exe_ctx.GetTarget()
+        state = Utils.getTargetState(target)
+        if state is None:
+            JSONOutput.fail('[ 无效的调试目标. ]')
+            return
         
-        # 暂存模块名
-        old_module_name = cls._data_handler.module_name
+        # 暂存模块名（using 的选择按调试目标保存，切换 target 后互不影响）
+        old_module_name = state.module_name
         
         # 如果没有指定模块，则使用主二进制模块
         if command is None or command == "":
-            cls._data_handler.module_name = Utils.getMainModuleName()
+            state.module_name = Utils.getMainModuleName(target)
         else:
-            cls._data_handler.module_name = command.strip()
+            state.module_name = command.strip()
         
-        aslr = Utils.getASLR()
+        aslr = Utils.getASLR(target)
         
-        if aslr:
+        if aslr is not None:
             # result.PutCString('[ Using %s successfully. ]' % module_name)
-            result.PutCString('[ 成功切换到 %s 模块. ]' % cls._data_handler.module_name)
+            result.PutCString('[ 成功切换到 %s 模块. ]' % state.module_name)
             
         else:
-            cls._data_handler.module_name = old_module_name
+            state.module_name = old_module_name
     
     @classmethod
     def markBreakPointByOffsetAddress(cls, debugger, command, exe_ctx, result, internal_dict):
         """[ 基于 module_name 模块打断点 ]
     >> 使用方法：mark <offset_address>
     >> 例如：mark 0x234
-    >> 支持多个地址: mark 0x234 0x567 0x89a"""
+    >> 支持多个地址: mark 0x234 0x567 0x89a
+    >> 条件断点: mark 0x234 --if "x0 == 0x1234 and u32[x1+8] > 5"（条件为假时自动继续运行）
+    >> 查看条件断点: mark --conditions
+    >> 在所有调用方上打断点: mark --callers 0xa8f4（基于 xref 索引，所有调用位置合并为一个断点，可与 --if 一起使用）
+    >> ObjC 方法: mark -[LoginVC submit:]、mark "*crypt*"（以 * 结尾的参数为通配符），mark --objc <通配符>（基于磁盘上的 ObjC 元数据，剥离符号的二进制也可以使用）
+    >> 延迟断点: mark --deferred <module_name> 0x234 0x567（模块尚未加载时，在模块加载时自动一次性解析，可与 --if 一起使用）
+    >> 查看延迟断点: mark --deferred
+    >> 从文件批量打断点: mark -f offsets.txt（例如 ιldb-scan 的输出，文件中的所有十六进制地址合并为一个断点，可与 --if 一起使用）"""
 
-        # 提取地址列表
-        offsets = Utils.extractAddressesFromCommand(command)
+        # 先取出 -[类 selector] / +[类 selector] 形式的 ObjC 方法（中间有空格，不能直接 shlex 切分）
+        command = command or ''
+        objc_patterns = [match.group(2) for match in OBJC_METHOD_PATTERN.finditer(command)]
+        command = OBJC_METHOD_PATTERN.sub(' ', command)
+        
+        # 解析 --if / --conditions / --callers / --objc 选项
+        args = shlex.split(command) if command else []
+        if '--conditions' in args:
+            cls._showBreakpointConditions(exe_ctx.GetTarget())
+            return
+        
+        condition = None
+        if '--if' in args:
+            idx = args.index('--if')
+            if idx + 1 >= len(args):
+                print('[ 请在 --if 后面提供条件表达式，例如: mark 0x234 --if "x0 == 0" ]')
+                return
+            condition = args[idx + 1]
+            args = args[:idx] + args[idx + 2:]
+            
+            # 条件只编译一次，语法错误或未知寄存器时直接返回
+            try:
+                BreakpointCondition.validate(condition, exe_ctx.GetFrame())
+            except ExprSyntaxError as e:
+                JSONOutput.fail(f'[ 条件表达式错误: {e} ]')
+                return
+        
+        deferred_module = None
+        if '--deferred' in args:
+            idx = args.index('--deferred')
+            if idx + 1 >= len(args):
+                cls._showDeferredBreakpoints(exe_ctx.GetTarget())
+                return
+            deferred_module = args[idx + 1]
+            args = args[:idx] + args[idx + 2:]
+        
+        offsets_file = None
+        for option in ('-f', '--file'):
+            if option in args:
+                idx = args.index(option)
+                if idx + 1 >= len(args):
+                    print('[ 请在 -f 后面提供偏移文件，例如: mark -f offsets.txt ]')
+                    return
+                offsets_file = args[idx + 1]
+                args = args[:idx] + args[idx + 2:]
+        
+        callers = '--callers' in args
+        if callers:
+            args.remove('--callers')
+        
+        while '--objc' in args:
+            idx = args.index('--objc')
+            if idx + 1 >= len(args):
+                print('[ 请在 --objc 后面提供方法名或通配符，例如: mark --objc "*[LoginVC *]" ]')
+                return
+            objc_patterns.append(args[idx + 1])
+            args = args[:idx] + args[idx + 2:]
+        
+        # 以 * 结尾的参数是 ObjC 方法名通配符（地址表达式不会以 * 结尾）
+        objc_patterns += [arg for arg in args if arg.endswith('*')]
+        args = [arg for arg in args if not arg.endswith('*')]
+        
+        if objc_patterns:
+            cls._markObjCMethods(exe_ctx, objc_patterns, condition)
+            if not args:
+                return
+        
+        # 提取地址表达式列表
+        offsets = Utils.splitExpressions(' '.join(shlex.quote(arg) for arg in args))
+        
+        if offsets_file is not None:
+            cls._markOffsetsFile(exe_ctx, offsets_file, condition)
+            if not offsets:
+                return
+        
+        if deferred_module is not None:
+            cls._markDeferred(exe_ctx, deferred_module, offsets, condition)
+            return
+        
+        if callers:
+            cls._markCallers(exe_ctx, offsets, condition)
+            return
         
         if not offsets:
             # result.PutCString('[ Please input at least one offset address. ]')
@@ -50,33 +168,229 @@ class LLDBScriptHandler:
             return
         
         # 获取 aslr
-        aslr = Utils.getASLR()
+        aslr = Utils.getASLR(exe_ctx.GetTarget())
 
-        if not aslr:
+        if aslr is None:
             # 获取不到 ASLR ，所以标记断点失败
             # result.PutCString('[ Unable to retrieve ASLR, breakpoint marking failed. ]')
-            print('[ 无法获取 ASLR 偏移地址，断点标记失败. ]')
+            JSONOutput.fail('[ 无法获取 ASLR 偏移地址，断点标记失败. ]')
             return
         
         # 循环处理每个地址
         success_count = 0
-        for offset in offsets:
+        for offset_expr in offsets:
+            offset = Utils.parseAddress(exe_ctx, offset_expr)
+            if offset is None:
+                continue
+            address = aslr + offset
+            if condition is not None:
+                if cls._setConditionalBreakpoint(exe_ctx.GetTarget(), address, condition):
+                    success_count += 1
+                continue
             # 设置断点
-            exec_command = 'breakpoint set --address "%s+%s"' % (aslr, offset)
-            debugger.HandleCommand(exec_command)
-            success_count += 1
+            exec_command = 'breakpoint set --address 0x%x' % address
+            if JSONOutput.handleCommand(debugger, exec_command):
+                success_count += 1
         
         # result.PutCString('[ Successfully set breakpoints at %d offset addresses. ]' % success_count)
         print('[ 成功设置 %d 个偏移地址的断点. ]' % success_count)
 
+    @classmethod
+    def _markObjCMethods(cls, exe_ctx, patterns, condition):
+        """[ 在匹配的 ObjC 方法的 IMP 上设置一个批量断点 ]"""
+        target = exe_ctx.GetTarget()
+        module_name = Utils.getUsingModuleName(target)
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f'[ 找不到模块 {module_name} ]')
+            return
+        
+        index = ObjCMethodIndex.forModule(target, module)
+        if index is None:
+            JSONOutput.fail()
+            return
+        
+        matched = []
+        for pattern in patterns:
+            found = index.find(pattern)
+            print('[ %s: 匹配 %d 个方法 ]' % (pattern, len(found)))
+            matched.extend(found)
+        if not matched:
+            print('[ 没有匹配的 ObjC 方法，未设置断点. ]')
+            return
+        
+        names = [index.text(i) for i in matched[:10]]
+        print('\n'.join('    0x%x  %s' % (index.imp(i), name) for i, name in zip(matched, names)))
+        if len(matched) > len(names):
+            print('    ... 共 %d 个方法' % len(matched))
+        
+        breakpoint = BatchBreakpoint.create(target, module, [index.imp(i) for i in matched],
+                                            f"{LLDB_SCRIPT_NAME}.BatchBreakpointResolver")
+        if not breakpoint.IsValid():
+            JSONOutput.fail('[ 设置批量断点失败. ]')
+            return
+        if condition is not None:
+            BreakpointCondition.attach(target, breakpoint, condition, f"{LLDB_SCRIPT_NAME}.conditionCallback")
+        print('[ 断点 %d: %d 个方法%s ]' % (breakpoint.GetID(), breakpoint.GetNumLocations(),
+                                          '，条件: %s' % condition if condition is not None else ''))
+
+    @classmethod
+    def _markOffsetsFile(cls, exe_ctx, file_path, condition):
+        """[ 文件中的所有偏移（例如 ιldb-scan 的扫描结果）在当前模块上设置一个批量断点 ]"""
+        target = exe_ctx.GetTarget()
+        module_name = Utils.getUsingModuleName(target)
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f'[ 找不到模块 {module_name} ]')
+            return
+        
+        try:
+            offsets = Symbolicator.readAddressesFromFile(os.path.expanduser(file_path))
+        except IOError as e:
+            JSONOutput.fail(f"[ 读取文件失败: {e} ]")
+            return
+        # 去重并保持文件中的顺序
+        offsets = list(dict.fromkeys(offsets))
+        if not offsets:
+            print(f'[ 文件 {file_path} 中没有偏移地址. ]')
+            return
+        
+        breakpoint = BatchBreakpoint.create(target, module, offsets, f"{LLDB_SCRIPT_NAME}.BatchBreakpointResolver")
+        if not breakpoint.IsValid():
+            JSONOutput.fail('[ 设置批量断点失败. ]')
+            return
+        if condition is not None:
+            BreakpointCondition.attach(target, breakpoint, condition, f"{LLDB_SCRIPT_NAME}.conditionCallback")
+        print('[ 断点 %d: %s 中的 %d 个偏移，已解析 %d 个位置%s ]' % (
+            breakpoint.GetID(), file_path, len(offsets), breakpoint.GetNumLocations(),
+            '，条件: %s' % condition if condition is not None else ''))
+
+    @classmethod
+    def _markDeferred(cls, exe_ctx, module_name, offsets, condition):
+        """[ 按模块名设置一个批量断点：模块已加载时立即解析，否则在模块加载时自动解析 ]"""
+        target = exe_ctx.GetTarget()
+        if not target.IsValid():
+            JSONOutput.fail('[ 无效的调试目标. ]')
+            return
+        
+        values = [Utils.parseAddress(exe_ctx, offset_expr) for offset_expr in offsets]
+        values = [value for value in values if value is not None]
+        if not values:
+            print('[ 请输入至少一个偏移地址. ]')
+            return
+        
+        breakpoint = BatchBreakpoint.createDeferred(target, module_name, values,
+                                                    f"{LLDB_SCRIPT_NAME}.BatchBreakpointResolver")
+        if not breakpoint.IsValid():
+            JSONOutput.fail('[ 设置延迟断点失败. ]')
+            return
+        if condition is not None:
+            BreakpointCondition.attach(target, breakpoint, condition, f"{LLDB_SCRIPT_NAME}.conditionCallback")
+        
+        if Utils.findModule(target, module_name) is not None:
+            state = '模块已加载，已解析 %d 个位置' % breakpoint.GetNumLocations()
+        else:
+            state = '模块尚未加载，加载时自动解析'
+        print('[ 断点 %d: %s 的 %d 个偏移，%s%s ]' % (breakpoint.GetID(), os.path.basename(module_name), len(set(values)), state,
+                                                 '，条件: %s' % condition if condition is not None else ''))
+
+    @classmethod
+    def _showDeferredBreakpoints(cls, target):
+        """[ 显示所有延迟断点及解析状态 ]"""
+        items = BatchBreakpoint.describeDeferred(target) if target.IsValid() else []
+        if not items:
+            print('[ 当前没有延迟断点. ]')
+            return
+        print('[ 延迟断点列表 ]')
+        for bp_id, module_name, count, locations in items:
+            state = '已解析 %d 个位置' % locations if locations else '等待模块加载'
+            print(f'{bp_id}. {module_name} —— {count} 个偏移，{state}')
+
+    @classmethod
+    def _markCallers(cls, exe_ctx, offsets, condition):
+        """[ 在偏移的所有调用位置（BL / B）上设置一个批量断点 ]"""
+        target = exe_ctx.GetTarget()
+        module_name = Utils.getUsingModuleName(target)
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f'[ 找不到模块 {module_name} ]')
+            return
+        
+        index = XrefIndex.forModule(target, module)
+        if index is None:
+            JSONOutput.fail()
+            return
+        
+        sites = []
+        for offset_expr in offsets:
+            offset = Utils.parseAddress(exe_ctx, offset_expr)
+            if offset is None:
+                continue
+            callers = index.callers(offset)
+            print('[ 0x%x: %d 处调用 / 跳转 ]' % (offset, len(callers)))
+            sites.extend(site for site, _ in callers)
+        
+        if not sites:
+            print('[ 没有找到调用位置，未设置断点. ]')
+            return
+        
+        breakpoint = BatchBreakpoint.create(target, module, sites, f"{LLDB_SCRIPT_NAME}.BatchBreakpointResolver")
+        if not breakpoint.IsValid():
+            JSONOutput.fail('[ 设置批量断点失败. ]')
+            return
+        if condition is not None:
+            BreakpointCondition.attach(target, breakpoint, condition, f"{LLDB_SCRIPT_NAME}.conditionCallback")
+        print('[ 断点 %d: %d 个调用位置%s ]' % (breakpoint.GetID(), breakpoint.GetNumLocations(),
+                                             '，条件: %s' % condition if condition is not None else ''))
+
+    @classmethod
+    def _setConditionalBreakpoint(cls, target, address, condition):
+        """[ 设置带 Python 条件的断点 ]"""
+        breakpoint = BreakpointCondition.create(target, address, condition, f"{LLDB_SCRIPT_NAME}.conditionCallback")
+        if not breakpoint.IsValid():
+            JSONOutput.fail('[ 在地址 0x%x 设置断点失败. ]' % address)
+            return False
+        print('[ 断点 %d: 0x%x，条件: %s ]' % (breakpoint.GetID(), address, condition))
+        return True
+
+    @classmethod
+    def _showBreakpointConditions(cls, target):
+        """[ 显示所有条件断点及条件求值耗时 ]"""
+        items = BreakpointCondition.describe(target)
+        if not items:
+            print('[ 当前没有条件断点. ]')
+            return
+        print('[ 条件断点列表 ]')
+        for bp_id, expr, count, average in items:
+            print(f'{bp_id}. {expr} —— 求值 {count} 次，平均 {average * 1e6:.1f}us')
+
     @classmethod
     def markBreakPointByDynamicAddress(cls, debugger, command, exe_ctx, result, internal_dict):
         """[ 在动态地址上打断点 ]
     >> 使用方法：markd <dynamic_address>
-    >> 例如：markd 0x1063c2c10"""
+    >> 例如：markd 0x1063c2c10
+    >> 条件断点: markd 0x1063c2c10 --if "x0 == 0"
+    """
 
-        # 提取地址列表
-        addresses = Utils.extractAddressesFromCommand(command)
+        # 解析 --if 选项
+        args = shlex.split(command) if command else []
+        condition = None
+        if '--if' in args:
+            idx = args.index('--if')
+            if idx + 1 >= len(args):
+                print('[ 请在 --if 后面提供条件表达式，例如: markd 0x1063c2c10 --if "x0 == 0" ]')
+                return
+            condition = args[idx + 1]
+            args = args[:idx] + args[idx + 2:]
+            
+            try:
+                BreakpointCondition.validate(condition, exe_ctx.GetFrame())
+            except ExprSyntaxError as e:
+                JSONOutput.fail(f'[ 条件表达式错误: {e} ]')
+                return
+        
+        # 提取地址表达式列表
+        addresses = Utils.splitExpressions(' '.join(shlex.quote(arg) for arg in args))
         
         if not addresses:
             # result.PutCString('[ Please input at least one dynamic address. ]')
@@ -85,10 +399,17 @@ class LLDBScriptHandler:
 
         # 循环处理每个地址
         success_count = 0
-        for address in addresses:
-            exec_command = 'breakpoint set --address %s' % (address)
-            debugger.HandleCommand(exec_command)
-            success_count += 1
+        for address_expr in addresses:
+            address = Utils.parseAddress(exe_ctx, address_expr)
+            if address is None:
+                continue
+            if condition is not None:
+                if cls._setConditionalBreakpoint(exe_ctx.GetTarget(), address, condition):
+                    success_count += 1
+                continue
+            exec_command = 'breakpoint set --address 0x%x' % address
+            if JSONOutput.handleCommand(debugger, exec_command):
+                success_count += 1
         
         # result.PutCString('[ Successfully set breakpoints at %d dynamic addresses. ]' % success_count)
         print('[ 成功设置 %d 个动态地址的断点. ]' % success_count)
@@ -97,45 +418,254 @@ class LLDBScriptHandler:
     def calcDynamicMemoryAddress(cls, debugger, command, exe_ctx, result, internal_dict):
         """[ 基于 module_name 模块，计算动态内存地址 ]
     >> 使用方法：dy <offset_address>
-    >> 例如：dy 0x4567"""
+    >> 例如：dy 0x4567
+    >> 输入文件偏移 / 模块偏移: dy --fileoff 0x4567、dy --modoff 0x4567（输出 IDA 地址、文件偏移、模块偏移、运行时地址）
+    >> 离线转换（不需要进程）: dy --load <模块加载地址> 0x4567、dy --binary <文件路径> 0x4567，没有进程时直接输出前三种地址
+    >> 批量转换: dy -f <file> [-o <output_file>]，-m <module_name> 指定模块"""
+        
+        args = shlex.split(command) if command else []
+        kind = None
+        load_expr = None
+        binary_path = None
+        module_name = None
+        input_file = None
+        output_file = None
+        expressions = []
+        i = 0
+        while i < len(args):
+            if args[i] in ('--fileoff', '--modoff'):
+                kind = args[i][2:]
+                i += 1
+            elif args[i] == '--load' and i + 1 < len(args):
+                load_expr = args[i + 1]
+                i += 2
+            elif args[i] == '--binary' and i + 1 < len(args):
+                binary_path = args[i + 1]
+                i += 2
+            elif args[i] in ('-m', '--module') and i + 1 < len(args):
+                module_name = args[i + 1]
+                i += 2
+            elif args[i] in ('-f', '--file') and i + 1 < len(args):
+                input_file = args[i + 1]
+                i += 2
+            elif args[i] in ('-o', '--output') and i + 1 < len(args):
+                output_file = args[i + 1]
+                i += 2
+            else:
+                expressions.append(args[i])
+                i += 1
+        
+        target = exe_ctx.GetTarget()
+        live = target.IsValid() and target.GetProcess().IsValid()
+        options = (kind, load_expr, binary_path, module_name, input_file, output_file)
         
-        # 获取 ASLR
-        aslr = Utils.getASLR()
+        if all(option is None for option in options) and live:
+            # 获取 ASLR
+            aslr = Utils.getASLR(target)
 
-        if aslr:
-            # 如果没有指定，则计算 pc 寄存器的偏移
-            if command is None or command == "":
-                print("[ 请输入偏移地址. 例如：dy 0x4567 ]")
-                return
-                
+            if aslr is not None:
+                # 如果没有指定，则计算 pc 寄存器的偏移
+                if not expressions:
+                    print("[ 请输入偏移地址. 例如：dy 0x4567 ]")
+                    return
+                    
+                else:
+                    # 内存地址列表
+                    address_list = Utils.splitExpressions(command)
+                    offsets = [Utils.parseAddress(exe_ctx, addr) for addr in address_list]
+                    dy_addr = [hex(offset + aslr) for offset in offsets if offset is not None]
+                    print(dy_addr)
+                    for offset in offsets:
+                        if offset is not None:
+                            JSONOutput.emit({'offset': offset, 'address': offset + aslr})
+            return
+        
+        values = cls._readConversionValues(exe_ctx, expressions, input_file)
+        if not values:
+            print("[ 请输入偏移地址. 例如：dy 0x4567 ]")
+            return
+        
+        segment_map, slide = cls._segmentMapAndSlide(target, module_name, binary_path, load_expr, exe_ctx)
+        if segment_map is None:
+            return
+        
+        start_time = time.perf_counter()
+        lines = []
+        for value in values:
+            if kind == 'fileoff':
+                vmaddr = segment_map.vmAddress(value)
+                if vmaddr is None:
+                    lines.append('文件偏移 0x%x  [ 不属于模块中的任何 segment ]' % value)
+                    JSONOutput.emit({'input': value, 'ida': None})
+                    continue
+            elif kind == 'modoff':
+                vmaddr = value + segment_map.base
             else:
-                # 内存地址列表
-                address_list = shlex.split(command)
-                dy_addr = [hex(int(addr, 16) + int(aslr,16)) for addr in address_list]
-                print(dy_addr)
+                vmaddr = value
+            lines.append(segment_map.describe(vmaddr, slide))
+            if JSONOutput.enabled():
+                JSONOutput.emit(dict(segment_map.convert(vmaddr, slide) or {'ida': None}, input=value))
+        cls._outputConversion(lines, output_file, input_file, time.perf_counter() - start_time)
+
+    @classmethod
+    def _readConversionValues(cls, exe_ctx, expressions, input_file):
+        """[ 地址转换的输入：命令中的地址表达式 + 文件中的所有十六进制地址 ]"""
+        values = []
+        if input_file:
+            try:
+                values.extend(Symbolicator.readAddressesFromFile(os.path.expanduser(input_file)))
+            except IOError as e:
+                JSONOutput.fail(f"[ 读取文件失败: {e} ]")
+                return []
+        for expression in Utils.splitExpressions(' '.join(shlex.quote(expr) for expr in expressions)):
+            value = Utils.parseAddress(exe_ctx, expression)
+            if value is not None:
+                values.append(value)
+        return values
+
+    @classmethod
+    def _segmentMapAndSlide(cls, target, module_name, binary_path, load_expr, exe_ctx):
+        """[ 离线地址转换使用的段映射和 ASLR 偏移：--load 指定的加载地址 > 进程中模块的 ASLR 偏移 > 无 ]"""
+        if binary_path:
+            segment_map = SegmentMap.forFile(os.path.expanduser(binary_path))
+        else:
+            if not target.IsValid():
+                JSONOutput.fail("[ 无效的调试目标，可以使用 --binary <文件路径> 直接指定二进制文件. ]")
+                return None, None
+            module_name = module_name or Utils.getUsingModuleName(target)
+            module = Utils.findModule(target, module_name)
+            if module is None:
+                JSONOutput.fail(f"[ 找不到模块 {module_name} ]")
+                return None, None
+            segment_map = SegmentMap.forModule(target, module)
+        if segment_map is None:
+            JSONOutput.fail()
+            return None, None
+        
+        if load_expr is not None:
+            load_address = Utils.parseAddress(exe_ctx, load_expr)
+            if load_address is None:
+                JSONOutput.fail()
+                return None, None
+            return segment_map, load_address - segment_map.base
+        if not binary_path and target.GetProcess().IsValid():
+            return segment_map, Utils.getASLR(target, module_name)
+        return segment_map, None
+
+    @classmethod
+    def _outputConversion(cls, lines, output_file, input_file, elapsed):
+        if output_file:
+            try:
+                with open(os.path.expanduser(output_file), 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+            except IOError as e:
+                JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+                return
+            print(f"[ 已转换 {len(lines)} 个地址，耗时 {elapsed:.3f}s，结果已写入 {output_file} ]")
+        else:
+            print('\n'.join(lines))
+            if input_file:
+                print(f"[ 已转换 {len(lines)} 个地址，耗时 {elapsed:.3f}s ]")
         
 
     @classmethod   
     def calcStaticOffsetAddress(cls, debugger, command, exe_ctx, result, internal_dict):
-        """[ 基于 module_name 模块，计算静态偏移地址 ]
-    >> 使用方法：offset <address>
-    >> 例如：offset 0x1063c2c10
-    >> 如果直接输入 offset，则会计算当前 pc 寄存器的偏移（该命令基于 using 命令指定的模块计算偏移地址）"""
-        
-        # 获取 ASLR
-        aslr = Utils.getASLR()
-        
-        if aslr:
-            # 如果没有指定，则计算 pc 寄存器的偏移
-            if command is None or command == "":
-                pc_address = Utils.get_pc_value(exe_ctx)
-                print(hex(pc_address - int(aslr, 16)))
-                
+        """[ 计算地址所属模块及静态偏移地址（基于所有已加载模块，并给出最近的符号） ]
+    >> 使用方法：offset <address1> <address2> ...
+    >> 例如：offset 0x1063c2c10 $lr
+    >> 从文件中批量读取地址：offset -f <file> [-o <output_file>]
+    >> 如果直接输入 offset，则会计算当前 pc 寄存器的偏移
+    >> 离线转换（例如崩溃日志，不需要进程）: offset --load <模块加载地址> <address> ... [-m <module_name> | --binary <文件路径>]"""
+        
+        args = shlex.split(command) if command else []
+        
+        # 解析 -f / -o / --load / --binary / -m 选项
+        input_file = None
+        output_file = None
+        load_expr = None
+        binary_path = None
+        module_name = None
+        expressions = []
+        i = 0
+        while i < len(args):
+            if args[i] in ('-f', '--file') and i + 1 < len(args):
+                input_file = args[i + 1]
+                i += 2
+            elif args[i] in ('-o', '--output') and i + 1 < len(args):
+                output_file = args[i + 1]
+                i += 2
+            elif args[i] == '--load' and i + 1 < len(args):
+                load_expr = args[i + 1]
+                i += 2
+            elif args[i] == '--binary' and i + 1 < len(args):
+                binary_path = args[i + 1]
+                i += 2
+            elif args[i] in ('-m', '--module') and i + 1 < len(args):
+                module_name = args[i + 1]
+                i += 2
             else:
-                # 内存地址列表
-                address_list = shlex.split(command)
-                offsets = [hex(int(addr, 16) - int(aslr,16)) for addr in address_list]
-                print(offsets)
+                expressions.append(args[i])
+                i += 1
+        
+        if load_expr is None and (module_name is not None or binary_path is not None):
+            JSONOutput.fail("[ 错误: -m / --binary 只用于离线转换，需要同时用 --load 指定模块加载地址 ]")
+            return
+        
+        if load_expr is not None:
+            # 运行时地址 -> IDA 地址：按指定的加载地址计算，不依赖进程
+            values = cls._readConversionValues(exe_ctx, expressions, input_file)
+            segment_map, slide = cls._segmentMapAndSlide(exe_ctx.GetTarget(), module_name, binary_path, load_expr, exe_ctx)
+            if segment_map is None or not values:
+                JSONOutput.fail()
+                return
+            start_time = time.perf_counter()
+            lines = ['0x%x -> %s' % (value, segment_map.describe(value - slide, slide)) for value in values]
+            if JSONOutput.enabled():
+                for value in values:
+                    JSONOutput.emit(dict(segment_map.convert(value - slide, slide) or {'ida': None}, address=value))
+            cls._outputConversion(lines, output_file, input_file, time.perf_counter() - start_time)
+            return
+        
+        addresses = []
+        if input_file:
+            try:
+                addresses.extend(Symbolicator.readAddressesFromFile(os.path.expanduser(input_file)))
+            except IOError as e:
+                JSONOutput.fail(f"[ 读取文件失败: {e} ]")
+                return
+        
+        for addr_expr in Utils.splitExpressions(' '.join(shlex.quote(expr) for expr in expressions)):
+            address = Utils.parseAddress(exe_ctx, addr_expr)
+            if address is not None:
+                addresses.append(address)
+        
+        # 如果没有指定，则计算 pc 寄存器的偏移
+        if not addresses and not input_file:
+            pc_address = Utils.get_pc_value(exe_ctx)
+            if pc_address is None:
+                JSONOutput.fail()
+                return
+            addresses.append(pc_address)
+        
+        start_time = time.perf_counter()
+        lines = Symbolicator.symbolicate(addresses, exe_ctx.GetTarget())
+        elapsed = time.perf_counter() - start_time
+        if JSONOutput.enabled():
+            for record in Symbolicator.records(addresses, exe_ctx.GetTarget()):
+                JSONOutput.emit(record)
+        
+        if output_file:
+            try:
+                with open(os.path.expanduser(output_file), 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+            except IOError as e:
+                JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+                return
+            print(f"[ 已解析 {len(lines)} 个地址，耗时 {elapsed:.3f}s，结果已写入 {output_file} ]")
+        else:
+            print('\n'.join(lines))
+            if input_file:
+                print(f"[ 已解析 {len(lines)} 个地址，耗时 {elapsed:.3f}s ]")
     
     @classmethod  
     def writeMemory(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -144,17 +674,19 @@ class LLDBScriptHandler:
     >> 例如：memwrite 0x1063c2c10 1f2003d5
     >> 注意：地址和机器码不一定要以 0x 开头"""
         # 解析命令参数
-        args = shlex.split(command)
+        args = Utils.splitExpressions(command)
         if len(args) < 2:
             result.PutCString('[ 请提供地址和要修改的大端序机器码（"0x" 可以要可以不要，默认是十六进制），例如: memwrite 0x1063c2c10 1f2003d5 ]')
             return
         
         # 获取地址和机器码
-        address = args[0]
+        address = Utils.parseAddress(exe_ctx, args[0])
         big_endian_code = args[1]
         
-        # 确保地址以0x开头
-        address = Utils.ensure_hex_prefix(address)
+        if address is None:
+            JSONOutput.fail()
+            return
+        address = hex(address)
         
         # 转换为小端序
         little_endian_code = Utils.swapEndian(big_endian_code)
@@ -166,7 +698,10 @@ class LLDBScriptHandler:
         print(f"[ 大端序: {big_endian_code} -> 小端序: {little_endian_code} ]")
         
         # 执行命令
-        debugger.HandleCommand(exec_command)
+        JSONOutput.handleCommand(debugger, exec_command)
+        
+        # 缓存的反汇编中与修改范围重叠的指令失效
+        Disassembler.invalidate(exe_ctx.GetTarget(), int(address, 16), max(4, len(little_endian_code.replace("0x", "")) // 2))
         
         # 验证写入是否成功
         verify_command = f'memory read -s 4 -f x {address}'
@@ -176,7 +711,7 @@ class LLDBScriptHandler:
         if return_obj.Succeeded():
             print(f"[ 验证结果: {return_obj.GetOutput().strip()} ]")
         else:
-            print(f"[ 验证失败: {return_obj.GetError()} ]")
+            JSONOutput.fail(f"[ 验证失败: {return_obj.GetError()} ]")
 
     @classmethod  
     def readMemory(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -184,29 +719,37 @@ class LLDBScriptHandler:
     使用方法：
     1. memread <addr1> <addr2> ... - 读取多个地址的内存内容
     2. memread -ptr <addr_expr1> -ptr <addr_expr2> ... - 先从指定地址获取指针，再读取该指针指向的内存
-    3. memread [options] <addr> - 支持选项：-c/--count 指定读取字节数
+    3. memread [options] <addr> - 支持选项：
+       -c/--count 指定读取字节数
+       -s/--size 字长（1、2、4、8，默认 1）
+       --endian big|little 字节序（默认 little）
+       -a/--annotate 按 8 字节指针输出，并标注指向的 模块 + 偏移（符号）
+       -o/--outfile 输出到文件
     举例：
     - memread $x8 0x12345678
     - memread -ptr ($x8 + 0x20)
     - memread -c 0x100 $x8
     - memread --count 0x200 0x12345678
+    - memread -s 8 -a -c 0x80 $sp
+    - memread -c 0x100000 -o dump.txt $x0
     """
         # 检查是否提供了参数
         if not command or not command.strip():
             print("[ 请提供要读取的内存地址，例如: memread $x8 或 memread -ptr ($x8 + 0x20) ]")
             return
         
+        # 带值的选项
+        value_options = ('-c', '--count', '-s', '--size', '--endian', '-o', '--outfile')
+        
         try:
             # 分割命令参数
             args = shlex.split(command)
             
-            # 获取命令解释器
-            interpreter = debugger.GetCommandInterpreter()
-            
-            # 解析参数，识别 -ptr、-c、--count 选项和普通地址
+            # 解析参数，识别 -ptr 和其它选项以及普通地址
             ptr_expressions = []  # 存储需要先获取指针的地址表达式
             direct_addresses = []  # 存储直接读取的地址
-            count_value = None  # 存储读取字节数
+            options = {}
+            annotate = False
             
             i = 0
             while i < len(args):
@@ -214,72 +757,101 @@ class LLDBScriptHandler:
                     # 找到 -ptr 选项，收集其后的地址表达式
                     ptr_expr = []
                     i += 1  # 跳过 -ptr
-                    while i < len(args) and args[i] != '-ptr' and args[i] != '-c' and args[i] != '--count':
+                    while i < len(args) and args[i] != '-ptr' and args[i] not in value_options and args[i] not in ('-a', '--annotate'):
                         ptr_expr.append(args[i])
                         i += 1
                     if ptr_expr:
                         ptr_expressions.append(' '.join(ptr_expr))
-                elif (args[i] == '-c' or args[i] == '--count') and i + 1 < len(args):
-                    # 找到 -c 或 --count 选项，获取其后的值
-                    count_value = args[i + 1]
+                elif args[i] in value_options and i + 1 < len(args):
+                    options[args[i].lstrip('-')[0]] = args[i + 1]
                     i += 2  # 跳过选项和值
+                elif args[i] in ('-a', '--annotate'):
+                    annotate = True
+                    i += 1
                 else:
                     # 普通地址参数
                     direct_addresses.append(args[i])
                     i += 1
             
-            # 处理所有 -ptr 表达式
-            for addr_expr in ptr_expressions:
-                # print(f"[ 先获取地址 {addr_expr} 中的指针值 ]")
-                
-                pointer_addr = cls.getPointer(debugger, addr_expr, exe_ctx, result, internal_dict)
-                
-                if pointer_addr is not None:
-                    pointer_addr = Utils.ensure_hex_prefix(pointer_addr)
-                    # print(f"[ 获取到指针值: {pointer_addr} ]")
-                    # 使用获取到的指针值执行内存读取
-                    if count_value:
-                        memread_command = f'memory read --force -c {count_value} {pointer_addr}'
-                    else:
-                        memread_command = f'memory read --force -c 0x50 {pointer_addr}'
-                    # print(f"[ 执行内存读取命令: {memread_command} ]")
-                    
-                    # 使用临时的 result 对象，避免覆盖主 result
-                    temp_result = lldb.SBCommandReturnObject()
-                    interpreter.HandleCommand(memread_command, temp_result)
-                    
-                    if temp_result.Succeeded():
-                        print(temp_result.GetOutput().strip() + "\n")
-                    else:
-                        print(f"[ 错误: {temp_result.GetError().strip()} ]")
-                else:
-                    print(f"[ 错误: 无法获取指针地址 {addr_expr} ]")
-
+            # 合并被空格拆开的地址表达式，例如 $x8 + 0x20
+            direct_addresses = Utils.splitExpressions(' '.join(shlex.quote(addr) for addr in direct_addresses))
+            
+            process = exe_ctx.GetProcess()
+            if not process.IsValid():
+                JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+                return
+            
+            count = int(options['c'], 0) if 'c' in options else 0x50
+            byte_order = options.get('e', 'little')
+            if byte_order not in ('little', 'big'):
+                JSONOutput.fail(f"[ 错误: 字节序只能是 little 或 big ]")
+                return
+            module_index = Symbolicator.getModuleIndex(exe_ctx.GetTarget()) if annotate else None
+            hexdump = HexDump(int(options.get('s', '1'), 0), byte_order, module_index=module_index)
+            
+            # 先合并读取所有 -ptr 表达式中的指针，得到要读取的地址
+            addresses = []
+            for addr_expr, item in zip(ptr_expressions, Utils.readPointers(exe_ctx, ptr_expressions)):
+                if item is None:
+                    JSONOutput.fail(f"[ 错误: 无法获取指针地址 {addr_expr} ]")
+                    continue
+                print(f"[ 0x{item[0]:x}: 0x{item[1]:016x} ]")
+                addresses.append(item[1])
             
             # 处理所有直接地址
-            total_operations = len(ptr_expressions) + len(direct_addresses)
-            for addr in direct_addresses:
-                if count_value:
-                    memread_command = f'memory read --force -c {count_value} {addr}'
+            for addr_expr in direct_addresses:
+                address = Utils.parseAddress(exe_ctx, addr_expr)
+                if address is not None:
+                    addresses.append(address)
+            
+            out_file = open(os.path.expanduser(options['o']), 'w', encoding='utf-8') if 'o' in options else None
+            try:
+                if count > PAGE_SIZE:
+                    # 大块内存逐页读取、逐页输出
+                    for address in addresses:
+                        if JSONOutput.enabled() and out_file is None:
+                            for page_address, data, error in HexDump.readPages(process, address, count):
+                                if data is None:
+                                    JSONOutput.fail(f"[ 错误: 无法读取内存 0x{page_address:x}: {error} ]")
+                                    break
+                                JSONOutput.emit({'address': page_address, 'size': len(data), 'bytes': data.hex()})
+                            continue
+                        for page in hexdump.pages(process, address, count):
+                            cls._writeDump(page, out_file)
                 else:
-                    memread_command = f'memory read --force -c 0x50 {addr}'
-                # print(f"[ 执行内存读取命令: {memread_command} ]")
-                
-                # 对于多个操作或多个地址，使用临时的 result 对象
-                if total_operations > 1 or len(direct_addresses) > 1:
-                    temp_result = lldb.SBCommandReturnObject()
-                    interpreter.HandleCommand(memread_command, temp_result)
+                    # 所有读取请求合并后一次性读取，再按地址逐个输出
+                    planner = ReadPlanner(process)
+                    handles = [planner.add(address, count) for address in addresses]
+                    planner.execute()
                     
-                    if temp_result.Succeeded():
-                        print(temp_result.GetOutput().strip() + "\n")
-                    else:
-                        print(f"[ 错误: {temp_result.GetError().strip()} ]")
-                else:
-                    # 单个操作且单个地址时使用主 result
-                    interpreter.HandleCommand(memread_command, result)
+                    for address, handle in zip(addresses, handles):
+                        data = planner.get(handle)
+                        if data is None:
+                            # 跨越区域边界时输出可读的部分
+                            data = planner.get_partial(handle)
+                            if data is None:
+                                JSONOutput.fail(f"[ 错误: 无法读取内存 0x{address:x}: {planner.regions.describe(address)} ]")
+                                continue
+                            print(f"[ 只读取了 0x{len(data):x} / 0x{count:x} 字节: {planner.regions.describe(address + len(data))} ]")
+                        JSONOutput.emit({'address': address, 'size': len(data), 'bytes': data.hex()})
+                        cls._writeDump(hexdump.render(address, data) + "\n", out_file)
+                    
+                    if planner.saved > 0:
+                        print(planner.summary())
+            finally:
+                if out_file is not None:
+                    out_file.close()
+                    print(f"[ 已输出到 {options['o']} ]")
                         
         except Exception as e:
-            print(f"[ 内存读取失败: {e} ]")
+            JSONOutput.fail(f"[ 内存读取失败: {e} ]")
+
+    @classmethod
+    def _writeDump(cls, text, out_file):
+        if out_file is None:
+            print(text)
+        else:
+            out_file.write(text + "\n")
 
     @classmethod  
     def nopMemory(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -305,7 +877,7 @@ class LLDBScriptHandler:
             
             # 验证范围
             if start_addr > end_addr:
-                result.PutCString(f"[ 错误: 起始地址 {hex(start_addr)} 大于结束地址 {hex(end_addr)} ]")
+                JSONOutput.fail(f"[ 错误: 起始地址 {hex(start_addr)} 大于结束地址 {hex(end_addr)} ]")
                 return
             
             # 确保地址对齐到4字节（ARM64指令宽度）
@@ -324,7 +896,7 @@ class LLDBScriptHandler:
             while current_addr <= end_addr:
                 exec_command = f'memory write -s 4 {hex(current_addr)} {little_endian_nop}'
                 # 执行命令
-                debugger.HandleCommand(exec_command)
+                JSONOutput.handleCommand(debugger, exec_command)
                 
                 # 验证写入是否成功
                 verify_command = f'memory read -s 4 -f x {hex(current_addr)}'
@@ -336,11 +908,12 @@ class LLDBScriptHandler:
                 
                 current_addr += 4
             
+            Disassembler.invalidate(exe_ctx.GetTarget(), start_addr, end_addr + 4 - start_addr)
             print(f"[ 地址范围NOP操作完成，成功写入 {success_count} 个NOP指令 ]")
             return
         
         # 处理多个地址
-        args = shlex.split(command)
+        args = Utils.splitExpressions(command)
         if not args:
             result.PutCString('[ 请提供至少一个地址，支持单个地址、多个地址或地址范围格式 ]')
             return
@@ -348,15 +921,18 @@ class LLDBScriptHandler:
         success_count = 0
         # 遍历所有地址
         for i, address_str in enumerate(args):
-            # 确保地址以0x开头
-            address = Utils.ensure_hex_prefix(address_str)
+            address = Utils.parseAddress(exe_ctx, address_str)
+            if address is None:
+                continue
+            address = hex(address)
             
             # 执行内存写入命令
             exec_command = f'memory write -s 4 {address} {little_endian_nop}'
             # print(f"[ 地址 {i+1}: 执行命令: {exec_command} ]")
             
             # 执行命令
-            debugger.HandleCommand(exec_command)
+            JSONOutput.handleCommand(debugger, exec_command)
+            Disassembler.invalidate(exe_ctx.GetTarget(), int(address, 16), 4)
             
             # 验证写入是否成功
             verify_command = f'memory read -s 4 -f x {address}'
@@ -367,7 +943,7 @@ class LLDBScriptHandler:
                 success_count += 1
                 # print(f"[ 地址 {i+1} 验证结果: {return_obj.GetOutput().strip()} ]")
             else:
-                print(f"[ 地址 {i+1} 验证失败: {return_obj.GetError()} ]")
+                JSONOutput.fail(f"[ 地址 {i+1} 验证失败: {return_obj.GetError()} ]")
         
         print(f"[ 多地址NOP操作完成，共处理 {len(args)} 个地址, 成功写入 {success_count} 个NOP指令 ]")
 
@@ -382,55 +958,29 @@ class LLDBScriptHandler:
             return
         
         try:
-            # 分割命令参数
-            args = shlex.split(command)
+            # 分割地址表达式
+            args = Utils.splitExpressions(command)
             
-            # 处理每个地址参数
-            for addr_expr in args:
-                
-                if addr_expr.startswith('$') is False:
-                    # 地址表达式，确保以0x开头
-                    addr_expr = Utils.ensure_hex_prefix(addr_expr)
-                
-                # 构建 LLDB 命令获取指针地址
-                lldb_command = f'memory read -c 1 -s 8 -f x {addr_expr}'
-                
-                # print(f"[ 执行命令: {lldb_command} ]")
-                
-                # 执行命令并获取结果
-                return_obj = lldb.SBCommandReturnObject()
-                interpreter = debugger.GetCommandInterpreter()
-                interpreter.HandleCommand(lldb_command, return_obj)
-                
-                # 获取命令输出
-                output = return_obj.GetOutput()
-                error = return_obj.GetError()
-                print(f"[ {output.strip()} ]")
-                
-                if return_obj.Succeeded():
-                    # 使用正则表达式提取所有地址
-                    matches = re.findall(r'(0x[a-fA-F0-9]+)', output)
-                    if len(matches) >= 2:
-                        # 返回第二个地址（指针值）
-                        pointer_addr = matches[1]
-                        # 输出提取的地址
-                        # print(pointer_addr)
-                        return pointer_addr
-                    elif len(matches) == 1:
-                        # 如果只有一个地址，返回它
-                        pointer_addr = matches[0]
-                        # print(pointer_addr)
-                        return pointer_addr
-                    else:
-                        print(f"[ 错误: 无法从输出中提取地址: {output.strip()} ]")
-                        return None
-                else:
-                    # 输出错误信息
-                    print(f"[ 错误: {error.strip()} ]")
+            process = exe_ctx.GetProcess()
+            if not process.IsValid():
+                JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+                return None
+            
+            # 所有地址一起计算，指针读取合并成尽量少的内存读取
+            pointer_addr = None
+            for addr_expr, item in zip(args, Utils.readPointers(exe_ctx, args)):
+                if item is None:
+                    JSONOutput.fail(f"[ 错误: 无法读取地址 {addr_expr} 中的指针 ]")
                     return None
+                address, pointer_value = item
+                print(f"[ 0x{address:x}: 0x{pointer_value:016x} ]")
+                JSONOutput.emit({'expression': addr_expr, 'address': address, 'pointer': pointer_value})
+                pointer_addr = hex(pointer_value)
+            
+            return pointer_addr
                     
         except Exception as e:
-            print(f"[ 获取指针地址失败: {e} ]")
+            JSONOutput.fail(f"[ 获取指针地址失败: {e} ]")
 
     @classmethod  
     def saveCmd(cls, debugger, command, exe_ctx, result, internal_dict): 
@@ -455,7 +1005,7 @@ class LLDBScriptHandler:
         # 获取命令输出
         output = return_obj.GetOutput()
         if not output:
-            print("[ 无法获取命令历史. ]")
+            JSONOutput.fail("[ 无法获取命令历史. ]")
             return
         
         # 解析历史命令，构建序号到命令的映射
@@ -465,7 +1015,7 @@ class LLDBScriptHandler:
         save_cmd_name = cls._data_handler.cmd_script.get("saveCmd")
         
         if not save_cmd_name:
-            print("[ 无法获取 saveCmd 在 lldb 中的名字. ]")
+            JSONOutput.fail("[ 无法获取 saveCmd 在 lldb 中的名字. ]")
             return
         
         for line in output.strip().split('\n'):
@@ -525,7 +1075,7 @@ class LLDBScriptHandler:
                     return
                     
             except ValueError as e:
-                print(f"[ 错误: 解析命令参数失败 - {e} ]")
+                JSONOutput.fail(f"[ 错误: 解析命令参数失败 - {e} ]")
                 return
         
         # 将新记录添加到现有的 cmd_record_list
@@ -544,7 +1094,7 @@ class LLDBScriptHandler:
                     print(f"  {i+1}. {record['command']} - {record['desc']}")
                     
         except Exception as e:
-            print(f"[ 保存命令到文件失败: {e} ]")
+            JSONOutput.fail(f"[ 保存命令到文件失败: {e} ]")
        
     @classmethod  
     def showCmd(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -576,7 +1126,7 @@ class LLDBScriptHandler:
                     print(f"{i}. {cmd} —— {desc}")
                 
         except Exception as e:
-            print(f"[ 显示命令列表失败: {e} ]")
+            JSONOutput.fail(f"[ 显示命令列表失败: {e} ]")
 
     @classmethod 
     def removeCmd(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -603,7 +1153,7 @@ class LLDBScriptHandler:
                 # 序号从0开始，直接使用
                 indices = [int(idx) for idx in shlex.split(command)]
             except ValueError:
-                print("[ 错误: 请提供有效的命令序号. ]")
+                JSONOutput.fail("[ 错误: 请提供有效的命令序号. ]")
                 return
             
             # 验证序号有效性
@@ -651,7 +1201,7 @@ class LLDBScriptHandler:
             cls.showCmd(debugger, "", exe_ctx, result, internal_dict)
                 
         except Exception as e:
-            print(f"[ 删除命令失败: {e} ]")
+            JSONOutput.fail(f"[ 删除命令失败: {e} ]")
 
     @classmethod 
     def execCmd(cls, debugger, command, exe_ctx, result, internal_dict):
@@ -678,7 +1228,7 @@ class LLDBScriptHandler:
                 # 序号从0开始，直接使用
                 indices = [int(idx) for idx in shlex.split(command)]
             except ValueError:
-                print("[ 错误: 请提供有效的命令序号. ]")
+                JSONOutput.fail("[ 错误: 请提供有效的命令序号. ]")
                 return
             
             # 只取第一个序号，忽略其他
@@ -700,14 +1250,14 @@ class LLDBScriptHandler:
                     print(f"[ 命令描述: {desc} ]")
                 
                 # 执行命令
-                debugger.HandleCommand(command_to_exec)
+                JSONOutput.handleCommand(debugger, command_to_exec)
                 
             else:
-                print(f"[ 错误: 序号 {index} 超出有效范围(0-{len(cls._data_handler.cmd_record_list)-1}). ]")
+                JSONOutput.fail(f"[ 错误: 序号 {index} 超出有效范围(0-{len(cls._data_handler.cmd_record_list)-1}). ]")
                 return
                 
         except Exception as e:
-            print(f"[ 执行命令失败: {e} ]")
+            JSONOutput.fail(f"[ 执行命令失败: {e} ]")
 
 
     @classmethod
@@ -737,7 +1287,7 @@ class LLDBScriptHandler:
                 # 提取寄存器编号
                 reg_num = target[2:]
                 if not reg_num.isdigit():
-                    print(f"[ 无效的寄存器格式: {target} ]")
+                    JSONOutput.fail(f"[ 无效的寄存器格式: {target} ]")
                     return
                     
                 reg_num = int(reg_num)
@@ -746,139 +1296,40 @@ class LLDBScriptHandler:
                 reg1 = f"x{reg_num}"
                 reg2 = f"x{reg_num + 1}"
                 print(f"[ 要读取的寄存器: {reg1} 和 {reg2} ]")
-                # 读取寄存器值
-                cmd = f"register read ${reg1} ${reg2}"
-                return_obj = lldb.SBCommandReturnObject()
-                debugger.GetCommandInterpreter().HandleCommand(cmd, return_obj)
-                
-                if not return_obj.Succeeded():
-                    print(f"[ 读取寄存器失败: {return_obj.GetError()} ]")
-                    return
-                
-                output = return_obj.GetOutput()
+                # 从本次停止的寄存器快照中读取寄存器值
+                reg_values = Utils.readRegisters(exe_ctx, (reg1, reg2))
                 
-                # 解析寄存器值
-                reg_values = {}
-                for line in output.split('\n'):
-                    if '=' in line:
-                        parts = line.split('=')
-                        if len(parts) == 2:
-                            reg_name = parts[0].strip()
-                            reg_value_full = parts[1].strip()
-                            
-                            # 使用正则表达式提取第一个 0x 开头的值
-                            match = re.search(r'(0x[a-fA-F0-9]+)', reg_value_full)
-                            if match:
-                                reg_value = match.group(1)
-                                reg_values[reg_name] = reg_value
-                            
-                print(f"[ 寄存器值解析结果: {reg_values} ]")
+                print(f"[ 寄存器值解析结果: {cls._formatRegisterValues(reg_values)} ]")
                 if reg1 not in reg_values or reg2 not in reg_values:
-                    print(f"[ 无法解析寄存器值 ]")
+                    JSONOutput.fail(f"[ 无法解析寄存器值 ]")
                     return
                 
-                # 获取寄存器值
-                low_reg_value = reg_values[reg1]
-                high_reg_value = reg_values[reg2]
-                
-                # 去掉 0x 前缀
-                low_hex = low_reg_value.replace("0x", "")
-                high_hex = high_reg_value.replace("0x", "")
-                
-                # 检查是否是小字符串（高位寄存器以 e 开头）
-                if high_hex.startswith('e'):
-                    # 获取字符串长度（e 后面的第一位）
-                    if len(high_hex) < 2:
-                        print("[ 无法正确解析为 Swift 的字符串 ]")
-                        return
-                        
-                    length_char = high_hex[1]
-                    try:
-                        str_length = int(length_char, 16)
-                    except ValueError:
-                        print("[ 无法正确解析为 Swift 的字符串 ]")
-                        return
-                    
-                    # 检查是否是空字符串
-                    if str_length == 0:
-                        # 验证是否是空字符串格式（低位寄存器全0，高位寄存器为 e000000000000000）
-                        if low_hex == "0" * len(low_hex) and high_hex == "e" + "0" * (len(high_hex) - 1):
-                            print("[ 解析结果: \"\" (空字符串) ]")
-                            return
-                        else:
-                            print("[ 无法正确解析为 Swift 的字符串 ]")
-                            return
-                    
-                    # 拼接高位和低位寄存器值
-                    combined_hex = high_hex + low_hex
-                    
-                    # 从后往前截取 2*str_length 位字符
-                    if len(combined_hex) < 2 * str_length:
-                        print("[ 无法正确解析为 Swift 的字符串 ]")
-                        return
-                        
-                    str_hex = combined_hex[-(2 * str_length):]
-                    
-                    # 字节逆转（每两个字符一组进行反转）
-                    bytes_list = [str_hex[i:i+2] for i in range(0, len(str_hex), 2)]
-                    reversed_bytes = bytes_list[::-1]
-                    reversed_hex = ''.join(reversed_bytes)
-                    
-                    # 转换为 ASCII 字符串
-                    try:
-                        result_str = bytes.fromhex(reversed_hex).decode('ascii')
-                        print(f"[ 解析结果: \"{result_str}\" ]")
-                        return
-                    except (ValueError, UnicodeDecodeError):
-                        print("[ 无法正确解析为 Swift 的字符串 ]")
-                        return
+                # 小字符串直接从寄存器值中解析，大字符串读取存储对象 +0x20 处的内容
+                str_content = SwiftDecoder.decodeString(exe_ctx.GetProcess(), reg_values[reg1], reg_values[reg2])
+                if str_content is None:
+                    JSONOutput.fail("[ 无法正确解析为 Swift 的字符串 ]")
+                    return
+                JSONOutput.emit({'registers': {reg1: reg_values[reg1], reg2: reg_values[reg2]}, 'string': str_content})
+                if str_content == "":
+                    print("[ 解析结果: \"\" (空字符串) ]")
                 else:
-                    # 不是小字符串，尝试作为大字符串处理
-                    # 使用高位寄存器的值作为地址，偏移 0x20
-                    address = high_hex
-                    
-                    # 确保地址以 0x 开头
-                    address = Utils.ensure_hex_prefix(address)
-                    
-                    # 读取字符串
-                    cmd = f"memory read -f s {address}+0x20"
-                    return_obj = lldb.SBCommandReturnObject()
-                    debugger.GetCommandInterpreter().HandleCommand(cmd, return_obj)
-                    
-                    if not return_obj.Succeeded():
-                        print(f"[ 执行的命令: {cmd} ]")
-                        print(f"[ 读取内存失败: {return_obj.GetError()} ]")
-                        return
-                    
-                    output = return_obj.GetOutput()
-                    
-                    # 解析输出，提取字符串内容
-                    lines = output.split('\n')
-                    for line in lines:
-                        if ':' in line and '"' in line:
-                            # 提取引号内的内容
-                            start = line.find('"')
-                            end = line.rfind('"')
-                            if start != -1 and end != -1 and end > start:
-                                str_content = line[start+1:end]
-                                print(f"[ 解析结果: \"{str_content}\" ]")
-                                return
-                    
-                    print("[ 无法正确解析为 Swift 的字符串 ]")
+                    print(f"[ 解析结果: \"{str_content}\" ]")
             else:
                 # 处理地址
                 # 直接读取指定地址的字符串
                 
-                # 确保地址以 0x 开头
-                address = Utils.ensure_hex_prefix(target)
+                address = Utils.parseAddress(exe_ctx, target)
+                if address is None:
+                    JSONOutput.fail()
+                    return
                 
-                cmd = f"memory read -f s {address}+0x20"
+                cmd = f"memory read -f s 0x{address + 0x20:x}"
                 return_obj = lldb.SBCommandReturnObject()
                 debugger.GetCommandInterpreter().HandleCommand(cmd, return_obj)
                 
                 if not return_obj.Succeeded():
                     print(f"[ 执行的命令: {cmd} ]")
-                    print(f"[ 读取内存失败: {return_obj.GetError()} ]")
+                    JSONOutput.fail(f"[ 读取内存失败: {return_obj.GetError()} ]")
                     return
                 
                 output = return_obj.GetOutput()
@@ -893,12 +1344,13 @@ class LLDBScriptHandler:
                         if start != -1 and end != -1 and end > start:
                             str_content = line[start+1:end]
                             print(f"[ 解析结果: \"{str_content}\" ]")
+                            JSONOutput.emit({'address': address, 'string': str_content})
                             return
                 
-                print("[ 无法正确解析为 Swift 的字符串 ]")
+                JSONOutput.fail("[ 无法正确解析为 Swift 的字符串 ]")
                 
         except Exception as e:
-            print(f"[ 解析 Swift 字符串失败: {e} ]")
+            JSONOutput.fail(f"[ 解析 Swift 字符串失败: {e} ]")
             
             
             
@@ -929,7 +1381,7 @@ class LLDBScriptHandler:
                 # 提取寄存器编号
                 reg_num = target[2:]
                 if not reg_num.isdigit():
-                    print(f"[ 无效的寄存器格式: {target} ]")
+                    JSONOutput.fail(f"[ 无效的寄存器格式: {target} ]")
                     return
                     
                 reg_num = int(reg_num)
@@ -939,161 +1391,1136 @@ class LLDBScriptHandler:
                 reg2 = f"x{reg_num + 1}"
                 print(f"[ 要读取的寄存器: {reg1} 和 {reg2} ]")
                 
-                # 读取寄存器值
-                cmd = f"register read ${reg1} ${reg2}"
-                return_obj = lldb.SBCommandReturnObject()
-                debugger.GetCommandInterpreter().HandleCommand(cmd, return_obj)
-                
-                if not return_obj.Succeeded():
-                    print(f"[ 读取寄存器失败: {return_obj.GetError()} ]")
-                    return
-                
-                output = return_obj.GetOutput()
-                
-                # 解析寄存器值
-                reg_values = {}
-                for line in output.split('\n'):
-                    if '=' in line:
-                        parts = line.split('=')
-                        if len(parts) == 2:
-                            reg_name = parts[0].strip()
-                            reg_value_full = parts[1].strip()
-                            
-                            # 使用正则表达式提取第一个 0x 开头的值
-                            match = re.search(r'(0x[a-fA-F0-9]+)', reg_value_full)
-                            if match:
-                                reg_value = match.group(1)
-                                reg_values[reg_name] = reg_value
+                # 从本次停止的寄存器快照中读取寄存器值
+                reg_values = Utils.readRegisters(exe_ctx, (reg1, reg2))
                 
-                print(f"[ 寄存器值解析结果: {reg_values} ]")
+                print(f"[ 寄存器值解析结果: {cls._formatRegisterValues(reg_values)} ]")
                 if reg1 not in reg_values or reg2 not in reg_values:
-                    print(f"[ 无法解析寄存器值 ]")
+                    JSONOutput.fail(f"[ 无法解析寄存器值 ]")
                     return
                 
-                # 获取寄存器值
                 value_0 = reg_values[reg1]
                 value_1 = reg_values[reg2]
                 
-                # 去掉 0x 前缀
-                hex_0 = value_0.replace("0x", "")
-                hex_1 = value_1.replace("0x", "")
+                # 小Data的长度在x1的高16位，内容直接存放在x0、x1中；大Data的内容在x1指向的存储对象中
+                data = SwiftDecoder.smallData(value_0, value_1)
+                label = "小Data"
+                if data is None:
+                    data = SwiftDecoder.decodeData(exe_ctx.GetProcess(), value_0, value_1)
+                    label = "大Data"
                 
-                # 尝试解析为小Data
-                # 小Data的长度存在于x1中，从x1的值中提取长度
-                if len(hex_1) >= 4:
-                    # 提取x1中的长度（前4位）
-                    length_hex = hex_1[:4]
-                    try:
-                        data_length = int(length_hex, 16)
-                        if data_length > 0 and data_length <= 0x1000:  # 合理的长度范围
-                            # 拼接x1和x0的值
-                            combined_hex = hex_1 + hex_0
-                            
-                            # 从后往前截取 2*data_length 位字符
-                            if len(combined_hex) >= 2 * data_length:
-                                data_hex = combined_hex[-(2 * data_length):]
-                                
-                                # 字节逆转（每两个字符一组进行反转）
-                                bytes_list = [data_hex[i:i+2] for i in range(0, len(data_hex), 2)]
-                                reversed_bytes = bytes_list[::-1]
-                                reversed_hex = ''.join(reversed_bytes)
-                                
-                                                                # 输出数组格式
-                                byte_values = [f"0x{b}" for b in bytes_list[::-1]]
-                                print(f"[ 小Data解析结果(数组): [{','.join(byte_values)}] ]")
-
-                                # 输出十六进制格式（无空格）
-                                print(f"[ 小Data解析结果(十六进制): {reversed_hex} ]")
-                                
-                                # 尝试转换为字符串
-                                try:
-                                    result_str = bytes.fromhex(reversed_hex).decode('ascii')
-                                    print(f"[ 小Data解析结果(字符串): \"{result_str}\" ]")
-                                except (ValueError, UnicodeDecodeError):
-                                    print(f"[ 小Data解析结果(字符串): 无法解析为ASCII字符串 ]")
-                                
-
-                                return
-                    except ValueError:
-                        pass  # 如果解析失败，继续尝试大Data
+                if data is None:
+                    JSONOutput.fail("[ 无法正确解析为 Swift Data ]")
+                    return
                 
-                # 尝试解析为大Data
-                # 大Data的长度存在于x0中，第7位和第8位组成一个十六进制字节
-                if len(hex_0) >= 16:
-                    # 提取第7位和第8位（索引6和7）
-                    length_hex = hex_0[6:8]
-                    try:
-                        data_length = int(length_hex, 16)
-                        if data_length > 0 and data_length <= 0x1000:  # 合理的长度范围
-                            # 使用x1的值作为地址，加上0x10偏移
-                            address = value_1
-                            address = Utils.ensure_hex_prefix(address)
-                            addr_expr = f"{address}+0x10"
-                            
-                            # 获取指针地址
-                            pointer_addr = cls.getPointer(debugger, addr_expr, exe_ctx, result, internal_dict)
-                            
-                            if pointer_addr is not None:
-                                pointer_addr = Utils.ensure_hex_prefix(pointer_addr)
-                                print(f"[ 获取到指针值: {pointer_addr} ]")
-                                
-                                # 读取数据
-                                memread_command = f'memory read -c 0x{data_length:x} -s 1 -f x {pointer_addr}'
-                                return_obj = lldb.SBCommandReturnObject()
-                                debugger.GetCommandInterpreter().HandleCommand(memread_command, return_obj)
-                                
-                                if return_obj.Succeeded():
-                                    output = return_obj.GetOutput()
-                                    
-                                    # 解析输出，只提取每行中冒号后面的0x值
-                                    hex_values = []
-                                    for line in output.split('\n'):
-                                        if ':' in line:
-                                            # 分割冒号前后的内容
-                                            parts = line.split(':', 1)
-                                            if len(parts) == 2:
-                                                # 只处理冒号后面的部分
-                                                data_part = parts[1]
-                                                # 提取所有0x开头的值
-                                                matches = re.findall(r'(0x[a-fA-F0-9]+)', data_part)
-                                                for match in matches:
-                                                    hex_values.append(match.replace("0x", ""))
-                                    
-                                    if hex_values:
-                                        # 拼接所有值
-                                        combined_hex = ''.join(hex_values)
-                                        
-                                        # 输出十六进制格式（无空格）
-                                        print(f"[ 大Data解析结果(十六进制): {combined_hex} ]")
-                                        
-                                        # 输出数组格式
-                                        byte_values = [f"0x{h}" for h in hex_values]
-                                        print(f"[ 大Data解析结果(数组): [{','.join(byte_values)}] ]")
-                                        
-                                        # 尝试转换为字符串
-                                        try:
-                                            result_str = bytes.fromhex(combined_hex).decode('ascii')
-                                            print(f"[ 大Data解析结果(字符串): \"{result_str}\" ]")
-                                        except (ValueError, UnicodeDecodeError):
-                                            print(f"[ 大Data解析结果(字符串): 无法解析为ASCII字符串 ]")
-                                        
-                                        return
-                                    else:
-                                        print(f"[ 无法从内存读取结果中提取数据 ]")
-                                else:
-                                    print(f"[ 读取内存失败: {return_obj.GetError()} ]")
-                            else:
-                                print(f"[ 无法获取指针地址 ]")
-                        else:
-                            print(f"[ 解析的Data长度({data_length})超出合理范围 ]")
-                    except ValueError:
-                        print(f"[ 无法解析Data长度 ]")
-                else:
-                    print(f"[ x0寄存器值长度不足，无法解析为大Data ]")
+                # 输出十六进制格式（无空格）
+                print(f"[ {label}解析结果(十六进制): {data.hex()} ]")
                 
-                print("[ 无法正确解析为 Swift Data ]")
+                # 输出数组格式
+                print(f"[ {label}解析结果(数组): [{','.join('0x%02x' % b for b in data)}] ]")
+                
+                # 尝试转换为字符串
+                try:
+                    print(f"[ {label}解析结果(字符串): \"{data.decode('ascii')}\" ]")
+                except UnicodeDecodeError:
+                    print(f"[ {label}解析结果(字符串): 无法解析为ASCII字符串 ]")
             else:
                 print("[ 当前只支持寄存器输入，不支持直接地址输入 ]")
                 
         except Exception as e:
-            print(f"[ 解析 Swift Data 失败: {e} ]")
\ No newline at end of file
+            JSONOutput.fail(f"[ 解析 Swift Data 失败: {e} ]")
+
+    @classmethod
+    def disassembleModule(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 基于模块偏移的反汇编（按模块 UUID + 偏移缓存） ]
+    >> 使用方法：dis <offset> [-c <指令条数>] - 从偏移开始反汇编（默认 16 条，默认使用 using 指定的模块）
+    >> dis [<start_offset>, <end_offset>] - 反汇编偏移范围
+    >> dis --pc - 反汇编当前 pc 附近的指令（pc-0x20 ~ pc+0x24，dispc 即此命令）
+    >> dis -m <module_name> <offset> - 指定模块
+    >> 指令字节从磁盘上的二进制读取（读取不到时读取一次进程内存），nop / memwrite 修改过的范围从进程内存读取"""
+        
+        args = shlex.split(command) if command else []
+        count = 16
+        module_name = None
+        around_pc = False
+        expressions = []
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] in ('-c', '--count') and i + 1 < len(args):
+                    count = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] in ('-m', '--module') and i + 1 < len(args):
+                    module_name = args[i + 1]
+                    i += 2
+                elif args[i] == '--pc':
+                    around_pc = True
+                    i += 1
+                else:
+                    expressions.append(args[i])
+                    i += 1
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        if not target.IsValid():
+            JSONOutput.fail("[ 无效的调试目标. ]")
+            return
+        
+        current = None
+        end = None
+        expression = ' '.join(expressions)
+        if around_pc or not expression:
+            # 当前 pc 所在模块
+            pc = Utils.get_pc_value(exe_ctx)
+            index = Symbolicator.getModuleIndex(target)
+            located = index.locate(pc) if pc is not None and index is not None else None
+            if located is None:
+                print("[ 当前 pc 不属于任何已加载模块 ]")
+                return
+            owner, current = located
+            module = index.modules[owner]
+            start, end = current - 0x20, current + 0x24
+        else:
+            module_name = module_name or Utils.getUsingModuleName(target)
+            module = Utils.findModule(target, module_name)
+            if module is None:
+                JSONOutput.fail(f"[ 找不到模块 {module_name} ]")
+                return
+            
+            range_match = re.fullmatch(r'\[\s*(.+?)\s*,\s*(.+?)\s*\]', expression)
+            if range_match:
+                start = Utils.parseAddress(exe_ctx, range_match.group(1))
+                end = Utils.parseAddress(exe_ctx, range_match.group(2))
+                if start is None or end is None:
+                    JSONOutput.fail()
+                    return
+            else:
+                start = Utils.parseAddress(exe_ctx, expression)
+                if start is None:
+                    JSONOutput.fail()
+                    return
+        
+        instructions = Disassembler.instructions(target, module, start, end, None if end is not None else count)
+        if not instructions:
+            JSONOutput.fail(f"[ 无法反汇编偏移 0x{start:x} ]")
+            return
+        
+        name = module.GetFileSpec().GetFilename()
+        header = module.GetObjectFileHeaderAddress()
+        header_load = header.GetLoadAddress(target)
+        slide = header_load - header.GetFileAddress() if header_load != lldb.LLDB_INVALID_ADDRESS else None
+        
+        symbol = module.ResolveFileAddress(start).GetSymbol()
+        print(f"[ {name}`{symbol.GetName()} ]" if symbol.IsValid() and symbol.GetName() else f"[ {name} ]")
+        lines = []
+        for offset, (size, mnemonic, operands, comment) in instructions:
+            marker = '->  ' if offset == current else '    '
+            address = f"0x{offset + slide:x} " if slide is not None else ""
+            line = f"{marker}{address}<{name}+0x{offset:x}>: {mnemonic:<8} {operands}"
+            lines.append(line + f"  ; {comment}" if comment else line)
+        print('\n'.join(lines))
+
+    @classmethod
+    def crossReference(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 基于模块偏移的交叉引用（调用方 / 数据引用 / 被调用方） ]
+    >> 使用方法：xref <offset> ... - 列出调用 / 跳转到偏移的位置，以及通过 ADRP + ADD / LDR 引用偏移的位置
+    >> xref --callees <offset> - 列出偏移所在函数中的所有调用 / 跳转
+    >> xref -m <module_name> <offset> - 指定模块（默认使用 using 指定的模块）
+    >> xref --rebuild - 重新扫描并建立索引，--max <条数> 限制每个偏移显示的条数（默认 200）
+    >> 索引按模块 UUID 保存在 cache 目录，第一次使用时扫描模块的可执行 section 建立"""
+        
+        args = shlex.split(command) if command else []
+        module_name = None
+        rebuild = False
+        show_callees = False
+        limit = 200
+        expressions = []
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] in ('-m', '--module') and i + 1 < len(args):
+                    module_name = args[i + 1]
+                    i += 2
+                elif args[i] == '--max' and i + 1 < len(args):
+                    limit = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] == '--rebuild':
+                    rebuild = True
+                    i += 1
+                elif args[i] == '--callees':
+                    show_callees = True
+                    i += 1
+                else:
+                    expressions.append(args[i])
+                    i += 1
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        if not target.IsValid():
+            JSONOutput.fail("[ 无效的调试目标. ]")
+            return
+        
+        module_name = module_name or Utils.getUsingModuleName(target)
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f"[ 找不到模块 {module_name} ]")
+            return
+        
+        offsets = Utils.splitExpressions(' '.join(shlex.quote(arg) for arg in expressions))
+        if not offsets and not rebuild:
+            print("[ 请输入至少一个偏移地址. ]")
+            return
+        
+        index = XrefIndex.forModule(target, module, rebuild)
+        if index is None:
+            JSONOutput.fail()
+            return
+        
+        for expression in offsets:
+            offset = Utils.parseAddress(exe_ctx, expression)
+            if offset is None:
+                continue
+            
+            if show_callees:
+                symbol = module.ResolveFileAddress(offset).GetSymbol()
+                if not symbol.IsValid():
+                    print(f"[ 偏移 0x{offset:x} 不属于任何函数 ]")
+                    continue
+                start = symbol.GetStartAddress().GetFileAddress()
+                end = symbol.GetEndAddress().GetFileAddress()
+                callees = index.callees(start, end)
+                print(f"[ {cls._describeOffset(module, start)} 中的调用 / 跳转: {len(callees)} 处 ]")
+                lines = [f"    0x{site:x}  {KIND_NAMES[kind]:<8} -> 0x{callee:x}  {cls._describeOffset(module, callee)}"
+                         for site, callee, kind in callees[:limit]]
+                cls._printXrefLines(lines, len(callees), limit)
+                continue
+            
+            callers = index.callers(offset)
+            data_refs = index.dataRefs(offset)
+            print(f"[ 0x{offset:x} {cls._describeOffset(module, offset)}: {len(callers)} 处调用 / 跳转，{len(data_refs)} 处数据引用 ]")
+            refs = callers + data_refs
+            lines = [f"    0x{site:x}  {KIND_NAMES[kind]:<8} {cls._describeOffset(module, site)}" for site, kind in refs[:limit]]
+            cls._printXrefLines(lines, len(refs), limit)
+
+    @classmethod
+    def findStrings(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 在模块的 C 字符串 / CFString 常量中搜索，并列出引用位置 ]
+    >> 使用方法：strfind <text> - 子串搜索（默认使用 using 指定的模块）
+    >> strfind -r <regex> - 正则搜索（^ $ 对应单个字符串的开头和结尾），-i 忽略大小写
+    >> strfind -m <module_name> <text> - 指定模块，--max <条数> 限制显示条数（默认 100），--rebuild 重新建立索引
+    >> arm64 目标同时列出通过 ADRP + ADD / LDR 引用字符串的代码偏移，可直接用于 mark；--no-xref 不查询引用位置"""
+        
+        args = shlex.split(command) if command else []
+        module_name = None
+        regex = False
+        ignore_case = False
+        rebuild = False
+        with_xref = True
+        limit = 100
+        patterns = []
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] in ('-m', '--module') and i + 1 < len(args):
+                    module_name = args[i + 1]
+                    i += 2
+                elif args[i] == '--max' and i + 1 < len(args):
+                    limit = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] in ('-r', '--regex'):
+                    regex = True
+                    i += 1
+                elif args[i] in ('-i', '--ignore-case'):
+                    ignore_case = True
+                    i += 1
+                elif args[i] == '--rebuild':
+                    rebuild = True
+                    i += 1
+                elif args[i] == '--no-xref':
+                    with_xref = False
+                    i += 1
+                else:
+                    patterns.append(args[i])
+                    i += 1
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        pattern = ' '.join(patterns)
+        if not pattern and not rebuild:
+            print("[ 请输入要搜索的字符串. ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        if not target.IsValid():
+            JSONOutput.fail("[ 无效的调试目标. ]")
+            return
+        
+        module_name = module_name or Utils.getUsingModuleName(target)
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f"[ 找不到模块 {module_name} ]")
+            return
+        
+        index = StringIndex.forModule(target, module, rebuild)
+        if index is None:
+            JSONOutput.fail()
+            return
+        if not pattern:
+            return
+        
+        try:
+            matched = index.search(pattern, regex, ignore_case)
+        except re.error as e:
+            JSONOutput.fail(f"[ 正则表达式错误: {e} ]")
+            return
+        
+        xref_index = XrefIndex.forModule(target, module) if with_xref and XrefIndex.isSupported(target) else None
+        
+        print(f"[ 找到 {len(matched)} 个字符串 ]")
+        sites = []
+        lines = []
+        for i in matched[:limit]:
+            offset = index.offset(i)
+            text = index.text(i)
+            if len(text) > 120:
+                text = text[:120] + '...'
+            lines.append(f"    0x{offset:x}  {STRING_KIND_NAMES[index.kind(i)]:<8} {text!r}")
+            if xref_index is not None:
+                for site, kind in xref_index.dataRefs(offset):
+                    sites.append(site)
+                    lines.append(f"        <- 0x{site:x}  {KIND_NAMES[kind]:<8} {cls._describeOffset(module, site)}")
+        cls._printXrefLines(lines, len(matched), limit)
+        
+        if sites:
+            print(f"[ 引用位置: mark {' '.join('0x%x' % site for site in sorted(set(sites)))} ]")
+
+    @classmethod
+    def _describeOffset(cls, module, offset):
+        """[ 偏移所在的 符号 + 偏移，没有符号时返回空字符串 ]"""
+        symbol = module.ResolveFileAddress(offset).GetSymbol()
+        if not symbol.IsValid() or not symbol.GetName():
+            return ""
+        delta = offset - symbol.GetStartAddress().GetFileAddress()
+        return f"{symbol.GetName()} + {delta}" if delta else symbol.GetName()
+
+    @classmethod
+    def _printXrefLines(cls, lines, total, limit):
+        if lines:
+            print('\n'.join(lines))
+        if total > limit:
+            print(f"[ 仅显示前 {limit} 条，共 {total} 条（--max 调整） ]")
+
+    @classmethod
+    def _formatRegisterValues(cls, reg_values):
+        return {name: '0x%016x' % value for name, value in reg_values.items()}
+
+    @classmethod
+    def parseSwiftCollection(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 解析 Swift Array / Dictionary / Set ]
+    >> 使用方法：sa <reg|addr> [--elem string|data|int|ptr] [--max <个数>] [--kind array|dict|set]
+    >> Dictionary 的键和值类型不同时用 --elem <键类型>:<值类型>，例如 --elem string:int
+    >> 例如：sa $x0 --elem string、sa $x20 --elem string:data
+    >> 默认根据存储对象的类名判断集合类型，元素按 ptr 输出"""
+        
+        args = shlex.split(command) if command else []
+        elem = 'ptr'
+        kind = None
+        limit = 0
+        expressions = []
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] == '--elem' and i + 1 < len(args):
+                    elem = args[i + 1]
+                    i += 2
+                elif args[i] == '--kind' and i + 1 < len(args):
+                    kind = args[i + 1]
+                    i += 2
+                elif args[i] == '--max' and i + 1 < len(args):
+                    limit = int(args[i + 1], 0)
+                    i += 2
+                else:
+                    expressions.append(args[i])
+                    i += 1
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        key_type, _, value_type = elem.partition(':')
+        value_type = value_type or key_type
+        if key_type not in ELEMENT_STRIDES or value_type not in ELEMENT_STRIDES:
+            JSONOutput.fail(f"[ 错误: 不支持的元素类型 {elem}，可选 string / data / int / ptr ]")
+            return
+        if kind is not None and kind not in ('array', 'dict', 'set'):
+            JSONOutput.fail(f"[ 错误: 不支持的集合类型 {kind}，可选 array / dict / set ]")
+            return
+        
+        expressions = Utils.splitExpressions(' '.join(shlex.quote(expr) for expr in expressions))
+        if len(expressions) != 1:
+            print("[ 请提供单个寄存器或地址，例如: sa $x0 --elem string ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        process = exe_ctx.GetProcess()
+        if not process.IsValid():
+            JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+            return
+        
+        address = Utils.parseAddress(exe_ctx, expressions[0])
+        if address is None:
+            JSONOutput.fail()
+            return
+        
+        # 集合类型：优先使用 --kind，否则根据存储对象的类名判断
+        class_name = ObjCDecoder(target).object_class_name(address & OBJECT_ADDRESS_MASK)
+        kind = kind or SwiftCollection.kindOfClass(class_name)
+        if kind is None:
+            print(f"[ 0x{address:x}: {class_name or '未知类'} 不是 Swift Array / Dictionary / Set，可以用 --kind 指定集合类型 ]")
+            return
+        
+        collection = SwiftCollection(process, address, kind, key_type, value_type)
+        if not collection.readHeader():
+            JSONOutput.fail(f"[ 0x{address:x}: 无法读取集合头部，或者不是有效的 Swift 集合 ]")
+            return
+        
+        print(f"[ 0x{collection.storage:x}: {class_name or kind}, count = {collection.count}, capacity = {collection.capacity} ]")
+        
+        # 分批解析、分批输出，大集合不必等全部解析完
+        shown = 0
+        for lines in collection.iterate(limit):
+            print('\n'.join(lines))
+            shown += len(lines)
+        if shown < collection.count:
+            print(f"[ ... 还有 {collection.count - shown} 个元素 ]")
+
+    @classmethod
+    def showRegisters(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 显示寄存器（基于本次停止的寄存器快照） ]
+    >> 使用方法：regs [--changed] [reg1 reg2 ...]
+    >> 例如：regs、regs x0 x1 pc、regs --changed
+    >> --changed：只显示与上一次停止相比发生变化的寄存器"""
+        
+        args = shlex.split(command) if command else []
+        only_changed = '--changed' in args or '-c' in args
+        names = [arg.lstrip('$') for arg in args if arg not in ('--changed', '-c')]
+        
+        frame = exe_ctx.GetFrame()
+        if not frame.IsValid():
+            JSONOutput.fail("[ 无效帧. ]")
+            return
+        
+        register_handler = RegisterHandler()
+        snapshot = register_handler.snapshot(frame)
+        if snapshot is None:
+            JSONOutput.fail("[ 读取寄存器失败. ]")
+            return
+        
+        if only_changed:
+            previous = register_handler.previous(frame)
+            if previous is None:
+                print("[ 没有上一次停止的寄存器快照. ]")
+                return
+            
+            changed = snapshot.changed(previous)
+            if names:
+                changed = [item for item in changed if item[0] in names]
+            
+            if not changed:
+                print("[ 寄存器没有变化. ]")
+                return
+            
+            lines = ["[ 发生变化的寄存器 ]"]
+            for name, old, new in changed:
+                old_str = "<none>" if old is None else "0x%016x" % old
+                lines.append("%8s = 0x%016x    (%s)" % (name, new, old_str))
+            print("\n".join(lines))
+            return
+        
+        if names:
+            items = [(name, register_handler.read(frame, name)) for name in names]
+        else:
+            items = list(snapshot.items())
+        
+        lines = []
+        for name, value in items:
+            if value is None:
+                lines.append("%8s = <unavailable>" % name)
+            else:
+                lines.append("%8s = 0x%016x" % (name, value))
+        print("\n".join(lines))
+
+    @classmethod
+    def showDashboard(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 停止面板：寄存器、pc 附近的反汇编、调用栈和监视表达式一次性输出 ]
+    >> 使用方法：dash - 立即输出面板
+    >> dash --on / --off - 安装 / 移除 stop-hook，每次停止时自动输出面板
+    >> dash --budget <毫秒> - 时间预算（默认 50ms），预计会超出预算的部分自动跳过
+    >> dash --frames <个数> - 显示的栈帧数量（默认 8），--sections regs,dis,stack,watch - 选择输出的部分
+    >> dash --watch <expr> [-s <字节数>] - 添加监视表达式（指定字节数时读取并显示内存），--unwatch <expr> 移除
+    >> dash --status - 查看面板配置和各部分的平均耗时"""
+        
+        args = shlex.split(command) if command else []
+        target = exe_ctx.GetTarget()
+        if not target.IsValid():
+            JSONOutput.fail("[ 无效的调试目标. ]")
+            return
+        
+        dashboard = StopDashboard.current(target)
+        action = None
+        watch_expr = None
+        watch_size = 0
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] in ('--on', '--off', '--status'):
+                    action = args[i][2:]
+                    i += 1
+                elif args[i] == '--budget' and i + 1 < len(args):
+                    dashboard.budget = float(args[i + 1]) / 1000
+                    i += 2
+                elif args[i] == '--frames' and i + 1 < len(args):
+                    dashboard.frame_count = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] == '--sections' and i + 1 < len(args):
+                    sections = [name.strip() for name in args[i + 1].split(',') if name.strip()]
+                    unknown = [name for name in sections if name not in SECTIONS]
+                    if unknown:
+                        JSONOutput.fail(f"[ 错误: 不支持的部分 {', '.join(unknown)}，可选 {', '.join(SECTIONS)} ]")
+                        return
+                    dashboard.sections = sections
+                    i += 2
+                elif args[i] == '--watch' and i + 1 < len(args):
+                    watch_expr = args[i + 1]
+                    i += 2
+                elif args[i] in ('-s', '--size') and i + 1 < len(args):
+                    watch_size = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] == '--unwatch' and i + 1 < len(args):
+                    if not dashboard.removeWatch(args[i + 1]):
+                        print(f"[ 没有监视表达式 {args[i + 1]} ]")
+                    i += 2
+                else:
+                    JSONOutput.fail(f"[ 错误: 未知参数 {args[i]} ]")
+                    return
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        if watch_expr is not None:
+            try:
+                ExprEvaluator.compile(watch_expr)
+            except ExprSyntaxError as e:
+                JSONOutput.fail(f"[ 监视表达式错误: {e} ]")
+                return
+            dashboard.addWatch(watch_expr, watch_size)
+        
+        interpreter = debugger.GetCommandInterpreter()
+        if action == 'on':
+            if dashboard.hook_id is None:
+                return_obj = lldb.SBCommandReturnObject()
+                interpreter.HandleCommand(f"target stop-hook add -P {LLDB_SCRIPT_NAME}.DashboardStopHook", return_obj)
+                match = re.search(r'#(\d+)', return_obj.GetOutput() or '')
+                if not return_obj.Succeeded() or match is None:
+                    JSONOutput.fail(f"[ 安装 stop-hook 失败: {return_obj.GetError() or return_obj.GetOutput()} ]")
+                    return
+                dashboard.hook_id = int(match.group(1))
+            print(f"[ 停止面板已启用 (stop-hook {dashboard.hook_id})，预算 {dashboard.budget * 1000:.0f}ms ]")
+            return
+        if action == 'off':
+            if dashboard.hook_id is not None:
+                interpreter.HandleCommand(f"target stop-hook delete {dashboard.hook_id}", lldb.SBCommandReturnObject())
+                dashboard.hook_id = None
+            print("[ 停止面板已关闭 ]")
+            return
+        if action == 'status':
+            print('\n'.join(dashboard.summary()))
+            return
+        if args:
+            # 只修改了配置
+            print('\n'.join(dashboard.summary()))
+            return
+        
+        frame = exe_ctx.GetFrame()
+        if not frame.IsValid():
+            JSONOutput.fail("[ 无效帧. ]")
+            return
+        print(dashboard.render(frame))
+
+    @classmethod
+    def showMemoryRegions(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 内存区域列表：地址范围、权限、所属模块和段 ]
+    >> 使用方法：regions - 列出所有已映射的内存区域
+    >> regions <addr_expr> ... - 查看地址所在的区域，例如: regions $x0 ($sp + 0x20)
+    >> regions -m <module_name> - 只列出属于指定模块的区域，-p <权限> - 只列出包含指定权限的区域，例如: regions -p rx"""
+        
+        args = shlex.split(command) if command else []
+        process = exe_ctx.GetProcess()
+        if not process.IsValid():
+            JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+            return
+        
+        options = {}
+        expressions = []
+        i = 0
+        while i < len(args):
+            if args[i] in ('-m', '--module', '-p', '--permissions') and i + 1 < len(args):
+                options[args[i].lstrip('-')[0]] = args[i + 1]
+                i += 2
+            else:
+                expressions.append(args[i])
+                i += 1
+        
+        permissions = options.get('p', '')
+        if any(char not in 'rwx' for char in permissions):
+            JSONOutput.fail(f"[ 错误: 权限只能是 r、w、x 的组合 ]")
+            return
+        
+        regions = MemoryRegionMap.current(process)
+        mapped = regions.loadAll()
+        if not mapped:
+            print("[ 调试服务不支持内存区域查询. ]")
+            return
+        index = Symbolicator.getModuleIndex(exe_ctx.GetTarget())
+        
+        selected = mapped
+        if expressions:
+            selected = []
+            for expression in Utils.splitExpressions(' '.join(shlex.quote(expr) for expr in expressions)):
+                address = Utils.parseAddress(exe_ctx, expression)
+                if address is None:
+                    continue
+                region = regions.find(address)
+                if region is None or not region.mapped:
+                    print(f"[ {regions.describe(address)} ]")
+                    JSONOutput.emit({'address': address, 'mapped': False})
+                    continue
+                selected.append(region)
+        
+        count = 0
+        total = 0
+        for region in selected:
+            owner = MemoryRegionMap.owner(region, index)
+            if 'm' in options and (owner is None or owner[0] != options['m']):
+                continue
+            if any(char not in region.permissions for char in permissions):
+                continue
+            count += 1
+            total += region.end - region.start
+            if owner is not None:
+                location = '%s %s' % owner
+            else:
+                location = region.name
+            print('0x%016x-0x%016x  %s  %10s  %s' % (region.start, region.end, region.permissions,
+                                                   '0x%x' % (region.end - region.start), location))
+            JSONOutput.emit({'start': region.start, 'end': region.end, 'size': region.end - region.start,
+                             'permissions': region.permissions, 'module': owner[0] if owner else None,
+                             'segment': owner[1] if owner else None, 'name': region.name})
+        
+        if not expressions:
+            print('[ %d 个区域，共 %.1f MB，本次停止本地拒绝了 %d 次读取 ]' % (count, total / 0x100000, regions.rejected))
+
+    @classmethod
+    def findInstances(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 在堆中查找类的实例：扫描所有可读写的内存区域，按 isa 匹配类指针 ]
+    >> 使用方法：instances <ClassName|Module.SwiftClass|class_addr> [--verify] [--all] [-l <显示个数>] [-d] [-o <output_file>]
+    >> 例如：instances LoginViewController、instances MyApp.Session --verify -d
+    >> --verify 校验候选实例（16 字节对齐、non-pointer isa 的 magic 位、类名一致），--all 同时扫描模块的数据段
+    >> -d 用 oc 的方式解析显示的实例，-o 把所有实例地址输出到文件"""
+        
+        args = shlex.split(command) if command else []
+        target = exe_ctx.GetTarget()
+        process = exe_ctx.GetProcess()
+        if not process.IsValid():
+            JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+            return
+        
+        options = {}
+        flags = set()
+        specs = []
+        i = 0
+        while i < len(args):
+            if args[i] in ('-l', '--limit', '-o', '--outfile') and i + 1 < len(args):
+                options[args[i].lstrip('-')[0]] = args[i + 1]
+                i += 2
+            elif args[i] in ('--verify', '--all', '-d', '--describe'):
+                flags.add(args[i].lstrip('-')[0])
+                i += 1
+            else:
+                specs.append(args[i])
+                i += 1
+        if not specs:
+            print("[ 请提供类名或类指针，例如: instances LoginViewController ]")
+            return
+        
+        try:
+            limit = int(options.get('l', '20'), 0)
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        # 类名解析为类指针，找不到符号时按地址表达式处理
+        spec = ' '.join(specs)
+        cls_pointer = InstanceFinder.resolveClass(target, spec)
+        if cls_pointer is None:
+            cls_pointer = Utils.parseAddress(exe_ctx, spec)
+            if cls_pointer is None:
+                JSONOutput.fail(f"[ 找不到类 {spec} ]")
+                return
+        decoder = ObjCDecoder(target)
+        class_name = decoder.class_name(cls_pointer) or spec
+        
+        scan = InstanceFinder.scan(target, cls_pointer, class_name, 'a' in flags)
+        if not scan.regions:
+            print("[ 没有可以扫描的可读写内存区域（调试服务可能不支持内存区域查询）. ]")
+            return
+        print(f"[ {scan.summary()} ]")
+        
+        if 'v' in flags:
+            removed = InstanceFinder.verify(target, scan)
+            print(f"[ 校验后剩余 {len(scan.addresses)} 个实例，去掉 {removed} 个 ]")
+        
+        for address, isa in zip(scan.addresses[:limit], scan.isas[:limit]):
+            line = f"0x{address:x}  isa = 0x{isa:x}"
+            if 'd' in flags:
+                try:
+                    line += '  ' + decoder.describe(address).replace('\n', '\n    ')
+                except Exception as e:
+                    line += f'  <解析对象失败: {e}>'
+            print(line)
+            JSONOutput.emit({'address': address, 'isa': isa, 'class': class_name})
+        if len(scan.addresses) > limit:
+            print(f"[ ... 还有 {len(scan.addresses) - limit} 个实例，可以用 -l 指定显示个数或 -o 输出到文件 ]")
+        
+        if 'o' in options:
+            try:
+                with open(os.path.expanduser(options['o']), 'w', encoding='utf-8') as f:
+                    f.write(''.join(f"0x{address:x}\n" for address in scan.addresses))
+            except IOError as e:
+                JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+                return
+            print(f"[ 已输出到 {options['o']} ]")
+
+    @classmethod
+    def stepUntil(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 单步执行直到条件满足（每一步不输出，条件基于寄存器直接求值） ]
+    >> 使用方法：stepuntil --if <条件> [--max <最大步数>] [--over-calls]
+    >> 例如：stepuntil --if "x0 == 0"、stepuntil --if "w8 == 0x1f && [sp + 0x10] != 0" --max 1000000 --over-calls
+    >> --over-calls 单步时跳过函数调用（相当于 tni），默认进入函数（相当于 si）；按 Ctrl+C 中断"""
+        
+        args = shlex.split(command) if command else []
+        thread = exe_ctx.GetThread()
+        if not thread.IsValid():
+            JSONOutput.fail("[ 无效的线程. ]")
+            return
+        
+        condition = None
+        max_steps = DEFAULT_MAX_STEPS
+        over_calls = False
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] == '--if' and i + 1 < len(args):
+                    condition = args[i + 1]
+                    i += 2
+                elif args[i] == '--max' and i + 1 < len(args):
+                    max_steps = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] == '--over-calls':
+                    over_calls = True
+                    i += 1
+                else:
+                    JSONOutput.fail(f"[ 错误: 未知参数 {args[i]} ]")
+                    return
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        if condition is None:
+            print('[ 请用 --if 提供条件表达式，例如: stepuntil --if "x0 == 0" ]')
+            return
+        
+        try:
+            stepper = StepUntil(debugger, thread, condition, max_steps, over_calls)
+            reason = stepper.run()
+        except ExprSyntaxError as e:
+            JSONOutput.fail(f"[ 条件表达式错误: {e} ]")
+            return
+        
+        process = exe_ctx.GetProcess()
+        if reason == RESULT_EXITED:
+            print(f"[ 进程已结束，{stepper.summary()} ]")
+            return
+        
+        pc = thread.GetFrameAtIndex(0).GetPC()
+        index = Symbolicator.getModuleIndex(exe_ctx.GetTarget())
+        location = Symbolicator.format(pc, index.resolve(pc) if index is not None else None)
+        print(f"[ {stepper.describe(reason)}: {location} ]")
+        if reason == RESULT_ERROR:
+            JSONOutput.fail()
+        print(f"[ {stepper.summary()} ]")
+        JSONOutput.emit({'result': reason, 'steps': stepper.steps, 'pc': pc, 'elapsed': stepper.elapsed,
+                         'steps_per_second': stepper.rate, 'stop_id': process.GetStopID()})
+
+    @classmethod
+    def instructionTrace(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 指令级跟踪：记录每条执行过的指令的模块偏移和变化的寄存器，压缩保存到文件，并可查询寄存器的写入 ]
+    >> 使用方法：itrace [<指令数>] [--until <偏移>] [--all] [--over-calls] [-o <文件>]
+    >>          itrace --query <文件> <寄存器> [<值>] [-l <显示个数>]
+    >>          itrace --info <文件>
+    >> 例如：itrace 5000、itrace --until 0x1a2b3c -o ~/login.trace、itrace --query ~/login.trace x0 0x1234
+    >> 默认只跟踪当前模块，进入其它模块时直接运行到返回地址（--all 时逐条跟踪所有模块）；--until 的偏移是当前模块中的偏移
+    >> --query 给出值时输出寄存器第一次被写入该值的指令，不给出值时列出寄存器的所有写入；按 Ctrl+C 中断跟踪"""
+        
+        args = shlex.split(command) if command else []
+        options = {}
+        flags = set()
+        positional = []
+        i = 0
+        while i < len(args):
+            if args[i] in ('--until', '--query', '--info', '-o', '--outfile', '-l', '--limit') and i + 1 < len(args):
+                options[args[i].lstrip('-')[0]] = args[i + 1]
+                i += 2
+            elif args[i] in ('--all', '--over-calls'):
+                flags.add(args[i].lstrip('-')[0])
+                i += 1
+            else:
+                positional.append(args[i])
+                i += 1
+        
+        if 'q' in options or 'i' in options:
+            cls._queryTrace(options, positional)
+            return
+        
+        thread = exe_ctx.GetThread()
+        if not thread.IsValid():
+            JSONOutput.fail("[ 无效的线程. ]")
+            return
+        try:
+            until_offset = int(options['u'], 0) if 'u' in options else None
+            max_steps = int(positional[0], 0) if positional else DEFAULT_TRACE_STEPS
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        tracer = InstructionTracer(debugger, thread, max_steps, until_offset, 'a' in flags, 'o' in flags)
+        reason = tracer.run()
+        print(f"[ {tracer.describe(reason)}，{tracer.summary()} ]")
+        if reason == TRACE_RESULT_ERROR:
+            JSONOutput.fail()
+        if not tracer.steps:
+            return
+        
+        trace = tracer.trace()
+        path = os.path.expanduser(options['o']) if 'o' in options else TraceFile.defaultPath()
+        try:
+            size = trace.save(path)
+        except OSError as e:
+            # 指定的路径无法写入时改为保存到默认目录，跟踪结果不会丢失
+            JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+            default_path = TraceFile.defaultPath()
+            if path == default_path:
+                return
+            path = default_path
+            try:
+                size = trace.save(path)
+            except OSError as e:
+                JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+                return
+        raw_size = sum(len(field) * field.itemsize for field in trace.fields().values())
+        print(f"[ 已保存到 {path}（{size} 字节，压缩前 {raw_size} 字节），查询: itrace --query {path} <寄存器> [<值>] ]")
+        JSONOutput.emit({'result': reason, 'steps': tracer.steps, 'hops': tracer.hops, 'elapsed': tracer.elapsed,
+                         'path': path, 'size': size})
+
+    @classmethod
+    def _queryTrace(cls, options, positional):
+        """[ itrace --query / --info：查询跟踪文件 ]"""
+        path = os.path.expanduser(options.get('q') or options.get('i'))
+        try:
+            trace = TraceFile.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            JSONOutput.fail(f"[ 无法加载跟踪文件 {path}: {e} ]")
+            return
+        print(f"[ {path}: {trace.summary()} ]")
+        
+        if 'q' not in options:
+            for i, (name, slide) in enumerate(trace.modules):
+                print(f"  {i}  {name}  slide = 0x{slide:x}")
+            print(f"  寄存器: {' '.join(trace.registers)}")
+            return
+        if not positional:
+            print("[ 请提供寄存器名，例如: itrace --query <文件> x0 0x1234 ]")
+            return
+        
+        try:
+            value = int(positional[1], 0) if len(positional) > 1 else None
+            limit = int(options.get('l', '20'), 0)
+            writes = trace.writes(positional[0], value)
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: {e} ]")
+            return
+        
+        if value is not None:
+            limit = 1
+        count = 0
+        try:
+            for step, written in writes:
+                if count < limit:
+                    changes = '  '.join(f"{name}=0x{new:x}" for name, new in trace.changes(step))
+                    print(f"第 {step} 步  {trace.location(step)}  {positional[0]} = 0x{written:x}    [{changes}]")
+                    JSONOutput.emit({'step': step, 'pc': trace.pcs()[step], 'location': trace.location(step),
+                                     'register': positional[0], 'value': written})
+                count += 1
+                if value is not None:
+                    break
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: {e} ]")
+            return
+        
+        if count == 0:
+            target = f" 0x{value:x}" if value is not None else ''
+            print(f"[ 跟踪中没有找到 {positional[0]} 被写入{target} ]")
+        elif count > limit:
+            print(f"[ ... 共 {count} 次写入，可以用 -l 指定显示个数 ]")
+
+    @classmethod
+    def writeRegister(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 修改寄存器，并使寄存器快照失效 ]
+    >> 使用方法：regwrite <register> <value>
+    >> 例如：regwrite x0 0x1"""
+        
+        JSONOutput.handleCommand(debugger, 'register write %s' % command)
+        
+        # 寄存器值已改变，丢弃本次停止的快照
+        RegisterHandler().invalidate()
+
+    @classmethod
+    def decodeObjCObject(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 不经过表达式 JIT 解析 ObjC 对象 ]
+    >> 使用方法：oc <reg|addr> ... [--depth <嵌套层数>] [--max <每个集合最多显示的元素个数>]
+    >> 支持 NSString / NSData / NSArray / NSDictionary / NSNumber 以及 tagged pointer，只读取内存，不调用目标进程中的方法
+    >> 例如：oc $x0、oc $x2 --depth 1、oc [$sp + 0x10]"""
+        
+        args = shlex.split(command) if command else []
+        max_depth = 3
+        max_items = 100
+        expressions = []
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] == '--depth' and i + 1 < len(args):
+                    max_depth = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] == '--max' and i + 1 < len(args):
+                    max_items = int(args[i + 1], 0)
+                    i += 2
+                else:
+                    expressions.append(args[i])
+                    i += 1
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        expressions = Utils.splitExpressions(' '.join(shlex.quote(expr) for expr in expressions))
+        if not expressions:
+            print("[ 请提供对象地址或寄存器，例如: oc $x0 ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        if not target.IsValid() or not target.GetProcess().IsValid():
+            JSONOutput.fail("[ 错误: 当前没有有效的进程 ]")
+            return
+        
+        decoder = ObjCDecoder(target, max_depth, max_items)
+        for expr in expressions:
+            address = Utils.parseAddress(exe_ctx, expr)
+            if address is None:
+                continue
+            # 无效指针中的字段可能是任意值，解析失败只影响这一个对象
+            try:
+                class_name = decoder.object_class_name(address) if address else 'nil'
+                print(f"[ 0x{address:x}: {class_name or '未知类'} ]")
+                print(decoder.describe(address))
+            except Exception as e:
+                JSONOutput.fail(f"[ 0x{address:x}: 解析对象失败: {e} ]")
+
+    @classmethod
+    def sampleStacks(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 调用栈采样，输出 flamegraph 可用的 collapsed-stack 格式 ]
+    >> 使用方法：sample [-r <次/秒>] [-d <秒>] [--depth <栈深度>] [--symbols] [-o <output_file>]
+    >> 例如：sample -r 50 -d 10 -o app.folded
+    >> 默认 20 次/秒，采样 5 秒，结束后进程保持停止状态"""
+        
+        args = shlex.split(command) if command else []
+        rate = 20.0
+        duration = 5.0
+        max_depth = 64
+        symbolize = False
+        output_file = None
+        
+        try:
+            i = 0
+            while i < len(args):
+                if args[i] in ('-r', '--rate') and i + 1 < len(args):
+                    rate = float(args[i + 1])
+                    i += 2
+                elif args[i] in ('-d', '--duration') and i + 1 < len(args):
+                    duration = float(args[i + 1])
+                    i += 2
+                elif args[i] == '--depth' and i + 1 < len(args):
+                    max_depth = int(args[i + 1], 0)
+                    i += 2
+                elif args[i] in ('-o', '--output') and i + 1 < len(args):
+                    output_file = args[i + 1]
+                    i += 2
+                elif args[i] in ('-s', '--symbols'):
+                    symbolize = True
+                    i += 1
+                else:
+                    print(f"[ 未知参数: {args[i]} ]")
+                    return
+        except ValueError as e:
+            JSONOutput.fail(f"[ 错误: 参数解析失败 - {e} ]")
+            return
+        
+        if rate <= 0 or duration <= 0:
+            JSONOutput.fail("[ 错误: 采样频率和采样时长必须大于 0 ]")
+            return
+        
+        target = exe_ctx.GetTarget()
+        process = exe_ctx.GetProcess()
+        if not process.IsValid() or process.GetState() != lldb.eStateStopped:
+            JSONOutput.fail("[ 错误: 进程需要处于停止状态才能开始采样 ]")
+            return
+        
+        sampler = StackSampler(debugger, target, max_depth)
+        
+        print(f"[ 开始采样: {rate:g} 次/秒，持续 {duration:g} 秒 ]")
+        wall_start = time.perf_counter()
+        sampler.run(rate, duration)
+        wall_time = time.perf_counter() - wall_start
+        
+        lines = sampler.collapsed(symbolize)
+        
+        if output_file:
+            try:
+                with open(os.path.expanduser(output_file), 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(lines) + '\n')
+                print(f"[ collapsed-stack 结果已写入 {output_file}，可使用 flamegraph.pl {output_file} > out.svg 生成火焰图 ]")
+            except IOError as e:
+                JSONOutput.fail(f"[ 写入文件失败: {e} ]")
+        else:
+            print('\n'.join(lines))
+        
+        print(f"[ 采样 {sampler.ticks} 次，共 {sampler.samples} 个线程栈，{len(sampler.counters)} 个不同调用栈，实际频率 {sampler.ticks / wall_time:.1f} 次/秒 ]")
+        overhead = sampler.overhead()
+        if overhead:
+            mean, worst, total = overhead
+            print(f"[ 每次采样开销: 平均 {mean * 1000:.2f}ms，最大 {worst * 1000:.2f}ms，占总时长 {total / wall_time * 100:.1f}% ]")
+
+    @classmethod
+    def coverModule(cls, debugger, command, exe_ctx, result, internal_dict):
+        """[ 函数级覆盖率收集 ]
+    >> 使用方法：cover [module_name] [-f <offsets_file>] - 在模块所有函数入口设置一次性断点（默认使用 using 指定的模块）
+    >> cover --status - 查看覆盖率
+    >> cover --export <file> [--format drcov|text] - 导出覆盖率（默认 drcov，可被 Lighthouse 等插件加载）
+    >> cover --stop - 停止收集并删除断点"""
+        
+        args = shlex.split(command) if command else []
+        session = CoverageSession.current(exe_ctx.GetTarget())
+        
+        # 查看覆盖率
+        if '--status' in args:
+            if session is None:
+                print("[ 当前没有覆盖率收集任务. ]")
+                return
+            total = len(session.file_addrs)
+            percent = session.hit_count / total * 100 if total else 0
+            print(f"[ {session.module_name}: 已命中 {session.hit_count}/{total} 个函数 ({percent:.2f}%) ]")
+            return
+        
+        # 停止收集
+        if '--stop' in args:
+            if session is None:
+                print("[ 当前没有覆盖率收集任务. ]")
+                return
+            session.stop()
+            print(f"[ 已停止覆盖率收集，共命中 {session.hit_count} 个函数 ]")
+            return
+        
+        # 导出覆盖率
+        if '--export' in args:
+            if session is None:
+                print("[ 当前没有覆盖率收集任务. ]")
+                return
+            idx = args.index('--export')
+            if idx + 1 >= len(args):
+                print("[ 请提供导出文件路径，例如: cover --export app.drcov ]")
+                return
+            file_path = os.path.expanduser(args[idx + 1])
+            export_format = args[args.index('--format') + 1] if '--format' in args and args.index('--format') + 1 < len(args) else 'drcov'
+            try:
+                if export_format == 'text':
+                    session.exportText(file_path)
+                else:
+                    session.exportDrcov(file_path)
+            except IOError as e:
+                JSONOutput.fail(f"[ 导出覆盖率失败: {e} ]")
+                return
+            print(f"[ 已导出 {session.hit_count} 个命中函数到 {file_path} ({export_format}) ]")
+            return
+        
+        # 开始收集
+        offsets_file = None
+        module_name = None
+        i = 0
+        while i < len(args):
+            if args[i] in ('-f', '--file') and i + 1 < len(args):
+                offsets_file = args[i + 1]
+                i += 2
+            else:
+                module_name = args[i]
+                i += 1
+        
+        if module_name is None:
+            module_name = Utils.getUsingModuleName(exe_ctx.GetTarget())
+        
+        target = exe_ctx.GetTarget()
+        module = Utils.findModule(target, module_name)
+        if module is None:
+            JSONOutput.fail(f"[ 找不到模块: {module_name} ]")
+            return
+        
+        try:
+            if offsets_file:
+                file_addrs = CoverageSession.readOffsets(os.path.expanduser(offsets_file))
+            else:
+                file_addrs = CoverageSession.functionStarts(module)
+        except (IOError, ValueError) as e:
+            JSONOutput.fail(f"[ 读取偏移列表失败: {e} ]")
+            return
+        
+        if not file_addrs:
+            print(f"[ 模块 {module_name} 中没有找到函数入口 ]")
+            return
+        
+        # 同一时间只保留一个覆盖率收集任务
+        if session is not None:
+            session.stop()
+        
+        start_time = time.perf_counter()
+        session = CoverageSession(target, module, file_addrs)
+        if not session.start(f"{LLDB_SCRIPT_NAME}.coverageHitCallback", f"{LLDB_SCRIPT_NAME}.CoverageBreakpointResolver"):
+            JSONOutput.fail("[ 创建覆盖率断点失败. ]")
+            return
+        elapsed = time.perf_counter() - start_time
+        
+        print(f"[ 已在 {session.module_name} 的 {session.breakpoint.GetNumLocations()} 个函数入口设置一次性断点，耗时 {elapsed:.3f}s ]")
@@ -1,5 +1,5 @@
 # 导出 DataHandler 类
-from .data_handler import DataHandler
+from .data_handler import DataHandler, TargetState, ProcessState
 
 
 
@@ -1,10 +1,76 @@
 import threading
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 # 使用相对导入
 from ..json_handler.json_handler import JSONHandler
 from src.config import CMD_CONFIG_PATH_STR, CMD_RECORD_PATH_STR, LLDB_SCRIPT_NAME
 
+class ProcessState:
+    """[ 单个进程的缓存（进程重新启动后使用新的缓存） ]"""
+
+    def __init__(self, pid: int, unique_id: int):
+        self.pid = pid
+
+        # SBProcess 的唯一 ID：进程 ID 被复用时用来区分新旧进程
+        self.unique_id = unique_id
+
+        # ASLR 偏移字典：模块名 -> 偏移
+        self.aslr_dict: Dict[str, int] = {}
+
+        # 模块区间索引（见 Symbolicator），建立索引时的模块指纹（各模块 header 的加载地址），以及最后一次检查指纹时的 StopID
+        self.module_index: Any = None
+        self.module_fingerprint: Optional[Tuple[int, ...]] = None
+        self.module_stop_id: int = -1
+
+        # ObjC 运行时信息（isa 掩码、tagged pointer 混淆值等，见 ObjCDecoder），进程内不变
+        self.objc_runtime: Any = None
+
+        # ObjC 类名缓存：类地址 -> 类名，只在同一次停止内有效
+        self.objc_class_names: Dict[int, str] = {}
+        self.objc_stop_id: int = -1
+
+        # 内存区域列表，只在同一次停止内有效（见 MemoryRegionMap）
+        self.memory_regions: Any = None
+
+        # nop / memwrite 修改过的范围：模块 UUID -> [(起始偏移, 结束偏移), ...]（见 Disassembler）
+        self.patched_ranges: Dict[str, List[Tuple[int, int]]] = {}
+
+
+class TargetState:
+    """[ 单个调试目标的状态：using 选择的模块、主模块名，以及每个进程的缓存 ]"""
+
+    def __init__(self, target_key: str, target):
+        self.target_key = target_key
+
+        # 对应的 SBTarget：删除调试目标后序号会变化，序号相同但目标不同时状态作废
+        self.target = target
+
+        # 主模块名
+        self.main_module_name: str = ""
+
+        # 当前使用的模块名
+        self.module_name: str = ""
+
+        # 覆盖率收集任务（见 CoverageSession）
+        self.coverage_session: Any = None
+
+        # 停止面板（见 StopDashboard）
+        self.dashboard: Any = None
+
+        # 进程缓存：进程 ID -> ProcessState
+        self.process_states: Dict[int, ProcessState] = {}
+
+    def process_state(self, process) -> ProcessState:
+        """[ 获取进程缓存，新的进程（重新启动 / 重新附加）使用新的缓存 ]"""
+        pid = process.GetProcessID()
+        unique_id = process.GetUniqueID()
+        state = self.process_states.get(pid)
+        if state is None or state.unique_id != unique_id:
+            state = ProcessState(pid, unique_id)
+            self.process_states[pid] = state
+        return state
+
+
 class DataHandler:
     # cmd_config json 相关字段
     cmd_script: Dict[str, str] = {}
@@ -21,14 +87,8 @@ class DataHandler:
     # 帮助列表
     help_list: str = ""
 
-    # 主模块名
-    main_module_name: str = ""
-
-    # 当前使用的模块名
-    module_name: str = ""
-
-    # ASLR 偏移字典
-    aslr_dict: dict[str, str] = {}
+    # 每个调试目标的状态：目标标识 -> TargetState
+    target_states: Dict[str, "TargetState"] = {}
 
     # 单例类变量
     _instance = None
@@ -51,6 +111,7 @@ class DataHandler:
         if not self._initialized:
             self.parse_json()
             self.parse_lldb_cmd()
+            self.target_states = {}
             self._initialized = True
 
     # 解析 json 文件
@@ -90,6 +151,25 @@ class DataHandler:
         # 将所有命令合并到一个列表中
         self.lldb_add_cmd_list = lldb_add_script_cmd_list + lldb_add_alias_cmd_list + self.cus_cmd
     
+    @staticmethod
+    def target_key(target) -> str:
+        """[ 调试目标的标识：调试器 ID + 目标序号（同一个可执行文件的多个调试目标各自独立） ]"""
+        debugger = target.GetDebugger()
+        return "%d#%d" % (debugger.GetID(), debugger.GetIndexOfTarget(target))
+
+    def get_target_state(self, target) -> TargetState:
+        """[ 获取调试目标的状态，不存在或序号已属于其它目标时创建 ]"""
+        key = self.target_key(target)
+        state = self.target_states.get(key)
+        if state is None or state.target != target:
+            state = TargetState(key, target)
+            self.target_states[key] = state
+        return state
+
+    def get_process_state(self, target) -> ProcessState:
+        """[ 获取调试目标当前进程的缓存 ]"""
+        return self.get_target_state(target).process_state(target.GetProcess())
+
     def save_cmd_record(self):
         """将 cmd_record_list 保存到 JSON 文件"""
         if not self._json_handler:
@@ -0,0 +1,2 @@
+# 导出 RegisterHandler 类
+from .register_handler import RegisterHandler, RegisterSnapshot
@@ -0,0 +1,161 @@
+import threading
+from array import array
+from typing import Dict, Optional, Tuple
+
+"""
+    类功能：寄存器快照缓存
+
+    每次停止、每个线程（以及栈帧）只通过 SBFrame.GetRegisters 读取一次通用寄存器，
+    快照以 (pid, tid, frame_idx) 为键，记录 SBProcess.GetStopID()。
+    进程恢复运行后 StopID 会变化，旧快照自动失效，并保留为 "上一次停止" 的快照用于比较。
+"""
+
+# 不同架构 / 别名之间的寄存器名映射
+REGISTER_ALIASES = {
+    "pc": ("rip", "eip"),
+    "sp": ("rsp", "esp"),
+    "fp": ("x29", "rbp", "ebp"),
+    "lr": ("x30",),
+    "x29": ("fp",),
+    "x30": ("lr",),
+}
+
+
+class RegisterSnapshot:
+    """[ 单个线程在某次停止时的寄存器快照，寄存器名布局共享，值存放在 array('Q') 中 ]"""
+
+    __slots__ = ("stop_id", "names", "index", "values")
+
+    def __init__(self, stop_id: int, names: Tuple[str, ...], index: Dict[str, int], values: array):
+        self.stop_id = stop_id
+        self.names = names
+        self.index = index
+        self.values = values
+
+    def get(self, name: str) -> Optional[int]:
+        idx = self.index.get(name)
+        if idx is None:
+            for alias in REGISTER_ALIASES.get(name, ()):
+                idx = self.index.get(alias)
+                if idx is not None:
+                    break
+            else:
+                return None
+        return self.values[idx]
+
+    def items(self):
+        return zip(self.names, self.values)
+
+    def changed(self, other: Optional["RegisterSnapshot"]):
+        """[ 返回与另一个快照相比发生变化的寄存器列表：[(name, old, new), ...] ]"""
+        if other is None:
+            return []
+        if other.names is self.names:
+            return [(name, old, new) for name, old, new in zip(self.names, other.values, self.values) if old != new]
+        return [(name, other.get(name), value) for name, value in self.items() if other.get(name) != value]
+
+
+class RegisterHandler:
+    # 当前快照：(pid, tid, frame_idx) -> RegisterSnapshot
+    _snapshots: Dict[Tuple[int, int, int], RegisterSnapshot] = {}
+
+    # 上一次停止的快照：(pid, tid, frame_idx) -> RegisterSnapshot
+    _previous: Dict[Tuple[int, int, int], RegisterSnapshot] = {}
+
+    # 寄存器名布局：names -> {name: index}，相同架构的所有快照共用同一份
+    _layouts: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+    # 单例类变量
+    _instance = None
+
+    # 线程锁
+    _lock = threading.Lock()
+
+    def __new__(cls, *args, **kwargs):
+        # 加锁确保唯一实例
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._snapshots = {}
+            self._previous = {}
+            self._layouts = {}
+            self._initialized = True
+
+    @staticmethod
+    def _frame_key(frame):
+        thread = frame.GetThread()
+        process = thread.GetProcess()
+        return (process.GetProcessID(), thread.GetThreadID(), frame.GetFrameID()), process.GetStopID()
+
+    def snapshot(self, frame) -> Optional[RegisterSnapshot]:
+        """[ 获取栈帧的寄存器快照，本次停止内只读取一次 ]"""
+        if frame is None or not frame.IsValid():
+            return None
+
+        key, stop_id = self._frame_key(frame)
+        current = self._snapshots.get(key)
+        if current is not None and current.stop_id == stop_id:
+            return current
+
+        # 只读取通用寄存器组（第一组），浮点 / 向量寄存器需要时再单独读取
+        names = []
+        values = array('Q')
+        register_sets = frame.GetRegisters()
+        if register_sets.GetSize() > 0:
+            gpr = register_sets.GetValueAtIndex(0)
+            for i in range(gpr.GetNumChildren()):
+                reg = gpr.GetChildAtIndex(i)
+                if reg.GetByteSize() > 8:
+                    continue
+                names.append(reg.GetName())
+                values.append(reg.GetValueAsUnsigned() & 0xFFFFFFFFFFFFFFFF)
+
+        names = tuple(names)
+        layout = self._layouts.get(names)
+        if layout is None:
+            layout = (names, {name: i for i, name in enumerate(names)})
+            self._layouts[names] = layout
+
+        snapshot = RegisterSnapshot(stop_id, layout[0], layout[1], values)
+
+        # 旧快照保留为上一次停止的快照
+        if current is not None:
+            self._previous[key] = current
+        self._snapshots[key] = snapshot
+
+        # 清理其它进程遗留的快照
+        if len(self._snapshots) > 256:
+            pid = key[0]
+            self._snapshots = {k: v for k, v in self._snapshots.items() if k[0] == pid}
+            self._previous = {k: v for k, v in self._previous.items() if k[0] == pid}
+
+        return snapshot
+
+    def previous(self, frame) -> Optional[RegisterSnapshot]:
+        """[ 获取该栈帧上一次停止时的寄存器快照 ]"""
+        if frame is None or not frame.IsValid():
+            return None
+        key, _ = self._frame_key(frame)
+        return self._previous.get(key)
+
+    def read(self, frame, name: str) -> Optional[int]:
+        """[ 读取寄存器值，快照中没有的寄存器（例如向量寄存器）回退到 FindRegister ]"""
+        snapshot = self.snapshot(frame)
+        if snapshot is None:
+            return None
+
+        value = snapshot.get(name)
+        if value is None:
+            reg = frame.FindRegister(name)
+            if reg.IsValid():
+                value = reg.GetValueAsUnsigned()
+        return value
+
+    def invalidate(self):
+        """[ 丢弃当前快照（例如执行 register write 之后） ]"""
+        self._snapshots.clear()
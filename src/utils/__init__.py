@@ -1 +1,6 @@
-from .utils import Utils
\ No newline at end of file
+# Utils 依赖 lldb，按需导入：离线工具（ιldb-scan）在没有 lldb 的 Python 中也可以导入 src.utils.macho 等模块
+def __getattr__(name):
+    if name == 'Utils':
+        from .utils import Utils
+        return Utils
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
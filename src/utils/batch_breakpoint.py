@@ -0,0 +1,83 @@
+import lldb
+import json
+import os
+from typing import Dict, List, Tuple
+
+"""
+    类功能：批量偏移断点
+
+    多个模块偏移放在同一个断点下：通过脚本化断点解析器（BreakpointCreateFromScript）为模块一次性添加所有断点位置，
+    偏移列表作为解析器参数保存在断点中，LLDB 在创建断点 / 模块加载时调用解析器，不需要逐个执行 breakpoint set
+
+    延迟断点：模块过滤器只按文件名匹配，模块还没有加载（懒加载的 framework、dlopen 的 dylib）时断点没有位置，
+    LLDB 在模块加载的通知中（模块中的代码运行之前）调用解析器一次性添加所有位置，不需要轮询 image list，也没有额外的停止
+"""
+
+
+class BatchBreakpoint:
+    # 延迟断点：(target 序号, 断点 ID) -> (模块名, 偏移数量)
+    _deferred: Dict[Tuple[int, int], Tuple[str, int]] = {}
+
+    @classmethod
+    def create(cls, target, module, offsets: List[int], resolver_name: str):
+        """[ 在模块的一组偏移（文件地址）上创建一个断点，返回 SBBreakpoint ]"""
+        return cls._create(target, module.GetFileSpec(), {"offsets": sorted(set(offsets))}, resolver_name)
+
+    @classmethod
+    def createDeferred(cls, target, module_name: str, offsets: List[int], resolver_name: str):
+        """[ 按模块名创建断点，模块已加载时立即解析，否则在模块加载时由解析器添加所有位置，返回 SBBreakpoint ]"""
+        module_name = os.path.basename(module_name)
+        offsets = sorted(set(offsets))
+        breakpoint = cls._create(target, lldb.SBFileSpec(module_name, False),
+                                 {"offsets": offsets, "module": module_name, "deferred": True}, resolver_name)
+        if breakpoint.IsValid():
+            cls._deferred[(target.GetDebugger().GetIndexOfTarget(target), breakpoint.GetID())] = (module_name, len(offsets))
+        return breakpoint
+
+    @classmethod
+    def _create(cls, target, file_spec, args: dict, resolver_name: str):
+        extra_args = lldb.SBStructuredData()
+        extra_args.SetFromJSON(json.dumps(args))
+
+        module_list = lldb.SBFileSpecList()
+        module_list.Append(file_spec)
+        return target.BreakpointCreateFromScript(resolver_name, extra_args, module_list, lldb.SBFileSpecList(), False)
+
+    @classmethod
+    def describeDeferred(cls, target) -> List[Tuple[int, str, int, int]]:
+        """[ 当前调试目标的延迟断点：[(断点 ID, 模块名, 偏移数量, 已解析的位置数量), ...]，已删除的断点不再列出 ]"""
+        index = target.GetDebugger().GetIndexOfTarget(target)
+        items = []
+        for (target_index, bp_id), (module_name, count) in sorted(cls._deferred.items()):
+            if target_index != index:
+                continue
+            breakpoint = target.FindBreakpointByID(bp_id)
+            if not breakpoint.IsValid():
+                continue
+            items.append((bp_id, module_name, count, breakpoint.GetNumLocations()))
+        return items
+
+
+class BatchBreakpointResolver:
+    """[ 脚本化断点解析器：为模块添加参数中的所有偏移 ]"""
+
+    def __init__(self, bkpt, extra_args, internal_dict):
+        self.bkpt = bkpt
+        offsets = extra_args.GetValueForKey("offsets")
+        self.offsets = [offsets.GetItemAtIndex(i).GetIntegerValue() for i in range(offsets.GetSize())]
+        self.deferred = extra_args.GetValueForKey("deferred").GetBooleanValue()
+
+    def __callback__(self, sym_ctx):
+        module = sym_ctx.module
+        if not module.IsValid():
+            return
+        resolve = module.ResolveFileAddress
+        add = self.bkpt.AddLocation
+        for offset in self.offsets:
+            add(resolve(offset))
+        if self.deferred:
+            print('[ 模块 %s 已加载，断点 %d 已解析 %d 个位置 ]' % (module.GetFileSpec().GetFilename(), self.bkpt.GetID(),
+                                                          self.bkpt.GetNumLocations()))
+
+    def __get_depth__(self):
+        return lldb.eSearchDepthModule
@@ -0,0 +1,113 @@
+import re
+import time
+from typing import Dict, Tuple
+
+from src.handler.register_handler.register_handler import REGISTER_ALIASES
+from src.utils.expr_evaluator import ExprEvaluator, ExprSyntaxError, ExprEvalError, FrameContext
+
+"""
+    类功能：Python 断点条件
+
+    条件表达式在设置断点时只编译一次，断点命中时在脚本回调中基于寄存器快照和少量内存读取求值，
+    条件为假时回调返回 False，LLDB 自动继续运行，不经过 LLDB 的表达式求值。
+    设置断点时检查条件中的寄存器名：有当前栈帧时按栈帧的寄存器检查，否则按已知的 ARM64 / x86_64 寄存器名检查，
+    拼写错误的寄存器不会等到命中时才报错。
+"""
+
+# 没有当前栈帧（进程未运行）时可以识别的寄存器名
+KNOWN_REGISTER_PATTERN = re.compile(
+    r'^(?:[xw](?:[12]?\d|30)|[xw]zr|sp|pc|lr|fp|cpsr'
+    r'|r(?:[abcd]x|si|di|bp|sp|ip|8|9|1[0-5])|e(?:[abcd]x|si|di|bp|sp|ip)|rflags|eflags)$')
+
+
+class BreakpointCondition:
+    # 已编译的条件：(target 序号, 断点 ID) -> (条件表达式, 编译结果)
+    _conditions: Dict[Tuple[int, int], Tuple[str, object]] = {}
+
+    # 求值统计：(target 序号, 断点 ID) -> [求值次数, 总耗时]
+    _stats: Dict[Tuple[int, int], list] = {}
+
+    @classmethod
+    def _key(cls, target, bp_id):
+        return (target.GetDebugger().GetIndexOfTarget(target), bp_id)
+
+    @classmethod
+    def compile(cls, expr):
+        """[ 编译条件表达式，语法错误时抛出 ExprSyntaxError ]"""
+        return ExprEvaluator.compile(expr)
+
+    @classmethod
+    def validate(cls, expr, frame=None):
+        """[ 编译条件并检查其中的寄存器名，语法错误或未知寄存器时抛出 ExprSyntaxError ]"""
+        compiled = cls.compile(expr)
+        if frame is not None and frame.IsValid():
+            context = FrameContext(frame, frame.GetThread().GetProcess())
+            for name in ExprEvaluator.registers(expr):
+                context.reg(name)
+        else:
+            for name in ExprEvaluator.registers(expr):
+                if name not in REGISTER_ALIASES and not KNOWN_REGISTER_PATTERN.match(name):
+                    raise ExprSyntaxError("未知寄存器: %s" % name)
+        return compiled
+
+    @classmethod
+    def create(cls, target, address, expr, callback_name):
+        """[ 在地址上创建带 Python 条件的断点，返回 SBBreakpoint ]"""
+        compiled = cls.compile(expr)
+
+        breakpoint = target.BreakpointCreateByAddress(address)
+        if breakpoint.IsValid():
+            cls._attach(target, breakpoint, expr, compiled, callback_name)
+        return breakpoint
+
+    @classmethod
+    def attach(cls, target, breakpoint, expr, callback_name):
+        """[ 为已有断点（例如包含多个位置的批量断点）设置 Python 条件，所有位置共用同一个条件 ]"""
+        cls._attach(target, breakpoint, expr, cls.compile(expr), callback_name)
+
+    @classmethod
+    def _attach(cls, target, breakpoint, expr, compiled, callback_name):
+        key = cls._key(target, breakpoint.GetID())
+        cls._conditions[key] = (expr, compiled)
+        cls._stats[key] = [0, 0.0]
+        breakpoint.SetScriptCallbackFunction(callback_name)
+
+    @classmethod
+    def evaluate(cls, frame, bp_loc) -> bool:
+        """[ 断点回调：条件为真时返回 True（停止），为假时返回 False（自动继续运行） ]"""
+        breakpoint = bp_loc.GetBreakpoint()
+        target = breakpoint.GetTarget()
+        key = cls._key(target, breakpoint.GetID())
+        condition = cls._conditions.get(key)
+        if condition is None:
+            return True
+
+        expr, compiled = condition
+        start_time = time.perf_counter()
+        try:
+            if isinstance(compiled, int):
+                matched = bool(compiled)
+            else:
+                matched = bool(compiled(FrameContext(frame, target.GetProcess())))
+        except (ExprSyntaxError, ExprEvalError) as e:
+            # 条件无法求值时停下来，由用户判断
+            print("[ 断点 %d 条件 %s 求值失败: %s ]" % (breakpoint.GetID(), expr, e))
+            return True
+        finally:
+            stats = cls._stats[key]
+            stats[0] += 1
+            stats[1] += time.perf_counter() - start_time
+
+        return matched
+
+    @classmethod
+    def describe(cls, target):
+        """[ 返回当前目标所有条件断点的 (断点 ID, 条件, 求值次数, 平均耗时秒) 列表 ]"""
+        target_index = target.GetDebugger().GetIndexOfTarget(target)
+        items = []
+        for (index, bp_id), (expr, _) in sorted(cls._conditions.items()):
+            if index != target_index or not target.FindBreakpointByID(bp_id).IsValid():
+                continue
+            count, total = cls._stats.get((index, bp_id), [0, 0.0])
+            items.append((bp_id, expr, count, total / count if count else 0.0))
+        return items
@@ -0,0 +1,165 @@
+import lldb
+import re
+import struct
+from typing import Dict, List, Optional
+
+from src.handler.data_handler import DataHandler
+
+"""
+    类功能：函数级覆盖率收集
+
+    - 所有函数入口放在同一个断点下，通过脚本化断点解析器（BreakpointCreateFromScript）一次性批量添加断点位置，
+      不需要创建几万个独立断点
+    - 每个断点位置第一次命中时在回调中禁用（即移除陷阱指令），命中记录在按函数序号索引的位图中，然后自动继续运行
+    - 覆盖率可以导出为 drcov 格式（Lighthouse / Dragon Dance 等 IDA、Ghidra 插件可直接加载）或 module+offset 文本格式
+"""
+
+# 覆盖率文件中的函数块大小（只记录函数入口的一条指令）
+BLOCK_SIZE = 4
+
+
+class CoverageSession:
+    """[ 单个模块的覆盖率收集会话（保存在调试目标状态中，每个调试目标同一时间只有一个会话） ]"""
+
+    def __init__(self, target, module, file_addrs: List[int]):
+        self.target = target
+        self.module = module
+        self.module_name = module.GetFileSpec().GetFilename()
+        self.module_path = module.GetFileSpec().fullpath
+
+        # 函数入口（文件地址），按地址排序，下标即函数序号
+        self.file_addrs = sorted(set(file_addrs))
+        self.index_by_addr: Dict[int, int] = {addr: i for i, addr in enumerate(self.file_addrs)}
+
+        # 命中位图：第 i 位表示第 i 个函数是否被执行过
+        self.bitmap = bytearray((len(self.file_addrs) + 7) // 8)
+        self.hit_count = 0
+
+        self.breakpoint = None
+
+    @classmethod
+    def current(cls, target) -> Optional["CoverageSession"]:
+        """[ 获取调试目标当前的覆盖率会话（脚本化断点解析器和断点回调通过它找到会话） ]"""
+        if target is None or not target.IsValid():
+            return None
+        return DataHandler().get_target_state(target).coverage_session
+
+    @classmethod
+    def functionStarts(cls, module) -> List[int]:
+        """[ 从符号表中获取模块所有函数入口的文件地址（剥离符号的二进制中也包含 LLDB 根据 LC_FUNCTION_STARTS 生成的符号） ]"""
+        starts = []
+        for i in range(module.GetNumSymbols()):
+            symbol = module.GetSymbolAtIndex(i)
+            if symbol.GetType() != lldb.eSymbolTypeCode:
+                continue
+            file_addr = symbol.GetStartAddress().GetFileAddress()
+            if file_addr != lldb.LLDB_INVALID_ADDRESS:
+                starts.append(file_addr)
+        return starts
+
+    @classmethod
+    def readOffsets(cls, file_path: str) -> List[int]:
+        """[ 从文件中读取偏移列表（十六进制，0x 可有可无，支持空格、逗号、换行分隔） ]"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return [int(token, 16) for token in re.split(r'[\s,]+', f.read()) if token]
+
+    @property
+    def base_file_addr(self) -> int:
+        return self.module.GetObjectFileHeaderAddress().GetFileAddress()
+
+    def start(self, callback_name: str, resolver_name: str) -> bool:
+        """[ 创建覆盖率断点，所有函数入口作为同一个断点的位置批量添加 ]"""
+        # 解析器在创建断点时就会通过 current 找到会话，所以要先登记
+        target_state = DataHandler().get_target_state(self.target)
+        target_state.coverage_session = self
+
+        module_list = lldb.SBFileSpecList()
+        module_list.Append(self.module.GetFileSpec())
+        self.breakpoint = self.target.BreakpointCreateFromScript(
+            resolver_name, lldb.SBStructuredData(), module_list, lldb.SBFileSpecList(), False)
+
+        if not self.breakpoint.IsValid():
+            target_state.coverage_session = None
+            self.breakpoint = None
+            return False
+
+        self.breakpoint.SetScriptCallbackFunction(callback_name)
+        return True
+
+    def stop(self):
+        if self.breakpoint is not None and self.breakpoint.IsValid():
+            self.target.BreakpointDelete(self.breakpoint.GetID())
+        self.breakpoint = None
+
+    def addLocations(self, bkpt, module):
+        """[ 脚本化断点解析器回调：为模块中的所有函数入口添加断点位置 ]"""
+        resolve = module.ResolveFileAddress
+        add = bkpt.AddLocation
+        for file_addr in self.file_addrs:
+            add(resolve(file_addr))
+
+    def hit(self, bp_loc) -> bool:
+        """[ 断点命中：记录到位图，并禁用该位置（移除陷阱指令），返回 False 表示自动继续运行 ]"""
+        idx = self.index_by_addr.get(bp_loc.GetAddress().GetFileAddress())
+        if idx is not None:
+            mask = 1 << (idx & 7)
+            if not self.bitmap[idx >> 3] & mask:
+                self.bitmap[idx >> 3] |= mask
+                self.hit_count += 1
+        bp_loc.SetEnabled(False)
+        return False
+
+    def hitOffsets(self) -> List[int]:
+        """[ 已命中函数相对模块基址的偏移 ]"""
+        base = self.base_file_addr
+        bitmap = self.bitmap
+        return [addr - base for i, addr in enumerate(self.file_addrs) if bitmap[i >> 3] & (1 << (i & 7))]
+
+    def moduleRange(self):
+        """[ 模块的 (起始地址, 结束地址)，已加载时使用运行时地址，否则使用文件地址 ]"""
+        header = self.module.GetObjectFileHeaderAddress()
+        base = header.GetLoadAddress(self.target)
+        if base == lldb.LLDB_INVALID_ADDRESS:
+            base = header.GetFileAddress()
+        size = 0
+        for section in self.module.section_iter():
+            if section.GetName() == "__PAGEZERO":
+                continue
+            size = max(size, section.GetFileAddress() + section.GetByteSize() - header.GetFileAddress())
+        return base, base + size
+
+    def exportDrcov(self, file_path: str):
+        """[ 导出 drcov 格式（version 2） ]"""
+        offsets = self.hitOffsets()
+        base, end = self.moduleRange()
+        header = (
+            "DRCOV VERSION: 2\n"
+            "DRCOV FLAVOR: drcov\n"
+            "Module Table: version 2, count 1\n"
+            "Columns: id, base, end, entry, checksum, timestamp, path\n"
+            " 0, 0x%x, 0x%x, 0x0000000000000000, 0x00000000, 0x00000000, %s\n"
+            "BB Table: %d bbs\n" % (base, end, self.module_path, len(offsets))
+        )
+        with open(file_path, 'wb') as f:
+            f.write(header.encode('utf-8'))
+            f.write(b''.join(struct.pack('<IHH', offset, BLOCK_SIZE, 0) for offset in offsets))
+
+    def exportText(self, file_path: str):
+        """[ 导出 module+offset 文本格式（每行一个命中的函数） ]"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(''.join('%s+0x%x\n' % (self.module_name, offset) for offset in self.hitOffsets()))
+
+
+class CoverageBreakpointResolver:
+    """[ 脚本化断点解析器：由 LLDB 在模块加载 / 断点创建时调用，批量添加当前覆盖率会话的所有断点位置 ]"""
+
+    def __init__(self, bkpt, extra_args, internal_dict):
+        self.bkpt = bkpt
+
+    def __callback__(self, sym_ctx):
+        session = CoverageSession.current(self.bkpt.GetTarget())
+        if session is not None and sym_ctx.module.IsValid():
+            session.addLocations(self.bkpt, sym_ctx.module)
+
+    def __get_depth__(self):
+        return lldb.eSearchDepthModule
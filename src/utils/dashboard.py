@@ -0,0 +1,238 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+from src.handler.register_handler import RegisterHandler
+from src.utils.disassembler import Disassembler
+from src.utils.expr_evaluator import ExprEvaluator, ExprSyntaxError, ExprEvalError, FrameContext
+from src.utils.hexdump import HexDump
+from src.utils.read_planner import ReadPlanner
+from src.utils.symbolicator import Symbolicator
+
+"""
+    类功能：停止面板（stop-hook）
+
+    - 每次停止时一次性输出寄存器（发生变化的寄存器高亮）、pc 附近的反汇编（带模块偏移）、前 N 个栈帧（模块 + 偏移 + 符号）和监视表达式，
+      代替每次手动执行 regs / dispc / bt / memread
+    - 所有数据来自本次停止的缓存：寄存器快照（RegisterHandler）、按模块 UUID 缓存的反汇编（Disassembler）、模块区间索引（Symbolicator），
+      监视表达式的内存读取通过 ReadPlanner 合并
+    - 每个部分记录耗时的滑动平均，按顺序输出，预计会超出时间预算的部分自动跳过（面板末尾列出），不拖慢单步调试
+"""
+
+# 面板的各个部分（按输出顺序）
+SECTIONS = ('regs', 'dis', 'stack', 'watch')
+
+SECTION_TITLES = {'regs': '寄存器', 'dis': '反汇编', 'stack': '调用栈', 'watch': '监视'}
+
+# 默认时间预算（秒）
+DEFAULT_BUDGET = 0.05
+
+# 默认显示的栈帧数量
+DEFAULT_FRAME_COUNT = 8
+
+# pc 前后显示的指令条数
+DIS_BEFORE = 4
+DIS_AFTER = 6
+
+# 每行显示的寄存器个数
+REGISTERS_PER_LINE = 4
+
+# 监视表达式最多显示的字节数
+MAX_WATCH_BYTES = 0x100
+
+# 耗时滑动平均的权重（新的一次）
+COST_WEIGHT = 0.5
+
+# 部分被跳过时预计耗时的衰减系数
+SKIP_DECAY = 0.8
+
+# 发生变化的寄存器的高亮（终端不支持颜色时使用 * 标记）
+HIGHLIGHT_START = '\033[1;31m'
+HIGHLIGHT_END = '\033[0m'
+
+
+class StopDashboard:
+    """[ 单个调试目标的停止面板（保存在调试目标状态中） ]"""
+
+    def __init__(self):
+        self.sections: List[str] = list(SECTIONS)
+        self.budget = DEFAULT_BUDGET
+        self.frame_count = DEFAULT_FRAME_COUNT
+
+        # 监视表达式：[(表达式, 读取的字节数)]，字节数为 0 时只显示表达式的值
+        self.watches: List[Tuple[str, int]] = []
+
+        # 每个部分耗时的滑动平均（秒）
+        self.costs: Dict[str, float] = {}
+
+        # 已安装的 stop-hook ID
+        self.hook_id: Optional[int] = None
+
+    @classmethod
+    def current(cls, target) -> "StopDashboard":
+        """[ 获取调试目标的停止面板，不存在时创建 ]"""
+        state = DataHandler().get_target_state(target)
+        if state.dashboard is None:
+            state.dashboard = cls()
+        return state.dashboard
+
+    def addWatch(self, expr: str, size: int):
+        self.watches = [watch for watch in self.watches if watch[0] != expr]
+        self.watches.append((expr, min(size, MAX_WATCH_BYTES)))
+
+    def removeWatch(self, expr: str) -> bool:
+        count = len(self.watches)
+        self.watches = [watch for watch in self.watches if watch[0] != expr]
+        return len(self.watches) != count
+
+    def render(self, frame) -> str:
+        """[ 生成面板文本：按顺序输出各部分，预计会超出预算的部分跳过 ]"""
+        start_time = time.perf_counter()
+        thread = frame.GetThread()
+        process = thread.GetProcess()
+        target = process.GetTarget()
+        index = Symbolicator.getModuleIndex(target)
+
+        lines = []
+        skipped = []
+        for name in self.sections:
+            elapsed = time.perf_counter() - start_time
+            estimate = self.costs.get(name, 0.0)
+            if elapsed + estimate > self.budget:
+                skipped.append('%s (预计 %.1fms)' % (SECTION_TITLES[name], estimate * 1000))
+                # 跳过的部分预计耗时逐次衰减，之后的停止中还会再尝试（例如缓存已经建立之后）
+                self.costs[name] = estimate * SKIP_DECAY
+                continue
+
+            section_start = time.perf_counter()
+            section_lines = getattr(self, '_' + name)(frame, target, process, index, start_time)
+            cost = time.perf_counter() - section_start
+            self.costs[name] = cost if name not in self.costs else self.costs[name] * (1 - COST_WEIGHT) + cost * COST_WEIGHT
+
+            if section_lines:
+                lines.append('─── %s ───' % SECTION_TITLES[name])
+                lines.extend(section_lines)
+
+        footer = '[ 停止 #%d，线程 %d，面板耗时 %.1fms / 预算 %.0fms' % (
+            process.GetStopID(), thread.GetIndexID(), (time.perf_counter() - start_time) * 1000, self.budget * 1000)
+        if skipped:
+            footer += '，已跳过: ' + '、'.join(skipped)
+        lines.append(footer + ' ]')
+        return '\n'.join(lines)
+
+    def _regs(self, frame, target, process, index, start_time) -> List[str]:
+        register_handler = RegisterHandler()
+        snapshot = register_handler.snapshot(frame)
+        if snapshot is None:
+            return ['[ 读取寄存器失败. ]']
+
+        previous = register_handler.previous(frame)
+        changed = {name for name, _, _ in snapshot.changed(previous)}
+        use_color = target.GetDebugger().GetUseColor()
+
+        cells = []
+        for name, value in snapshot.items():
+            cell = '%5s 0x%016x' % (name, value)
+            if name in changed:
+                cell = HIGHLIGHT_START + cell + HIGHLIGHT_END if use_color else cell + '*'
+            elif not use_color:
+                cell += ' '
+            cells.append(cell)
+        return ['  '.join(cells[i:i + REGISTERS_PER_LINE]).rstrip() for i in range(0, len(cells), REGISTERS_PER_LINE)]
+
+    def _dis(self, frame, target, process, index, start_time) -> List[str]:
+        pc = frame.GetPC()
+        located = index.locate(pc) if index is not None else None
+        if located is None:
+            return ['[ pc 0x%x 不属于任何已加载模块 ]' % pc]
+
+        owner, current = located
+        module = index.modules[owner]
+        name = index.names[owner]
+        slide = index.slides[owner]
+        instructions = Disassembler.instructions(target, module, current - DIS_BEFORE * 4, count=DIS_BEFORE + DIS_AFTER + 1)
+        if not any(offset == current for offset, _ in instructions):
+            # pc 前面的字节不是完整的指令（例如 x86），从 pc 开始反汇编
+            instructions = Disassembler.instructions(target, module, current, count=DIS_AFTER + 1)
+
+        lines = []
+        for offset, (_, mnemonic, operands, comment) in instructions:
+            marker = '->  ' if offset == current else '    '
+            line = '%s0x%x <%s+0x%x>: %-8s %s' % (marker, offset + slide, name, offset, mnemonic, operands)
+            lines.append(line + '  ; ' + comment if comment else line)
+        return lines
+
+    def _stack(self, frame, target, process, index, start_time) -> List[str]:
+        thread = frame.GetThread()
+        lines = []
+        for i in range(self.frame_count):
+            # 栈帧按需展开，只展开显示的帧
+            stack_frame = thread.GetFrameAtIndex(i)
+            if not stack_frame.IsValid():
+                break
+            if i and time.perf_counter() - start_time > self.budget:
+                lines.append('    ... [ 超出预算，只展开了 %d 帧 ]' % i)
+                break
+            pc = stack_frame.GetPC()
+            resolved = index.resolve(pc) if index is not None else None
+            lines.append('%s#%-2d %s' % ('*' if stack_frame.GetFrameID() == frame.GetFrameID() else ' ', i,
+                                         Symbolicator.format(pc, resolved)))
+        return lines
+
+    def _watch(self, frame, target, process, index, start_time) -> List[str]:
+        if not self.watches:
+            return []
+
+        context = FrameContext(frame, process)
+        planner = ReadPlanner(process)
+        values = []
+        for expr, size in self.watches:
+            try:
+                value = ExprEvaluator.evaluate(expr, context)
+            except (ExprSyntaxError, ExprEvalError) as e:
+                values.append((expr, size, None, str(e)))
+                continue
+            handle = planner.add(value, size) if size else None
+            values.append((expr, size, value, handle))
+
+        # 所有监视表达式的内存读取合并执行
+        planner.execute()
+
+        lines = []
+        hexdump = HexDump(width=16)
+        for expr, size, value, extra in values:
+            if value is None:
+                lines.append('%s = [ %s ]' % (expr, extra))
+                continue
+            resolved = index.resolve(value) if index is not None else None
+            lines.append('%s = %s' % (expr, Symbolicator.format(value, resolved) if resolved is not None else '0x%x' % value))
+            if size:
+                data = planner.get(extra)
+                if data is None:
+                    lines.append('    [ 读取内存失败: 0x%x ]' % value)
+                else:
+                    lines.extend('    ' + line for line in hexdump.lines(value, data))
+        return lines
+
+    def summary(self) -> List[str]:
+        lines = ['[ 停止面板: %s，预算 %.0fms，栈帧 %d 个 ]' % (
+            '已启用 (stop-hook %d)' % self.hook_id if self.hook_id is not None else '未启用', self.budget * 1000, self.frame_count)]
+        for name in self.sections:
+            cost = self.costs.get(name)
+            lines.append('    %s: %s' % (SECTION_TITLES[name], '平均 %.2fms' % (cost * 1000) if cost is not None else '尚未输出'))
+        for expr, size in self.watches:
+            lines.append('    监视: %s%s' % (expr, '（读取 %d 字节）' % size if size else ''))
+        return lines
+
+
+class DashboardStopHook:
+    """[ 脚本化 stop-hook：每次停止时输出面板，不改变停止行为 ]"""
+
+    def __init__(self, target, extra_args, internal_dict):
+        self.target = target
+
+    def handle_stop(self, exe_ctx, stream):
+        frame = exe_ctx.GetFrame()
+        if frame.IsValid():
+            stream.Print(StopDashboard.current(self.target).render(frame) + '\n')
+        return True
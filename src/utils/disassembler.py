@@ -0,0 +1,162 @@
+import lldb
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+from src.utils.macho import MachOFile
+from src.utils.symbolicator import Symbolicator
+
+"""
+    类功能：按模块 UUID + 偏移缓存的反汇编
+
+    - 指令字节优先从模块的磁盘文件（SBSection.GetSectionData）读取，读取不到时才读取一次进程内存
+    - 解码结果按 模块 UUID -> 偏移 缓存，同一个二进制重新启动进程后缓存仍然有效
+    - nop / memwrite 修改过的范围记录在进程状态中：这些范围只从进程内存读取、不再缓存，缓存中与之重叠的指令不使用
+      （缓存按 UUID 全局共享，其它进程可能重新从磁盘填充这些偏移）
+    - 加密的 App Store 二进制（cryptid 不为 0）的加密范围在磁盘上是密文，从进程内存读取已解密的字节
+"""
+
+# 一条指令: (字节数, 助记符, 操作数, 注释)
+Instruction = Tuple[int, str, str, str]
+
+# 缓存未命中时，至少解码的字节数（减少之后相邻范围的再次解码）
+MIN_DECODE_SIZE = 0x100
+
+
+class Disassembler:
+    # 模块 UUID -> {偏移: 指令}
+    _cache: Dict[str, Dict[int, Instruction]] = {}
+
+    @classmethod
+    def moduleKey(cls, module) -> str:
+        """[ 模块 UUID，没有 UUID 时使用文件路径 ]"""
+        return module.GetUUIDString() or module.GetFileSpec().fullpath
+
+    @classmethod
+    def encryptedRange(cls, module) -> Optional[Tuple[int, int]]:
+        """[ 模块磁盘文件中加密部分的文件地址范围，没有加密时返回 None ]"""
+        path = module.GetFileSpec().fullpath
+        if not path or not os.path.isfile(path):
+            return None
+        return MachOFile.encryptedRange(path, module.GetUUIDString())
+
+    @classmethod
+    def decrypt(cls, target, module, file_addr: int, raw: bytes) -> Optional[bytes]:
+        """[ raw 是从 file_addr 开始的磁盘字节：与加密范围重叠的部分替换为进程内存中已解密的字节，没有进程时返回 None ]"""
+        encrypted = cls.encryptedRange(module)
+        if encrypted is None:
+            return raw
+        start, end = max(file_addr, encrypted[0]), min(file_addr + len(raw), encrypted[1])
+        if start >= end:
+            return raw
+
+        load_addr = module.ResolveFileAddress(start).GetLoadAddress(target)
+        if load_addr == lldb.LLDB_INVALID_ADDRESS:
+            return None
+        error = lldb.SBError()
+        data = target.GetProcess().ReadMemory(load_addr, end - start, error)
+        if not error.Success() or not data or len(data) != end - start:
+            return None
+        return raw[:start - file_addr] + bytes(data) + raw[end - file_addr:]
+
+    @classmethod
+    def _patchedRanges(cls, target, key) -> List[Tuple[int, int]]:
+        return DataHandler().get_process_state(target).patched_ranges.setdefault(key, [])
+
+    @classmethod
+    def _isPatched(cls, patched, start, end) -> bool:
+        return any(start < patch_end and patch_start < end for patch_start, patch_end in patched)
+
+    @classmethod
+    def invalidate(cls, target, address, size):
+        """[ nop / memwrite 修改内存后调用：移除与修改范围重叠的缓存指令，并记录修改范围 ]"""
+        index = Symbolicator.getModuleIndex(target)
+        located = index.locate(address) if index is not None else None
+        if located is None:
+            return
+
+        owner, offset = located
+        key = cls.moduleKey(index.modules[owner])
+        cls._patchedRanges(target, key).append((offset, offset + size))
+
+        cache = cls._cache.get(key)
+        if cache:
+            for inst_offset in [o for o, inst in cache.items() if o < offset + size and offset < o + inst[0]]:
+                del cache[inst_offset]
+
+    @classmethod
+    def _readBytes(cls, target, module, offset, size, from_memory) -> Optional[bytes]:
+        """[ 读取指令字节，不会跨越所在的 section ]"""
+        address = module.ResolveFileAddress(offset)
+        section = address.GetSection()
+        if not section.IsValid():
+            return None
+        size = min(size, section.GetByteSize() - address.GetOffset())
+        if size <= 0:
+            return None
+
+        if not from_memory:
+            error = lldb.SBError()
+            data = section.GetSectionData(address.GetOffset(), size)
+            raw = data.ReadRawData(error, 0, size) if data.IsValid() and data.GetByteSize() >= size else None
+            if raw:
+                return bytes(raw)
+
+        load_addr = address.GetLoadAddress(target)
+        if load_addr == lldb.LLDB_INVALID_ADDRESS:
+            return None
+        error = lldb.SBError()
+        raw = target.GetProcess().ReadMemory(load_addr, size, error)
+        return bytes(raw) if error.Success() and raw else None
+
+    @classmethod
+    def _decode(cls, target, module, offset, size, from_memory) -> Dict[int, Instruction]:
+        raw = cls._readBytes(target, module, offset, size, from_memory)
+        if raw is None:
+            return {}
+
+        decoded = {}
+        instructions = target.GetInstructions(module.ResolveFileAddress(offset), raw)
+        for i in range(instructions.GetSize()):
+            inst = instructions.GetInstructionAtIndex(i)
+            inst_offset = inst.GetAddress().GetFileAddress()
+            decoded[inst_offset] = (inst.GetByteSize(), inst.GetMnemonic(target) or '', inst.GetOperands(target) or '',
+                                    inst.GetComment(target) or '')
+        return decoded
+
+    @classmethod
+    def instructions(cls, target, module, start, end=None, count=None) -> List[Tuple[int, Instruction]]:
+        """[ 返回 [start, end) 范围内（或从 start 开始 count 条）的 (偏移, 指令) 列表 ]"""
+        key = cls.moduleKey(module)
+        cache = cls._cache.setdefault(key, {})
+        patched = cls._patchedRanges(target, key)
+        encrypted = cls.encryptedRange(module)
+
+        # 本次解码的指令（修改过的范围不写入缓存，只在这里使用）
+        decoded: Dict[int, Instruction] = {}
+        result = []
+        offset = start
+        while (end is None or offset < end) and (count is None or len(result) < count):
+            inst = decoded.get(offset)
+            if inst is None:
+                inst = cache.get(offset)
+                if inst is not None and cls._isPatched(patched, offset, offset + inst[0]):
+                    inst = None
+            if inst is None:
+                want = (end - offset) if end is not None else (count - len(result)) * 4
+                size = max(want, MIN_DECODE_SIZE)
+                if cls._isPatched(patched, offset, offset + size):
+                    decoded.update(cls._decode(target, module, offset, want, True))
+                else:
+                    # 加密范围的解密结果在同一个二进制的所有进程中相同，可以缓存
+                    from_memory = encrypted is not None and cls._isPatched([encrypted], offset, offset + size)
+                    fresh = cls._decode(target, module, offset, size, from_memory)
+                    cache.update(fresh)
+                    decoded.update(fresh)
+                inst = decoded.get(offset)
+                if inst is None:
+                    break
+
+            result.append((offset, inst))
+            offset += inst[0]
+        return result
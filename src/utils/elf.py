@@ -0,0 +1,107 @@
+import mmap
+import struct
+from typing import List, Optional
+
+from src.utils.macho import Segment, Section
+
+"""
+    类功能：只读 mmap 的 ELF 文件解析
+
+    - 支持 32 / 64 位、小端 / 大端的 ELF，解析程序头（PT_LOAD 作为 segment）、节头和 GNU build-id
+    - 提供与 MachOFile 相同的 segment / section 列表和 虚拟地址 <-> 文件偏移 转换，供 SegmentMap 使用
+"""
+
+ELF_MAGIC = b'\x7fELF'
+
+PT_LOAD = 1
+PT_NOTE = 4
+NT_GNU_BUILD_ID = 3
+
+
+class ELFFile:
+    """[ ELF 文件，segment 为 PT_LOAD 程序头，名称为 PT_LOAD[序号] ]"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.slice_offset = 0
+        self.uuid = ''
+        self.segments: List[Segment] = []
+        self.sections: List[Section] = []
+
+        try:
+            self._parse()
+        except (ValueError, struct.error):
+            self.mapped.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.mapped.close()
+
+    def _parse(self):
+        if self.mapped[:4] != ELF_MAGIC:
+            raise ValueError("不是 ELF 文件")
+        is_64 = self.mapped[4] == 2
+        order = '<' if self.mapped[5] == 1 else '>'
+
+        if is_64:
+            _, _, _, _, phoff, shoff, _, _, phentsize, phnum, shentsize, shnum, shstrndx = struct.unpack_from(
+                order + 'HHIQQQIHHHHHH', self.mapped, 16)
+            program_header = struct.Struct(order + 'IIQQQQQQ')
+            section_header = struct.Struct(order + 'IIQQQQIIQQ')
+        else:
+            _, _, _, _, phoff, shoff, _, _, phentsize, phnum, shentsize, shnum, shstrndx = struct.unpack_from(
+                order + 'HHIIIIIHHHHHH', self.mapped, 16)
+            program_header = struct.Struct(order + 'IIIIIIII')
+            section_header = struct.Struct(order + 'IIIIIIIIII')
+
+        for i in range(phnum):
+            fields = program_header.unpack_from(self.mapped, phoff + i * phentsize)
+            if is_64:
+                p_type, _, p_offset, p_vaddr, _, p_filesz, p_memsz, _ = fields
+            else:
+                p_type, p_offset, p_vaddr, _, p_filesz, p_memsz, _, _ = fields
+            if p_type == PT_LOAD:
+                self.segments.append(Segment('PT_LOAD[%d]' % len(self.segments), p_vaddr, p_memsz, p_offset, p_filesz))
+            elif p_type == PT_NOTE and not self.uuid:
+                self.uuid = self._buildId(order, p_offset, p_filesz)
+
+        if shoff and shnum:
+            headers = [section_header.unpack_from(self.mapped, shoff + i * shentsize) for i in range(shnum)]
+            names_offset = headers[shstrndx][4] if shstrndx < shnum else None
+            for sh_name, _, _, sh_addr, sh_offset, sh_size, _, _, _, _ in headers:
+                if not sh_addr or names_offset is None:
+                    continue
+                name_start = names_offset + sh_name
+                name = self.mapped[name_start:self.mapped.find(b'\0', name_start)].decode('utf-8', 'replace')
+                self.sections.append(Section('', name, sh_addr, sh_size, sh_offset))
+
+    def _buildId(self, order: str, offset: int, size: int) -> str:
+        end = offset + size
+        while offset + 12 <= end:
+            namesz, descsz, note_type = struct.unpack_from(order + 'III', self.mapped, offset)
+            name_start = offset + 12
+            desc_start = name_start + ((namesz + 3) & ~3)
+            if note_type == NT_GNU_BUILD_ID and self.mapped[name_start:name_start + namesz] == b'GNU\0':
+                return self.mapped[desc_start:desc_start + descsz].hex().upper()
+            offset = desc_start + ((descsz + 3) & ~3)
+        return ''
+
+    @property
+    def base(self) -> int:
+        """[ 第一个 PT_LOAD 的虚拟地址（模块基址） ]"""
+        return min((segment.vmaddr for segment in self.segments), default=0)
+
+    def fileOffset(self, vmaddr: int) -> Optional[int]:
+        for segment in self.segments:
+            if segment.vmaddr <= vmaddr < segment.vmaddr + segment.filesize:
+                return segment.fileoff + vmaddr - segment.vmaddr
+        return None
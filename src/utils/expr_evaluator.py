@@ -0,0 +1,300 @@
+import lldb
+import re
+
+from src.handler.register_handler import RegisterHandler
+
+"""
+    类功能：地址表达式快速求值（不经过 LLDB 表达式 JIT）
+
+    支持的语法：
+        - 寄存器：$x8、x8、$pc、$sp、$lr、$fp、w0 ...
+        - 数字：0x 开头的十六进制、十进制
+        - 运算符：+ - * << >> & | ^ ~ 以及括号
+        - 解引用：*expr、[expr]（读取 8 字节），u8[expr] / u16[expr] / u32[expr] / u64[expr]
+        - 条件（用于断点条件）：== != < <= > >=，and / or / not（也可以写成 && / || / !）
+
+    表达式只解析一次，编译成闭包后缓存，之后每次求值只需要读取寄存器和内存。
+"""
+
+# 64 位掩码
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+# 指定宽度的解引用
+SIZED_DEREF = {"u8": 1, "u16": 2, "u32": 4, "u64": 8}
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<num>0[xX][0-9a-fA-F]+|\d+)
+      | (?P<name>\$?[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op><<|>>|==|!=|<=|>=|&&|\|\||[-+*&|^~!<>()\[\]])
+    )""", re.VERBOSE)
+
+# 比较运算符（优先级低于位运算，与 Python 一致）
+_COMPARE_FUNCS = {
+    "==": lambda a, b: int(a == b),
+    "!=": lambda a, b: int(a != b),
+    "<": lambda a, b: int(a < b),
+    "<=": lambda a, b: int(a <= b),
+    ">": lambda a, b: int(a > b),
+    ">=": lambda a, b: int(a >= b),
+}
+
+# 逻辑运算符的两种写法
+_LOGICAL_OR = ("or", "||")
+_LOGICAL_AND = ("and", "&&")
+_LOGICAL_NOT = ("not", "!")
+
+# 二元运算符优先级（数值越大优先级越高，与 C 语言一致）
+_BINARY_PRECEDENCE = {
+    "|": 1,
+    "^": 2,
+    "&": 3,
+    "<<": 4, ">>": 4,
+    "+": 5, "-": 5,
+    "*": 6,
+}
+
+_BINARY_FUNCS = {
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+    "&": lambda a, b: a & b,
+    "<<": lambda a, b: (a << b) & MASK_64,
+    ">>": lambda a, b: a >> b,
+    "+": lambda a, b: (a + b) & MASK_64,
+    "-": lambda a, b: (a - b) & MASK_64,
+    "*": lambda a, b: (a * b) & MASK_64,
+}
+
+
+class ExprSyntaxError(ValueError):
+    """[ 表达式不在快速求值器支持的语法范围内 ]"""
+
+
+class ExprEvalError(RuntimeError):
+    """[ 表达式求值失败（内存不可读等） ]"""
+
+
+class FrameContext:
+    """[ 基于 SBFrame / SBProcess 的求值上下文，寄存器从本次停止的快照中读取，内存直接读取 ]"""
+
+    def __init__(self, frame, process):
+        self.frame = frame
+        self.process = process
+        self._register_handler = RegisterHandler()
+
+    def reg(self, name):
+        value = self._register_handler.read(self.frame, name)
+        if value is None:
+            # 不是寄存器（可能是符号名），交给 LLDB 表达式求值
+            raise ExprSyntaxError("未知寄存器: %s" % name)
+        return value
+
+    def mem(self, address, size):
+        error = lldb.SBError()
+        value = self.process.ReadUnsignedFromMemory(address, size, error)
+        if not error.Success():
+            raise ExprEvalError("读取内存失败: 0x%x" % address)
+        return value
+
+
+class _Parser:
+    """[ 递归下降解析器，直接生成求值闭包 ]"""
+
+    def __init__(self, expr):
+        self.tokens = self._tokenize(expr)
+        self.pos = 0
+        # 表达式中用到的寄存器名
+        self.registers = set()
+
+    @staticmethod
+    def _tokenize(expr):
+        tokens = []
+        pos = 0
+        expr = expr.rstrip()
+        while pos < len(expr):
+            match = _TOKEN_RE.match(expr, pos)
+            if match is None or match.end() == pos:
+                raise ExprSyntaxError("无法识别的字符: %r" % expr[pos:])
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        return tokens
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        if index < len(self.tokens):
+            return self.tokens[index]
+        return (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, token = self.next()
+        if token != value:
+            raise ExprSyntaxError("缺少 %s" % value)
+
+    def parse(self):
+        if not self.tokens:
+            raise ExprSyntaxError("表达式为空")
+        func = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ExprSyntaxError("多余的内容: %r" % (self.peek()[1],))
+        return func
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.peek()[1] in _LOGICAL_OR:
+            self.next()
+            right = self.parse_and()
+            left = self._make_logical(left, right, is_and=False)
+        return left
+
+    def parse_and(self):
+        left = self.parse_not()
+        while self.peek()[1] in _LOGICAL_AND:
+            self.next()
+            right = self.parse_not()
+            left = self._make_logical(left, right, is_and=True)
+        return left
+
+    def parse_not(self):
+        if self.peek()[1] in _LOGICAL_NOT:
+            self.next()
+            return self._make_unary(lambda v: int(not v), self.parse_not())
+        return self.parse_compare()
+
+    def parse_compare(self):
+        left = self.parse_binary(1)
+        while self.peek()[0] == "op" and self.peek()[1] in _COMPARE_FUNCS:
+            op = self.next()[1]
+            right = self.parse_binary(1)
+            left = self._make_binary(_COMPARE_FUNCS[op], left, right)
+        return left
+
+    @staticmethod
+    def _make_logical(left, right, is_and):
+        # 短路求值：条件为假时不再读取右侧的寄存器和内存
+        left_func = left if callable(left) else (lambda ctx, v=left: v)
+        right_func = right if callable(right) else (lambda ctx, v=right: v)
+        if is_and:
+            return lambda ctx: int(bool(left_func(ctx)) and bool(right_func(ctx)))
+        return lambda ctx: int(bool(left_func(ctx)) or bool(right_func(ctx)))
+
+    def parse_binary(self, min_precedence):
+        left = self.parse_unary()
+        while True:
+            kind, op = self.peek()
+            precedence = _BINARY_PRECEDENCE.get(op) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.next()
+            right = self.parse_binary(precedence + 1)
+            left = self._make_binary(_BINARY_FUNCS[op], left, right)
+
+    @staticmethod
+    def _make_binary(op_func, left, right):
+        # 两侧都是常量时直接折叠
+        if isinstance(left, int) and isinstance(right, int):
+            return op_func(left, right)
+        left_func = left if callable(left) else (lambda ctx, v=left: v)
+        right_func = right if callable(right) else (lambda ctx, v=right: v)
+        return lambda ctx: op_func(left_func(ctx), right_func(ctx))
+
+    def parse_unary(self):
+        kind, token = self.peek()
+        if kind == "op" and token in ("-", "~", "*"):
+            self.next()
+            operand = self.parse_unary()
+            if token == "-":
+                return self._make_unary(lambda v: (-v) & MASK_64, operand)
+            if token == "~":
+                return self._make_unary(lambda v: (~v) & MASK_64, operand)
+            return self._make_deref(operand, 8)
+        if kind == "op" and token == "+":
+            self.next()
+            return self.parse_unary()
+        return self.parse_primary()
+
+    @staticmethod
+    def _make_unary(op_func, operand):
+        if isinstance(operand, int):
+            return op_func(operand)
+        return lambda ctx: op_func(operand(ctx))
+
+    @staticmethod
+    def _make_deref(operand, size):
+        if isinstance(operand, int):
+            return lambda ctx: ctx.mem(operand, size)
+        return lambda ctx: ctx.mem(operand(ctx), size)
+
+    def parse_primary(self):
+        kind, token = self.next()
+        if kind == "num":
+            return int(token, 0) if token[:2].lower() == "0x" else int(token, 10)
+
+        if kind == "name" and token in _LOGICAL_OR + _LOGICAL_AND + _LOGICAL_NOT:
+            raise ExprSyntaxError("意外的关键字: %s" % token)
+
+        if kind == "name":
+            # u32[expr] 等指定宽度的解引用
+            if token in SIZED_DEREF and self.peek() == ("op", "["):
+                self.next()
+                inner = self.parse_binary(1)
+                self.expect("]")
+                return self._make_deref(inner, SIZED_DEREF[token])
+            reg_name = token[1:] if token.startswith("$") else token
+            self.registers.add(reg_name)
+            return lambda ctx: ctx.reg(reg_name)
+
+        if token == "(":
+            inner = self.parse_or()
+            self.expect(")")
+            return inner
+
+        if token == "[":
+            inner = self.parse_binary(1)
+            self.expect("]")
+            return self._make_deref(inner, 8)
+
+        raise ExprSyntaxError("意外的符号: %r" % (token,))
+
+
+class ExprEvaluator:
+    # 已编译表达式缓存：表达式字符串 -> 闭包或常量
+    _compiled_cache = {}
+
+    @classmethod
+    def compile(cls, expr):
+        """[ 编译表达式，返回 func(ctx) -> int 或常量 int，语法不支持时抛出 ExprSyntaxError ]"""
+        expr = expr.strip()
+        compiled = cls._compiled_cache.get(expr)
+        if compiled is None:
+            compiled = _Parser(expr).parse()
+            cls._compiled_cache[expr] = compiled
+        return compiled
+
+    @classmethod
+    def registers(cls, expr):
+        """[ 表达式中用到的寄存器名（不含 $ 前缀），语法不支持时抛出 ExprSyntaxError ]"""
+        parser = _Parser(expr.strip())
+        parser.parse()
+        return parser.registers
+
+    @classmethod
+    def evaluate(cls, expr, ctx):
+        """[ 在给定上下文中对表达式求值 ]"""
+        compiled = cls.compile(expr)
+        if isinstance(compiled, int):
+            return compiled & MASK_64
+        return compiled(ctx)
+
+    @classmethod
+    def is_constant(cls, expr):
+        """[ 判断表达式是否不依赖寄存器和内存 ]"""
+        try:
+            return isinstance(cls.compile(expr), int)
+        except ExprSyntaxError:
+            return False
@@ -0,0 +1,117 @@
+import struct
+from typing import Iterator, Optional, Tuple
+
+from src.utils.memory_regions import MemoryRegionMap
+
+"""
+    类功能：内存十六进制输出
+
+    memread 直接读取原始字节，由这里格式化输出，不再经过 LLDB 的 memory read：
+    - 支持 1 / 2 / 4 / 8 字节的字长、小端序 / 大端序，右侧附带 ASCII
+    - 8 字节指针模式下，每个值都尝试解析为 模块 + 偏移（符号 + 偏移）
+    - 整页字节一次性 unpack / hex / translate，再按行切分，逐页生成文本，大块内存不会一次性生成全部文本
+    - 逐页读取前通过 MemoryRegionMap 校验，跨越区域边界时输出到最后一个可读字节为止
+"""
+
+# 每页读取 / 格式化的字节数
+PAGE_SIZE = 0x10000
+
+# 不可打印字符显示为 .
+ASCII_TABLE = bytes(b if 0x20 <= b < 0x7f else ord('.') for b in range(256))
+
+# 字长 -> struct 格式字符
+WORD_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+# 解析指针时去掉高位的指针认证位
+POINTER_LOOKUP_MASK = 0x00007fffffffffff
+
+
+class HexDump:
+    """[ 十六进制格式化器 ]"""
+
+    def __init__(self, word_size: int = 1, byte_order: str = 'little', width: int = 16, module_index=None):
+        if word_size not in WORD_FORMATS:
+            raise ValueError("字长只能是 1、2、4、8")
+        self.word_size = word_size
+        self.byte_order = byte_order
+        # 指针注释模式：每行一个 8 字节的值
+        self.module_index = module_index
+        if module_index is not None:
+            self.word_size = 8
+            width = 8
+        self.width = max(width - width % self.word_size, self.word_size)
+
+        prefix = '<' if byte_order == 'little' else '>'
+        self._word_format = prefix + WORD_FORMATS[self.word_size]
+        self._value_format = '0x%%0%dx' % (self.word_size * 2)
+
+    def lines(self, address: int, data: bytes) -> Iterator[str]:
+        """[ 逐行生成文本（data 不满一个字长的尾部按字节输出） ]"""
+        width = self.width
+        word_size = self.word_size
+        text = data.translate(ASCII_TABLE).decode('ascii')
+        aligned = len(data) - len(data) % word_size
+
+        if word_size == 1:
+            hex_width = width * 3 - 1
+            for offset in range(0, len(data), width):
+                chunk = data[offset:offset + width]
+                yield '0x%x: %s  %s' % (address + offset, chunk.hex(' ').ljust(hex_width), text[offset:offset + width])
+            return
+
+        values = struct.unpack('%s%d%s' % (self._word_format[0], aligned // word_size, self._word_format[1]), data[:aligned])
+        per_line = width // word_size
+        value_format = self._value_format
+        hex_width = per_line * (word_size * 2 + 3) - 1
+        for offset in range(0, aligned, width):
+            index = offset // word_size
+            words = values[index:index + per_line]
+            line = '0x%x: %s  %s' % (address + offset, ' '.join([value_format % value for value in words]).ljust(hex_width),
+                                     text[offset:min(offset + width, aligned)])
+            if self.module_index is not None:
+                annotation = self.annotate(words[0])
+                if annotation:
+                    line += '  ' + annotation
+            yield line
+
+        if aligned < len(data):
+            tail = data[aligned:]
+            yield '0x%x: %s  %s' % (address + aligned, tail.hex(' '), text[aligned:])
+
+    def annotate(self, value: int) -> Optional[str]:
+        """[ 值指向某个已加载模块时，返回 模块 + 偏移（符号 + 偏移） ]"""
+        resolved = self.module_index.resolve(value & POINTER_LOOKUP_MASK)
+        if resolved is None:
+            return None
+        module_name, offset, symbol_name, delta = resolved
+        annotation = "%s + 0x%x" % (module_name, offset)
+        if symbol_name is not None:
+            annotation += " (%s + %d)" % (symbol_name, delta) if delta else " (%s)" % symbol_name
+        return annotation
+
+    def render(self, address: int, data: bytes) -> str:
+        return '\n'.join(self.lines(address, data))
+
+    def pages(self, process, address: int, count: int, page_size: int = PAGE_SIZE) -> Iterator[str]:
+        """[ 按页读取并格式化，每次只保留一页的字节和文本，读取失败时停止 ]"""
+        # 每页大小保持为行宽的整数倍，行地址才能连续对齐
+        page_size = max(page_size - page_size % self.width, self.width)
+        for page_address, data, error in self.readPages(process, address, count, page_size):
+            if data is None:
+                yield '[ 错误: 无法读取内存 0x%x: %s ]' % (page_address, error)
+                return
+            yield self.render(page_address, data)
+
+    @classmethod
+    def readPages(cls, process, address: int, count: int, page_size: int = PAGE_SIZE) -> Iterator[Tuple[int, Optional[bytes], str]]:
+        """[ 按页读取：逐页生成 (地址, 字节, 错误信息)，读取失败时字节为 None 并停止 ]"""
+        regions = MemoryRegionMap.current(process)
+        end = address + count
+        while address < end:
+            # 页在不可读的位置截断，之前的部分照常输出
+            data, _ = regions.read(address, min(page_size, end - address))
+            if not data:
+                yield address, None, regions.describe(address)
+                return
+            yield address, data, ''
+            address += len(data)
@@ -0,0 +1,234 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import INDEX_CACHE_PATH_STR
+from src.utils.disassembler import Disassembler
+
+"""
+    类功能：按模块 UUID 持久化的索引文件
+
+    - 一个索引文件包含若干个整数数组字段（或字节串字段），文件头是 JSON（字段的位置、元素大小、附加信息），数据按 8 字节对齐
+    - 加载时只读 mmap 整个文件，字段直接以 memoryview 的形式访问，不需要反序列化，大索引也不会占用额外内存
+    - 文件保存在 cache/<模块 UUID>/<索引名>.idx，写入时先写临时文件再替换，中途中断不会留下损坏的索引
+    - ModuleIndexFile 是各类模块索引（xref、字符串等）的基类：内存中已加载 -> 磁盘上的索引文件 -> 扫描建立并保存
+    - TextIndexFile 把大量短文本以换行分隔拼接成一个字节串，搜索时直接在 mmap 的字节串上执行正则，再用 bisect 找到所属的文本
+"""
+
+# 文件标识
+INDEX_MAGIC = b'ILDBIDX1'
+
+# 文本索引中拼接字符串的分隔符（正则使用 MULTILINE 时 ^ $ 对应单个字符串的开头和结尾）
+TEXT_SEPARATOR = b'\n'
+
+# 元素大小 -> memoryview 格式字符
+ITEM_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+
+class IndexFile:
+    """[ 已加载的索引文件：fields 中每个字段是只读 mmap 上的 memoryview ]"""
+
+    def __init__(self, path: str, mapped: mmap.mmap, meta: Dict[str, Any], fields: Dict[str, memoryview]):
+        self.path = path
+        self.meta = meta
+        self.fields = fields
+        self._mapped = mapped
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.fields[name]
+
+    def close(self):
+        for field in self.fields.values():
+            field.release()
+        self.fields = {}
+        self._mapped.close()
+
+
+class IndexStore:
+
+    @classmethod
+    def path(cls, key: str, name: str) -> str:
+        """[ 索引文件路径（模块没有 UUID 时 key 是文件路径，替换掉其中不能用作目录名的字符） ]"""
+        return os.path.join(INDEX_CACHE_PATH_STR, re.sub(r'[^\w.-]', '_', key), name + '.idx')
+
+    @classmethod
+    def write(cls, f, meta: Dict[str, Any], fields: Dict[str, Any]):
+        """[ 把索引写入文件对象，字段可以是 array.array / bytes / 支持 buffer 协议的连续数组（例如 numpy 数组） ]"""
+        views = {field: memoryview(value) for field, value in fields.items()}
+
+        layout = {}
+        offset = 0
+        for field, view in views.items():
+            if view.itemsize not in ITEM_FORMATS:
+                raise ValueError(f"字段 {field} 的元素大小 {view.itemsize} 不受支持")
+            layout[field] = [offset, len(view), view.itemsize]
+            offset += (view.nbytes + 7) & ~7
+
+        header = json.dumps({"meta": meta, "fields": layout}, ensure_ascii=False).encode('utf-8')
+        header += b' ' * (-(len(header) + 16) % 8)
+
+        f.write(INDEX_MAGIC + struct.pack('<Q', len(header)) + header)
+        for view in views.values():
+            f.write(view.cast('B'))
+            f.write(b'\0' * (-view.nbytes % 8))
+
+    @classmethod
+    def save(cls, key: str, name: str, meta: Dict[str, Any], fields: Dict[str, Any]) -> str:
+        """[ 保存索引 ]"""
+        path = cls.path(key, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            cls.write(f, meta, fields)
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def parse(cls, buffer) -> Tuple[Dict[str, Any], Dict[str, memoryview]]:
+        """[ 解析索引数据（mmap 或 bytes），返回 (附加信息, 字段)，格式不正确时抛出 ValueError 等异常 ]"""
+        if buffer[:8] != INDEX_MAGIC:
+            raise ValueError("文件标识不正确")
+        header_size = struct.unpack_from('<Q', buffer, 8)[0]
+        header = json.loads(bytes(buffer[16:16 + header_size]).decode('utf-8'))
+        data_start = 16 + header_size
+
+        view = memoryview(buffer)
+        fields = {}
+        for field, (offset, count, item_size) in header["fields"].items():
+            start = data_start + offset
+            end = start + count * item_size
+            if end > len(buffer):
+                raise ValueError(f"字段 {field} 超出文件范围")
+            fields[field] = view[start:end].cast(ITEM_FORMATS[item_size])
+        view.release()
+        return header.get("meta", {}), fields
+
+    @classmethod
+    def load(cls, key: str, name: str) -> Optional[IndexFile]:
+        """[ 加载索引，文件不存在或格式不正确时返回 None ]"""
+        path = cls.path(key, name)
+        if not os.path.isfile(path):
+            return None
+
+        with open(path, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return None
+
+        try:
+            meta, fields = cls.parse(mapped)
+        except (ValueError, KeyError, TypeError, struct.error) as e:
+            print(f'[ 索引文件 {path} 无效，将重新建立: {e} ]')
+            mapped.close()
+            return None
+
+        return IndexFile(path, mapped, meta, fields)
+
+
+class ModuleIndexFile:
+    """[ 按模块 UUID 持久化的模块索引基类，子类实现 build / summary，并定义自己的 _loaded ]"""
+
+    # 索引文件名、版本（建立规则变化时增加版本号，旧索引自动重建）和显示名称
+    INDEX_NAME = ''
+    INDEX_VERSION = 1
+    INDEX_TITLE = ''
+
+    # 已加载的索引：模块 UUID -> 索引
+    _loaded: Dict[str, "ModuleIndexFile"] = {}
+
+    def __init__(self, fields, meta: Dict[str, Any], index_file: Optional[IndexFile] = None):
+        self.fields = fields
+        self.meta = meta
+        self._index_file = index_file
+
+    @classmethod
+    def build(cls, target, module) -> Optional[Dict[str, Any]]:
+        """[ 扫描模块，返回索引字段，失败时返回 None ]"""
+        raise NotImplementedError
+
+    def summary(self) -> str:
+        raise NotImplementedError
+
+    def close(self):
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    @classmethod
+    def forModule(cls, target, module, rebuild: bool = False):
+        """[ 获取模块的索引：内存中已加载 -> 磁盘上的索引文件 -> 扫描建立并保存 ]"""
+        key = Disassembler.moduleKey(module)
+        if not rebuild:
+            index = cls._loaded.get(key)
+            if index is not None:
+                return index
+
+            index_file = IndexStore.load(key, cls.INDEX_NAME)
+            if index_file is not None and index_file.meta.get('version') == cls.INDEX_VERSION:
+                index = cls(index_file.fields, index_file.meta, index_file)
+                cls._loaded[key] = index
+                return index
+            if index_file is not None:
+                index_file.close()
+
+        old = cls._loaded.pop(key, None)
+        if old is not None:
+            old.close()
+
+        start_time = time.perf_counter()
+        fields = cls.build(target, module)
+        if fields is None:
+            return None
+
+        meta = {'version': cls.INDEX_VERSION, 'module': module.GetFileSpec().GetFilename()}
+        index = cls(fields, meta)
+        print('[ 已建立 %s 的%s: %s，耗时 %.2fs ]' % (meta['module'], cls.INDEX_TITLE, index.summary(),
+                                                 time.perf_counter() - start_time))
+
+        # 没有 UUID 的模块（key 是文件路径）无法判断文件是否变化，只保存在内存中
+        if module.GetUUIDString():
+            try:
+                print('[ 索引已保存到 %s ]' % IndexStore.save(key, cls.INDEX_NAME, meta, fields))
+            except OSError as e:
+                print(f'[ 保存索引失败: {e} ]')
+        cls._loaded[key] = index
+        return index
+
+
+class TextIndexFile(ModuleIndexFile):
+    """[ 包含文本列表的模块索引：blob 是以 TEXT_SEPARATOR 分隔拼接的所有文本，positions 是每个文本的起始位置（最后多一项） ]"""
+
+    @classmethod
+    def joinTexts(cls, texts: List[bytes]) -> Tuple[bytes, array]:
+        positions = array('Q', [0] * (len(texts) + 1))
+        position = 0
+        for i, text in enumerate(texts):
+            positions[i] = position
+            position += len(text) + 1
+        positions[len(texts)] = position
+        return TEXT_SEPARATOR.join(texts), positions
+
+    def text(self, i: int) -> str:
+        positions = self.fields['positions']
+        return bytes(self.fields['blob'][positions[i]:positions[i + 1] - 1]).decode('utf-8', 'replace')
+
+    def searchTexts(self, compiled) -> List[int]:
+        """[ 在 blob 上执行编译好的 bytes 正则，返回匹配的文本序号 ]"""
+        positions = self.fields['positions']
+        matched = []
+        last = -1
+        for match in compiled.finditer(self.fields['blob']):
+            i = bisect.bisect_right(positions, match.start()) - 1
+            # 匹配跨越了文本（模式中包含换行）时忽略
+            if i == last or match.end() > positions[i + 1] - 1:
+                continue
+            matched.append(i)
+            last = i
+        return matched
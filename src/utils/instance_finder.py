@@ -0,0 +1,166 @@
+import lldb
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+from src.utils.memory_regions import MemoryRegion, MemoryRegionMap
+from src.utils.objc_decoder import ObjCDecoder, ObjCRuntime, ISA_MASK_ARM64, ISA_MASK_X86_64
+from src.utils.symbolicator import Symbolicator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+    类功能：堆中的类实例查找（isa 匹配）
+
+    - 类名解析为类指针：ObjC 类通过 OBJC_CLASS_$_<类名> 符号，Swift 类（Module.Name）通过 _TtC 形式的 ObjC 名称或 $s...CN 元数据符号，也可以直接给出类指针
+    - 扫描所有可读写的内存区域（默认排除模块自身的数据段，其中的 classrefs 等会直接引用类指针），大块读取后逐个 8 字节比较：
+      (值 & isa 掩码) == 类指针，同时匹配原始 isa（Swift 对象、未使用 non-pointer isa 的对象）和 ARM64 / x86_64 的 non-pointer isa
+    - 安装了 numpy 时每块内存转换为 uint64 数组向量化比较，没有安装时使用 array('Q') 逐个比较，结果相同
+    - 候选实例可选校验：16 字节对齐（malloc 的最小对齐）、non-pointer isa 的 magic 位、重新读取 isa 后类名一致
+"""
+
+# 每次读取的字节数
+CHUNK_SIZE = 0x1000000
+
+# 读取失败时跳过的粒度
+SKIP_SIZE = 0x1000
+
+# malloc 返回的地址至少 16 字节对齐
+MALLOC_ALIGNMENT = 16
+
+# non-pointer isa 的 magic 位（objc4 isa.h），只对已知布局校验
+ISA_MAGIC = {
+    ISA_MASK_ARM64: (0x000003f000000001, 0x000001a000000001),
+    ISA_MASK_X86_64: (0x001f800000000001, 0x001d800000000001),
+}
+
+
+class InstanceScan:
+    """[ 一次扫描的结果：类指针、候选实例地址（按地址排序）、统计信息 ]"""
+
+    def __init__(self, cls: int, class_name: str):
+        self.cls = cls
+        self.class_name = class_name
+        self.addresses: List[int] = []
+        self.isas: List[int] = []
+        self.regions = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        return '%s (0x%x): 扫描 %d 个区域，%.1f MB，耗时 %.2fs，找到 %d 个候选实例%s' % (
+            self.class_name, self.cls, self.regions, self.bytes / 0x100000, self.elapsed, len(self.addresses),
+            '' if np is not None else '（未安装 numpy，使用纯 Python 比较）')
+
+
+class InstanceFinder:
+
+    @classmethod
+    def symbolNames(cls, name: str) -> List[str]:
+        """[ 类名对应的候选符号名 ]"""
+        if '.' not in name:
+            return ['OBJC_CLASS_$_' + name]
+        parts = name.split('.')
+        mangled = ''.join('%d%s' % (len(part), part) for part in parts)
+        # Swift 类：继承自 NSObject 的类有 ObjC 名称 _TtC<模块><类名>，纯 Swift 类只有元数据符号 $s<模块><类名>CN
+        return ['OBJC_CLASS_$__TtC' + mangled, '$s%sCN' % mangled, '_$s%sCN' % mangled]
+
+    @classmethod
+    def resolveClass(cls, target, name: str) -> Optional[int]:
+        """[ 类名 -> 运行时的类指针 ]"""
+        for symbol_name in cls.symbolNames(name):
+            contexts = target.FindSymbols(symbol_name)
+            for i in range(contexts.GetSize()):
+                address = contexts.GetContextAtIndex(i).GetSymbol().GetStartAddress().GetLoadAddress(target)
+                if address != lldb.LLDB_INVALID_ADDRESS:
+                    return address
+        return None
+
+    @classmethod
+    def runtime(cls, target) -> ObjCRuntime:
+        state = DataHandler().get_process_state(target)
+        if state.objc_runtime is None:
+            state.objc_runtime = ObjCRuntime(target)
+        return state.objc_runtime
+
+    @classmethod
+    def scanRegions(cls, target, include_modules: bool = False) -> List[MemoryRegion]:
+        """[ 需要扫描的区域：可读写，默认排除属于已加载模块的区域 ]"""
+        regions = MemoryRegionMap.current(target.GetProcess()).loadAll()
+        index = None if include_modules else Symbolicator.getModuleIndex(target)
+        return [region for region in regions if region.readable and region.writable
+                and (include_modules or MemoryRegionMap.owner(region, index) is None)]
+
+    @classmethod
+    def _matchNumpy(cls, data: bytes, cls_pointer: int, isa_mask: int) -> Tuple[List[int], List[int]]:
+        words = np.frombuffer(data, dtype='<u8', count=len(data) // 8)
+        hits = np.flatnonzero((words & np.uint64(isa_mask)) == np.uint64(cls_pointer))
+        return (hits * 8).tolist(), words[hits].tolist()
+
+    @classmethod
+    def _matchPython(cls, data: bytes, cls_pointer: int, isa_mask: int) -> Tuple[List[int], List[int]]:
+        words = array('Q', data[:len(data) - len(data) % 8])
+        hits = [i for i, word in enumerate(words) if word & isa_mask == cls_pointer]
+        return [i * 8 for i in hits], [words[i] for i in hits]
+
+    @classmethod
+    def scan(cls, target, cls_pointer: int, class_name: str, include_modules: bool = False) -> InstanceScan:
+        """[ 扫描所有可读写区域，找出 isa 指向类指针的 8 字节对齐位置 ]"""
+        start_time = time.perf_counter()
+        process = target.GetProcess()
+        isa_mask = cls.runtime(target).isa_mask
+        regions = MemoryRegionMap.current(process)
+        match = cls._matchNumpy if np is not None else cls._matchPython
+
+        result = InstanceScan(cls_pointer, class_name)
+        for region in cls.scanRegions(target, include_modules):
+            result.regions += 1
+            address = region.start
+            while address < region.end:
+                data, _ = regions.read(address, min(CHUNK_SIZE, region.end - address))
+                if not data:
+                    # 区域中间不可读的页（例如保护页）跳过
+                    result.skipped += SKIP_SIZE
+                    address = (address + SKIP_SIZE) & ~(SKIP_SIZE - 1)
+                    continue
+                offsets, isas = match(data, cls_pointer, isa_mask)
+                result.addresses.extend(address + offset for offset in offsets)
+                result.isas.extend(isas)
+                result.bytes += len(data)
+                address += len(data)
+
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    @classmethod
+    def verify(cls, target, result: InstanceScan) -> int:
+        """[ 校验候选实例，去掉不符合的地址，返回去掉的个数 ]"""
+        runtime = cls.runtime(target)
+        magic = ISA_MAGIC.get(runtime.isa_mask)
+        decoder = ObjCDecoder(target)
+        expected_name = decoder.class_name(result.cls)
+
+        # 同一个 isa 值只校验一次类名
+        checked: Dict[int, bool] = {}
+        addresses = []
+        isas = []
+        for address, isa in zip(result.addresses, result.isas):
+            if address % MALLOC_ALIGNMENT:
+                continue
+            if isa != result.cls and magic is not None and isa & magic[0] != magic[1]:
+                continue
+            if isa not in checked:
+                checked[isa] = expected_name is None or decoder.object_class_name(address) == expected_name
+            if checked[isa]:
+                addresses.append(address)
+                isas.append(isa)
+
+        removed = len(result.addresses) - len(addresses)
+        result.addresses = addresses
+        result.isas = isas
+        return removed
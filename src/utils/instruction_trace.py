@@ -0,0 +1,409 @@
+import io
+import lldb
+import os
+import re
+import time
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.config import INDEX_CACHE_PATH_STR
+from src.handler.register_handler import RegisterHandler
+from src.handler.register_handler.register_handler import REGISTER_ALIASES
+from src.utils.index_store import IndexStore
+from src.utils.symbolicator import Symbolicator
+
+"""
+    类功能：指令级跟踪（itrace）
+
+    - 在 Python 循环中逐条 StepInstruction，记录每条执行过的指令的地址和执行后发生变化的寄存器，不经过命令解释器，也不输出任何内容
+    - 默认只跟踪起始模块：单步进入其它模块（系统库、stub 跳转到的外部函数）时，在返回地址设置只对当前线程有效的一次性断点后继续运行，
+      整个外部调用记为调用指令这一步（寄存器变化是整个调用的结果）；--all 时所有模块都逐条单步
+    - 数据全部是增量编码的 array，不为每一步建立 dict：
+        pc_deltas    array('q')  与上一条指令地址的差（第一条为绝对地址），顺序执行时几乎全是 4，压缩率很高
+        owners       array('h')  指令所属模块在模块表中的序号（-1 表示不属于任何模块），模块表为 [模块名, slide]
+        change_counts array('B') 每一步变化的寄存器个数
+        change_regs  array('B')  变化的寄存器在寄存器表中的序号（按步依次排列）
+        change_values array('Q') 变化后的值（与 change_regs 一一对应）
+        initial      array('Q')  开始时所有寄存器的值
+      pc、w0 / eax 等子寄存器不单独记录（pc 已由 pc_deltas 记录，子寄存器是对应 64 位寄存器的一部分）
+    - 保存时使用 IndexStore 的格式（JSON 文件头 + 8 字节对齐的数组）整体 zlib 压缩，默认保存到 cache/traces/
+    - 查询：某个寄存器第一次（或每一次）被写入某个值是在哪一步、哪个模块偏移；只能看到值发生了变化的写入
+"""
+
+# 跟踪文件保存目录
+TRACE_PATH_STR = os.path.normpath(os.path.join(INDEX_CACHE_PATH_STR, 'traces'))
+
+# 跟踪文件格式标识
+TRACE_FORMAT = 'itrace-1'
+
+# 跟踪文件中的数组字段
+TRACE_FIELDS = ('pc_deltas', 'owners', 'change_counts', 'change_regs', 'change_values', 'initial')
+
+# 单步正常结束的停止原因，其它原因（断点、信号、异常等）结束跟踪
+STEP_STOP_REASONS = (lldb.eStopReasonTrace, lldb.eStopReasonPlanComplete, lldb.eStopReasonNone)
+
+# 默认跟踪的最大指令数
+DEFAULT_MAX_STEPS = 100000
+
+# 每隔多少步检查一次用户中断
+INTERRUPT_CHECK_INTERVAL = 64
+
+# 不单独记录的寄存器：pc 和 64 位寄存器的子寄存器（ARM64 的 w0~w30，x86_64 的 eax / ax / al / r8d 等）
+# x86_64 的 sp / bp 是 16 位子寄存器，ARM64 的 sp 是栈指针，所以按架构区分
+PC_REGISTERS = ('pc', 'rip', 'eip')
+SUBREGISTER_PATTERN = re.compile(r'^w\d+$')
+X86_SUBREGISTER_PATTERN = re.compile(r'^(e[a-d]x|e[sd]i|e[sb]p|[a-d]x|[a-d][lh]|[sd]il?|[sb]pl?|r\d+[dwbl])$')
+
+# 子寄存器 -> (64 位寄存器, 掩码)，查询时使用
+SUBREGISTER_PARENTS = (
+    (re.compile(r'^w(\d+)$'), r'x\1', 0xFFFFFFFF),
+    (re.compile(r'^e([a-d]x|[sd]i|[sb]p)$'), r'r\1', 0xFFFFFFFF),
+    (re.compile(r'^(r\d+)d$'), r'\1', 0xFFFFFFFF),
+)
+
+# 结束原因
+RESULT_LIMIT = 'limit'
+RESULT_REACHED = 'reached'
+RESULT_LEFT = 'left'
+RESULT_STOPPED = 'stopped'
+RESULT_EXITED = 'exited'
+RESULT_INTERRUPTED = 'interrupted'
+RESULT_ERROR = 'error'
+
+
+class TraceFile:
+    """[ 一次指令跟踪的数据（记录中的或从文件加载的） ]"""
+
+    def __init__(self, meta: Dict, fields: Dict):
+        self.meta = meta
+        self.registers: List[str] = meta['registers']
+        self.modules: List[List] = meta['modules']
+        for field in TRACE_FIELDS:
+            setattr(self, field, fields[field])
+        self._pcs = None
+
+    @property
+    def steps(self) -> int:
+        return len(self.pc_deltas)
+
+    def fields(self) -> Dict:
+        return {field: getattr(self, field) for field in TRACE_FIELDS}
+
+    def save(self, path: str) -> int:
+        """[ 压缩后保存，返回文件大小 ]"""
+        buffer = io.BytesIO()
+        IndexStore.write(buffer, self.meta, self.fields())
+        data = zlib.compress(buffer.getvalue(), 6)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: str) -> "TraceFile":
+        """[ 加载跟踪文件，格式不正确时抛出 ValueError ]"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            meta, fields = IndexStore.parse(zlib.decompress(data))
+        except zlib.error as e:
+            raise ValueError(f"解压失败: {e}")
+        if meta.get('format') != TRACE_FORMAT:
+            raise ValueError("不是 itrace 跟踪文件")
+        return cls(meta, fields)
+
+    @classmethod
+    def defaultPath(cls) -> str:
+        return os.path.join(TRACE_PATH_STR, time.strftime('itrace-%Y%m%d-%H%M%S.trace'))
+
+    def pcs(self) -> array:
+        """[ 每一步的指令地址（由 pc_deltas 累加得到） ]"""
+        if self._pcs is None:
+            self._pcs = array('Q', (pc & 0xFFFFFFFFFFFFFFFF for pc in accumulate(self.pc_deltas)))
+        return self._pcs
+
+    def location(self, step: int) -> str:
+        """[ 第 step 步指令的位置：模块名+偏移 ]"""
+        pc = self.pcs()[step]
+        owner = self.owners[step]
+        if owner < 0:
+            return '0x%x' % pc
+        name, slide = self.modules[owner]
+        return '%s+0x%x' % (name, pc - slide)
+
+    def registerIndex(self, name: str) -> Tuple[int, int]:
+        """[ 寄存器名 -> (寄存器表中的序号, 掩码)，子寄存器按所属的 64 位寄存器查询，未知时抛出 ValueError ]"""
+        name = name.lower()
+        mask = 0xFFFFFFFFFFFFFFFF
+        for pattern, replacement, sub_mask in SUBREGISTER_PARENTS:
+            if pattern.match(name):
+                name = pattern.sub(replacement, name)
+                mask = sub_mask
+                break
+        for candidate in (name,) + REGISTER_ALIASES.get(name, ()):
+            if candidate in self.registers:
+                return self.registers.index(candidate), mask
+        raise ValueError(f"跟踪中没有记录寄存器 {name}")
+
+    def writes(self, name: str, value: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """[ 依次返回寄存器被写入（值发生变化）的 (步数序号, 写入后的值)，给出 value 时只返回写入该值的步骤 ]"""
+        register, mask = self.registerIndex(name)
+        change_regs = self.change_regs
+        change_values = self.change_values
+        position = 0
+        for step, count in enumerate(self.change_counts):
+            end = position + count
+            for i in range(position, end):
+                if change_regs[i] == register:
+                    new_value = change_values[i] & mask
+                    if value is None or new_value == value & mask:
+                        yield step, new_value
+                    break
+            position = end
+
+    def changes(self, step: int) -> List[Tuple[str, int]]:
+        """[ 第 step 步变化的寄存器：[(寄存器名, 新值), ...] ]"""
+        position = sum(self.change_counts[:step])
+        count = self.change_counts[step]
+        return [(self.registers[self.change_regs[i]], self.change_values[i]) for i in range(position, position + count)]
+
+    def summary(self) -> str:
+        return '%d 条指令，%d 个模块，%d 次寄存器变化，跳过外部调用 %d 次' % (
+            self.steps, len(self.modules), len(self.change_regs), self.meta.get('hops', 0))
+
+
+class InstructionTracer:
+    """[ 逐条单步并记录指令地址和寄存器变化 ]"""
+
+    def __init__(self, debugger, thread, max_steps: int, until_offset: Optional[int] = None,
+                 all_modules: bool = False, over_calls: bool = False):
+        self.debugger = debugger
+        self.thread = thread
+        self.process = thread.GetProcess()
+        self.target = self.process.GetTarget()
+        self.index = Symbolicator.getModuleIndex(self.target)
+        self.max_steps = max_steps
+        self.until_offset = until_offset
+        self.all_modules = all_modules
+        self.over_calls = over_calls
+
+        # 模块索引中的序号 -> 跟踪文件模块表中的序号
+        self.module_ids: Dict[int, int] = {}
+        self.modules: List[List] = []
+        self.start_owner: Optional[int] = None
+
+        self.pc_deltas = array('q')
+        self.owners = array('h')
+        self.change_counts = array('B')
+        self.change_regs = array('B')
+        self.change_values = array('Q')
+        self.initial = array('Q')
+        self.registers: List[str] = []
+        self.tracked: List[int] = []
+
+        self.hops = 0
+        self.elapsed = 0.0
+        self.message = ''
+
+    def _moduleId(self, owner: Optional[int]) -> int:
+        if owner is None:
+            return -1
+        module_id = self.module_ids.get(owner)
+        if module_id is None:
+            module_id = len(self.modules)
+            self.module_ids[owner] = module_id
+            self.modules.append([self.index.names[owner], self.index.slides[owner]])
+        return module_id
+
+    def _locate(self, pc: int) -> Optional[Tuple[int, int]]:
+        return self.index.locate(pc) if self.index is not None else None
+
+    def _values(self, frame) -> Optional[array]:
+        snapshot = RegisterHandler().snapshot(frame)
+        if snapshot is None:
+            return None
+        if not self.registers:
+            # 第一次快照确定寄存器表，之后每一步只比较这些寄存器
+            pattern = X86_SUBREGISTER_PATTERN if 'rip' in snapshot.names else SUBREGISTER_PATTERN
+            self.tracked = [i for i, name in enumerate(snapshot.names)
+                            if name not in PC_REGISTERS and not pattern.match(name)]
+            self.registers = [snapshot.names[i] for i in self.tracked]
+        values = snapshot.values
+        return array('Q', [values[i] for i in self.tracked])
+
+    def _returnAddress(self, values: array) -> Optional[int]:
+        """[ 当前调用的返回地址：ARM64 为 lr，x86_64 为栈顶的值 ]"""
+        for name in ('lr', 'x30'):
+            if name in self.registers:
+                return values[self.registers.index(name)]
+        for name in ('rsp', 'esp', 'sp'):
+            if name in self.registers:
+                error = lldb.SBError()
+                address = self.process.ReadPointerFromMemory(values[self.registers.index(name)], error)
+                return address if error.Success() else None
+        return None
+
+    def _hop(self, return_address: Optional[int]) -> bool:
+        """[ 在返回地址设置一次性断点后继续运行，回到被跟踪的模块时返回 True ]"""
+        location = self._locate(return_address) if return_address is not None else None
+        if location is None or location[0] != self.start_owner:
+            self.message = '离开了被跟踪的模块，且返回地址不在模块内'
+            return False
+
+        breakpoint = self.target.BreakpointCreateByAddress(return_address)
+        breakpoint.SetOneShot(True)
+        breakpoint.SetThreadID(self.thread.GetThreadID())
+
+        # 同步模式下 Continue 在进程再次停止后才返回
+        old_async = self.debugger.GetAsync()
+        self.debugger.SetAsync(False)
+        try:
+            self.process.Continue()
+        finally:
+            self.debugger.SetAsync(old_async)
+            self.target.BreakpointDelete(breakpoint.GetID())
+
+        if self.process.GetState() != lldb.eStateStopped:
+            return False
+        if self.thread.GetFrameAtIndex(0).GetPC() != return_address:
+            self.message = '运行到返回地址之前停止: %s' % (self.thread.GetStopDescription(256) or '')
+            return False
+        self.hops += 1
+        return True
+
+    def _interrupted(self) -> bool:
+        interrupt_requested = getattr(self.debugger, 'InterruptRequested', None)
+        return bool(interrupt_requested and interrupt_requested())
+
+    def run(self) -> str:
+        """[ 执行跟踪，返回结束原因 ]"""
+        start_time = time.perf_counter()
+        try:
+            return self._run()
+        except KeyboardInterrupt:
+            return RESULT_INTERRUPTED
+        finally:
+            self.elapsed = time.perf_counter() - start_time
+
+    def _run(self) -> str:
+        thread = self.thread
+        process = self.process
+        frame = thread.GetFrameAtIndex(0)
+        previous = self._values(frame)
+        if previous is None:
+            self.message = '无法读取寄存器'
+            return RESULT_ERROR
+        self.initial = array('Q', previous)
+
+        pc = frame.GetPC()
+        location = self._locate(pc)
+        self.start_owner = location[0] if location is not None else None
+        if self.until_offset is not None and self.start_owner is None:
+            self.message = '当前地址不属于任何模块，无法按偏移结束'
+            return RESULT_ERROR
+
+        last_pc = 0
+        while self.steps < self.max_steps:
+            if self.until_offset is not None and location is not None \
+                    and location[0] == self.start_owner and location[1] == self.until_offset:
+                return RESULT_REACHED
+
+            error = lldb.SBError()
+            thread.StepInstruction(self.over_calls, error)
+            if not error.Success():
+                self.message = error.GetCString() or ''
+                return RESULT_ERROR
+            if process.GetState() != lldb.eStateStopped:
+                return RESULT_EXITED
+            if thread.GetStopReason() not in STEP_STOP_REASONS:
+                self.message = thread.GetStopDescription(256) or ''
+                return RESULT_STOPPED
+
+            frame = thread.GetFrameAtIndex(0)
+            next_pc = frame.GetPC()
+            next_location = self._locate(next_pc)
+            if not self.all_modules and self.start_owner is not None \
+                    and (next_location is None or next_location[0] != self.start_owner):
+                # 进入了其它模块：运行到返回地址，整个调用记为这一步
+                values = self._values(frame)
+                if values is None:
+                    self.message = '无法读取寄存器'
+                    return RESULT_ERROR
+                if not self._hop(self._returnAddress(values)):
+                    return RESULT_LEFT if process.GetState() == lldb.eStateStopped else RESULT_EXITED
+                frame = thread.GetFrameAtIndex(0)
+                next_pc = frame.GetPC()
+                next_location = self._locate(next_pc)
+
+            current = self._values(frame)
+            if current is None:
+                self.message = '无法读取寄存器'
+                return RESULT_ERROR
+            self._record(pc, last_pc, location, previous, current)
+            last_pc = pc
+            pc = next_pc
+            location = next_location
+            previous = current
+
+            if self.steps % INTERRUPT_CHECK_INTERVAL == 0 and self._interrupted():
+                return RESULT_INTERRUPTED
+        return RESULT_LIMIT
+
+    def _record(self, pc: int, last_pc: int, location, previous: array, current: array):
+        # 差值按 64 位回绕后存为有符号数，累加后再按 64 位截断即可还原
+        delta = (pc - last_pc) & 0xFFFFFFFFFFFFFFFF
+        self.pc_deltas.append(delta - (1 << 64) if delta >> 63 else delta)
+        self.owners.append(self._moduleId(location[0] if location is not None else None))
+        count = 0
+        for i, (old, new) in enumerate(zip(previous, current)):
+            if old != new:
+                self.change_regs.append(i)
+                self.change_values.append(new)
+                count += 1
+        self.change_counts.append(count)
+
+    @property
+    def steps(self) -> int:
+        return len(self.pc_deltas)
+
+    @property
+    def rate(self) -> float:
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+    def trace(self) -> TraceFile:
+        """[ 记录的数据 ]"""
+        meta = {
+            'format': TRACE_FORMAT,
+            'registers': self.registers,
+            'modules': self.modules,
+            'start_module': self.module_ids.get(self.start_owner, -1) if self.start_owner is not None else -1,
+            'thread_id': self.thread.GetThreadID(),
+            'hops': self.hops,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        return TraceFile(meta, {field: getattr(self, field) for field in TRACE_FIELDS})
+
+    def describe(self, reason: str) -> str:
+        """[ 结束原因的说明 ]"""
+        return {
+            RESULT_LIMIT: '达到最大指令数 %d' % self.max_steps,
+            RESULT_REACHED: '到达偏移 0x%x' % (self.until_offset or 0),
+            RESULT_LEFT: self.message,
+            RESULT_STOPPED: '遇到其它停止原因 (%s)' % self.message,
+            RESULT_EXITED: '进程已结束',
+            RESULT_INTERRUPTED: '已中断',
+            RESULT_ERROR: '跟踪失败: %s' % self.message,
+        }[reason]
+
+    def summary(self) -> str:
+        text = '%d 条指令，耗时 %.2fs，%.0f 条/秒' % (self.steps, self.elapsed, self.rate)
+        if self.hops:
+            text += '，跳过外部调用 %d 次' % self.hops
+        return text
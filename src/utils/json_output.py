@@ -0,0 +1,151 @@
+import lldb
+import io
+import json
+import re
+from contextlib import redirect_stdout
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+"""
+    类功能：--json 机器可读输出
+
+    - 所有命令都支持 --json / --jsonl：命令执行期间 print 的文本被收集，结束时通过 SBCommandReturnObject 一次性写入，不再逐行输出
+    - 命令通过 JSONOutput.emit 提交结构化结果（地址等数值直接是整数），没有提交结构化结果的命令，输出的每一行作为结果
+    - [ ... ] 形式的提示 / 错误信息单独放在 messages 中，不需要解析中文文本
+    - 命令通过 JSONOutput.fail 明确标记失败（ok 为 false），LLDB 原生命令通过 JSONOutput.handleCommand 执行，输出同样被收集
+    - 结果较多（超过 JSONL_THRESHOLD 条）或指定 --jsonl 时按 JSONL 输出：每行一个结果，最后一行是汇总，调用方可以逐行解析；
+      JSONL 模式下 emit 的结果立即写入 SBCommandReturnObject（交互执行时直接输出到终端），不在内存中积累
+    - 命令抛出异常时同样写入汇总（ok 为 false），已收集的输出不会丢失
+"""
+
+# 结果超过该条数时自动改为 JSONL 输出
+JSONL_THRESHOLD = 1000
+
+# [ ... ] 形式的提示信息
+MESSAGE_PATTERN = re.compile(r'^\[ ?(.*?) ?\]$')
+
+# 命令中的 --json / --jsonl 选项
+JSON_OPTION_PATTERN = re.compile(r'(?<!\S)--jsonl?(?!\S)')
+
+
+class JSONOutput:
+    """[ 单次命令执行的 JSON 结果收集器（LLDB 命令在解释器线程上依次执行，同一时间只有一个） ]"""
+
+    _current: Optional["JSONOutput"] = None
+
+    def __init__(self, command_name: str, jsonl: bool, result):
+        self.command_name = command_name
+        self.jsonl = jsonl
+        self.result = result
+        self.records: List[Dict[str, Any]] = []
+        self.failed = False
+
+        # 已经按 JSONL 逐条写入的结果数
+        self.streamed = 0
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """[ 当前命令是否以 --json 执行（用于跳过只在 JSON 模式下需要的结果构造） ]"""
+        return cls._current is not None
+
+    @classmethod
+    def emit(cls, record: Dict[str, Any]):
+        """[ 提交一条结构化结果，不是 --json 模式时忽略 ]"""
+        if cls._current is not None:
+            cls._current._add(record)
+
+    def _add(self, record: Dict[str, Any]):
+        # 指定 --jsonl 或结果超过 JSONL_THRESHOLD 条后改为逐条写入，之前积累的结果先写入
+        if not self.streamed and (self.jsonl or len(self.records) >= JSONL_THRESHOLD):
+            for held in self.records:
+                self._stream(held)
+            self.records = []
+        if self.streamed or self.jsonl:
+            self._stream(record)
+        else:
+            self.records.append(record)
+
+    def _stream(self, record: Dict[str, Any]):
+        self.result.AppendMessage(self._dumps(record))
+        self.streamed += 1
+
+    @classmethod
+    def fail(cls, message: Optional[str] = None):
+        """[ 输出错误信息，并把当前命令标记为失败（--json 结果的 ok 为 false） ]"""
+        if message is not None:
+            print(message)
+        if cls._current is not None:
+            cls._current.failed = True
+
+    @classmethod
+    def handleCommand(cls, debugger, command: str) -> bool:
+        """[ 通过命令解释器执行 LLDB 命令：输出经过 print（--json 模式下被收集），执行失败时标记当前命令失败 ]"""
+        return_obj = lldb.SBCommandReturnObject()
+        debugger.GetCommandInterpreter().HandleCommand(command, return_obj)
+        output = return_obj.GetOutput()
+        if output and output.strip():
+            print(output.rstrip('\n'))
+        if not return_obj.Succeeded():
+            cls.fail(f"[ 执行命令失败: {command}: {(return_obj.GetError() or '').strip()} ]")
+            return False
+        return True
+
+    @classmethod
+    def command(cls, func, command_name: Optional[str] = None):
+        """[ 包装命令函数：命令中带 --json / --jsonl 时收集输出并以 JSON 写入 SBCommandReturnObject ]"""
+
+        @wraps(func)
+        def wrapper(debugger, command, exe_ctx, result, internal_dict):
+            tokens = command.split() if command else []
+            if '--json' not in tokens and '--jsonl' not in tokens:
+                return func(debugger, command, exe_ctx, result, internal_dict)
+
+            jsonl = '--jsonl' in tokens
+            # 直接从原始命令中去掉选项，其它参数（引号、括号中的空格）保持原样
+            command = JSON_OPTION_PATTERN.sub('', command).strip()
+            collector = cls(command_name or func.__name__, jsonl, result)
+            buffer = io.StringIO()
+            previous, cls._current = cls._current, collector
+            try:
+                with redirect_stdout(buffer):
+                    return func(debugger, command, exe_ctx, result, internal_dict)
+            except Exception as e:
+                collector.failed = True
+                buffer.write('[ %s: %s ]\n' % (type(e).__name__, e))
+                raise
+            finally:
+                cls._current = previous
+                collector.write(result, buffer.getvalue())
+
+        return wrapper
+
+    def write(self, result, text: str):
+        """[ 把收集到的结果一次性写入 SBCommandReturnObject ]"""
+        messages = []
+        lines = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            match = MESSAGE_PATTERN.match(line.strip())
+            if match:
+                messages.append(match.group(1))
+            else:
+                lines.append(line)
+
+        # 没有提交结构化结果的命令，输出的每一行作为结果
+        if not self.records and not self.streamed:
+            for line in lines:
+                self._add({'text': line})
+        ok = not self.failed and result.Succeeded()
+        summary = {'command': self.command_name, 'ok': ok, 'count': self.streamed + len(self.records),
+                   'messages': messages}
+
+        if self.streamed or self.jsonl:
+            for record in self.records:
+                self._stream(record)
+            result.AppendMessage(self._dumps(dict(summary, done=True)))
+        else:
+            summary['results'] = self.records
+            result.AppendMessage(json.dumps(summary, ensure_ascii=False))
+        result.SetStatus(lldb.eReturnStatusSuccessFinishResult if ok else lldb.eReturnStatusFailed)
@@ -0,0 +1,284 @@
+import mmap
+import os
+import struct
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+"""
+    类功能：只读 mmap 的 Mach-O 文件解析
+
+    - 支持 64 位 Mach-O 和 fat 文件（按模块 UUID 选择 slice，找不到时选择 arm64 / 第一个 slice）
+    - 解析 segment / section / UUID，提供 虚拟地址（与 IDA、模块偏移一致）-> 文件偏移 的转换和按虚拟地址读取
+    - 磁盘上的指针可能是 chained fixup 格式：rebase 解码为虚拟地址，bind 通过 LC_DYLD_CHAINED_FIXUPS 的导入表得到符号名
+    - App Store 二进制的 LC_ENCRYPTION_INFO_64 中 cryptid 不为 0 时，磁盘上对应范围的字节是加密的，见 encrypted_range
+"""
+
+MH_MAGIC_64 = 0xFEEDFACF
+FAT_MAGIC = 0xCAFEBABE
+FAT_MAGIC_64 = 0xCAFEBABF
+
+CPU_TYPE_ARM64 = 0x0100000C
+CPU_SUBTYPE_ARM64E = 2
+
+LC_SEGMENT_64 = 0x19
+LC_UUID = 0x1B
+LC_DYLD_CHAINED_FIXUPS = 0x80000034
+LC_ENCRYPTION_INFO_64 = 0x2C
+
+MACH_HEADER_64 = struct.Struct('<IiiIIIII')
+LOAD_COMMAND = struct.Struct('<II')
+SEGMENT_COMMAND_64 = struct.Struct('<16sQQQQiiII')
+SECTION_64 = struct.Struct('<16s16sQQIIIIIIII')
+
+
+class Segment:
+    def __init__(self, name: str, vmaddr: int, vmsize: int, fileoff: int, filesize: int):
+        self.name = name
+        self.vmaddr = vmaddr
+        self.vmsize = vmsize
+        self.fileoff = fileoff
+        self.filesize = filesize
+
+
+class Section:
+    def __init__(self, segment: str, name: str, addr: int, size: int, offset: int):
+        self.segment = segment
+        self.name = name
+        self.addr = addr
+        self.size = size
+        self.offset = offset
+
+
+class MachOFile:
+    """[ Mach-O 文件（fat 文件中的一个 slice），文件偏移均相对于 slice 起始位置，绝对位置为 slice_offset + 偏移 ]"""
+
+    # 加密范围缓存：(路径, 修改时间, UUID) -> 虚拟地址范围
+    _encrypted_ranges: Dict[tuple, Optional[Tuple[int, int]]] = {}
+
+    def __init__(self, path: str, uuid_string: Optional[str] = None):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.slice_offset = 0
+        self.slice_size = len(self.mapped)
+        self.cputype = 0
+        self.cpusubtype = 0
+        self.uuid = ''
+        self.segments: List[Segment] = []
+        self.sections: List[Section] = []
+        self.chained_fixups: Optional[tuple] = None
+        # (cryptoff, cryptsize, cryptid)
+        self.encryption: Optional[tuple] = None
+        self._imports: Optional[List[str]] = None
+
+        try:
+            self._parse(uuid_string)
+        except (ValueError, struct.error):
+            self.mapped.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.mapped.close()
+
+    @classmethod
+    def slices(cls, mapped) -> List[tuple]:
+        """[ fat 文件中的所有 slice: [(cputype, cpusubtype, 偏移, 大小), ...]，不是 fat 文件时返回空列表 ]"""
+        magic = struct.unpack_from('>I', mapped, 0)[0]
+        if magic not in (FAT_MAGIC, FAT_MAGIC_64):
+            return []
+        count = struct.unpack_from('>I', mapped, 4)[0]
+        if magic == FAT_MAGIC:
+            return [struct.unpack_from('>iiII', mapped, 8 + i * 20) for i in range(count)]
+        return [struct.unpack_from('>iiQQ', mapped, 8 + i * 32) for i in range(count)]
+
+    def _parse(self, uuid_string: Optional[str]):
+        slices = self.slices(self.mapped)
+        if not slices:
+            self._parseSlice(0)
+            return
+
+        wanted = (uuid_string or '').upper()
+        candidates = sorted(slices, key=lambda item: item[0] != CPU_TYPE_ARM64)
+        for _, _, offset, size in candidates:
+            self.slice_offset, self.slice_size = offset, size
+            self._parseSlice(offset)
+            if not wanted or self.uuid == wanted:
+                return
+        # 没有 UUID 相同的 slice（例如本地文件与设备上的版本不同），使用 arm64 / 第一个 slice
+        _, _, self.slice_offset, self.slice_size = candidates[0]
+        self._parseSlice(self.slice_offset)
+
+    def _parseSlice(self, start: int):
+        magic, cputype, cpusubtype, _, ncmds, _, _, _ = MACH_HEADER_64.unpack_from(self.mapped, start)
+        if magic != MH_MAGIC_64:
+            raise ValueError("不是 64 位 Mach-O 文件")
+        self.cputype, self.cpusubtype = cputype, cpusubtype
+        self.uuid = ''
+        self.segments, self.sections = [], []
+        self.chained_fixups = None
+        self.encryption = None
+        self._imports = None
+
+        offset = start + MACH_HEADER_64.size
+        for _ in range(ncmds):
+            cmd, cmdsize = LOAD_COMMAND.unpack_from(self.mapped, offset)
+            if cmd == LC_SEGMENT_64:
+                name, vmaddr, vmsize, fileoff, filesize, _, _, nsects, _ = SEGMENT_COMMAND_64.unpack_from(self.mapped, offset + 8)
+                self.segments.append(Segment(name.rstrip(b'\0').decode(), vmaddr, vmsize, fileoff, filesize))
+                for i in range(nsects):
+                    fields = SECTION_64.unpack_from(self.mapped, offset + 8 + SEGMENT_COMMAND_64.size + i * SECTION_64.size)
+                    self.sections.append(Section(fields[1].rstrip(b'\0').decode(), fields[0].rstrip(b'\0').decode(),
+                                                 fields[2], fields[3], fields[4]))
+            elif cmd == LC_UUID:
+                self.uuid = str(uuid.UUID(bytes=bytes(self.mapped[offset + 8:offset + 24]))).upper()
+            elif cmd == LC_DYLD_CHAINED_FIXUPS:
+                self.chained_fixups = struct.unpack_from('<II', self.mapped, offset + 8)
+            elif cmd == LC_ENCRYPTION_INFO_64:
+                self.encryption = struct.unpack_from('<III', self.mapped, offset + 8)
+            offset += cmdsize
+
+    @property
+    def encrypted_range(self) -> Optional[Tuple[int, int]]:
+        """[ 加密部分的虚拟地址范围 [起始, 结束)，没有加密（cryptid 为 0）时返回 None ]"""
+        if self.encryption is None or self.encryption[2] == 0:
+            return None
+        cryptoff, cryptsize, _ = self.encryption
+        for segment in self.segments:
+            if segment.fileoff <= cryptoff < segment.fileoff + segment.filesize:
+                start = segment.vmaddr + cryptoff - segment.fileoff
+                return start, start + cryptsize
+        return None
+
+    @classmethod
+    def encryptedRange(cls, path: str, uuid_string: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """[ 文件中加密部分的虚拟地址范围，不是 Mach-O 文件或没有加密时返回 None（文件未修改时复用） ]"""
+        try:
+            key = (os.path.abspath(path), os.path.getmtime(path), (uuid_string or '').upper())
+        except OSError:
+            return None
+        if key not in cls._encrypted_ranges:
+            try:
+                with cls(path, uuid_string) as macho:
+                    cls._encrypted_ranges[key] = macho.encrypted_range
+            except (OSError, ValueError, struct.error):
+                cls._encrypted_ranges[key] = None
+        return cls._encrypted_ranges[key]
+
+    @property
+    def is_arm64e(self) -> bool:
+        return self.cputype == CPU_TYPE_ARM64 and self.cpusubtype & 0xFF == CPU_SUBTYPE_ARM64E
+
+    @property
+    def base(self) -> int:
+        """[ __TEXT 的虚拟地址（模块基址） ]"""
+        for segment in self.segments:
+            if segment.name == '__TEXT':
+                return segment.vmaddr
+        return 0
+
+    def section(self, name: str, segment: Optional[str] = None) -> Optional[Section]:
+        for section in self.sections:
+            if section.name == name and (segment is None or section.segment == segment):
+                return section
+        return None
+
+    def contains(self, vmaddr: int) -> bool:
+        return any(segment.vmaddr <= vmaddr < segment.vmaddr + segment.vmsize
+                   for segment in self.segments if segment.name != '__PAGEZERO')
+
+    def fileOffset(self, vmaddr: int) -> Optional[int]:
+        """[ 虚拟地址 -> 文件偏移（相对于 slice），不在文件中（例如 __bss）时返回 None ]"""
+        for segment in self.segments:
+            if segment.vmaddr <= vmaddr < segment.vmaddr + segment.filesize:
+                return segment.fileoff + vmaddr - segment.vmaddr
+        return None
+
+    def read(self, vmaddr: int, size: int) -> Optional[bytes]:
+        offset = self.fileOffset(vmaddr)
+        if offset is None:
+            return None
+        start = self.slice_offset + offset
+        return self.mapped[start:start + size]
+
+    def readU32(self, vmaddr: int) -> Optional[int]:
+        data = self.read(vmaddr, 4)
+        return struct.unpack('<I', data)[0] if data and len(data) == 4 else None
+
+    def readI32(self, vmaddr: int) -> Optional[int]:
+        data = self.read(vmaddr, 4)
+        return struct.unpack('<i', data)[0] if data and len(data) == 4 else None
+
+    def readU64(self, vmaddr: int) -> Optional[int]:
+        data = self.read(vmaddr, 8)
+        return struct.unpack('<Q', data)[0] if data and len(data) == 8 else None
+
+    def cstring(self, vmaddr: int, limit: int = 4096) -> Optional[str]:
+        offset = self.fileOffset(vmaddr)
+        if offset is None:
+            return None
+        start = self.slice_offset + offset
+        end = self.mapped.find(b'\0', start, start + limit)
+        if end < 0:
+            return None
+        return self.mapped[start:end].decode('utf-8', 'replace')
+
+    def pointer(self, vmaddr: int) -> Optional[int]:
+        """[ 读取指针并解码 rebase，bind 或无效指针返回 None ]"""
+        raw = self.readU64(vmaddr)
+        return self.decodePointer(raw) if raw else None
+
+    def isBind(self, raw: int) -> bool:
+        return bool((raw >> 62) & 1) if self.is_arm64e else bool(raw >> 63)
+
+    def decodePointer(self, raw: int) -> Optional[int]:
+        """[ 解码磁盘上的指针：普通地址，或 chained fixup 的 rebase（地址 / 相对模块基址的偏移） ]"""
+        if not raw or self.isBind(raw):
+            return None
+        if self.is_arm64e and raw >> 63:
+            candidates = (self.base + (raw & 0xFFFFFFFF),)
+        else:
+            target = raw & (0x7FFFFFFFFFF if self.is_arm64e else 0xFFFFFFFFF)
+            candidates = (target, self.base + target)
+        for candidate in candidates:
+            if self.contains(candidate):
+                return candidate
+        return None
+
+    def bindSymbol(self, raw: int) -> Optional[str]:
+        """[ chained fixup 的 bind 指针对应的导入符号名 ]"""
+        if not raw or not self.isBind(raw):
+            return None
+        imports = self.imports()
+        ordinal = raw & (0xFFFF if self.is_arm64e else 0xFFFFFF)
+        return imports[ordinal] if ordinal < len(imports) else None
+
+    def imports(self) -> List[str]:
+        """[ LC_DYLD_CHAINED_FIXUPS 的导入符号表 ]"""
+        if self._imports is not None:
+            return self._imports
+        self._imports = []
+        if self.chained_fixups is None:
+            return self._imports
+
+        start = self.slice_offset + self.chained_fixups[0]
+        _, _, imports_offset, symbols_offset, count, imports_format, _ = struct.unpack_from('<IIIIIII', self.mapped, start)
+        entry_size = {1: 4, 2: 8, 3: 16}.get(imports_format)
+        if entry_size is None:
+            return self._imports
+        for i in range(count):
+            entry = start + imports_offset + i * entry_size
+            if imports_format == 3:
+                name_offset = struct.unpack_from('<Q', self.mapped, entry)[0] >> 32
+            else:
+                name_offset = struct.unpack_from('<I', self.mapped, entry)[0] >> 9
+            name_start = start + symbols_offset + name_offset
+            name_end = self.mapped.find(b'\0', name_start)
+            self._imports.append(self.mapped[name_start:name_end].decode('utf-8', 'replace'))
+        return self._imports
@@ -0,0 +1,187 @@
+import lldb
+from bisect import bisect_right, insort
+from typing import List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+
+"""
+    类功能：进程内存区域缓存（读取前在本地校验地址）
+
+    - 区域信息只在同一次停止内有效（以 StopID 为准，进程恢复运行后整体丢弃）
+    - 已知不可读（未映射 / 没有读权限）的地址直接在本地拒绝，不再发起一次注定失败的读取往返；
+      读取会在已知的不可读位置之前截断，返回可读部分的数据，而不是整个读取失败
+    - 区域按需获取：读取失败时才通过 SBProcess.GetMemoryRegionInfo 查询所涉及的区域（之后同一区域内的读取不再查询），
+      regions 命令通过 SBProcess.GetMemoryRegions 一次性取得完整列表，之后所有校验都在本地完成；
+      正常的读取不会因为校验多一次往返
+    - 调试服务不支持区域查询时不做校验，所有读取照常发起
+"""
+
+
+class MemoryRegion:
+    """[ 一个内存区域：[start, end)、是否映射、权限、名称（Linux 上为映射的文件路径） ]"""
+
+    def __init__(self, start: int, end: int, mapped: bool, readable: bool, writable: bool, executable: bool, name: str):
+        self.start = start
+        self.end = end
+        self.mapped = mapped
+        self.readable = mapped and readable
+        self.writable = writable
+        self.executable = executable
+        self.name = name
+
+    def __lt__(self, other: "MemoryRegion") -> bool:
+        return self.start < other.start
+
+    @property
+    def permissions(self) -> str:
+        return ('r' if self.readable else '-') + ('w' if self.writable else '-') + ('x' if self.executable else '-')
+
+    @classmethod
+    def fromInfo(cls, info) -> "MemoryRegion":
+        return cls(info.GetRegionBase(), info.GetRegionEnd(), info.IsMapped(), info.IsReadable(),
+                   info.IsWritable(), info.IsExecutable(), info.GetName() or '')
+
+
+class MemoryRegionMap:
+    """[ 某次停止时已知的内存区域（按起始地址排序，包括查询得到的未映射区间） ]"""
+
+    def __init__(self, process, stop_id: int):
+        self.process = process
+        self.stop_id = stop_id
+        self.regions: List[MemoryRegion] = []
+        self.starts: List[int] = []
+
+        # 已经取得完整的区域列表：不在列表中的地址都是未映射的
+        self.complete = False
+        # 调试服务不支持区域查询
+        self.unsupported = False
+
+        # 本地拒绝的读取次数（节省的往返）和区域查询次数
+        self.rejected = 0
+        self.queries = 0
+
+    @classmethod
+    def current(cls, process) -> "MemoryRegionMap":
+        """[ 获取进程本次停止的区域缓存（保存在进程状态中） ]"""
+        if process is None or not process.IsValid():
+            regions = cls(process, -1)
+            regions.unsupported = True
+            return regions
+
+        state = DataHandler().get_process_state(process.GetTarget())
+        stop_id = process.GetStopID()
+        if state.memory_regions is None or state.memory_regions.stop_id != stop_id:
+            state.memory_regions = cls(process, stop_id)
+        return state.memory_regions
+
+    def _insert(self, region: MemoryRegion):
+        i = bisect_right(self.starts, region.start)
+        self.starts.insert(i, region.start)
+        self.regions.insert(i, region)
+
+    def loadAll(self) -> List[MemoryRegion]:
+        """[ 一次性取得完整的区域列表，返回所有已映射的区域 ]"""
+        if not self.complete and not self.unsupported:
+            regions = []
+            region_list = self.process.GetMemoryRegions()
+            for i in range(region_list.GetSize()):
+                info = lldb.SBMemoryRegionInfo()
+                if region_list.GetMemoryRegionAtIndex(i, info) and info.IsMapped():
+                    insort(regions, MemoryRegion.fromInfo(info))
+            if regions:
+                self.regions = regions
+                self.starts = [region.start for region in regions]
+                self.complete = True
+            else:
+                self.unsupported = True
+        return [region for region in self.regions if region.mapped]
+
+    def find(self, address: int, query: bool = False) -> Optional[MemoryRegion]:
+        """[ 地址所属的区域：已知时直接返回，否则 query 为 True 时向调试服务查询一次；无法确定时返回 None ]"""
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address < self.regions[i].end:
+            return self.regions[i]
+        if self.complete:
+            # 完整列表中没有的地址：到下一个区域之前都是未映射的
+            end = self.starts[i + 1] if i + 1 < len(self.starts) else 1 << 64
+            return MemoryRegion(address, end, False, False, False, False, '')
+        if not query or self.unsupported:
+            return None
+
+        self.queries += 1
+        info = lldb.SBMemoryRegionInfo()
+        error = self.process.GetMemoryRegionInfo(address, info)
+        if not error.Success() or info.GetRegionEnd() <= address:
+            self.unsupported = True
+            return None
+        region = MemoryRegion.fromInfo(info)
+        self._insert(region)
+        return region
+
+    def readableSize(self, address: int, size: int, query: bool = False) -> int:
+        """[ 从 address 开始可以读取的字节数（不超过 size）：在已知不可读的位置截断，区域未知时按可读处理 ]"""
+        end = address + size
+        position = address
+        while position < end:
+            region = self.find(position, query)
+            if region is None:
+                return size
+            if not region.readable:
+                break
+            position = region.end
+        return min(position, end) - address
+
+    def describe(self, address: int) -> str:
+        """[ 地址不可读的原因 ]"""
+        region = self.find(address, True)
+        if region is None:
+            return '0x%x 读取失败' % address
+        if not region.mapped:
+            return '0x%x 未映射' % address
+        if not region.readable:
+            return '0x%x 所在区域 [0x%x, 0x%x) 没有读权限 (%s)' % (address, region.start, region.end, region.permissions)
+        return '0x%x 读取失败' % address
+
+    def _readMemory(self, address: int, size: int) -> Optional[bytes]:
+        error = lldb.SBError()
+        data = self.process.ReadMemory(address, size, error)
+        if not error.Success() or data is None or len(data) != size:
+            return None
+        return bytes(data)
+
+    def read(self, address: int, size: int) -> Tuple[Optional[bytes], int]:
+        """[ 校验后读取：返回 (从 address 开始可读部分的数据, 发起的读取次数)，起始地址不可读时数据为 None ]"""
+        if size == 0:
+            return b'', 0
+        readable = self.readableSize(address, size)
+        if readable == 0:
+            self.rejected += 1
+            return None, 0
+
+        data = self._readMemory(address, readable)
+        if data is not None:
+            return data, 1
+
+        # 读取失败：查询所涉及的区域，在第一个不可读的位置截断后重新读取
+        partial = self.readableSize(address, readable, True)
+        if partial == 0 or partial == readable:
+            return None, 1
+        return self._readMemory(address, partial), 2
+
+    @classmethod
+    def owner(cls, region: MemoryRegion, index) -> Optional[Tuple[str, str]]:
+        """[ 区域所属的模块和段：(模块名, 段名)，不属于任何模块时返回 None（index 为 Symbolicator 的模块索引） ]"""
+        if index is None:
+            return None
+        # 区域起始地址所在的模块段，或者区域中第一个模块段
+        i = bisect_right(index.starts, region.start) - 1
+        if i < 0 or region.start >= index.ends[i]:
+            i += 1
+            if i >= len(index.starts) or index.starts[i] >= region.end:
+                return None
+        owner = index.owners[i]
+        start = max(index.starts[i], region.start)
+        section = index.modules[owner].ResolveFileAddress(start - index.slides[owner]).GetSection()
+        while section.IsValid() and section.GetParent().IsValid():
+            section = section.GetParent()
+        return index.names[owner], section.GetName() if section.IsValid() else ''
@@ -0,0 +1,542 @@
+import lldb
+import json
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+from src.utils.memory_regions import MemoryRegionMap
+
+"""
+    类功能：不经过表达式 JIT 的 ObjC 对象解析
+
+    po 需要在目标进程中调用 description，真机上耗时以秒计，目标进程持有锁时还可能卡死。
+    这里只读取内存：通过 isa -> class_rw_t -> class_ro_t 得到类名，再按 Foundation / CoreFoundation 类的内存布局
+    直接解析 NSString / NSData / NSArray / NSDictionary / NSNumber 以及 tagged pointer，不调用目标进程中的任何方法。
+    布局参考 objc4 / CF 开源代码以及 LLDB 自带的 Foundation 数据格式化器（均为 64 位）。
+"""
+
+# 对象内部指针（class_rw_t / class_ro_t 等）去掉指针认证和低位标志后的掩码
+POINTER_MASK = 0x00007ffffffffff8
+ADDRESS_MASK = 0x00007fffffffffff
+
+# objc_class.bits 中 class_rw_t 指针的掩码，以及 class_rw_t.flags 中的 RW_REALIZED
+FAST_DATA_MASK = 0x00007ffffffffff8
+RW_REALIZED = 1 << 31
+
+# isa 中类指针的掩码（运行时导出了 objc_debug_isa_class_mask 时优先使用导出值）
+ISA_MASK_ARM64 = 0x0000000ffffffff8
+ISA_MASK_ARM64E = 0x007ffffffffffff8
+ISA_MASK_X86_64 = 0x00007ffffffffff8
+
+# tagged pointer：iOS 14 起 arm64 使用拆分布局（标记位在最高位，类型在最低 3 位）
+TAG_MASK_MSB = 1 << 63
+TAG_MASK_LSB = 1
+TAG_NO_OBFUSCATION_MASK = (1 << 62) | (1 << 63)
+TAG_PAYLOAD_BITS = 60
+
+TAGGED_CLASS_NAMES = {
+    2: 'NSTaggedPointerString',
+    3: '__NSCFNumber',
+    4: 'NSIndexPath',
+    5: 'NSManagedObjectID',
+    6: '__NSTaggedDate',
+}
+
+# 长度 8~9 的 tagged string 每个字符 6 位，长度 10~11 每个字符 5 位（取前 32 个字符）
+TAGGED_STRING_TABLE = "eilotrm.apdnsIc ufkMShjTRxgC4013bDNvwyUL2O856P-B79AFKEWV_zGJ/HYX"
+
+# __NSDictionaryI / __NSDictionaryM 的容量表，下标为 szidx
+DICTIONARY_CAPACITIES = (
+    0, 3, 7, 13, 23, 41, 71, 127, 191, 251, 383, 631, 1087, 1723, 2803, 4523, 7351, 11959, 19447, 31231,
+    50683, 81919, 132607, 214519, 346607, 561109, 907759, 1468927, 2376191, 3845119, 6221311, 10066421,
+    16287743, 26354171, 42641881, 68996069, 111638519, 180634607, 292272623, 472907251,
+)
+
+# 字典哈希表每次读取的槽位数，以及最多扫描的槽位数（max_items 的倍数）：找到 max_items 个键后停止，
+# 无效指针中的 szidx 可能对应数亿个槽位，不能按容量一次读取
+DICTIONARY_SLOT_CHUNK = 256
+DICTIONARY_SCAN_FACTOR = 16
+
+# CFNumber 类型 -> (struct 格式, 字节数)
+CF_NUMBER_TYPES = {
+    1: ('<b', 1),
+    2: ('<h', 2),
+    3: ('<i', 4),
+    4: ('<q', 8),
+    5: ('<f', 4),
+    6: ('<d', 8),
+}
+
+# 字符串最多读取的字符数，Data 最多显示的字节数
+MAX_STRING_LENGTH = 0x1000
+DATA_PREVIEW_LENGTH = 0x40
+
+# 类名 -> 解析方式
+CLASS_KINDS = {
+    '__NSCFString': 'cfstring',
+    '__NSCFConstantString': 'cfstring',
+    'NSCFString': 'cfstring',
+    'NSCFConstantString': 'cfstring',
+    '_TtCs15__StringStorage': 'swift_string',
+    'Swift.__StringStorage': 'swift_string',
+    '__NSCFData': 'data',
+    'NSConcreteData': 'data',
+    'NSConcreteMutableData': 'data',
+    '_NSInlineData': 'data',
+    '_NSZeroData': 'data',
+    '__NSArrayI': 'array',
+    '__NSArrayI_Transfer': 'array',
+    '__NSArrayM': 'array',
+    '__NSFrozenArrayM': 'array',
+    '__NSCFArray': 'array',
+    '__NSArray0': 'array',
+    '__NSSingleObjectArrayI': 'array',
+    'NSConstantArray': 'array',
+    '__NSDictionaryI': 'dictionary',
+    '__NSDictionaryM': 'dictionary',
+    '__NSFrozenDictionaryM': 'dictionary',
+    '__NSSingleEntryDictionaryI': 'dictionary',
+    '__NSDictionary0': 'dictionary',
+    'NSConstantDictionary': 'dictionary',
+    '__NSCFNumber': 'number',
+    '__NSCFBoolean': 'boolean',
+}
+
+
+class ObjCRuntime:
+    """[ 进程内不变的运行时信息：isa 掩码、tagged pointer 布局和混淆值 ]"""
+
+    def __init__(self, target):
+        self.target = target
+        self.process = target.GetProcess()
+
+        arch = (target.GetTriple() or '').split('-')[0]
+        self.is_arm64 = arch.startswith('arm64') or arch.startswith('aarch64')
+
+        isa_mask = self._read_global('objc_debug_isa_class_mask')
+        if isa_mask:
+            self.isa_mask = isa_mask
+        elif arch == 'arm64e':
+            self.isa_mask = ISA_MASK_ARM64E
+        elif self.is_arm64:
+            self.isa_mask = ISA_MASK_ARM64
+        else:
+            self.isa_mask = ISA_MASK_X86_64
+
+        self.obfuscator = self._read_global('objc_debug_taggedpointer_obfuscator') or 0
+
+        # iOS 14 起 arm64 的 tagged pointer 类型号经过置换，置换表存在时即为拆分布局
+        self.permutations: Optional[List[int]] = None
+        permutations_addr = self._symbol_address('objc_debug_tag60_permutations')
+        if self.is_arm64 and permutations_addr is not None:
+            error = lldb.SBError()
+            data = self.process.ReadMemory(permutations_addr, 8, error)
+            if error.Success() and data:
+                self.permutations = list(data)
+
+        self.tag_mask = TAG_MASK_MSB if self.is_arm64 else TAG_MASK_LSB
+
+        # kCFBooleanTrue 的地址（__NSCFBoolean 只有两个实例，按地址区分真假）
+        self.boolean_true = self._symbol_address('__kCFBooleanTrue')
+
+    def _symbol_address(self, name) -> Optional[int]:
+        contexts = self.target.FindSymbols(name)
+        for i in range(contexts.GetSize()):
+            address = contexts.GetContextAtIndex(i).GetSymbol().GetStartAddress().GetLoadAddress(self.target)
+            if address != lldb.LLDB_INVALID_ADDRESS:
+                return address
+        return None
+
+    def _read_global(self, name) -> Optional[int]:
+        address = self._symbol_address(name)
+        if address is None:
+            return None
+        error = lldb.SBError()
+        value = self.process.ReadUnsignedFromMemory(address, 8, error)
+        return value if error.Success() else None
+
+    def is_tagged(self, pointer: int) -> bool:
+        return bool(pointer & self.tag_mask)
+
+    def decode_tagged(self, pointer: int) -> Tuple[int, int, int]:
+        """[ 解码 tagged pointer，返回 (类型号, 无符号载荷, 有符号载荷) ]"""
+        value = pointer
+        if self.permutations is not None:
+            if value & TAG_NO_OBFUSCATION_MASK != TAG_NO_OBFUSCATION_MASK:
+                value ^= self.obfuscator
+            tag = value & 7
+            if tag in self.permutations:
+                tag = self.permutations.index(tag)
+            payload = (value >> 3) & ((1 << TAG_PAYLOAD_BITS) - 1)
+        elif self.is_arm64:
+            value ^= self.obfuscator
+            tag = (value >> 60) & 7
+            payload = value & ((1 << TAG_PAYLOAD_BITS) - 1)
+        else:
+            value ^= self.obfuscator
+            tag = (value >> 1) & 7
+            payload = value >> 4
+
+        signed = payload - (1 << TAG_PAYLOAD_BITS) if payload & (1 << (TAG_PAYLOAD_BITS - 1)) else payload
+        return tag, payload, signed
+
+
+class ObjCDecoder:
+    """[ ObjC 对象解析器 ]"""
+
+    def __init__(self, target, max_depth: int = 3, max_items: int = 100):
+        self.target = target
+        self.process = target.GetProcess()
+        self.max_depth = max_depth
+        self.max_items = max_items
+
+        state = DataHandler().get_process_state(target)
+        if state.objc_runtime is None:
+            state.objc_runtime = ObjCRuntime(target)
+        self.runtime: ObjCRuntime = state.objc_runtime
+
+        # 类名缓存只在同一次停止内有效（期间可能有类被实现或动态创建）
+        stop_id = self.process.GetStopID()
+        if state.objc_stop_id != stop_id:
+            state.objc_class_names = {}
+            state.objc_stop_id = stop_id
+        self.class_names: Dict[int, str] = state.objc_class_names
+
+        # 解析过程中跟随的指针可能是野指针，读取前先校验（见 MemoryRegionMap）
+        self.regions = MemoryRegionMap.current(self.process)
+
+    def _read(self, address: int, size: int) -> Optional[bytes]:
+        data, _ = self.regions.read(address, size)
+        return data if data is not None and len(data) == size else None
+
+    def _unsigned(self, address: int, size: int) -> Optional[int]:
+        if self.regions.readableSize(address, size) < size:
+            self.regions.rejected += 1
+            return None
+        error = lldb.SBError()
+        value = self.process.ReadUnsignedFromMemory(address, size, error)
+        return value if error.Success() else None
+
+    def _u64(self, address: int) -> Optional[int]:
+        return self._unsigned(address, 8)
+
+    def _pointers(self, address: int, count: int) -> Optional[List[int]]:
+        data = self._read(address, count * 8)
+        if data is None:
+            return None
+        return list(struct.unpack('<%dQ' % count, data))
+
+    def _cstring(self, address: int) -> Optional[str]:
+        if self.regions.readableSize(address, 1) == 0:
+            self.regions.rejected += 1
+            return None
+        error = lldb.SBError()
+        value = self.process.ReadCStringFromMemory(address, 256, error)
+        return value if error.Success() and value else None
+
+    def class_name(self, cls: int) -> Optional[str]:
+        """[ isa 中的类指针 -> 类名 ]"""
+        name = self.class_names.get(cls)
+        if name is None:
+            name = self._read_class_name(cls)
+            if name is not None:
+                self.class_names[cls] = name
+        return name
+
+    def _read_class_name(self, cls: int) -> Optional[str]:
+        bits = self._u64(cls + 0x20)
+        if bits is None:
+            return None
+        data = bits & FAST_DATA_MASK
+        flags = self._unsigned(data, 4)
+        if flags is None:
+            return None
+
+        # 未实现的类 bits 直接指向 class_ro_t；已实现的类指向 class_rw_t，其中的 ro_or_rw_ext 最低位为 1 时指向 class_rw_ext_t
+        ro = data
+        if flags & RW_REALIZED:
+            ro_or_ext = self._u64(data + 8)
+            if ro_or_ext is None:
+                return None
+            ro = self._u64(ro_or_ext & POINTER_MASK) if ro_or_ext & 1 else ro_or_ext
+            if ro is None:
+                return None
+
+        name_ptr = self._u64((ro & POINTER_MASK) + 0x18)
+        if not name_ptr:
+            return None
+        return self._cstring(name_ptr & ADDRESS_MASK)
+
+    def object_class_name(self, pointer: int) -> Optional[str]:
+        """[ 对象指针 -> 类名，tagged pointer 返回对应的类名 ]"""
+        if self.runtime.is_tagged(pointer):
+            tag = self.runtime.decode_tagged(pointer)[0]
+            return TAGGED_CLASS_NAMES.get(tag, 'tagged pointer (tag %d)' % tag)
+        isa = self._u64(pointer)
+        if isa is None:
+            return None
+        return self.class_name(isa & self.runtime.isa_mask)
+
+    def describe(self, pointer: int, depth: int = 0) -> str:
+        """[ 返回对象的描述文本（嵌套集合为多行文本） ]"""
+        if pointer == 0:
+            return 'nil'
+        if self.runtime.is_tagged(pointer):
+            return self._describe_tagged(pointer)
+
+        name = self.object_class_name(pointer)
+        if name is None:
+            return '<无法读取的对象: 0x%x>' % pointer
+
+        kind = CLASS_KINDS.get(name)
+        try:
+            if kind == 'cfstring':
+                return self._quote(self._cfstring(pointer))
+            if kind == 'swift_string':
+                return self._quote(self._swift_string(pointer))
+            if kind == 'data':
+                return self._describe_data(pointer, name)
+            if kind == 'number':
+                return self._describe_number(pointer)
+            if kind == 'boolean':
+                if self.runtime.boolean_true is None:
+                    return '<%s: 0x%x>' % (name, pointer)
+                return '1' if pointer == self.runtime.boolean_true else '0'
+            if kind == 'array':
+                return self._describe_array(pointer, name, depth)
+            if kind == 'dictionary':
+                return self._describe_dictionary(pointer, name, depth)
+        except (struct.error, TypeError):
+            # 布局中的某个字段读取失败（返回 None）
+            return '<%s: 0x%x, 读取失败>' % (name, pointer)
+        return '<%s: 0x%x>' % (name, pointer)
+
+    @staticmethod
+    def _quote(text: Optional[str]) -> str:
+        if text is None:
+            raise TypeError
+        return json.dumps(text, ensure_ascii=False)
+
+    @staticmethod
+    def _indent(text: str, suffix: str = '') -> List[str]:
+        lines = ['    ' + line for line in text.split('\n')]
+        lines[-1] += suffix
+        return lines
+
+    def _describe_tagged(self, pointer: int) -> str:
+        tag, payload, signed = self.runtime.decode_tagged(pointer)
+        if tag == 2:
+            return self._quote(self._tagged_string(payload))
+        if tag == 3:
+            # 低 4 位是数值类型，其余为数值
+            return str(signed >> 4)
+        return '<%s: 0x%x>' % (TAGGED_CLASS_NAMES.get(tag, 'tagged pointer (tag %d)' % tag), pointer)
+
+    @staticmethod
+    def _tagged_string(payload: int) -> str:
+        length = payload & 0xf
+        value = payload >> 4
+        if length <= 7:
+            bits, table = 8, None
+        elif length <= 9:
+            bits, table = 6, TAGGED_STRING_TABLE
+        else:
+            bits, table = 5, TAGGED_STRING_TABLE[:32]
+
+        # 8 位编码时第一个字符在最低字节（按小端序的 char* 读取），6 位 / 5 位编码时第一个字符在最高位
+        mask = (1 << bits) - 1
+        chars = []
+        for _ in range(length):
+            code = value & mask
+            chars.append(chr(code) if table is None else table[code])
+            value >>= bits
+        if table is None:
+            return ''.join(chars)
+        return ''.join(reversed(chars))
+
+    def _cfstring(self, pointer: int) -> Optional[str]:
+        info = self._unsigned(pointer + 8, 1)
+        is_unicode = info & 0x10
+        is_inline = info & 0x60 == 0
+        # 没有长度字节的不可变字符串，以及所有可变字符串，长度单独存放
+        explicit_length = info & 0x05 != 0x04
+
+        length = None
+        if is_inline:
+            contents = pointer + 0x18 if explicit_length else pointer + 0x10
+            if explicit_length:
+                length = self._u64(pointer + 0x10)
+        else:
+            contents = self._u64(pointer + 0x10)
+            if explicit_length:
+                length = self._u64(pointer + 0x18)
+
+        if not explicit_length:
+            # Pascal 风格：第一个字节是长度
+            length = self._unsigned(contents, 1)
+            contents += 1
+
+        count = min(length, MAX_STRING_LENGTH)
+        data = self._read(contents, count * 2 if is_unicode else count)
+        if data is None:
+            return None
+        text = data.decode('utf-16-le' if is_unicode else 'utf-8', errors='replace')
+        return text + '...' if length > count else text
+
+    def _swift_string(self, pointer: int) -> Optional[str]:
+        # __StringStorage: isa, 引用计数, capacityAndFlags, countAndFlags, UTF-8 内容
+        length = self._u64(pointer + 0x18) & 0x0000ffffffffffff
+        count = min(length, MAX_STRING_LENGTH)
+        data = self._read(pointer + 0x20, count)
+        if data is None:
+            return None
+        text = data.decode('utf-8', errors='replace')
+        return text + '...' if length > count else text
+
+    def _describe_data(self, pointer: int, name: str) -> str:
+        if name == '_NSZeroData':
+            length, bytes_addr = 0, 0
+        elif name == '_NSInlineData':
+            length, bytes_addr = self._u64(pointer + 8), pointer + 0x10
+        else:
+            # __CFData / NSConcreteData: 长度在 +0x10，数据指针在 +0x28
+            length, bytes_addr = self._u64(pointer + 0x10), self._u64(pointer + 0x28)
+
+        preview = self._read(bytes_addr, min(length, DATA_PREVIEW_LENGTH))
+        if preview is None:
+            return '{length = %d, bytes = <读取失败 0x%x>}' % (length, bytes_addr)
+        return '{length = %d, bytes = 0x%s%s}' % (length, preview.hex(), ' ... ' if length > len(preview) else '')
+
+    def _describe_number(self, pointer: int) -> str:
+        number_type = self._unsigned(pointer + 8, 1) & 0x1f
+        fmt = CF_NUMBER_TYPES.get(number_type)
+        if fmt is None:
+            return '<__NSCFNumber: 0x%x, type %d>' % (pointer, number_type)
+        value = struct.unpack(fmt[0], self._read(pointer + 0x10, fmt[1]))[0]
+        return repr(value) if isinstance(value, float) else str(value)
+
+    def array_elements(self, pointer: int, name: str) -> Tuple[int, Optional[List[int]]]:
+        """[ 返回 (元素个数, 前 max_items 个元素指针) ]"""
+        limit = self.max_items
+        if name in ('__NSArrayI', '__NSArrayI_Transfer'):
+            count = self._u64(pointer + 8)
+            return count, self._pointers(pointer + 0x10, min(count, limit))
+        if name == 'NSConstantArray':
+            count = self._u64(pointer + 8)
+            return count, self._pointers(self._u64(pointer + 0x10), min(count, limit))
+        if name == '__NSSingleObjectArrayI':
+            return 1, [self._u64(pointer + 8)]
+        if name == '__NSArray0':
+            return 0, []
+        if name in ('__NSArrayM', '__NSFrozenArrayM'):
+            # 环形缓冲区：_list, _offset, _size, _mutations, _used
+            buffer = self._u64(pointer + 8)
+            offset = self._unsigned(pointer + 0x10, 4)
+            size = self._unsigned(pointer + 0x14, 4)
+            count = self._unsigned(pointer + 0x1c, 4)
+            n = min(count, limit)
+            if n == 0 or size == 0:
+                return count, []
+            start = offset % size
+            first = min(n, size - start)
+            head = self._pointers(buffer + start * 8, first)
+            tail = self._pointers(buffer, n - first)
+            return count, head + tail if head is not None and tail is not None else None
+        if name == '__NSCFArray':
+            count = self._u64(pointer + 0x10)
+            n = min(count, limit)
+            if self._unsigned(pointer + 8, 1) & 3 == 0:
+                # 不可变：元素紧跟在结构体后面
+                return count, self._pointers(pointer + 0x30, n)
+            deque = self._u64(pointer + 0x28)
+            return count, self._pointers(deque + 0x10 + self._u64(deque) * 8, n)
+        return 0, None
+
+    def dictionary_entries(self, pointer: int, name: str) -> Tuple[int, Optional[List[Tuple[int, int]]]]:
+        """[ 返回 (键值对个数, 前 max_items 个 (键, 值) 指针) ]"""
+        limit = self.max_items
+        if name == '__NSDictionaryI':
+            # _used:58, _szidx:6，之后键值交替存放
+            word = self._u64(pointer + 8)
+            count, szidx = word & ((1 << 58) - 1), word >> 58
+            if szidx >= len(DICTIONARY_CAPACITIES):
+                return 0, None
+
+            def read_slots(start, n):
+                raw = self._pointers(pointer + 0x10 + start * 16, n * 2)
+                return None if raw is None else list(zip(raw[0::2], raw[1::2]))
+            return count, self._dictionary_slots(DICTIONARY_CAPACITIES[szidx], read_slots)
+        if name in ('__NSDictionaryM', '__NSFrozenDictionaryM'):
+            # _buffer（+0x8，键数组 + 值数组）, uint32 _muts（+0x10）, _used:25 _kvo:1 _szidx:6（+0x14）
+            buffer = self._u64(pointer + 8)
+            word = self._unsigned(pointer + 0x14, 4)
+            count, szidx = word & 0x1ffffff, word >> 26
+            if szidx >= len(DICTIONARY_CAPACITIES):
+                return 0, None
+            capacity = DICTIONARY_CAPACITIES[szidx]
+
+            def read_slots(start, n):
+                keys = self._pointers(buffer + start * 8, n)
+                values = self._pointers(buffer + (capacity + start) * 8, n)
+                return None if keys is None or values is None else list(zip(keys, values))
+            return count, self._dictionary_slots(capacity, read_slots)
+        if name == '__NSSingleEntryDictionaryI':
+            return 1, [(self._u64(pointer + 8), self._u64(pointer + 0x10))]
+        if name == '__NSDictionary0':
+            return 0, []
+        if name == 'NSConstantDictionary':
+            count = self._u64(pointer + 0x10)
+            n = min(count, limit)
+            keys = self._pointers(self._u64(pointer + 0x18), n)
+            values = self._pointers(self._u64(pointer + 0x20), n)
+            if keys is None or values is None:
+                return count, None
+            return count, list(zip(keys, values))
+        return 0, None
+
+    def _dictionary_slots(self, capacity: int, read_slots) -> Optional[List[Tuple[int, int]]]:
+        """[ 分块读取哈希表的槽位，返回前 max_items 个非空 (键, 值)，扫描的槽位数不超过 max_items * DICTIONARY_SCAN_FACTOR ]"""
+        limit = self.max_items
+        end = min(capacity, max(limit, 1) * DICTIONARY_SCAN_FACTOR)
+        entries = []
+        start = 0
+        while start < end and len(entries) < limit:
+            n = min(DICTIONARY_SLOT_CHUNK, end - start)
+            slots = read_slots(start, n)
+            if slots is None:
+                return None
+            entries.extend(slot for slot in slots if slot[0])
+            start += n
+        return entries[:limit]
+
+    def _describe_array(self, pointer: int, name: str, depth: int) -> str:
+        count, elements = self.array_elements(pointer, name)
+        if elements is None:
+            return '<%s: 0x%x, %d 个元素, 读取失败>' % (name, pointer, count)
+        if depth >= self.max_depth:
+            return '<%s: 0x%x, %d 个元素>' % (name, pointer, count)
+
+        lines = ['(']
+        for i, element in enumerate(elements):
+            last = i == len(elements) - 1 and count <= len(elements)
+            lines.extend(self._indent(self.describe(element, depth + 1), '' if last else ','))
+        if count > len(elements):
+            lines.append('    ... 还有 %d 个元素' % (count - len(elements)))
+        lines.append(')')
+        return '\n'.join(lines)
+
+    def _describe_dictionary(self, pointer: int, name: str, depth: int) -> str:
+        count, entries = self.dictionary_entries(pointer, name)
+        if entries is None:
+            return '<%s: 0x%x, %d 个键值对, 读取失败>' % (name, pointer, count)
+        if depth >= self.max_depth:
+            return '<%s: 0x%x, %d 个键值对>' % (name, pointer, count)
+
+        lines = ['{']
+        for key, value in entries:
+            key_text = self.describe(key, self.max_depth)
+            lines.extend(self._indent('%s = %s' % (key_text, self.describe(value, depth + 1)), ';'))
+        if count > len(entries):
+            lines.append('    ... 还有 %d 个键值对' % (count - len(entries)))
+        lines.append('}')
+        return '\n'.join(lines)
@@ -0,0 +1,198 @@
+import os
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.index_store import TextIndexFile
+from src.utils.macho import MachOFile
+
+"""
+    类功能：ObjC 方法索引（-[类 selector] -> IMP 偏移）
+
+    - 通过 mmap 直接解析磁盘上的 Mach-O：__objc_classlist 中每个类的 class_ro_t（实例方法）和元类的 class_ro_t（类方法），
+      以及 __objc_catlist 中的分类方法；支持普通方法列表和相对方法列表（relative method list）
+    - 剥离符号的 Release 二进制中 ObjC 元数据仍然完整，不需要表达式求值就能得到所有方法的 IMP 偏移
+    - 索引按模块 UUID 持久化（见 TextIndexFile），方法名以 -[类 selector] / +[类 selector] 的形式保存（Swift 类名为 模块.类名），支持通配符搜索
+    - 加密的 App Store 二进制（cryptid 不为 0）的方法名在磁盘上是密文，不建立索引
+"""
+
+# class_t: isa, superclass, cache, vtable, data（class_ro_t 指针，低位是标志位）
+CLASS_DATA_OFFSET = 0x20
+CLASS_DATA_MASK = ~0x7
+
+# class_ro_t 中的字段偏移
+RO_NAME_OFFSET = 0x18
+RO_METHODS_OFFSET = 0x20
+
+# category_t: name, cls, instanceMethods, classMethods
+CATEGORY_CLASS_OFFSET = 0x08
+CATEGORY_INSTANCE_METHODS_OFFSET = 0x10
+CATEGORY_CLASS_METHODS_OFFSET = 0x18
+
+# method_list_t 头部：entsizeAndFlags, count
+METHOD_LIST_RELATIVE_FLAG = 0x80000000
+METHOD_LIST_ENTSIZE_MASK = 0x0000FFFC
+
+# 方法数量的合理上限（解析到损坏的数据时不至于循环过久）
+MAX_METHODS_PER_LIST = 0x10000
+
+
+class ObjCMethodIndex(TextIndexFile):
+    INDEX_NAME = 'objc_methods'
+    INDEX_VERSION = 2
+    INDEX_TITLE = 'ObjC 方法索引'
+
+    # 已加载的索引：模块 UUID -> ObjCMethodIndex
+    _loaded: Dict[str, "ObjCMethodIndex"] = {}
+
+    # 索引字段：blob / positions（方法名，见 TextIndexFile），imps: 每个方法的 IMP 偏移
+
+    def summary(self) -> str:
+        return '%d 个方法' % len(self.fields['imps'])
+
+    @classmethod
+    def build(cls, target, module) -> Optional[Dict[str, Any]]:
+        path = module.GetFileSpec().fullpath
+        if not path or not os.path.isfile(path):
+            print(f'[ 磁盘上找不到模块文件 {path}，无法解析 ObjC 元数据. ]')
+            return None
+
+        try:
+            macho = MachOFile(path, module.GetUUIDString())
+        except (OSError, ValueError) as e:
+            print(f'[ 解析 Mach-O 文件失败: {e} ]')
+            return None
+
+        with macho:
+            if macho.encrypted_range is not None:
+                # 方法名在加密的 __TEXT 中，建立的索引会被永久保存，不能使用
+                print('[ 模块文件已加密（cryptid 不为 0），无法从磁盘解析 ObjC 元数据，请使用解密后的二进制. ]')
+                return None
+            if module.GetUUIDString() and macho.uuid != module.GetUUIDString().upper():
+                print(f'[ 警告: 磁盘文件的 UUID {macho.uuid} 与模块不一致，偏移可能不正确 ]')
+            methods = cls.parseMethods(macho)
+
+        methods.sort(key=lambda item: item[1])
+        blob, positions = cls.joinTexts([name.encode('utf-8') for name, _ in methods])
+        return {'blob': blob, 'positions': positions, 'imps': array('Q', [imp for _, imp in methods])}
+
+    @classmethod
+    def parseMethods(cls, macho: MachOFile) -> List[Tuple[str, int]]:
+        """[ 解析所有类和分类的方法：[(方法名, IMP 偏移), ...] ]"""
+        methods = []
+        classlist = macho.section('__objc_classlist')
+        if classlist is not None:
+            for i in range(classlist.size // 8):
+                class_addr = macho.pointer(classlist.addr + i * 8)
+                if class_addr is None:
+                    continue
+                name = cls._className(macho, class_addr)
+                if name is None:
+                    continue
+                methods.extend(cls._methods(macho, cls._roMethods(macho, class_addr), '-', name))
+                metaclass = macho.pointer(class_addr)
+                if metaclass is not None:
+                    methods.extend(cls._methods(macho, cls._roMethods(macho, metaclass), '+', name))
+
+        catlist = macho.section('__objc_catlist')
+        if catlist is not None:
+            for i in range(catlist.size // 8):
+                category = macho.pointer(catlist.addr + i * 8)
+                if category is None:
+                    continue
+                name = '%s(%s)' % (cls._categoryClassName(macho, category), macho.cstring(macho.pointer(category) or 0) or '?')
+                methods.extend(cls._methods(macho, macho.pointer(category + CATEGORY_INSTANCE_METHODS_OFFSET), '-', name))
+                methods.extend(cls._methods(macho, macho.pointer(category + CATEGORY_CLASS_METHODS_OFFSET), '+', name))
+        return methods
+
+    @classmethod
+    def _classRo(cls, macho: MachOFile, class_addr: int) -> Optional[int]:
+        data = macho.pointer(class_addr + CLASS_DATA_OFFSET)
+        return data & CLASS_DATA_MASK if data is not None else None
+
+    @classmethod
+    def _className(cls, macho: MachOFile, class_addr: int) -> Optional[str]:
+        ro = cls._classRo(macho, class_addr)
+        if ro is None:
+            return None
+        name_addr = macho.pointer(ro + RO_NAME_OFFSET)
+        name = macho.cstring(name_addr) if name_addr is not None else None
+        return cls.readableName(name) if name is not None else None
+
+    @classmethod
+    def readableName(cls, name: str) -> str:
+        """[ Swift 类的 ObjC 名称 _TtC<长度><模块><长度><类名> 转换为 模块.类名，其它名称不变 ]"""
+        match = re.match(r'_TtC(\d+)', name)
+        if match is None:
+            return name
+        position = match.end()
+        parts = []
+        length = int(match.group(1))
+        while True:
+            parts.append(name[position:position + length])
+            position += length
+            digits = re.match(r'\d+', name[position:])
+            if digits is None:
+                break
+            length = int(digits.group())
+            position += digits.end()
+        if position != len(name) or len(parts) != 2:
+            return name
+        return '.'.join(parts)
+
+    @classmethod
+    def _roMethods(cls, macho: MachOFile, class_addr: int) -> Optional[int]:
+        ro = cls._classRo(macho, class_addr)
+        return macho.pointer(ro + RO_METHODS_OFFSET) if ro is not None else None
+
+    @classmethod
+    def _categoryClassName(cls, macho: MachOFile, category: int) -> str:
+        """[ 分类所属的类：本模块中的类读取类名，外部类从 bind 的导入符号（_OBJC_CLASS_$_类名）得到类名 ]"""
+        class_addr = macho.pointer(category + CATEGORY_CLASS_OFFSET)
+        if class_addr is not None:
+            return cls._className(macho, class_addr) or '?'
+        raw = macho.readU64(category + CATEGORY_CLASS_OFFSET)
+        symbol = macho.bindSymbol(raw) if raw else None
+        if symbol and '_OBJC_CLASS_$_' in symbol:
+            return symbol.split('_OBJC_CLASS_$_', 1)[1]
+        return '?'
+
+    @classmethod
+    def _methods(cls, macho: MachOFile, method_list: Optional[int], prefix: str, class_name: str) -> List[Tuple[str, int]]:
+        if method_list is None:
+            return []
+        entsize_and_flags = macho.readU32(method_list)
+        count = macho.readU32(method_list + 4)
+        if entsize_and_flags is None or count is None or count > MAX_METHODS_PER_LIST:
+            return []
+
+        entsize = entsize_and_flags & METHOD_LIST_ENTSIZE_MASK
+        relative = entsize_and_flags & METHOD_LIST_RELATIVE_FLAG
+        methods = []
+        for i in range(count):
+            entry = method_list + 8 + i * entsize
+            if relative:
+                # 相对方法列表: int32 nameOffset（指向 selector 引用）、typesOffset、impOffset，均相对于字段自身的地址
+                name_offset = macho.readI32(entry)
+                imp_offset = macho.readI32(entry + 8)
+                if name_offset is None or not imp_offset:
+                    continue
+                selector = macho.pointer(entry + name_offset)
+                imp = entry + 8 + imp_offset
+            else:
+                selector = macho.pointer(entry)
+                imp = macho.pointer(entry + 16)
+            name = macho.cstring(selector) if selector is not None else None
+            if name is None or imp is None:
+                continue
+            methods.append(('%s[%s %s]' % (prefix, class_name, name), imp))
+        return methods
+
+    def imp(self, i: int) -> int:
+        return self.fields['imps'][i]
+
+    def find(self, pattern: str) -> List[int]:
+        """[ 按方法名搜索：-[类 selector] 精确匹配，* ? 为通配符（忽略大小写） ]"""
+        source = ''.join('.*' if char == '*' else '.' if char == '?' else re.escape(char) for char in pattern)
+        compiled = re.compile(('^' + source + '$').encode('utf-8'), re.MULTILINE | re.IGNORECASE)
+        return self.searchTexts(compiled)
@@ -0,0 +1,126 @@
+import lldb
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.memory_regions import MemoryRegionMap
+
+"""
+    类功能：内存读取合并
+
+    远程调试（debugserver）时，每次内存读取都是一次往返，延迟远大于读取的字节数本身的开销。
+    ReadPlanner 先收集一个命令需要读取的所有地址范围，把相邻（间隔不超过 max_gap）的范围合并成尽量少的大块读取，
+    读取完成后再按请求拆分结果。
+    读取通过 MemoryRegionMap 校验地址：合并后的读取在不可读的位置截断，已知不可读的请求不发起读取。
+
+    用法：
+        planner = ReadPlanner(process)
+        h1 = planner.add(0x1000, 8)
+        h2 = planner.add(0x1010, 0x50)
+        planner.execute()
+        data = planner.get(h1)
+"""
+
+# 两个范围之间的间隔不超过该值时合并读取
+DEFAULT_MAX_GAP = 0x400
+
+# 单次合并读取的最大字节数
+DEFAULT_MAX_READ = 0x10000
+
+
+class ReadPlanner:
+    """[ 内存读取合并规划器 ]"""
+
+    def __init__(self, process, max_gap: int = DEFAULT_MAX_GAP, max_read: int = DEFAULT_MAX_READ):
+        self.process = process
+        self.max_gap = max_gap
+        self.max_read = max_read
+
+        # 读取请求：(地址, 字节数)
+        self.requests: List[Tuple[int, int]] = []
+        # 读取结果：与 requests 一一对应，读取失败为 None
+        self.results: List[Optional[bytes]] = []
+        # 跨越不可读区域的请求中可读的部分：请求句柄 -> 从请求地址开始的数据
+        self.partials: Dict[int, bytes] = {}
+        # 实际发生的读取次数
+        self.reads = 0
+        # 本次读取使用的内存区域列表（execute 时获取）
+        self.regions: Optional[MemoryRegionMap] = None
+
+    def add(self, address: int, size: int) -> int:
+        """[ 添加读取请求，返回请求句柄 ]"""
+        self.requests.append((address, size))
+        return len(self.requests) - 1
+
+    def plan(self) -> List[Tuple[int, int, List[int]]]:
+        """[ 合并读取范围，返回 [(起始地址, 结束地址, [请求句柄...]), ...] ]"""
+        order = sorted(range(len(self.requests)), key=lambda i: self.requests[i])
+        chunks = []
+        for handle in order:
+            address, size = self.requests[handle]
+            end = address + size
+            if chunks:
+                start, chunk_end, handles = chunks[-1]
+                if address <= chunk_end + self.max_gap and max(end, chunk_end) - start <= self.max_read:
+                    chunks[-1] = (start, max(end, chunk_end), handles)
+                    handles.append(handle)
+                    continue
+            chunks.append((address, end, [handle]))
+        return chunks
+
+    def _read(self, address: int, size: int) -> Optional[bytes]:
+        """[ 读取从 address 开始的可读部分（在已知不可读的位置截断），起始地址不可读时返回 None ]"""
+        data, reads = self.regions.read(address, size)
+        self.reads += reads
+        return data
+
+    def execute(self) -> "ReadPlanner":
+        """[ 执行合并后的读取，没有被合并读取完整覆盖的请求再逐个读取（只影响跨越不可读区域的请求） ]"""
+        self.regions = MemoryRegionMap.current(self.process)
+        self.results = [None] * len(self.requests)
+        self.partials = {}
+        for start, end, handles in self.plan():
+            data = self._read(start, end - start)
+            for handle in handles:
+                address, size = self.requests[handle]
+                if data is not None and address - start + size <= len(data):
+                    self.results[handle] = data[address - start:address - start + size]
+                    continue
+                if data is not None and address - start < len(data):
+                    self.partials[handle] = data[address - start:]
+                elif len(handles) > 1 and self.regions.readableSize(address, size) == size:
+                    partial = self._read(address, size)
+                    if partial is not None and len(partial) == size:
+                        self.results[handle] = partial
+                    elif partial:
+                        self.partials[handle] = partial
+        return self
+
+    def get(self, handle: int) -> Optional[bytes]:
+        return self.results[handle]
+
+    def get_partial(self, handle: int) -> Optional[bytes]:
+        """[ 读取失败的请求中从请求地址开始可读的部分（在不可读的位置截断），没有时返回 None ]"""
+        return self.partials.get(handle)
+
+    def get_pointer(self, handle: int) -> Optional[int]:
+        """[ 将读取结果解析为指针（按进程的字节序） ]"""
+        data = self.results[handle]
+        if data is None:
+            return None
+        byte_order = 'big' if self.process.GetByteOrder() == lldb.eByteOrderBig else 'little'
+        return int.from_bytes(data, byte_order)
+
+    @property
+    def saved(self) -> int:
+        """[ 与逐个读取相比节省的读取次数 ]"""
+        return len(self.requests) - self.reads
+
+    def summary(self) -> str:
+        return "[ 合并读取: %d 个请求 -> %d 次读取，节省 %d 次往返 ]" % (len(self.requests), self.reads, self.saved)
+
+    @classmethod
+    def readMany(cls, process, ranges) -> List[Optional[bytes]]:
+        """[ 一次性读取多个 (地址, 字节数) 范围 ]"""
+        planner = cls(process)
+        for address, size in ranges:
+            planner.add(address, size)
+        return planner.execute().results
@@ -0,0 +1,152 @@
+import lldb
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.symbolicator import Symbolicator
+
+"""
+    类功能：调用栈采样分析
+
+    以固定频率中断进程，通过 SB API 遍历所有线程的栈帧（逐帧读取到 max_depth 为止，不展开整个调用栈），
+    进程状态事件通过专用的 SBListener 接收，不占用 debugger 的默认监听器，
+    每个 pc 记录为 (模块序号, 偏移) 并映射为一个整数编号，调用栈以整数元组的形式聚合计数，
+    最后输出 flamegraph 工具可以直接使用的 collapsed-stack 格式。
+"""
+
+
+class StackSampler:
+    """[ 调用栈采样器 ]"""
+
+    def __init__(self, debugger, target, max_depth=64):
+        self.debugger = debugger
+        self.target = target
+        self.process = target.GetProcess()
+        self.max_depth = max_depth
+        self.index = Symbolicator.getModuleIndex(target)
+
+        # 栈帧编号：(模块序号, 偏移) -> 编号，模块外的地址以 (-1, 地址) 表示
+        self.frame_ids: Dict[Tuple[int, int], int] = {}
+        self.frame_keys: List[Tuple[int, int]] = []
+
+        # 聚合计数：(线程名, 栈帧编号...) -> 次数，栈按 根 -> 叶 的顺序存放
+        self.counters: Counter = Counter()
+
+        self.ticks = 0
+        self.samples = 0
+        # 每次采样（停止 -> 遍历 -> 恢复）的耗时
+        self.tick_costs: List[float] = []
+
+    def _frame_id(self, pc: int) -> int:
+        located = self.index.locate(pc) if self.index is not None else None
+        key = located if located is not None else (-1, pc)
+        frame_id = self.frame_ids.get(key)
+        if frame_id is None:
+            frame_id = len(self.frame_keys)
+            self.frame_ids[key] = frame_id
+            self.frame_keys.append(key)
+        return frame_id
+
+    def _wait_for_state(self, listener, states, timeout=5.0) -> int:
+        """[ 处理进程事件，直到进程进入指定状态（或退出） ]"""
+        deadline = time.perf_counter() + timeout
+        state = self.process.GetState()
+        event = lldb.SBEvent()
+        while state not in states and state not in (lldb.eStateExited, lldb.eStateDetached, lldb.eStateCrashed):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            if listener.WaitForEvent(max(1, int(remaining)), event) and lldb.SBProcess.EventIsProcessEvent(event):
+                state = lldb.SBProcess.GetStateFromEvent(event)
+            else:
+                state = self.process.GetState()
+        return state
+
+    def record(self):
+        """[ 记录当前所有线程的调用栈 ]"""
+        for thread in self.process:
+            # GetNumFrames 会展开整个调用栈，这里逐帧读取，遇到无效栈帧即停止
+            stack = []
+            for i in range(self.max_depth):
+                frame = thread.GetFrameAtIndex(i)
+                if not frame.IsValid():
+                    break
+                stack.append(self._frame_id(frame.GetPC()))
+            if not stack:
+                continue
+            stack.reverse()
+            name = thread.GetName() or thread.GetQueueName() or "thread-%d" % thread.GetIndexID()
+            self.counters[(name,) + tuple(stack)] += 1
+            self.samples += 1
+
+    def run(self, rate: float, duration: float):
+        """[ 以 rate 次/秒的频率采样 duration 秒，结束时进程保持停止状态 ]"""
+        interval = 1.0 / rate
+        listener = lldb.SBListener("ildb.sampler")
+        broadcaster = self.process.GetBroadcaster()
+        broadcaster.AddListener(listener, lldb.SBProcess.eBroadcastBitStateChanged)
+        old_async = self.debugger.GetAsync()
+        self.debugger.SetAsync(True)
+
+        try:
+            end_time = time.perf_counter() + duration
+            while time.perf_counter() < end_time:
+                resume_start = time.perf_counter()
+                self.process.Continue()
+                state = self._wait_for_state(listener, (lldb.eStateRunning,))
+                if state != lldb.eStateRunning:
+                    break
+
+                # 恢复运行的耗时也计入上一次采样的开销
+                if self.tick_costs:
+                    self.tick_costs[-1] += time.perf_counter() - resume_start
+
+                time.sleep(interval)
+
+                # 停止 -> 遍历栈帧 -> 恢复运行，这段时间就是每次采样的开销（不包括进程正常运行的时间）
+                tick_start = time.perf_counter()
+                if self.process.GetState() == lldb.eStateRunning:
+                    self.process.Stop()
+                state = self._wait_for_state(listener, (lldb.eStateStopped,))
+                if state != lldb.eStateStopped:
+                    break
+
+                self.record()
+                self.ticks += 1
+                self.tick_costs.append(time.perf_counter() - tick_start)
+        finally:
+            broadcaster.RemoveListener(listener, lldb.SBProcess.eBroadcastBitStateChanged)
+            self.debugger.SetAsync(old_async)
+
+    def label(self, frame_id: int, symbolize: bool) -> str:
+        owner, offset = self.frame_keys[frame_id]
+        if owner < 0:
+            return "0x%x" % offset
+        module_name = self.index.names[owner]
+        if symbolize:
+            resolved = self.index.resolve(offset + self.index.slides[owner])
+            if resolved is not None and resolved[2] is not None:
+                return "%s`%s" % (module_name, resolved[2])
+        return "%s+0x%x" % (module_name, offset)
+
+    def collapsed(self, symbolize=False) -> List[str]:
+        """[ 输出 collapsed-stack 格式：线程;根;...;叶 次数 ]"""
+        labels: Dict[int, str] = {}
+        lines = []
+        for stack, count in self.counters.most_common():
+            names = [stack[0].replace(";", "_").replace(" ", "_")]
+            for frame_id in stack[1:]:
+                label = labels.get(frame_id)
+                if label is None:
+                    label = self.label(frame_id, symbolize).replace(";", "_").replace(" ", "_")
+                    labels[frame_id] = label
+                names.append(label)
+            lines.append("%s %d" % (";".join(names), count))
+        return lines
+
+    def overhead(self) -> Optional[Tuple[float, float, float]]:
+        """[ 返回每次采样开销的 (平均值, 最大值, 总和)，单位秒 ]"""
+        if not self.tick_costs:
+            return None
+        total = sum(self.tick_costs)
+        return (total / len(self.tick_costs), max(self.tick_costs), total)
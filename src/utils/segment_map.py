@@ -0,0 +1,168 @@
+import bisect
+import os
+import struct
+from array import array
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.index_store import TextIndexFile
+from src.utils.macho import MachOFile
+from src.utils.elf import ELFFile
+
+"""
+    类功能：模块的 segment / section 映射（离线地址转换）
+
+    - 通过 mmap 直接解析磁盘上的 Mach-O（包括 fat 文件，按 UUID 选择 slice）或 ELF（程序头 + 节头），不需要进程
+    - 映射按模块 UUID 持久化（见 TextIndexFile），之后直接 mmap 加载
+    - 四种地址之间批量转换：
+        IDA 地址（虚拟地址，与 mark / dis 的偏移一致）、文件偏移（相对于 slice，fat 文件中的绝对位置另外给出）、
+        模块偏移（虚拟地址 - 模块基址，与崩溃日志中的 模块 + 偏移 一致）、运行时地址（虚拟地址 + ASLR 偏移）
+"""
+
+# header 字段：模块基址、slice 在文件中的偏移、文件格式
+FORMAT_MACHO = 0
+FORMAT_ELF = 1
+
+
+class SegmentMap(TextIndexFile):
+    INDEX_NAME = 'segments'
+    INDEX_VERSION = 1
+    INDEX_TITLE = '段映射'
+
+    # 已加载的索引：模块 UUID -> SegmentMap
+    _loaded: Dict[str, "SegmentMap"] = {}
+
+    # 直接指定文件（没有调试目标）时解析的映射：(文件路径, 修改时间) -> SegmentMap
+    _files: Dict[Tuple[str, float], "SegmentMap"] = {}
+
+    # 索引字段：
+    # header: [模块基址, slice 偏移, 文件格式]
+    # seg_vmaddrs / seg_vmsizes / seg_fileoffs / seg_filesizes: segment（按虚拟地址排序）
+    # sec_addrs / sec_sizes: section（按地址排序）
+    # blob / positions: 所有 segment 名称，之后是所有 section 名称（见 TextIndexFile）
+
+    def summary(self) -> str:
+        return '%d 个 segment，%d 个 section' % (len(self.fields['seg_vmaddrs']), len(self.fields['sec_addrs']))
+
+    @property
+    def base(self) -> int:
+        return self.fields['header'][0]
+
+    @property
+    def slice_offset(self) -> int:
+        return self.fields['header'][1]
+
+    @classmethod
+    def parse(cls, path: str, uuid_string: Optional[str] = None) -> Dict[str, Any]:
+        """[ 解析 Mach-O / ELF 文件，返回映射字段，格式不支持时抛出 ValueError ]"""
+        try:
+            binary = MachOFile(path, uuid_string)
+            file_format = FORMAT_MACHO
+        except (ValueError, struct.error):
+            binary = ELFFile(path)
+            file_format = FORMAT_ELF
+
+        with binary:
+            segments = sorted((segment for segment in binary.segments if segment.name != '__PAGEZERO'),
+                              key=lambda segment: segment.vmaddr)
+            sections = sorted(binary.sections, key=lambda section: section.addr)
+            names = [segment.name for segment in segments]
+            names += ['%s,%s' % (section.segment, section.name) if section.segment else section.name for section in sections]
+            blob, positions = cls.joinTexts([name.encode('utf-8') for name in names])
+            return {
+                'header': array('Q', [binary.base, binary.slice_offset, file_format]),
+                'seg_vmaddrs': array('Q', [segment.vmaddr for segment in segments]),
+                'seg_vmsizes': array('Q', [segment.vmsize for segment in segments]),
+                'seg_fileoffs': array('Q', [segment.fileoff for segment in segments]),
+                'seg_filesizes': array('Q', [segment.filesize for segment in segments]),
+                'sec_addrs': array('Q', [section.addr for section in sections]),
+                'sec_sizes': array('Q', [section.size for section in sections]),
+                'blob': blob,
+                'positions': positions,
+            }
+
+    @classmethod
+    def build(cls, target, module) -> Optional[Dict[str, Any]]:
+        path = module.GetFileSpec().fullpath
+        if not path or not os.path.isfile(path):
+            print(f'[ 磁盘上找不到模块文件 {path}. ]')
+            return None
+        try:
+            return cls.parse(path, module.GetUUIDString())
+        except (OSError, ValueError, struct.error) as e:
+            print(f'[ 解析模块文件失败: {e} ]')
+            return None
+
+    @classmethod
+    def forFile(cls, path: str) -> Optional["SegmentMap"]:
+        """[ 直接解析指定的文件（不需要调试目标），同一个文件未修改时复用 ]"""
+        try:
+            key = (os.path.abspath(path), os.path.getmtime(path))
+            if key not in cls._files:
+                cls._files[key] = cls(cls.parse(path), {'version': cls.INDEX_VERSION, 'module': os.path.basename(path)})
+            return cls._files[key]
+        except (OSError, ValueError, struct.error) as e:
+            print(f'[ 解析文件 {path} 失败: {e} ]')
+            return None
+
+    def _segmentOf(self, vmaddr: int) -> Optional[int]:
+        addrs = self.fields['seg_vmaddrs']
+        i = bisect.bisect_right(addrs, vmaddr) - 1
+        if i >= 0 and vmaddr < addrs[i] + self.fields['seg_vmsizes'][i]:
+            return i
+        return None
+
+    def sectionName(self, vmaddr: int) -> Optional[str]:
+        addrs = self.fields['sec_addrs']
+        i = bisect.bisect_right(addrs, vmaddr) - 1
+        if i >= 0 and vmaddr < addrs[i] + self.fields['sec_sizes'][i]:
+            return self.text(len(self.fields['seg_vmaddrs']) + i)
+        segment = self._segmentOf(vmaddr)
+        return self.text(segment) if segment is not None else None
+
+    def fileOffset(self, vmaddr: int) -> Optional[int]:
+        """[ 虚拟地址 -> 文件偏移（相对于 slice），不在文件中（例如 __bss）时返回 None ]"""
+        i = self._segmentOf(vmaddr)
+        if i is None or vmaddr - self.fields['seg_vmaddrs'][i] >= self.fields['seg_filesizes'][i]:
+            return None
+        return self.fields['seg_fileoffs'][i] + vmaddr - self.fields['seg_vmaddrs'][i]
+
+    def vmAddress(self, file_offset: int) -> Optional[int]:
+        """[ 文件偏移（相对于 slice） -> 虚拟地址，不属于任何 segment 时返回 None ]"""
+        fileoffs = self.fields['seg_fileoffs']
+        filesizes = self.fields['seg_filesizes']
+        for i in range(len(fileoffs)):
+            if fileoffs[i] <= file_offset < fileoffs[i] + filesizes[i]:
+                return self.fields['seg_vmaddrs'][i] + file_offset - fileoffs[i]
+        return None
+
+    def convert(self, vmaddr: int, slide: Optional[int]) -> Optional[Dict[str, Any]]:
+        """[ 一个虚拟地址的所有表示，不属于模块中的任何 segment 时返回 None ]"""
+        section = self.sectionName(vmaddr)
+        if section is None:
+            return None
+        file_offset = self.fileOffset(vmaddr)
+        return {
+            'ida': vmaddr,
+            'section': section,
+            'file_offset': file_offset,
+            'fat_offset': file_offset + self.slice_offset if file_offset is not None and self.slice_offset else None,
+            'module_offset': vmaddr - self.base,
+            'runtime': vmaddr + slide if slide is not None else None,
+        }
+
+    def describe(self, vmaddr: int, slide: Optional[int]) -> str:
+        """[ 一个虚拟地址的所有表示：IDA 地址 (section)  文件偏移  模块偏移  运行时地址 ]"""
+        converted = self.convert(vmaddr, slide)
+        if converted is None:
+            return '0x%x  [ 不属于模块中的任何 segment ]' % vmaddr
+        parts = ['IDA 0x%x (%s)' % (vmaddr, converted['section'])]
+        if converted['file_offset'] is None:
+            parts.append('文件偏移 -')
+        elif converted['fat_offset'] is not None:
+            parts.append('文件偏移 0x%x (fat 0x%x)' % (converted['file_offset'], converted['fat_offset']))
+        else:
+            parts.append('文件偏移 0x%x' % converted['file_offset'])
+        parts.append('模块偏移 0x%x' % converted['module_offset'])
+        if converted['runtime'] is not None:
+            parts.append('运行时 0x%x' % converted['runtime'])
+        return '  '.join(parts)
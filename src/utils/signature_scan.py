@@ -0,0 +1,199 @@
+import bisect
+import mmap
+import os
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.macho import MachOFile
+from src.utils.elf import ELFFile
+
+"""
+    类功能：离线特征码 / 常量扫描（不需要 lldb，ιldb-scan 使用）
+
+    - 特征码语法与 IDA 相同：十六进制字节以空格分隔，?? 或 ? 匹配任意字节，半字节通配（例如 4? 、?F）；
+      也可以不带空格（F44FBEA9????0191）。常量按小端序展开为字节（0x12345678 为 4 字节，超过 32 位为 8 字节，也可以用 :宽度 指定）
+    - 所有模式编译为字节正则（零宽前瞻，重叠的匹配也会全部找到），直接在 mmap 上匹配，不复制文件内容
+    - 有磁盘数据的 section 切块（MIN_CHUNK_SIZE ~ MAX_CHUNK_SIZE）分给 ProcessPoolExecutor 的各个进程，相邻块重叠（最长模式长度 - 1）字节，
+      匹配只归属于起始位置所在的块，合并后不会重复
+    - 结果是 IDA 地址（与 mark / dy 的偏移一致），每行一个，可以直接用 mark -f 加载
+"""
+
+# 每个任务扫描的字节数上下限（按文件大小和进程数在上下限之间选择，保证每个进程有多个任务用于负载均衡）
+MIN_CHUNK_SIZE = 0x100000
+MAX_CHUNK_SIZE = 0x4000000
+
+# 每个进程平均分到的任务数
+TASKS_PER_WORKER = 4
+
+HEX_DIGITS = '0123456789abcdefABCDEF'
+
+
+class Signature:
+    """[ 一个扫描模式：名称、编译前的字节正则、匹配长度 ]"""
+
+    def __init__(self, name: str, source: bytes, length: int):
+        self.name = name
+        self.source = source
+        self.length = length
+
+    @classmethod
+    def parse(cls, text: str) -> "Signature":
+        """[ 解析特征码，格式错误时抛出 ValueError ]"""
+        tokens = text.split()
+        if len(tokens) == 1 and len(tokens[0]) > 2:
+            compact = tokens[0]
+            if len(compact) % 2:
+                raise ValueError(f"特征码 {text} 的长度不是偶数")
+            tokens = [compact[i:i + 2] for i in range(0, len(compact), 2)]
+        if not tokens:
+            raise ValueError("特征码为空")
+
+        parts = []
+        for token in tokens:
+            parts.append(cls._byteSource(token, text))
+        if all(part == b'.' for part in parts):
+            raise ValueError(f"特征码 {text} 不能全部是通配符")
+        return cls(text, b''.join(parts), len(parts))
+
+    @classmethod
+    def _byteSource(cls, token: str, text: str) -> bytes:
+        if token in ('?', '??'):
+            return b'.'
+        if len(token) != 2 or any(char not in HEX_DIGITS + '?' for char in token):
+            raise ValueError(f"特征码 {text} 中的 {token} 无效")
+        high, low = token
+        if high == '?':
+            values = [(i << 4) | int(low, 16) for i in range(16)]
+        elif low == '?':
+            values = [(int(high, 16) << 4) | i for i in range(16)]
+        else:
+            return re.escape(bytes([int(token, 16)]))
+        return b'[' + b''.join(re.escape(bytes([value])) for value in values) + b']'
+
+    @classmethod
+    def constant(cls, text: str) -> "Signature":
+        """[ 解析常量：<值>[:<宽度>]，按小端序展开为字节 ]"""
+        value_text, _, width_text = text.partition(':')
+        value = int(value_text, 0)
+        width = int(width_text, 0) if width_text else (4 if value <= 0xFFFFFFFF else 8)
+        if width not in (1, 2, 4, 8) or value < 0 or value >= 1 << (width * 8):
+            raise ValueError(f"常量 {text} 的宽度无效")
+        raw = value.to_bytes(width, 'little')
+        return cls(text, re.escape(raw), width)
+
+
+@lru_cache(maxsize=None)
+def _compile(source: bytes):
+    # 零宽前瞻：每个起始位置都尝试匹配，重叠的匹配不会被跳过
+    return re.compile(b'(?=' + source + b')', re.DOTALL)
+
+
+def _scanChunk(path: str, start: int, end: int, limit: int, sources: Tuple[bytes, ...]) -> List[Tuple[int, int]]:
+    """[ 进程池任务：扫描文件 [start, end) 中开始的匹配（匹配可以延伸到 limit），返回 [(文件位置, 模式序号), ...] ]"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        found = []
+        for index, source in enumerate(sources):
+            for match in _compile(source).finditer(mapped, start, limit):
+                position = match.start()
+                if position >= end:
+                    break
+                found.append((position, index))
+        return found
+    finally:
+        mapped.close()
+
+
+class ScanRegion:
+    """[ 一段有磁盘数据的 section：名称、虚拟地址、文件中的绝对位置、大小 ]"""
+
+    def __init__(self, name: str, vmaddr: int, file_start: int, size: int):
+        self.name = name
+        self.vmaddr = vmaddr
+        self.file_start = file_start
+        self.size = size
+
+
+class SignatureScanner:
+
+    @classmethod
+    def regions(cls, path: str, uuid_string: Optional[str] = None, section_names: Optional[List[str]] = None) -> List[ScanRegion]:
+        """[ 文件中所有有磁盘数据的 section（__bss 等没有磁盘数据的 section 跳过），可以按 section 名称过滤 ]"""
+        try:
+            binary = MachOFile(path, uuid_string)
+        except (ValueError, struct.error):
+            binary = ELFFile(path)
+
+        with binary:
+            regions = []
+            if not binary.sections:
+                # 没有节头（例如剥离了节头的 ELF），扫描所有 segment 的磁盘数据
+                for segment in binary.segments:
+                    if segment.filesize and (not section_names or segment.name in section_names):
+                        regions.append(ScanRegion(segment.name, segment.vmaddr, binary.slice_offset + segment.fileoff,
+                                                  min(segment.filesize, segment.vmsize)))
+                return regions
+            for section in binary.sections:
+                full_name = '%s,%s' % (section.segment, section.name) if section.segment else section.name
+                if section_names and section.name not in section_names and full_name not in section_names:
+                    continue
+                if section.size == 0 or binary.fileOffset(section.addr) is None \
+                        or binary.fileOffset(section.addr + section.size - 1) is None:
+                    continue
+                file_start = binary.slice_offset + binary.fileOffset(section.addr)
+                regions.append(ScanRegion(full_name, section.addr, file_start, section.size))
+            return regions
+
+    @classmethod
+    def tasks(cls, path: str, regions: List[ScanRegion], signatures: List[Signature], workers: int) -> List[tuple]:
+        """[ 把所有 section 切块：[(文件, 起始, 结束, 匹配可以延伸到的位置, 模式), ...]，相邻块重叠 最长模式长度 - 1 字节 ]"""
+        total = sum(region.size for region in regions)
+        chunk_size = min(max(total // max(workers * TASKS_PER_WORKER, 1), MIN_CHUNK_SIZE), MAX_CHUNK_SIZE)
+        overlap = max(signature.length for signature in signatures) - 1
+        sources = tuple(signature.source for signature in signatures)
+
+        tasks = []
+        for region in regions:
+            region_end = region.file_start + region.size
+            for start in range(region.file_start, region_end, chunk_size):
+                end = min(start + chunk_size, region_end)
+                tasks.append((path, start, end, min(end + overlap, region_end), sources))
+        return tasks
+
+    @classmethod
+    def scan(cls, path: str, signatures: List[Signature], workers: Optional[int] = None,
+             uuid_string: Optional[str] = None, section_names: Optional[List[str]] = None) -> Dict[str, object]:
+        """[ 扫描文件，返回 {matches: [(IDA 地址, section 名称, 模式序号), ...]（按地址排序）, bytes, tasks, workers, elapsed} ]"""
+        start_time = time.perf_counter()
+        workers = workers or os.cpu_count() or 1
+        regions = cls.regions(path, uuid_string, section_names)
+        tasks = cls.tasks(path, regions, signatures, workers)
+
+        if workers == 1 or len(tasks) <= 1:
+            chunks = [_scanChunk(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_scanChunk, *zip(*tasks)))
+
+        # 文件位置 -> IDA 地址：找到所在的 section（section 按文件位置排序后二分查找）
+        ordered = sorted(regions, key=lambda region: region.file_start)
+        starts = [region.file_start for region in ordered]
+        matches = []
+        for found in chunks:
+            for position, index in found:
+                region = ordered[bisect.bisect_right(starts, position) - 1]
+                matches.append((region.vmaddr + position - region.file_start, region.name, index))
+        matches.sort()
+
+        return {
+            'matches': matches,
+            'bytes': sum(region.size for region in regions),
+            'tasks': len(tasks),
+            'workers': workers,
+            'elapsed': time.perf_counter() - start_time,
+        }
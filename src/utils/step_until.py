@@ -0,0 +1,136 @@
+import lldb
+import time
+
+from src.handler.register_handler.register_handler import REGISTER_ALIASES
+from src.utils.expr_evaluator import ExprEvaluator, ExprSyntaxError, ExprEvalError, FrameContext
+
+"""
+    类功能：单步执行直到条件满足（stepuntil）
+
+    - 在 Python 循环中直接调用 SBThread.StepInstruction，每一步不经过命令解释器，也不输出任何内容
+    - 条件表达式只编译一次（见 ExprEvaluator），每一步只读取条件中用到的寄存器（不建立整组寄存器快照），内存直接读取
+    - 条件满足、达到最大步数、遇到断点 / 信号等其它停止原因、进程退出或用户中断（Ctrl+C）时结束，最后输出步数和每秒步数
+"""
+
+# 单步正常结束的停止原因，其它原因（断点、信号、异常等）结束循环
+STEP_STOP_REASONS = (lldb.eStopReasonTrace, lldb.eStopReasonPlanComplete, lldb.eStopReasonNone)
+
+# 默认最大步数
+DEFAULT_MAX_STEPS = 100000
+
+# 每隔多少步检查一次用户中断
+INTERRUPT_CHECK_INTERVAL = 64
+
+# 结束原因
+RESULT_MATCHED = 'matched'
+RESULT_LIMIT = 'limit'
+RESULT_STOPPED = 'stopped'
+RESULT_EXITED = 'exited'
+RESULT_INTERRUPTED = 'interrupted'
+RESULT_ERROR = 'error'
+
+
+class StepContext(FrameContext):
+    """[ 单步时的求值上下文：寄存器通过 FindRegister 直接读取 ]"""
+
+    def reg(self, name):
+        register = self.frame.FindRegister(name)
+        if not register.IsValid():
+            for alias in REGISTER_ALIASES.get(name, ()):
+                register = self.frame.FindRegister(alias)
+                if register.IsValid():
+                    break
+            else:
+                raise ExprSyntaxError("未知寄存器: %s" % name)
+        return register.GetValueAsUnsigned()
+
+
+class StepUntil:
+    """[ 单步执行直到条件满足 ]"""
+
+    def __init__(self, debugger, thread, condition: str, max_steps: int, over_calls: bool = False):
+        self.debugger = debugger
+        self.thread = thread
+        self.process = thread.GetProcess()
+        self.condition = condition
+        self.compiled = ExprEvaluator.compile(condition)
+        # 单步之前先检查条件中的寄存器，未知寄存器直接报错，不会先执行一步
+        context = StepContext(thread.GetFrameAtIndex(0), self.process)
+        for name in ExprEvaluator.registers(condition):
+            context.reg(name)
+        self.max_steps = max_steps
+        self.over_calls = over_calls
+
+        self.steps = 0
+        self.eval_errors = 0
+        self.elapsed = 0.0
+        self.message = ''
+
+    def _matches(self) -> bool:
+        if isinstance(self.compiled, int):
+            return bool(self.compiled)
+        try:
+            return bool(self.compiled(StepContext(self.thread.GetFrameAtIndex(0), self.process)))
+        except ExprEvalError:
+            # 条件中的内存暂时不可读（例如寄存器还不是有效指针）时按不满足处理
+            self.eval_errors += 1
+            return False
+
+    def _interrupted(self) -> bool:
+        # LLDB 17 起 Ctrl+C 通过 InterruptRequested 通知正在执行的脚本命令
+        interrupt_requested = getattr(self.debugger, 'InterruptRequested', None)
+        return bool(interrupt_requested and interrupt_requested())
+
+    def run(self) -> str:
+        """[ 执行单步循环，返回结束原因 ]"""
+        start_time = time.perf_counter()
+        try:
+            return self._run()
+        except KeyboardInterrupt:
+            return RESULT_INTERRUPTED
+        finally:
+            self.elapsed = time.perf_counter() - start_time
+
+    def _run(self) -> str:
+        thread = self.thread
+        process = self.process
+        over_calls = self.over_calls
+        while self.steps < self.max_steps:
+            error = lldb.SBError()
+            thread.StepInstruction(over_calls, error)
+            if not error.Success():
+                self.message = error.GetCString() or ''
+                return RESULT_ERROR
+            self.steps += 1
+
+            if process.GetState() != lldb.eStateStopped:
+                return RESULT_EXITED
+            if thread.GetStopReason() not in STEP_STOP_REASONS:
+                self.message = thread.GetStopDescription(256) or ''
+                return RESULT_STOPPED
+            if self._matches():
+                return RESULT_MATCHED
+            if self.steps % INTERRUPT_CHECK_INTERVAL == 0 and self._interrupted():
+                return RESULT_INTERRUPTED
+        return RESULT_LIMIT
+
+    @property
+    def rate(self) -> float:
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+    def describe(self, reason: str) -> str:
+        """[ 结束原因的说明 ]"""
+        return {
+            RESULT_MATCHED: '条件满足（第 %d 步）' % self.steps,
+            RESULT_LIMIT: '达到最大步数 %d，条件未满足' % self.max_steps,
+            RESULT_STOPPED: '遇到其它停止原因 (%s)' % self.message,
+            RESULT_EXITED: '进程已结束',
+            RESULT_INTERRUPTED: '已中断',
+            RESULT_ERROR: '单步失败: %s' % self.message,
+        }[reason]
+
+    def summary(self) -> str:
+        text = '%d 步，耗时 %.2fs，%.0f 步/秒' % (self.steps, self.elapsed, self.rate)
+        if self.eval_errors:
+            text += '，条件求值失败 %d 次（按不满足处理）' % self.eval_errors
+        return text
@@ -0,0 +1,235 @@
+import lldb
+import bisect
+import re
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.disassembler import Disassembler
+from src.utils.index_store import TextIndexFile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+    类功能：模块字符串索引（C 字符串 + CFString 常量）
+
+    - 扫描模块中可能存放字符串的数据 section（按 section 类型 / 名称选择）的磁盘字节（加密的范围读取进程内存），提取以 NUL 结尾、长度不小于 MIN_STRING_LENGTH 的可打印字节串（ASCII / UTF-8）
+    - 大 section 按 CHUNK_SIZE 分块（在 NUL 处切分，字符串不会跨块），安装了 numpy 时用查表 + 差分向量化查找字符串边界，
+      未安装时用正则表达式匹配最长的可打印字节串，再检查后面是否是 NUL（不使用前瞻，没有 NUL 结尾的长字节串不会回溯）
+    - __cfstring 中的 CFString 常量单独记录：偏移是 CFString 结构体本身（代码通过 ADRP + ADD 引用的是结构体），UTF-16 内容转换为 UTF-8
+    - 所有字符串拼接成一个字节串保存（见 TextIndexFile），搜索时直接在 mmap 的字节串上执行正则；
+      字符串中的换行 / 回车保存为 \\n / \\r 两个字符，保证 ^ $ 只对应单个字符串的开头和结尾
+"""
+
+# 最短字符串长度
+MIN_STRING_LENGTH = 4
+
+# 分块扫描的块大小
+CHUNK_SIZE = 0x1000000
+
+# 字符串类型
+KIND_CSTRING = 0
+KIND_CFSTRING = 1
+
+KIND_NAMES = {KIND_CSTRING: 'cstring', KIND_CFSTRING: 'CFString'}
+
+# 可能存放字符串的 section：C 字符串、CFString、普通数据（LLDB 中 Mach-O section 的权限继承自所在 segment，不能按权限选择）
+STRING_SECTION_TYPES = (lldb.eSectionTypeDataCString, lldb.eSectionTypeDataObjCCFStrings, lldb.eSectionTypeData)
+STRING_SECTION_NAMES = ('__cstring', '__cfstring', '__const', '__objc_methname', '__objc_classname', '__objc_methtype',
+                        '__swift5_reflstr', '__data', '.rodata', '.data', '.data.rel.ro')
+
+# 字符串中的换行 / 回车在索引中的表示
+LINE_ESCAPES = ((b'\n', b'\\n'), (b'\r', b'\\r'))
+
+# 可打印字节：\t \n \r、0x20 ~ 0x7e 以及 UTF-8 多字节字符
+PRINTABLE_BYTES = b'\t\n\r' + bytes(range(0x20, 0x7f)) + bytes(range(0x80, 0x100))
+STRING_PATTERN = re.compile(rb'[\t\n\r\x20-\x7e\x80-\xff]{%d,}' % MIN_STRING_LENGTH)
+
+# numpy 查表：字节值 -> 是否可打印
+PRINTABLE_TABLE = None
+if np is not None:
+    PRINTABLE_TABLE = np.zeros(256, dtype=bool)
+    PRINTABLE_TABLE[np.frombuffer(PRINTABLE_BYTES, dtype=np.uint8)] = True
+
+# CFString 常量结构体: isa, flags, 字符串指针, 长度
+CFSTRING_FORMAT = struct.Struct('<QQQQ')
+
+
+class StringIndex(TextIndexFile):
+    INDEX_NAME = 'strings'
+    INDEX_VERSION = 3
+    INDEX_TITLE = '字符串索引'
+
+    # 已加载的索引：模块 UUID -> StringIndex
+    _loaded: Dict[str, "StringIndex"] = {}
+
+    # 索引字段：blob / positions（见 TextIndexFile），offsets / kinds: 每个字符串的模块偏移和类型
+
+    @property
+    def count(self) -> int:
+        return len(self.fields['offsets'])
+
+    def summary(self) -> str:
+        kinds = self.fields['kinds']
+        cfstrings = sum(1 for kind in kinds if kind == KIND_CFSTRING)
+        return '%d 个 C 字符串，%d 个 CFString%s' % (self.count - cfstrings, cfstrings,
+                                                  '' if np is not None else '（未安装 numpy，使用正则扫描）')
+
+    @classmethod
+    def dataSections(cls, module) -> List[Any]:
+        """[ 模块中可能存放字符串、有磁盘数据的叶子 section（按 section 类型 / 名称选择） ]"""
+        sections = []
+        pending = [module.GetSectionAtIndex(i) for i in range(module.GetNumSections())]
+        while pending:
+            section = pending.pop()
+            if section.GetNumSubSections() > 0:
+                pending.extend(section.GetSubSectionAtIndex(i) for i in range(section.GetNumSubSections()))
+            elif section.GetFileByteSize() > 0 and (section.GetSectionType() in STRING_SECTION_TYPES
+                                                    or section.GetName() in STRING_SECTION_NAMES):
+                sections.append(section)
+        return sorted(sections, key=lambda section: section.GetFileAddress())
+
+    @classmethod
+    def _sectionBytes(cls, section) -> Optional[bytes]:
+        size = section.GetFileByteSize()
+        data = section.GetSectionData()
+        if not data.IsValid() or data.GetByteSize() < size:
+            return None
+        error = lldb.SBError()
+        raw = data.ReadRawData(error, 0, size)
+        return bytes(raw) if error.Success() and raw else None
+
+    @classmethod
+    def escapeText(cls, text: bytes) -> bytes:
+        """[ 换行 / 回车转换为两个字符的转义形式，索引中每个字符串都在同一行 ]"""
+        for raw, escaped in LINE_ESCAPES:
+            text = text.replace(raw, escaped)
+        return text
+
+    @classmethod
+    def _chunks(cls, raw: bytes) -> Iterator[Tuple[int, int]]:
+        """[ 按 CHUNK_SIZE 分块，块在 NUL 之后切分，以 NUL 结尾的字符串不会跨块 ]"""
+        start = 0
+        while start < len(raw):
+            end = min(start + CHUNK_SIZE, len(raw))
+            if end < len(raw):
+                cut = raw.rfind(b'\0', start, end)
+                end = cut + 1 if cut >= start else len(raw)
+            yield start, end
+            start = end
+
+    @classmethod
+    def _scanNumpy(cls, raw: bytes, start: int, end: int) -> List[Tuple[int, int]]:
+        """[ 向量化查找 [start, end) 中的字符串：返回 [(起始, 结束), ...]，结束位置是 NUL ]"""
+        data = np.frombuffer(raw, dtype=np.uint8, count=end - start, offset=start)
+        printable = PRINTABLE_TABLE[data].astype(np.int8)
+
+        # 可打印区间的边界：差分为 1 的位置是起始，为 -1 的位置是结束
+        edges = np.diff(np.concatenate(([0], printable, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        terminated = ends < len(data)
+        terminated[terminated] = data[ends[terminated]] == 0
+        keep = terminated & (ends - starts >= MIN_STRING_LENGTH)
+        return list(zip((starts[keep] + start).tolist(), (ends[keep] + start).tolist()))
+
+    @classmethod
+    def _scanPython(cls, raw: bytes, start: int, end: int) -> List[Tuple[int, int]]:
+        """[ 与 _scanNumpy 相同：每次匹配都是完整的可打印区间，只保留在块内以 NUL 结尾的 ]"""
+        return [match.span() for match in STRING_PATTERN.finditer(raw, start, end)
+                if match.end() < end and raw[match.end()] == 0]
+
+    @classmethod
+    def _pointerTarget(cls, value: int, base: int, ranges: List[Tuple[int, int]]) -> Optional[int]:
+        """[ 磁盘上的指针可能是普通地址或 chained fixup 格式，依次尝试：36 位地址、相对模块基址的 32 位偏移、43 位地址 ]"""
+        for candidate in (value & 0xFFFFFFFFF, base + (value & 0xFFFFFFFF), value & 0x7FFFFFFFFFF):
+            index = bisect.bisect_right(ranges, (candidate, float('inf'))) - 1
+            if index >= 0 and ranges[index][0] <= candidate < ranges[index][1]:
+                return candidate
+        return None
+
+    @classmethod
+    def build(cls, target, module) -> Optional[Dict[str, Any]]:
+        """[ 扫描模块的数据 section，返回索引字段 ]"""
+        scan = cls._scanNumpy if np is not None else cls._scanPython
+
+        texts: List[bytes] = []
+        offsets: List[int] = []
+        kinds: List[int] = []
+        cstrings: Dict[int, bytes] = {}
+        loaded = []
+        for section in cls.dataSections(module):
+            raw = cls._sectionBytes(section)
+            if raw is None:
+                continue
+            address = section.GetFileAddress()
+            raw = Disassembler.decrypt(target, module, address, raw)
+            if raw is None:
+                # 磁盘上是密文，建立的索引会被永久保存，不能使用
+                print('[ 模块已加密（cryptid 不为 0），需要在进程运行时建立字符串索引. ]')
+                return None
+            loaded.append((address, raw, section.GetName()))
+            if section.GetName() == '__cfstring':
+                continue
+            for chunk_start, chunk_end in cls._chunks(raw):
+                for start, end in scan(raw, chunk_start, chunk_end):
+                    text = raw[start:end]
+                    try:
+                        text.decode('utf-8')
+                    except UnicodeDecodeError:
+                        continue
+                    text = cls.escapeText(text)
+                    texts.append(text)
+                    offsets.append(address + start)
+                    kinds.append(KIND_CSTRING)
+                    cstrings[address + start] = text
+
+        if not loaded:
+            print('[ 没有可以扫描的数据 section. ]')
+            return None
+
+        # CFString 常量
+        base = module.GetObjectFileHeaderAddress().GetFileAddress()
+        ranges = [(address, address + len(raw)) for address, raw, _ in loaded]
+        for address, raw, name in loaded:
+            if name != '__cfstring':
+                continue
+            for i, (_, flags, pointer, length) in enumerate(CFSTRING_FORMAT.iter_unpack(raw[:len(raw) - len(raw) % 32])):
+                text_addr = cls._pointerTarget(pointer, base, ranges)
+                if text_addr is None or length == 0:
+                    continue
+                text = cstrings.get(text_addr)
+                if text is None:
+                    owner = bisect.bisect_right(ranges, (text_addr, float('inf'))) - 1
+                    section_addr, section_raw, _ = loaded[owner]
+                    start = text_addr - section_addr
+                    utf16 = flags & 0xFF == 0xD0
+                    text = section_raw[start:start + length * (2 if utf16 else 1)]
+                    text = cls.escapeText(text.decode('utf-16-le' if utf16 else 'utf-8', 'replace').encode('utf-8'))
+                texts.append(text)
+                offsets.append(address + i * CFSTRING_FORMAT.size)
+                kinds.append(KIND_CFSTRING)
+
+        blob, positions = cls.joinTexts(texts)
+        return {
+            'blob': blob,
+            'positions': positions,
+            'offsets': array('Q', offsets),
+            'kinds': array('B', kinds),
+        }
+
+    def search(self, pattern: str, regex: bool = False, ignore_case: bool = False) -> List[int]:
+        """[ 在所有字符串中搜索子串或正则，返回匹配的字符串序号 ]"""
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        source = pattern.encode('utf-8')
+        return self.searchTexts(re.compile(source if regex else re.escape(source), flags))
+
+    def offset(self, i: int) -> int:
+        return self.fields['offsets'][i]
+
+    def kind(self, i: int) -> int:
+        return self.fields['kinds'][i]
+
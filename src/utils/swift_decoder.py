@@ -0,0 +1,303 @@
+import json
+import struct
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from src.utils.read_planner import ReadPlanner
+
+"""
+    类功能：Swift String / Data 以及 Array / Dictionary / Set 的内存解析
+
+    - String / Data 都是两个字长的值（寄存器中为 x_n、x_n+1），规则与 ss / sd 一致：
+      小字符串 / 小 Data 的内容直接存放在两个字中，大字符串 / 大 Data 需要再读取一次堆上的存储
+    - Array / Dictionary / Set 是一个指向存储对象的指针，存储对象头部保存 count / capacity，元素紧跟在头部后面（或存放在桶数组中）
+    - 集合元素分批解析，每批元素以及它们指向的字符串 / Data 内容都通过 ReadPlanner 合并读取，解析完一批输出一批
+"""
+
+# 对象指针掩码（去掉高位的类型标记 / 判别位以及低位标志）
+OBJECT_ADDRESS_MASK = 0x0000fffffffffff8
+
+# 大字符串：countAndFlags 的低 48 位是长度，内容在存储对象 +0x20 处
+STRING_COUNT_MASK = 0x0000ffffffffffff
+STRING_CONTENTS_OFFSET = 0x20
+
+# 字符串 / Data 最多读取的字节数
+MAX_STRING_LENGTH = 0x1000
+MAX_DATA_LENGTH = 0x1000
+
+# Data 最多显示的字节数
+DATA_PREVIEW_LENGTH = 0x40
+
+# 集合元素类型 -> 每个元素的字节数
+ELEMENT_STRIDES = {
+    'string': 16,
+    'data': 16,
+    'int': 8,
+    'ptr': 8,
+}
+
+# 每批解析的元素个数
+CHUNK_SIZE = 256
+
+
+class SwiftDecoder:
+    """[ Swift String / Data 解析（两个字长的值） ]"""
+
+    @classmethod
+    def isSmallString(cls, word1: int) -> bool:
+        # 高 4 位为 0xe（ASCII）或 0xa（非 ASCII）时是小字符串
+        return (word1 >> 60) in (0xe, 0xa)
+
+    @classmethod
+    def smallString(cls, word0: int, word1: int) -> Optional[str]:
+        """[ 小字符串：长度在最高字节的低 4 位，内容按小端序依次存放在 word0、word1 中 ]"""
+        length = (word1 >> 56) & 0xf
+        if length == 0:
+            return "" if word0 == 0 and word1 & 0x00ffffffffffffff == 0 else None
+        raw = word0.to_bytes(8, 'little') + word1.to_bytes(8, 'little')
+        try:
+            return raw[:length].decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+
+    @classmethod
+    def largeStringRange(cls, word0: int, word1: int) -> Optional[Tuple[int, int, int]]:
+        """[ 大字符串：返回 (内容地址, 读取字节数, 实际长度) ]"""
+        address = word1 & OBJECT_ADDRESS_MASK
+        if address == 0:
+            return None
+        count = word0 & STRING_COUNT_MASK
+        return address + STRING_CONTENTS_OFFSET, min(count, MAX_STRING_LENGTH), count
+
+    @classmethod
+    def decodeStrings(cls, process, pairs: Sequence[Tuple[int, int]]) -> List[Optional[str]]:
+        """[ 批量解析字符串，所有大字符串的内容合并读取 ]"""
+        results: List[Optional[str]] = []
+        pending = []
+        planner = ReadPlanner(process)
+        for word0, word1 in pairs:
+            if cls.isSmallString(word1):
+                results.append(cls.smallString(word0, word1))
+                continue
+            results.append(None)
+            string_range = cls.largeStringRange(word0, word1)
+            if string_range is not None:
+                address, size, count = string_range
+                pending.append((len(results) - 1, planner.add(address, size), count > size))
+
+        planner.execute()
+        for index, handle, truncated in pending:
+            data = planner.get(handle)
+            if data is not None:
+                text = data.decode('utf-8', errors='replace')
+                results[index] = text + '...' if truncated else text
+        return results
+
+    @classmethod
+    def decodeString(cls, process, word0: int, word1: int) -> Optional[str]:
+        return cls.decodeStrings(process, [(word0, word1)])[0]
+
+    @classmethod
+    def smallData(cls, word0: int, word1: int) -> Optional[bytes]:
+        """[ 小 Data：长度在 word1 的高 16 位，内容按小端序依次存放在 word0、word1 中 ]"""
+        length = word1 >> 48
+        if 0 < length <= 16:
+            return (word0.to_bytes(8, 'little') + word1.to_bytes(8, 'little'))[:length]
+        return None
+
+    @classmethod
+    def largeDataRange(cls, word0: int, word1: int) -> Optional[Tuple[int, int, int]]:
+        """[ 大 Data：word0 是 Int32 范围（下界、上界），word1 是 __DataStorage，返回 (数据指针所在地址, 起始偏移, 长度) ]"""
+        lower = word0 & 0xffffffff
+        upper = (word0 >> 32) & 0xffffffff
+        storage = word1 & OBJECT_ADDRESS_MASK
+        if storage == 0 or not 0 < upper - lower <= MAX_DATA_LENGTH:
+            return None
+        # __DataStorage: isa, 引用计数, _bytes
+        return storage + 0x10, lower, upper - lower
+
+    @classmethod
+    def decodeDatas(cls, process, pairs: Sequence[Tuple[int, int]]) -> List[Optional[bytes]]:
+        """[ 批量解析 Data：先合并读取所有大 Data 的数据指针，再合并读取数据内容 ]"""
+        results: List[Optional[bytes]] = []
+        pending = []
+        pointer_planner = ReadPlanner(process)
+        for word0, word1 in pairs:
+            small = cls.smallData(word0, word1)
+            results.append(small)
+            if small is not None:
+                continue
+            data_range = cls.largeDataRange(word0, word1)
+            if data_range is not None:
+                slot, lower, length = data_range
+                pending.append((len(results) - 1, pointer_planner.add(slot, 8), lower, length))
+
+        pointer_planner.execute()
+        data_planner = ReadPlanner(process)
+        handles = []
+        for index, handle, lower, length in pending:
+            pointer = pointer_planner.get_pointer(handle)
+            if pointer:
+                handles.append((index, data_planner.add(pointer + lower, length)))
+
+        data_planner.execute()
+        for index, handle in handles:
+            results[index] = data_planner.get(handle)
+        return results
+
+    @classmethod
+    def decodeData(cls, process, word0: int, word1: int) -> Optional[bytes]:
+        return cls.decodeDatas(process, [(word0, word1)])[0]
+
+    @classmethod
+    def formatData(cls, data: bytes) -> str:
+        preview = data[:DATA_PREVIEW_LENGTH]
+        return '{length = %d, bytes = 0x%s%s}' % (len(data), preview.hex(), ' ... ' if len(data) > len(preview) else '')
+
+    @classmethod
+    def formatElements(cls, process, elem_type: str, raw: bytes) -> List[str]:
+        """[ 批量解析并格式化集合元素 ]"""
+        words = struct.unpack('<%dQ' % (len(raw) // 8), raw)
+        if elem_type == 'int':
+            return [str(word - (1 << 64) if word >> 63 else word) for word in words]
+        if elem_type == 'ptr':
+            return ['0x%x' % word for word in words]
+
+        pairs = list(zip(words[0::2], words[1::2]))
+        if elem_type == 'string':
+            values = cls.decodeStrings(process, pairs)
+            return [json.dumps(value, ensure_ascii=False) if value is not None else
+                    '<无法解析: 0x%016x 0x%016x>' % pair for value, pair in zip(values, pairs)]
+
+        values = cls.decodeDatas(process, pairs)
+        return [cls.formatData(value) if value is not None else
+                '<无法解析: 0x%016x 0x%016x>' % pair for value, pair in zip(values, pairs)]
+
+
+class SwiftCollection:
+    """[ Swift Array / Dictionary / Set 的存储对象 ]"""
+
+    def __init__(self, process, storage: int, kind: str, key_type: str = 'ptr', value_type: str = 'ptr'):
+        self.process = process
+        self.storage = storage & OBJECT_ADDRESS_MASK
+        self.kind = kind
+        self.key_type = key_type
+        self.value_type = value_type
+
+        self.count = 0
+        self.capacity = 0
+        # Dictionary / Set：桶数 = 1 << scale，键 / 值 / 元素数组的地址
+        self.scale = 0
+        self.keys_address = 0
+        self.values_address = 0
+
+    @classmethod
+    def kindOfClass(cls, class_name: Optional[str]) -> Optional[str]:
+        """[ 根据存储对象的类名判断集合类型，例如 _TtGCs23_ContiguousArrayStorageSS_ ]"""
+        if not class_name:
+            return None
+        if 'ArrayStorage' in class_name:
+            return 'array'
+        if 'DictionaryStorage' in class_name or 'EmptyDictionarySingleton' in class_name:
+            return 'dict'
+        if 'SetStorage' in class_name or 'EmptySetSingleton' in class_name:
+            return 'set'
+        return None
+
+    def _read(self, address: int, size: int) -> Optional[bytes]:
+        return ReadPlanner.readMany(self.process, [(address, size)])[0]
+
+    def readHeader(self) -> bool:
+        """[ 读取存储对象头部，count / capacity 不合理时返回 False ]"""
+        # Array 的头部 0x20 字节之后就是元素，Dictionary / Set 的头部是 0x40 字节
+        header = self._read(self.storage, 0x20 if self.kind == 'array' else 0x40)
+        if header is None:
+            return False
+
+        # isa, 引用计数, count, capacity（Array 的 capacity 左移了 1 位，最低位是标志）
+        _, _, self.count, capacity = struct.unpack_from('<4Q', header)
+        if self.kind == 'array':
+            self.capacity = capacity >> 1
+        else:
+            # _scale: Int8, _reservedScale: Int8, _extra: Int16, _age: Int32, _seed: Int, 键 / 元素数组, 值数组
+            self.capacity = capacity
+            self.scale = header[0x20]
+            self.keys_address, self.values_address = struct.unpack_from('<2Q', header, 0x30)
+            if self.scale > 48:
+                return False
+        return self.count <= self.capacity
+
+    def _occupiedBuckets(self) -> Optional[List[int]]:
+        """[ 从元数据位图中读取所有已占用的桶 ]"""
+        bucket_count = 1 << self.scale
+        word_count = (bucket_count + 63) // 64
+        # Dictionary 的位图在 +0x40，Set 没有值数组，位图在 +0x38
+        bitmap_address = self.storage + (0x40 if self.kind == 'dict' else 0x38)
+        raw = self._read(bitmap_address, word_count * 8)
+        if raw is None:
+            return None
+
+        buckets = []
+        for word_index, word in enumerate(struct.unpack('<%dQ' % word_count, raw)):
+            while word:
+                low = word & -word
+                bucket = word_index * 64 + low.bit_length() - 1
+                if bucket < bucket_count:
+                    buckets.append(bucket)
+                word ^= low
+        return buckets
+
+    def iterate(self, limit: int = 0) -> Iterator[List[str]]:
+        """[ 分批返回格式化后的元素行，limit 为 0 时不限制个数 ]"""
+        total = self.count if limit <= 0 else min(self.count, limit)
+        if total == 0:
+            return
+
+        if self.kind == 'array':
+            yield from self._iterateArray(total)
+        else:
+            yield from self._iterateBuckets(total)
+
+    def _iterateArray(self, total: int) -> Iterator[List[str]]:
+        stride = ELEMENT_STRIDES[self.value_type]
+        elements = self.storage + 0x20
+        for start in range(0, total, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, total - start)
+            raw = self._read(elements + start * stride, n * stride)
+            if raw is None:
+                yield ['[ 读取元素 %d ~ %d 失败 ]' % (start, start + n - 1)]
+                return
+            values = SwiftDecoder.formatElements(self.process, self.value_type, raw)
+            yield ['[%d] %s' % (start + i, value) for i, value in enumerate(values)]
+
+    def _iterateBuckets(self, total: int) -> Iterator[List[str]]:
+        buckets = self._occupiedBuckets()
+        if buckets is None:
+            yield ['[ 读取元数据位图失败 ]']
+            return
+
+        buckets = buckets[:total]
+        key_stride = ELEMENT_STRIDES[self.key_type]
+        value_stride = ELEMENT_STRIDES[self.value_type]
+        is_dict = self.kind == 'dict'
+        for start in range(0, len(buckets), CHUNK_SIZE):
+            chunk = buckets[start:start + CHUNK_SIZE]
+
+            # 同一批的键和值合并读取
+            planner = ReadPlanner(self.process)
+            key_handles = [planner.add(self.keys_address + bucket * key_stride, key_stride) for bucket in chunk]
+            value_handles = [planner.add(self.values_address + bucket * value_stride, value_stride)
+                             for bucket in chunk] if is_dict else []
+            planner.execute()
+
+            key_raw = [planner.get(handle) for handle in key_handles]
+            value_raw = [planner.get(handle) for handle in value_handles]
+            if any(raw is None for raw in key_raw + value_raw):
+                yield ['[ 读取桶 %d ~ %d 失败 ]' % (chunk[0], chunk[-1])]
+                return
+
+            keys = SwiftDecoder.formatElements(self.process, self.key_type, b''.join(key_raw))
+            if not is_dict:
+                yield ['[%d] %s' % (start + i, key) for i, key in enumerate(keys)]
+                continue
+            values = SwiftDecoder.formatElements(self.process, self.value_type, b''.join(value_raw))
+            yield ['[%s] = %s' % (key, value) for key, value in zip(keys, values)]
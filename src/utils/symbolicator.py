@@ -0,0 +1,191 @@
+import lldb
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from src.handler.data_handler import DataHandler
+
+"""
+    类功能：整个进程范围内的 地址 -> 模块 + 偏移 + 最近符号 解析
+
+    - 所有已加载模块的段按起始地址排序，组成区间索引，使用 bisect 查找地址所属模块
+    - 每个模块的符号表在第一次命中时读取一次，同样排好序用 bisect 查找最近符号
+    - 偏移的含义与 mark / dy 一致：偏移 = 运行时地址 - 模块 ASLR 偏移（即 IDA 中看到的地址）
+"""
+
+# 从文本中提取十六进制地址
+HEX_ADDRESS_RE = re.compile(r'0x[0-9a-fA-F]+')
+
+
+class ModuleIndex:
+    """[ 已加载模块的区间索引 ]"""
+
+    def __init__(self, target):
+        self.target = target
+        # 区间：起始地址 / 结束地址 / 所属模块序号，按起始地址排序
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.owners: List[int] = []
+        # 模块信息：模块名 / ASLR 偏移 / SBModule
+        self.names: List[str] = []
+        self.slides: List[int] = []
+        self.modules: List[object] = []
+        # 模块符号表：模块序号 -> (符号文件地址列表, 符号名列表)
+        self._symbols: Dict[int, Tuple[List[int], List[str]]] = {}
+        self._build()
+
+    def _build(self):
+        intervals = []
+        for module in self.target.module_iter():
+            header = module.GetObjectFileHeaderAddress()
+            header_load = header.GetLoadAddress(self.target)
+            if header_load == lldb.LLDB_INVALID_ADDRESS:
+                continue
+
+            owner = len(self.names)
+            self.names.append(module.GetFileSpec().GetFilename())
+            self.slides.append(header_load - header.GetFileAddress())
+            self.modules.append(module)
+
+            for section in module.section_iter():
+                load_addr = section.GetLoadAddress(self.target)
+                size = section.GetByteSize()
+                # 跳过 __PAGEZERO 等没有映射到内存的段
+                if load_addr == lldb.LLDB_INVALID_ADDRESS or size == 0 or section.GetName() == "__PAGEZERO":
+                    continue
+                intervals.append((load_addr, load_addr + size, owner))
+
+        intervals.sort()
+        self.starts = [item[0] for item in intervals]
+        self.ends = [item[1] for item in intervals]
+        self.owners = [item[2] for item in intervals]
+
+    def find_module(self, address: int) -> Optional[int]:
+        """[ 返回地址所属模块的序号，不属于任何模块时返回 None ]"""
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address < self.ends[i]:
+            return self.owners[i]
+        return None
+
+    def locate(self, address: int) -> Optional[Tuple[int, int]]:
+        """[ 返回 (模块序号, 偏移)，不属于任何模块时返回 None ]"""
+        i = bisect_right(self.starts, address) - 1
+        if i >= 0 and address < self.ends[i]:
+            owner = self.owners[i]
+            return (owner, address - self.slides[owner])
+        return None
+
+    def find_module_by_name(self, name: str) -> Optional[int]:
+        for owner, module_name in enumerate(self.names):
+            if module_name == name:
+                return owner
+        return None
+
+    def symbols(self, owner: int) -> Tuple[List[int], List[str]]:
+        """[ 读取模块符号表（每个模块只读取一次） ]"""
+        table = self._symbols.get(owner)
+        if table is None:
+            entries = []
+            module = self.modules[owner]
+            for i in range(module.GetNumSymbols()):
+                symbol = module.GetSymbolAtIndex(i)
+                file_addr = symbol.GetStartAddress().GetFileAddress()
+                if file_addr == lldb.LLDB_INVALID_ADDRESS or symbol.GetType() == lldb.eSymbolTypeUndefined:
+                    continue
+                name = symbol.GetName()
+                if name:
+                    entries.append((file_addr, name))
+            entries.sort()
+            table = ([item[0] for item in entries], [item[1] for item in entries])
+            self._symbols[owner] = table
+        return table
+
+    def resolve(self, address: int):
+        """[ 解析地址，返回 (模块名, 偏移, 最近符号名, 符号内偏移)，不属于任何模块时返回 None ]"""
+        located = self.locate(address)
+        if located is None:
+            return None
+
+        owner, offset = located
+        symbol_addrs, symbol_names = self.symbols(owner)
+        i = bisect_right(symbol_addrs, offset) - 1
+        if i >= 0:
+            return (self.names[owner], offset, symbol_names[i], offset - symbol_addrs[i])
+        return (self.names[owner], offset, None, 0)
+
+
+class Symbolicator:
+
+    @classmethod
+    def getModuleIndex(cls, target=None) -> Optional[ModuleIndex]:
+        """[ 获取调试目标当前进程的模块索引（缓存在进程状态中），模块加载、卸载或重新映射后自动重建 ]"""
+        if target is None:
+            target = lldb.debugger.GetSelectedTarget()
+        if target is None or not target.IsValid():
+            print("[ 无效的调试目标. ]")
+            return None
+
+        process_state = DataHandler().get_process_state(target)
+        # 同一次停止内模块不会变化，StopID 变化后才重新计算指纹；没有进程时每次都检查指纹
+        process = target.GetProcess()
+        stop_id = process.GetStopID() if process.IsValid() else -1
+        if process_state.module_index is not None and stop_id >= 0 and process_state.module_stop_id == stop_id:
+            return process_state.module_index
+
+        fingerprint = cls._moduleFingerprint(target)
+        if process_state.module_index is None or process_state.module_fingerprint != fingerprint:
+            process_state.module_index = ModuleIndex(target)
+            process_state.module_fingerprint = fingerprint
+        process_state.module_stop_id = stop_id
+        return process_state.module_index
+
+    @classmethod
+    def _moduleFingerprint(cls, target) -> Tuple[int, ...]:
+        """[ 模块指纹：每个模块 header 的加载地址，模块数量相同但卸载后重新加载到其它地址时同样会变化 ]"""
+        return tuple(module.GetObjectFileHeaderAddress().GetLoadAddress(target) for module in target.module_iter())
+
+    @classmethod
+    def format(cls, address: int, resolved) -> str:
+        """[ 格式化解析结果：地址 -> 模块 + 偏移 (符号 + 偏移) ]"""
+        if resolved is None:
+            return "0x%x -> ?" % address
+
+        module_name, offset, symbol_name, delta = resolved
+        line = "0x%x -> %s + 0x%x" % (address, module_name, offset)
+        if symbol_name is not None:
+            line += " (%s + %d)" % (symbol_name, delta) if delta else " (%s)" % symbol_name
+        return line
+
+    @classmethod
+    def symbolicate(cls, addresses, target=None) -> List[str]:
+        """[ 批量解析地址，返回格式化后的结果列表 ]"""
+        index = cls.getModuleIndex(target)
+        if index is None:
+            return []
+
+        resolve = index.resolve
+        return [cls.format(address, resolve(address)) for address in addresses]
+
+    @classmethod
+    def records(cls, addresses, target=None) -> List[dict]:
+        """[ 批量解析地址，返回结构化结果（--json 输出使用） ]"""
+        index = cls.getModuleIndex(target)
+        if index is None:
+            return []
+
+        records = []
+        for address in addresses:
+            resolved = index.resolve(address)
+            if resolved is None:
+                records.append({'address': address, 'module': None})
+                continue
+            module_name, offset, symbol_name, delta = resolved
+            records.append({'address': address, 'module': module_name, 'offset': offset,
+                            'symbol': symbol_name, 'symbol_offset': delta})
+        return records
+
+    @classmethod
+    def readAddressesFromFile(cls, file_path: str) -> List[int]:
+        """[ 从文件（例如崩溃日志）中提取所有十六进制地址 ]"""
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return [int(match, 16) for match in HEX_ADDRESS_RE.findall(f.read())]
@@ -5,6 +5,9 @@ import shlex
 import threading
 
 from src.handler.data_handler import DataHandler
+from src.handler.register_handler import RegisterHandler
+from src.utils.expr_evaluator import ExprEvaluator, ExprSyntaxError, ExprEvalError, FrameContext
+from src.utils.read_planner import ReadPlanner
 
 class Utils:
     _data_handler = None
@@ -47,110 +50,98 @@ class Utils:
 
         
     @classmethod
-    def getMainModuleName(cls):
-        """[ 获取主二进制模块名 ]"""
+    def getTargetState(cls, target=None):
+        """[ 获取调试目标的状态（using 选择的模块、主模块名、进程缓存等） ]"""
         
         cls._data_handler = cls._data_handler if cls._data_handler is not None else DataHandler()
         
-        # 初始化变量
+        if target is None:
+            target = lldb.debugger.GetSelectedTarget()
+        if target is None or not target.IsValid():
+            return None
+        
+        return cls._data_handler.get_target_state(target)
+        
+    @classmethod
+    def getMainModuleName(cls, target=None):
+        """[ 获取主二进制模块名 ]"""
+        
+        if target is None:
+            target = lldb.debugger.GetSelectedTarget()
+        
+        state = cls.getTargetState(target)
+        if state is None:
+            print('[ 获取主二进制模块失败 ]')
+            return ""
+        
+        # 如果已经获取过主模块名，直接使用
+        if state.main_module_name != "":
+            return state.main_module_name
+        
+        # 主模块即目标的可执行文件（没有可执行文件时取第一个模块）
         main_binary_name = ""
-
-        if cls._data_handler.main_module_name == "":
-            # 获取断点
-            interpreter = lldb.debugger.GetCommandInterpreter()
-            
-            # 保存结果
-            return_obj = lldb.SBCommandReturnObject()
-            
-            # 获取主模块的信息
-            interpreter.HandleCommand('image list -o -f', return_obj)
-            
-            # 获取所有返回值
-            output = return_obj.GetOutput()
-            
-            # 提取第一行
-            first_line = output.splitlines()[0]
-            
-            # 用正则把路径提取出来（从第一个 / 开始，到 (0x 出现为止）
-            # 匹配从斜杠开始，直到 (0x 结束的完整路径
-            path_match = re.search(r'(\/[^(]+)\(0x', first_line)
-            if path_match:
-                full_path = path_match.group(1).strip()
-                # 从路径中取最后一个斜杠后的文件名
-                main_binary_name = full_path.split('/')[-1]
-            else:
-                main_binary_name = ""
-            
-            if main_binary_name == "":
-                # print('[ Failed to get main module. ]')
-                print('[ 获取主二进制模块失败 ]')
-            else :
-                # print('[ main module：%s. ]' % main_binary_name)
-                cls._data_handler.main_module_name = main_binary_name
-                print('[ 主二进制模块：%s. ]' % main_binary_name)
-            
-        else:
-            # 如果已经获取过主模块名，直接使用
-            main_binary_name = cls._data_handler.main_module_name     
+        executable = target.GetExecutable()
+        if executable.IsValid() and executable.GetFilename():
+            main_binary_name = executable.GetFilename()
+        elif target.GetNumModules() > 0:
+            main_binary_name = target.GetModuleAtIndex(0).GetFileSpec().GetFilename() or ""
+        
+        if main_binary_name == "":
+            # print('[ Failed to get main module. ]')
+            print('[ 获取主二进制模块失败 ]')
+        else :
+            # print('[ main module：%s. ]' % main_binary_name)
+            state.main_module_name = main_binary_name
+            print('[ 主二进制模块：%s. ]' % main_binary_name)
             
         return main_binary_name
          
     @classmethod
-    def getASLR(cls):
-        """[ 获取 ASLR 偏移地址. ]"""
+    def getASLR(cls, target=None, module_name=None):
+        """[ 获取 ASLR 偏移地址（整数）. ]
+        偏移按 调试目标 + 进程 缓存，进程重新启动后自动重新计算；获取失败时返回 None
+        """
         
-        cls._data_handler = cls._data_handler if cls._data_handler is not None else DataHandler()
-
-        # 获取当前使用的模块名
-        module_name = cls._data_handler.module_name
+        if target is None:
+            target = lldb.debugger.GetSelectedTarget()
+        
+        state = cls.getTargetState(target)
+        if state is None:
+            print("[ 无效的调试目标. ]")
+            return None
 
-        # 默认使用主二进制模块
+        # 获取当前使用的模块名，默认使用主二进制模块
+        if module_name is None:
+            module_name = state.module_name
         if module_name == "":
-            module_name = cls.getMainModuleName()
+            module_name = cls.getMainModuleName(target)
 
-        # 检查模块名是否存在于 ASLR 字典中
-        if module_name in cls._data_handler.aslr_dict:
-            return cls._data_handler.aslr_dict.get(module_name) 
-        else:
-            # 模块名不存在于 ASLR 字典中，尝试获取 ASLR 偏移地址
-            # 获取断点
-            interpreter = lldb.debugger.GetCommandInterpreter()
-            
-            # 保存结果
-            return_obj = lldb.SBCommandReturnObject()
-            
-            # 获取模块的信息
-            exec_command = 'image list -o "%s"' % module_name
-            interpreter.HandleCommand(exec_command, return_obj)
-            
-            # 获取所有返回值
-            output = return_obj.GetOutput()
-            
-            if output is None or output == "":
-                # print("[ Failed to obtain the ASLR offset address of the module, module name: %s. ]" % module_name)
-                print("[ 获取模块 %s 的 ASLR 偏移地址失败. ]" % module_name)
-                return None
-            
-            # 提取第一行
-            first_line = output.splitlines()[0]
-            
-            # 使用正则表达式匹配地址
-            match = re.search(r'0x[0-9a-fA-F]+', first_line)
-
-            address = None
+        process_state = state.process_state(target.GetProcess())
 
-            if match:
-                address = match.group(0)
-                # print('[ ASLR offset address of the %s module: %s ]' % (module_name, address))
-                print('[ 模块 %s 的 ASLR 偏移地址为：%s ]' % (module_name, address))
-            else:
-                # print("[ Failed to obtain the ASLR offset address of the module, module name: %s. ]" % module_name)
-                print("[ 获取模块 %s 的 ASLR 偏移地址失败. ]" % module_name)
-            
-            if address is not None:  
-                cls._data_handler.aslr_dict[module_name] = address
-            
-            return address
+        # 检查模块名是否存在于 ASLR 字典中
+        aslr = process_state.aslr_dict.get(module_name)
+        if aslr is not None:
+            return aslr
+        
+        # 直接通过 SBModule 计算偏移：模块头的运行时地址 - 文件地址
+        module = cls.findModule(target, module_name)
+        if module is None:
+            # print("[ Failed to obtain the ASLR offset address of the module, module name: %s. ]" % module_name)
+            print("[ 获取模块 %s 的 ASLR 偏移地址失败. ]" % module_name)
+            return None
+        
+        header = module.GetObjectFileHeaderAddress()
+        load_address = header.GetLoadAddress(target)
+        if load_address == lldb.LLDB_INVALID_ADDRESS:
+            print("[ 获取模块 %s 的 ASLR 偏移地址失败（模块尚未加载）. ]" % module_name)
+            return None
+        
+        aslr = load_address - header.GetFileAddress()
+        # print('[ ASLR offset address of the %s module: %s ]' % (module_name, address))
+        print('[ 模块 %s 的 ASLR 偏移地址为：0x%x ]' % (module_name, aslr))
+        
+        process_state.aslr_dict[module_name] = aslr
+        return aslr
         
     @classmethod
     def extractAddressesFromCommand(cls, command):
@@ -166,6 +157,79 @@ class Utils:
         # 确保每个地址都有0x前缀
         return [cls.ensure_hex_prefix(addr) for addr in addresses]
 
+    @classmethod
+    def splitExpressions(cls, command):
+        """[ 将命令字符串拆分为多个地址表达式 ]
+        括号内的空格、以及运算符两侧的空格不会拆分表达式，例如：
+        ($x8 + 0x20) 0x1234 $x0+8 -> ['($x8 + 0x20)', '0x1234', '$x0+8']
+        """
+        if command is None or command.strip() == "":
+            return []
+
+        expressions = []
+        current = ""
+        depth = 0
+        for token in shlex.split(command):
+            joinable = current != "" and (
+                depth > 0
+                or re.search(r'(<<|>>|[-+*&|^~(\[])$', current)
+                or re.match(r'(<<|>>|[-+&|^)\]])', token)
+            )
+            if joinable:
+                current = current + " " + token
+            else:
+                if current:
+                    expressions.append(current)
+                current = token
+                depth = 0
+            depth += token.count('(') + token.count('[') - token.count(')') - token.count(']')
+
+        if current:
+            expressions.append(current)
+        return expressions
+
+    @classmethod
+    def parseAddress(cls, exe_ctx, expr):
+        """[ 计算地址表达式的值 ]
+        先使用 ExprEvaluator 直接读取寄存器和内存求值，只有快速求值器无法解析的表达式才交给 LLDB 表达式求值。
+        单独的十六进制数字（例如 1063c2c10）按十六进制处理，与 ensure_hex_prefix 的约定保持一致。
+        """
+        if expr is None or expr.strip() == "":
+            return None
+        expr = expr.strip()
+
+        # 不带 0x 前缀的单个数字，默认是十六进制
+        if re.fullmatch(r'[0-9a-fA-F]+', expr):
+            return int(expr, 16)
+
+        frame = exe_ctx.GetFrame() if exe_ctx is not None else None
+        process = exe_ctx.GetProcess() if exe_ctx is not None else None
+        has_frame = frame is not None and frame.IsValid()
+
+        try:
+            if ExprEvaluator.is_constant(expr):
+                return ExprEvaluator.evaluate(expr, None)
+            if has_frame:
+                return ExprEvaluator.evaluate(expr, FrameContext(frame, process))
+        except ExprSyntaxError:
+            pass
+        except ExprEvalError as e:
+            print('[ 表达式 %s 求值失败: %s ]' % (expr, e))
+            return None
+
+        # 快速求值器不支持的表达式，交给 LLDB 表达式求值
+        if has_frame:
+            value = frame.EvaluateExpression(expr)
+        else:
+            value = lldb.debugger.GetSelectedTarget().EvaluateExpression(expr)
+
+        if value is None or not value.GetError().Success():
+            error = value.GetError().GetCString() if value is not None else ""
+            print('[ 表达式 %s 求值失败: %s ]' % (expr, error))
+            return None
+
+        return value.GetValueAsUnsigned()
+
     @classmethod
     def get_pc_value(cls,exe_ctx):
         # 获取当前线程
@@ -182,20 +246,8 @@ class Utils:
             print("[ 无效帧. ]")
             return None
 
-        # 通过寄存器名“pc”或者“rip”（x86_64）获取寄存器值
-        # 注意不同架构寄存器名可能不同，如 ARM 是“pc”，x86_64 是“rip”
-        
-        pc_value = None
-        
-        # 先尝试通用名称"pc"
-        reg = frame.FindRegister("pc")
-        if reg.IsValid():
-            pc_value = reg.GetValueAsUnsigned()
-        else:
-            # 备用尝试x86_64架构rip寄存器
-            reg = frame.FindRegister("rip")
-            if reg.IsValid():
-                pc_value = reg.GetValueAsUnsigned()
+        # 从本次停止的寄存器快照中读取 pc（x86_64 下会自动映射到 rip）
+        pc_value = RegisterHandler().read(frame, "pc")
         
         if pc_value is None:
             # print("[Failed to get PC register value]")
@@ -204,5 +256,64 @@ class Utils:
         
         return pc_value
 
+    @classmethod
+    def readRegisters(cls, exe_ctx, names):
+        """[ 从本次停止的寄存器快照中读取多个寄存器，返回 {寄存器名: 值}，读取失败的寄存器不会出现在结果中 ]"""
+        frame = exe_ctx.GetFrame()
+        if not frame.IsValid():
+            print("[ 无效帧. ]")
+            return {}
+        
+        register_handler = RegisterHandler()
+        reg_values = {}
+        for name in names:
+            value = register_handler.read(frame, name)
+            if value is not None:
+                reg_values[name] = value
+        return reg_values
+
+    @classmethod
+    def readPointers(cls, exe_ctx, exprs):
+        """[ 计算多个地址表达式并合并读取其中的指针，返回 [(地址, 指针), ...]，失败的项为 None ]"""
+        process = exe_ctx.GetProcess()
+        planner = ReadPlanner(process)
+        pointer_size = process.GetAddressByteSize() or 8
 
-    
\ No newline at end of file
+        addresses = [cls.parseAddress(exe_ctx, expr) for expr in exprs]
+        handles = [planner.add(address, pointer_size) if address is not None else None for address in addresses]
+        planner.execute()
+
+        pointers = []
+        for address, handle in zip(addresses, handles):
+            pointer = planner.get_pointer(handle) if handle is not None else None
+            pointers.append((address, pointer) if pointer is not None else None)
+        if planner.saved > 0:
+            print(planner.summary())
+        return pointers
+
+    @classmethod
+    def getUsingModuleName(cls, target=None):
+        """[ 获取 using 指定的模块名，没有指定时使用主二进制模块 ]"""
+        state = cls.getTargetState(target)
+        
+        module_name = state.module_name if state is not None else ""
+        if module_name == "":
+            module_name = cls.getMainModuleName(target)
+        return module_name
+
+    @classmethod
+    def findModule(cls, target, module_name):
+        """[ 根据模块名查找 SBModule，找不到时返回 None ]"""
+        if target is None or not target.IsValid() or not module_name:
+            return None
+        
+        module = target.FindModule(lldb.SBFileSpec(module_name, False))
+        if module.IsValid():
+            return module
+        
+        # 按文件名再匹配一次（例如传入的是完整路径）
+        file_name = os.path.basename(module_name)
+        for module in target.module_iter():
+            if module.GetFileSpec().GetFilename() == file_name:
+                return module
+        return None
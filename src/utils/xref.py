@@ -0,0 +1,271 @@
+import lldb
+import bisect
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.disassembler import Disassembler
+from src.utils.index_store import ModuleIndexFile
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""
+    类功能：ARM64 交叉引用索引（调用方 / 被调用方 / 数据引用）
+
+    - 扫描模块所有代码 section（按 section 类型 / 名称选择）的磁盘字节（加密的范围读取进程内存，没有进程时不建立索引），按 uint32 指令字解码 BL / B（调用、尾调用）以及 ADRP + ADD / ADRP + LDR（数据引用）
+    - 安装了 numpy 时整个 section 一次性转换为 uint32 数组，用掩码向量化解码；没有安装时使用纯 Python 逐条解码，结果相同
+    - 索引按模块 UUID 持久化（见 ModuleIndexFile），同一个二进制再次调试时直接 mmap 加载；地址均为模块偏移（文件地址，与 IDA 一致）
+"""
+
+# 引用类型
+KIND_CALL = 0       # BL
+KIND_JUMP = 1       # B（尾调用 / 函数内跳转）
+KIND_ADD = 2        # ADRP + ADD（取地址）
+KIND_LOAD = 3       # ADRP + LDR（读取指针，例如 GOT、selector 引用）
+
+KIND_NAMES = {KIND_CALL: 'BL', KIND_JUMP: 'B', KIND_ADD: 'ADRP+ADD', KIND_LOAD: 'ADRP+LDR'}
+
+# 按名称识别的代码 section（LLDB 中 Mach-O section 的权限继承自所在 segment，__TEXT 中的 __cstring 等也是可执行的，不能按权限选择）
+CODE_SECTION_NAMES = ('__text', '__stubs', '__auth_stubs', '.text', '.plt', '.plt.sec', '.init', '.fini')
+
+
+class XrefIndex(ModuleIndexFile):
+    INDEX_NAME = 'xref'
+    INDEX_VERSION = 3
+    INDEX_TITLE = '交叉引用索引'
+
+    # 已加载的索引：模块 UUID -> XrefIndex
+    _loaded: Dict[str, "XrefIndex"] = {}
+
+    # 索引字段：
+    # 按调用位置排序：out_sites / out_targets / out_kinds
+    # 按被调用地址排序：in_targets / in_sites / in_kinds
+    # 按数据地址排序：data_targets / data_sites / data_kinds
+
+    @property
+    def call_count(self) -> int:
+        return len(self.fields['out_sites'])
+
+    @property
+    def data_count(self) -> int:
+        return len(self.fields['data_sites'])
+
+    def summary(self) -> str:
+        return '%d 条调用 / 跳转，%d 条数据引用%s' % (self.call_count, self.data_count,
+                                                '' if np is not None else '（未安装 numpy，使用纯 Python 解码）')
+
+    @classmethod
+    def isSupported(cls, target) -> bool:
+        triple = target.GetTriple() or ''
+        return triple.startswith('arm64') or triple.startswith('aarch64')
+
+    @classmethod
+    def executableSections(cls, module) -> List[Any]:
+        """[ 模块中所有代码叶子 section（Mach-O 的 __text / __stubs 等，ELF 的 .text / .plt 等），按 section 类型 / 名称选择 ]"""
+        sections = []
+        pending = [module.GetSectionAtIndex(i) for i in range(module.GetNumSections())]
+        while pending:
+            section = pending.pop()
+            if section.GetNumSubSections() > 0:
+                pending.extend(section.GetSubSectionAtIndex(i) for i in range(section.GetNumSubSections()))
+            elif section.GetByteSize() > 0 and (section.GetSectionType() == lldb.eSectionTypeCode
+                                                or section.GetName() in CODE_SECTION_NAMES):
+                sections.append(section)
+        return sorted(sections, key=lambda section: section.GetFileAddress())
+
+    @classmethod
+    def moduleRange(cls, module) -> Tuple[int, int]:
+        """[ 模块的文件地址范围 [low, high)（不包括 __PAGEZERO），超出范围的目标都不是有效引用 ]"""
+        low, high = None, None
+        for i in range(module.GetNumSections()):
+            section = module.GetSectionAtIndex(i)
+            size = section.GetByteSize()
+            if size == 0 or section.GetName() == '__PAGEZERO':
+                continue
+            start = section.GetFileAddress()
+            low = start if low is None else min(low, start)
+            high = start + size if high is None else max(high, start + size)
+        return (low or 0, high or 0)
+
+    @classmethod
+    def _sectionBytes(cls, section) -> Optional[bytes]:
+        size = section.GetByteSize()
+        data = section.GetSectionData()
+        if not data.IsValid() or data.GetByteSize() < size:
+            return None
+        error = lldb.SBError()
+        raw = data.ReadRawData(error, 0, size)
+        return bytes(raw) if error.Success() and raw else None
+
+    @classmethod
+    def build(cls, target, module) -> Optional[Dict[str, Any]]:
+        """[ 扫描模块的可执行 section，返回索引字段 ]"""
+        if not cls.isSupported(target):
+            print('[ 交叉引用索引只支持 arm64 / aarch64 目标. ]')
+            return None
+
+        low, high = cls.moduleRange(module)
+        chunks = []
+        for section in cls.executableSections(module):
+            raw = cls._sectionBytes(section)
+            if raw is None:
+                print('[ 无法读取 section %s 的磁盘数据，已跳过 ]' % section.GetName())
+                continue
+            raw = Disassembler.decrypt(target, module, section.GetFileAddress(), raw)
+            if raw is None:
+                # 磁盘上是密文，建立的索引会被永久保存，不能使用
+                print('[ 模块已加密（cryptid 不为 0），需要在进程运行时建立交叉引用索引. ]')
+                return None
+            decode = cls._decodeNumpy if np is not None else cls._decodePython
+            chunks.append(decode(section.GetFileAddress(), raw, low, high))
+
+        if not chunks:
+            print('[ 没有可以扫描的可执行 section. ]')
+            return None
+        return cls._buildNumpy(chunks) if np is not None else cls._buildPython(chunks)
+
+    @classmethod
+    def _decodeNumpy(cls, base: int, raw: bytes, low: int, high: int):
+        """[ 向量化解码一个 section：返回 (调用位置, 目标, 类型), (引用位置, 目标, 类型)，目标不在模块范围 [low, high) 内的丢弃 ]"""
+        words = np.frombuffer(raw, dtype='<u4', count=len(raw) // 4)
+        pcs = np.uint64(base) + np.arange(len(words), dtype=np.uint64) * np.uint64(4)
+
+        # BL: 100101 imm26，B: 000101 imm26
+        opcode = words & np.uint32(0xFC000000)
+        branch = np.flatnonzero((opcode == np.uint32(0x94000000)) | (opcode == np.uint32(0x14000000)))
+        imm26 = (words[branch] & np.uint32(0x03FFFFFF)).astype(np.int64)
+        imm26 = (imm26 ^ 0x02000000) - 0x02000000
+        call_targets = pcs[branch].astype(np.int64) + imm26 * 4
+        # 向后跳转（或被当作指令解码的数据）可能得到负数或模块外的目标，在转换为无符号数之前丢弃
+        inside = (call_targets >= low) & (call_targets < high)
+        branch, call_targets = branch[inside], call_targets[inside]
+        call_sites = pcs[branch]
+        call_targets = call_targets.astype(np.uint64)
+        call_kinds = np.where(opcode[branch] == np.uint32(0x94000000), KIND_CALL, KIND_JUMP).astype(np.uint8)
+
+        # ADRP: 1 immlo 10000 immhi Rd，下一条指令是以 Rd 为基址的 ADD（立即数）/ LDR（64 位无符号偏移）
+        adrp = np.flatnonzero((words[:-1] & np.uint32(0x9F000000)) == np.uint32(0x90000000))
+        first = words[adrp]
+        second = words[adrp + 1]
+        same_reg = (first & np.uint32(0x1F)) == ((second >> np.uint32(5)) & np.uint32(0x1F))
+        is_add = same_reg & ((second & np.uint32(0xFF800000)) == np.uint32(0x91000000))
+        is_load = same_reg & ((second & np.uint32(0xFFC00000)) == np.uint32(0xF9400000))
+        keep = is_add | is_load
+        adrp, first, second, is_add = adrp[keep], first[keep], second[keep], is_add[keep]
+
+        imm21 = (((first >> np.uint32(5)) & np.uint32(0x7FFFF)) << np.uint32(2) | ((first >> np.uint32(29)) & np.uint32(3))).astype(np.int64)
+        imm21 = (imm21 ^ 0x100000) - 0x100000
+        pages = (pcs[adrp] & ~np.uint64(0xFFF)).astype(np.int64) + (imm21 << 12)
+
+        imm12 = ((second >> np.uint32(10)) & np.uint32(0xFFF)).astype(np.int64)
+        shift = ((second >> np.uint32(22)) & np.uint32(1)).astype(np.int64) * 12
+        offsets = np.where(is_add, imm12 << shift, imm12 * 8)
+
+        data_targets = pages + offsets
+        inside = (pages >= low) & (data_targets >= low) & (data_targets < high)
+        adrp, data_targets, is_add = adrp[inside], data_targets[inside], is_add[inside]
+        data_sites = pcs[adrp]
+        data_targets = data_targets.astype(np.uint64)
+        data_kinds = np.where(is_add, KIND_ADD, KIND_LOAD).astype(np.uint8)
+        return (call_sites, call_targets, call_kinds), (data_sites, data_targets, data_kinds)
+
+    @classmethod
+    def _decodePython(cls, base: int, raw: bytes, low: int, high: int):
+        """[ 纯 Python 解码一个 section，规则与 _decodeNumpy 相同 ]"""
+        words = array('I', raw[:len(raw) - len(raw) % 4])
+        if sys.byteorder == 'big':
+            words.byteswap()
+
+        call_sites, call_targets, call_kinds = [], [], []
+        data_sites, data_targets, data_kinds = [], [], []
+        last = len(words) - 1
+        for i, word in enumerate(words):
+            pc = base + i * 4
+            opcode = word & 0xFC000000
+            if opcode == 0x94000000 or opcode == 0x14000000:
+                imm26 = ((word & 0x03FFFFFF) ^ 0x02000000) - 0x02000000
+                target = pc + imm26 * 4
+                if not low <= target < high:
+                    continue
+                call_sites.append(pc)
+                call_targets.append(target)
+                call_kinds.append(KIND_CALL if opcode == 0x94000000 else KIND_JUMP)
+            elif (word & 0x9F000000) == 0x90000000 and i < last:
+                second = words[i + 1]
+                if (word & 0x1F) != ((second >> 5) & 0x1F):
+                    continue
+                imm12 = (second >> 10) & 0xFFF
+                if (second & 0xFF800000) == 0x91000000:
+                    offset, kind = imm12 << (12 if second & 0x400000 else 0), KIND_ADD
+                elif (second & 0xFFC00000) == 0xF9400000:
+                    offset, kind = imm12 * 8, KIND_LOAD
+                else:
+                    continue
+                imm21 = ((((word >> 5) & 0x7FFFF) << 2 | (word >> 29) & 3) ^ 0x100000) - 0x100000
+                page = (pc & ~0xFFF) + (imm21 << 12)
+                target = page + offset
+                if page < low or not low <= target < high:
+                    continue
+                data_sites.append(pc)
+                data_targets.append(target)
+                data_kinds.append(kind)
+        return (call_sites, call_targets, call_kinds), (data_sites, data_targets, data_kinds)
+
+    @classmethod
+    def _buildNumpy(cls, chunks) -> Dict[str, Any]:
+        calls = [np.concatenate([chunk[0][i] for chunk in chunks]) for i in range(3)]
+        datas = [np.concatenate([chunk[1][i] for chunk in chunks]) for i in range(3)]
+
+        # section 按地址顺序扫描，调用位置本身已经有序；按目标地址稳定排序得到反向索引
+        by_target = np.argsort(calls[1], kind='stable')
+        by_data = np.argsort(datas[1], kind='stable')
+        return {
+            'out_sites': calls[0], 'out_targets': calls[1], 'out_kinds': calls[2],
+            'in_targets': calls[1][by_target], 'in_sites': calls[0][by_target], 'in_kinds': calls[2][by_target],
+            'data_targets': datas[1][by_data], 'data_sites': datas[0][by_data], 'data_kinds': datas[2][by_data],
+        }
+
+    @classmethod
+    def _buildPython(cls, chunks) -> Dict[str, Any]:
+        calls = [[value for chunk in chunks for value in chunk[0][i]] for i in range(3)]
+        datas = [[value for chunk in chunks for value in chunk[1][i]] for i in range(3)]
+
+        by_target = sorted(range(len(calls[1])), key=calls[1].__getitem__)
+        by_data = sorted(range(len(datas[1])), key=datas[1].__getitem__)
+        return {
+            'out_sites': array('Q', calls[0]), 'out_targets': array('Q', calls[1]), 'out_kinds': array('B', calls[2]),
+            'in_targets': array('Q', [calls[1][i] for i in by_target]),
+            'in_sites': array('Q', [calls[0][i] for i in by_target]),
+            'in_kinds': array('B', [calls[2][i] for i in by_target]),
+            'data_targets': array('Q', [datas[1][i] for i in by_data]),
+            'data_sites': array('Q', [datas[0][i] for i in by_data]),
+            'data_kinds': array('B', [datas[2][i] for i in by_data]),
+        }
+
+    def _lookup(self, prefix: str, offset: int) -> List[Tuple[int, int]]:
+        targets = self.fields[prefix + '_targets']
+        sites = self.fields[prefix + '_sites']
+        kinds = self.fields[prefix + '_kinds']
+        start = bisect.bisect_left(targets, offset)
+        end = bisect.bisect_right(targets, offset, start)
+        return [(int(sites[i]), int(kinds[i])) for i in range(start, end)]
+
+    def callers(self, offset: int) -> List[Tuple[int, int]]:
+        """[ 调用 / 跳转到 offset 的所有位置：[(调用位置, 类型), ...] ]"""
+        return self._lookup('in', offset)
+
+    def dataRefs(self, offset: int) -> List[Tuple[int, int]]:
+        """[ 通过 ADRP + ADD / LDR 引用 offset 的所有位置：[(引用位置, 类型), ...] ]"""
+        return self._lookup('data', offset)
+
+    def callees(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """[ [start, end) 范围内的所有调用 / 跳转：[(调用位置, 目标, 类型), ...] ]"""
+        sites = self.fields['out_sites']
+        targets = self.fields['out_targets']
+        kinds = self.fields['out_kinds']
+        first = bisect.bisect_left(sites, start)
+        last = bisect.bisect_left(sites, end, first)
+        return [(int(sites[i]), int(targets[i]), int(kinds[i])) for i in range(first, last)]
@@ -0,0 +1,31 @@
+import struct
+
+from src.utils.macho import (MachOFile, MACH_HEADER_64, SEGMENT_COMMAND_64, MH_MAGIC_64, CPU_TYPE_ARM64,
+                             LC_SEGMENT_64, LC_ENCRYPTION_INFO_64)
+
+
+def _write_macho(path, cryptid):
+    # __TEXT: 虚拟地址 0x100000000，文件偏移 0 ~ 0x8000，加密范围为文件偏移 0x4000 ~ 0x6000
+    segment = struct.pack('<II', LC_SEGMENT_64, 8 + SEGMENT_COMMAND_64.size) + SEGMENT_COMMAND_64.pack(
+        b'__TEXT', 0x100000000, 0x8000, 0, 0x8000, 5, 5, 0, 0)
+    encryption = struct.pack('<IIIIII', LC_ENCRYPTION_INFO_64, 24, 0x4000, 0x2000, cryptid, 0)
+    commands = segment + encryption
+    header = MACH_HEADER_64.pack(MH_MAGIC_64, CPU_TYPE_ARM64, 0, 2, 2, len(commands), 0, 0)
+    path.write_bytes(header + commands + b'\0' * 0x100)
+
+
+def test_encrypted_range(tmp_path):
+    path = tmp_path / 'encrypted'
+    _write_macho(path, 1)
+    with MachOFile(str(path)) as macho:
+        assert macho.encrypted_range == (0x100004000, 0x100006000)
+    assert MachOFile.encryptedRange(str(path)) == (0x100004000, 0x100006000)
+
+
+def test_decrypted_binary_has_no_encrypted_range(tmp_path):
+    path = tmp_path / 'decrypted'
+    _write_macho(path, 0)
+    with MachOFile(str(path)) as macho:
+        assert macho.encrypted_range is None
+    assert MachOFile.encryptedRange(str(path)) is None
+    assert MachOFile.encryptedRange(str(tmp_path / 'missing')) is None
@@ -0,0 +1,82 @@
+import sys
+import types
+
+# ObjCDecoder._tagged_string 是纯 Python 函数，没有安装 LLDB 的 Python 中也可以测试
+sys.modules.setdefault('lldb', types.ModuleType('lldb'))
+
+from src.utils.objc_decoder import ObjCDecoder, TAGGED_STRING_TABLE
+
+
+def _packed(text: str, bits: int, table: str) -> int:
+    # 6 位 / 5 位编码：第一个字符在最高位
+    value = 0
+    for char in text:
+        value = (value << bits) | table.index(char)
+    return (value << 4) | len(text)
+
+
+def test_tagged_string_8bit_first_char_in_lowest_byte():
+    payload = (int.from_bytes(b'abc', 'little') << 4) | 3
+    assert ObjCDecoder._tagged_string(payload) == 'abc'
+
+
+def test_tagged_string_8bit_max_length():
+    payload = (int.from_bytes(b'abcdefg', 'little') << 4) | 7
+    assert ObjCDecoder._tagged_string(payload) == 'abcdefg'
+
+
+def test_tagged_string_6bit():
+    text = 'eilotrm.'
+    assert ObjCDecoder._tagged_string(_packed(text, 6, TAGGED_STRING_TABLE)) == text
+
+
+def test_tagged_string_5bit():
+    text = 'eilotrmapd'
+    assert ObjCDecoder._tagged_string(_packed(text, 5, TAGGED_STRING_TABLE[:32])) == text
+
+
+class _FakeMemory(ObjCDecoder):
+    """[ 不读取进程：字段值来自字典，_pointers 记录读取的总个数 ]"""
+
+    def __init__(self, words, max_items=4):
+        self.words = words
+        self.max_items = max_items
+        self.pointers_read = 0
+
+    def _u64(self, address):
+        return self.words.get(address, 0)
+
+    def _unsigned(self, address, size):
+        return self.words.get(address, 0) & ((1 << (size * 8)) - 1)
+
+    def _pointers(self, address, count):
+        self.pointers_read += count
+        return [self.words.get(address + i * 8, 0) for i in range(count)]
+
+
+def test_dictionary_invalid_szidx_is_undecodable():
+    decoder = _FakeMemory({0x1008: (63 << 58) | 5})
+    assert decoder.dictionary_entries(0x1000, '__NSDictionaryI') == (0, None)
+    decoder = _FakeMemory({0x1014: (50 << 26) | 5})
+    assert decoder.dictionary_entries(0x1000, '__NSDictionaryM') == (0, None)
+
+
+def test_dictionary_large_capacity_read_is_bounded():
+    # szidx 39 对应约 4.7 亿个槽位，只有第一个槽位有键
+    decoder = _FakeMemory({0x1008: (39 << 58) | 1, 0x1010: 0xaaa0, 0x1018: 0xbbb0})
+    count, entries = decoder.dictionary_entries(0x1000, '__NSDictionaryI')
+    assert (count, entries) == (1, [(0xaaa0, 0xbbb0)])
+    assert decoder.pointers_read <= decoder.max_items * 16 * 2
+
+
+def test_dictionary_mutable_stops_after_max_items():
+    buffer = 0x8000
+    capacity = 41
+    words = {0x1008: buffer, 0x1014: (5 << 26) | 10}
+    for i in range(10):
+        words[buffer + i * 8] = 0x100 + i
+        words[buffer + (capacity + i) * 8] = 0x200 + i
+    decoder = _FakeMemory(words, max_items=3)
+    count, entries = decoder.dictionary_entries(0x1000, '__NSDictionaryM')
+    assert count == 10
+    assert entries == [(0x100, 0x200), (0x101, 0x201), (0x102, 0x202)]
@@ -0,0 +1,56 @@
+import sys
+import time
+import types
+
+import pytest
+
+# StringIndex 的扫描函数只处理字节串，没有安装 LLDB 的 Python 中也可以测试（模块级只用到 section 类型常量）
+lldb = sys.modules.setdefault('lldb', types.ModuleType('lldb'))
+for _name, _value in (('eSectionTypeDataCString', 5), ('eSectionTypeDataObjCCFStrings', 25), ('eSectionTypeData', 4)):
+    if not hasattr(lldb, _name):
+        setattr(lldb, _name, _value)
+
+from src.utils.string_index import StringIndex, np
+
+
+CRAFTED = (
+    b'\x00abc\x00'                     # 太短
+    b'abcd\x00'                        # 刚好 4 个字符
+    b'\x01\x02hello world\x00'         # 前面是不可打印字节
+    b'tab\there\r\nnext\x00'           # \t \r \n 属于可打印
+    b'\xe4\xb8\xad\xe6\x96\x87\x00'    # UTF-8
+    b'no terminator\x01'               # 后面不是 NUL
+    + b'A' * 5000 + b'\x02'            # 很长、没有 NUL 结尾
+    + b'x' * 100 + b'\x00'
+    + b'tail without nul'              # 块的结尾
+)
+
+
+def test_scan_python_spans():
+    spans = StringIndex._scanPython(CRAFTED, 0, len(CRAFTED))
+    texts = [CRAFTED[start:end] for start, end in spans]
+    assert texts == [b'abcd', b'hello world', b'tab\there\r\nnext', '中文'.encode(), b'x' * 100]
+    assert all(CRAFTED[end] == 0 for _, end in spans)
+
+
+def test_scan_python_respects_chunk_end():
+    raw = b'\x00abcdef\x00ghijkl\x00'
+    # 块在第二个字符串的 NUL 之前结束，该字符串不计入
+    assert StringIndex._scanPython(raw, 0, 14) == [(1, 7)]
+    assert StringIndex._scanPython(raw, 8, len(raw)) == [(8, 14)]
+
+
+def test_scan_python_unterminated_run_is_linear():
+    raw = b'A' * 400000 + b'\x01'
+    start_time = time.perf_counter()
+    assert StringIndex._scanPython(raw, 0, len(raw)) == []
+    assert time.perf_counter() - start_time < 1.0
+
+
+@pytest.mark.skipif(np is None, reason='需要 numpy')
+def test_scan_python_matches_numpy():
+    samples = [CRAFTED, b'abcd', b'abcd\x00', b'\x00' * 16, bytes(range(256)) * 8 + b'\x00']
+    for raw in samples:
+        for start, end in ((0, len(raw)), (1, len(raw) - 1), (3, len(raw))):
+            if start < end:
+                assert StringIndex._scanPython(raw, start, end) == StringIndex._scanNumpy(raw, start, end)
@@ -0,0 +1,95 @@
+import random
+import struct
+import sys
+import types
+
+import pytest
+
+# XrefIndex 的解码函数只处理字节串，没有安装 LLDB 的 Python 中也可以测试
+sys.modules.setdefault('lldb', types.ModuleType('lldb'))
+
+from src.utils.xref import XrefIndex, np, KIND_CALL, KIND_JUMP, KIND_ADD, KIND_LOAD
+
+BASE = 0x100004000
+LOW, HIGH = 0x100000000, 0x100100000
+
+
+def _bl(pc, target, opcode=0x94000000):
+    return opcode | (((target - pc) >> 2) & 0x03FFFFFF)
+
+
+def _adrp(pc, target, reg):
+    imm = ((target & ~0xFFF) - (pc & ~0xFFF)) >> 12
+    return 0x90000000 | (imm & 3) << 29 | ((imm >> 2) & 0x7FFFF) << 5 | reg
+
+
+def _add(reg, imm12, dst=None):
+    return 0x91000000 | imm12 << 10 | reg << 5 | (reg if dst is None else dst)
+
+
+def _ldr(reg, offset):
+    return 0xF9400000 | (offset // 8) << 10 | reg << 5 | reg
+
+
+def _crafted():
+    words = []
+
+    def pc():
+        return BASE + len(words) * 4
+
+    words.append(_bl(pc(), 0x100008000))                    # BL 向前
+    words.append(_bl(pc(), 0x100000100))                    # BL 向后
+    words.append(_bl(pc(), 0x100010000, 0x14000000))        # B
+    words.append(0x96000000)                                # BL 向后 128MB（模块外）
+    words.append(_bl(pc(), 0x100200000))                    # BL 到模块外
+    words += [_adrp(pc(), 0x100050000, 8), _add(8, 0x123)]                  # ADRP + ADD
+    words += [_adrp(pc(), 0x100060000, 9), _ldr(9, 0x40)]                   # ADRP + LDR
+    words += [_adrp(pc(), 0x100070000, 1), _add(2, 0x10)]                   # 寄存器不同
+    words += [_adrp(pc(), 0x100070000, 3), 0x91400000 | 1 << 10 | 3 << 5 | 3]  # ADD lsl #12
+    words += [_adrp(pc(), 0x100400000, 4), _add(4, 0x10)]                   # 目标在模块外
+    words += [_adrp(pc(), 0x0FFFF8000, 5), _add(5, 0x10)]                   # 页在模块之前
+    words.append(_adrp(pc(), 0x100050000, 6))               # 最后一条 ADRP
+    return b''.join(struct.pack('<I', word & 0xFFFFFFFF) for word in words)
+
+
+def test_decode_python_crafted():
+    (call_sites, call_targets, call_kinds), (data_sites, data_targets, data_kinds) = \
+        XrefIndex._decodePython(BASE, _crafted(), LOW, HIGH)
+    assert list(zip(call_sites, call_targets, call_kinds)) == [
+        (BASE, 0x100008000, KIND_CALL), (BASE + 4, 0x100000100, KIND_CALL), (BASE + 8, 0x100010000, KIND_JUMP)]
+    assert list(zip(data_sites, data_targets, data_kinds)) == [
+        (BASE + 0x14, 0x100050123, KIND_ADD), (BASE + 0x1c, 0x100060040, KIND_LOAD),
+        (BASE + 0x2c, 0x100071000, KIND_ADD)]
+
+
+def test_decode_python_drops_negative_targets():
+    # 模块从 0 开始时，向后跳转和 ADRP 的页可能是负数
+    words = [_bl(0x1000, -0x2000), _adrp(0x1004, -0x3000, 1), _add(1, 0x10), _bl(0x100c, 0x800)]
+    raw = b''.join(struct.pack('<I', word & 0xFFFFFFFF) for word in words)
+    calls, datas = XrefIndex._decodePython(0x1000, raw, 0, 0x10000)
+    assert list(zip(*calls)) == [(0x100c, 0x800, KIND_CALL)]
+    assert list(zip(*datas)) == []
+    index = XrefIndex._buildPython([(calls, datas)])
+    assert list(index['in_targets']) == [0x800]
+    if np is not None:
+        vectorized = XrefIndex._buildNumpy([XrefIndex._decodeNumpy(0x1000, raw, 0, 0x10000)])
+        assert all(list(index[key]) == [int(value) for value in vectorized[key]] for key in index)
+
+
+@pytest.mark.skipif(np is None, reason='需要 numpy')
+def test_decode_numpy_matches_python():
+    random.seed(1)
+    choices = [
+        lambda: 0x90000000 | (random.getrandbits(24) << 5) & 0xFFFFE0 | random.getrandbits(3) << 29 & 0x60000000,
+        lambda: 0x91000000 | random.getrandbits(22),
+        lambda: 0xF9400000 | random.getrandbits(22),
+        lambda: 0x94000000 | random.getrandbits(26),
+        lambda: 0x14000000 | random.getrandbits(26),
+        lambda: random.getrandbits(32),
+    ]
+    raw = _crafted() + b''.join(struct.pack('<I', random.choice(choices)()) for _ in range(20000))
+    python = XrefIndex._buildPython([XrefIndex._decodePython(BASE, raw, LOW, HIGH)])
+    vectorized = XrefIndex._buildNumpy([XrefIndex._decodeNumpy(BASE, raw, LOW, HIGH)])
+    assert python.keys() == vectorized.keys()
+    for key in python:
+        assert list(python[key]) == [int(value) for value in vectorized[key]], key
@@ -5,6 +5,11 @@ import shlex
 
 from src.core.lldb_script_handler import LLDBScriptHandler
 from src.handler.data_handler import DataHandler
+from src.utils.coverage import CoverageSession, CoverageBreakpointResolver
+from src.utils.breakpoint_condition import BreakpointCondition
+from src.utils.batch_breakpoint import BatchBreakpointResolver
+from src.utils.dashboard import DashboardStopHook
+from src.utils.json_output import JSONOutput
 
 def usingModule(debugger, command, exe_ctx, result, internal_dict):
     """[ 指定模块 —— 后续使用 mark 命令添加断点等操作都将基于该模块 ]
@@ -16,26 +21,40 @@ def markBreakPointByOffsetAddress(debugger, command, exe_ctx, result, internal_d
     """[ 基于 module_name 模块打断点 ]
 >> 使用方法：mark <offset_address>
 >> 例如：mark 0x234
->> 支持多个地址: mark 0x234 0x567 0x89a"""
+>> 支持多个地址: mark 0x234 0x567 0x89a
+>> 条件断点: mark 0x234 --if "x0 == 0x1234 and u32[x1+8] > 5"（条件为假时自动继续运行）
+>> 查看条件断点: mark --conditions
+>> 在所有调用方上打断点: mark --callers 0xa8f4（基于 xref 索引，所有调用位置合并为一个断点，可与 --if 一起使用）
+>> ObjC 方法: mark -[LoginVC submit:]、mark "*crypt*"（以 * 结尾的参数为通配符），mark --objc <通配符>（基于磁盘上的 ObjC 元数据，剥离符号的二进制也可以使用）
+>> 延迟断点: mark --deferred <module_name> 0x234 0x567（模块尚未加载时，在模块加载时自动一次性解析，可与 --if 一起使用）
+>> 查看延迟断点: mark --deferred
+>> 从文件批量打断点: mark -f offsets.txt（例如 ιldb-scan 的输出，文件中的所有十六进制地址合并为一个断点，可与 --if 一起使用）"""
     LLDBScriptHandler.markBreakPointByOffsetAddress(debugger, command, exe_ctx, result, internal_dict)
 
 def markBreakPointByDynamicAddress(debugger, command, exe_ctx, result, internal_dict):
     """[ 在动态地址上打断点 ]
 >> 使用方法：markd <dynamic_address>
->> 例如：markd 0x1063c2c10"""
+>> 例如：markd 0x1063c2c10
+>> 条件断点: markd 0x1063c2c10 --if "x0 == 0"
+"""
     LLDBScriptHandler.markBreakPointByDynamicAddress(debugger, command, exe_ctx, result, internal_dict)
     
 def calcDynamicMemoryAddress(debugger, command, exe_ctx, result, internal_dict):
     """[ 基于 module_name 模块，计算动态内存地址 ]
 >> 使用方法：dy <offset_address>
->> 例如：dy 0x4567"""    
+>> 例如：dy 0x4567
+>> 输入文件偏移 / 模块偏移: dy --fileoff 0x4567、dy --modoff 0x4567（输出 IDA 地址、文件偏移、模块偏移、运行时地址）
+>> 离线转换（不需要进程）: dy --load <模块加载地址> 0x4567、dy --binary <文件路径> 0x4567，没有进程时直接输出前三种地址
+>> 批量转换: dy -f <file> [-o <output_file>]，-m <module_name> 指定模块"""    
     LLDBScriptHandler.calcDynamicMemoryAddress(debugger, command, exe_ctx, result, internal_dict)
     
 def calcStaticOffsetAddress(debugger, command, exe_ctx, result, internal_dict):
-    """[ 基于 module_name 模块，计算静态偏移地址 ]
->> 使用方法：offset <address>
->> 例如：offset 0x1063c2c10
->> 如果直接输入 offset，则会计算当前 pc 寄存器的偏移（该命令基于 using 命令指定的模块计算偏移地址）"""
+    """[ 计算地址所属模块及静态偏移地址（基于所有已加载模块，并给出最近的符号） ]
+>> 使用方法：offset <address1> <address2> ...
+>> 例如：offset 0x1063c2c10 $lr
+>> 从文件中批量读取地址：offset -f <file> [-o <output_file>]
+>> 如果直接输入 offset，则会计算当前 pc 寄存器的偏移
+>> 离线转换（例如崩溃日志，不需要进程）: offset --load <模块加载地址> <address> ... [-m <module_name> | --binary <文件路径>]"""
     LLDBScriptHandler.calcStaticOffsetAddress(debugger, command, exe_ctx, result, internal_dict)
 
 def writeMemory(debugger, command, exe_ctx, result, internal_dict):
@@ -50,12 +69,19 @@ def readMemory(debugger, command, exe_ctx, result, internal_dict):
 使用方法：
 1. memread <addr1> <addr2> ... - 读取多个地址的内存内容
 2. memread -ptr <addr_expr1> -ptr <addr_expr2> ... - 先从指定地址获取指针，再读取该指针指向的内存
-3. memread [options] <addr> - 支持选项：-c/--count 指定读取字节数
+3. memread [options] <addr> - 支持选项：
+   -c/--count 指定读取字节数
+   -s/--size 字长（1、2、4、8，默认 1）
+   --endian big|little 字节序（默认 little）
+   -a/--annotate 按 8 字节指针输出，并标注指向的 模块 + 偏移（符号）
+   -o/--outfile 输出到文件
 举例：
 - memread $x8 0x12345678
 - memread -ptr ($x8 + 0x20)
 - memread -c 0x100 $x8
 - memread --count 0x200 0x12345678
+- memread -s 8 -a -c 0x80 $sp
+- memread -c 0x100000 -o dump.txt $x0
 """
     LLDBScriptHandler.readMemory(debugger, command, exe_ctx, result, internal_dict)
 
@@ -129,12 +155,156 @@ def parseSwiftData(debugger, command, exe_ctx, result, internal_dict):
     LLDBScriptHandler.parseSwiftData(debugger, command, exe_ctx, result, internal_dict)
 
 
+def showRegisters(debugger, command, exe_ctx, result, internal_dict):
+    """[ 显示寄存器（基于本次停止的寄存器快照） ]
+>> 使用方法：regs [--changed] [reg1 reg2 ...]
+>> 例如：regs、regs x0 x1 pc、regs --changed
+>> --changed：只显示与上一次停止相比发生变化的寄存器"""
+    LLDBScriptHandler.showRegisters(debugger, command, exe_ctx, result, internal_dict)
+
+
+def showDashboard(debugger, command, exe_ctx, result, internal_dict):
+    """[ 停止面板：寄存器、pc 附近的反汇编、调用栈和监视表达式一次性输出 ]
+>> 使用方法：dash - 立即输出面板
+>> dash --on / --off - 安装 / 移除 stop-hook，每次停止时自动输出面板
+>> dash --budget <毫秒> - 时间预算（默认 50ms），预计会超出预算的部分自动跳过
+>> dash --frames <个数> - 显示的栈帧数量（默认 8），--sections regs,dis,stack,watch - 选择输出的部分
+>> dash --watch <expr> [-s <字节数>] - 添加监视表达式（指定字节数时读取并显示内存），--unwatch <expr> 移除
+>> dash --status - 查看面板配置和各部分的平均耗时"""
+    LLDBScriptHandler.showDashboard(debugger, command, exe_ctx, result, internal_dict)
+
+
+def showMemoryRegions(debugger, command, exe_ctx, result, internal_dict):
+    """[ 内存区域列表：地址范围、权限、所属模块和段 ]
+>> 使用方法：regions - 列出所有已映射的内存区域
+>> regions <addr_expr> ... - 查看地址所在的区域，例如: regions $x0 ($sp + 0x20)
+>> regions -m <module_name> - 只列出属于指定模块的区域，-p <权限> - 只列出包含指定权限的区域，例如: regions -p rx"""
+    LLDBScriptHandler.showMemoryRegions(debugger, command, exe_ctx, result, internal_dict)
+
+
+def findInstances(debugger, command, exe_ctx, result, internal_dict):
+    """[ 在堆中查找类的实例：扫描所有可读写的内存区域，按 isa 匹配类指针 ]
+>> 使用方法：instances <ClassName|Module.SwiftClass|class_addr> [--verify] [--all] [-l <显示个数>] [-d] [-o <output_file>]
+>> 例如：instances LoginViewController、instances MyApp.Session --verify -d
+>> --verify 校验候选实例（16 字节对齐、non-pointer isa 的 magic 位、类名一致），--all 同时扫描模块的数据段
+>> -d 用 oc 的方式解析显示的实例，-o 把所有实例地址输出到文件"""
+    LLDBScriptHandler.findInstances(debugger, command, exe_ctx, result, internal_dict)
+
+
+def stepUntil(debugger, command, exe_ctx, result, internal_dict):
+    """[ 单步执行直到条件满足（每一步不输出，条件基于寄存器直接求值） ]
+>> 使用方法：stepuntil --if <条件> [--max <最大步数>] [--over-calls]
+>> 例如：stepuntil --if "x0 == 0"、stepuntil --if "w8 == 0x1f && [sp + 0x10] != 0" --max 1000000 --over-calls
+>> --over-calls 单步时跳过函数调用（相当于 tni），默认进入函数（相当于 si）；按 Ctrl+C 中断"""
+    LLDBScriptHandler.stepUntil(debugger, command, exe_ctx, result, internal_dict)
+
+
+def instructionTrace(debugger, command, exe_ctx, result, internal_dict):
+    """[ 指令级跟踪：记录每条执行过的指令的模块偏移和变化的寄存器，压缩保存到文件，并可查询寄存器的写入 ]
+>> 使用方法：itrace [<指令数>] [--until <偏移>] [--all] [--over-calls] [-o <文件>]
+>>          itrace --query <文件> <寄存器> [<值>] [-l <显示个数>]
+>>          itrace --info <文件>
+>> 例如：itrace 5000、itrace --until 0x1a2b3c -o ~/login.trace、itrace --query ~/login.trace x0 0x1234
+>> 默认只跟踪当前模块，进入其它模块时直接运行到返回地址（--all 时逐条跟踪所有模块）；--until 的偏移是当前模块中的偏移
+>> --query 给出值时输出寄存器第一次被写入该值的指令，不给出值时列出寄存器的所有写入；按 Ctrl+C 中断跟踪"""
+    LLDBScriptHandler.instructionTrace(debugger, command, exe_ctx, result, internal_dict)
+
+
+def writeRegister(debugger, command, exe_ctx, result, internal_dict):
+    """[ 修改寄存器，并使寄存器快照失效 ]
+>> 使用方法：regwrite <register> <value>
+>> 例如：regwrite x0 0x1"""
+    LLDBScriptHandler.writeRegister(debugger, command, exe_ctx, result, internal_dict)
+
+
+def sampleStacks(debugger, command, exe_ctx, result, internal_dict):
+    """[ 调用栈采样，输出 flamegraph 可用的 collapsed-stack 格式 ]
+>> 使用方法：sample [-r <次/秒>] [-d <秒>] [--depth <栈深度>] [--symbols] [-o <output_file>]
+>> 例如：sample -r 50 -d 10 -o app.folded
+>> 默认 20 次/秒，采样 5 秒，结束后进程保持停止状态"""
+    LLDBScriptHandler.sampleStacks(debugger, command, exe_ctx, result, internal_dict)
+
+
+
+def parseSwiftCollection(debugger, command, exe_ctx, result, internal_dict):
+    """[ 解析 Swift Array / Dictionary / Set ]
+>> 使用方法：sa <reg|addr> [--elem string|data|int|ptr] [--max <个数>] [--kind array|dict|set]
+>> Dictionary 的键和值类型不同时用 --elem <键类型>:<值类型>，例如 --elem string:int
+>> 例如：sa $x0 --elem string、sa $x20 --elem string:data
+>> 默认根据存储对象的类名判断集合类型，元素按 ptr 输出"""
+    LLDBScriptHandler.parseSwiftCollection(debugger, command, exe_ctx, result, internal_dict)
+
+
+def disassembleModule(debugger, command, exe_ctx, result, internal_dict):
+    """[ 基于模块偏移的反汇编（按模块 UUID + 偏移缓存） ]
+>> 使用方法：dis <offset> [-c <指令条数>] - 从偏移开始反汇编（默认 16 条，默认使用 using 指定的模块）
+>> dis [<start_offset>, <end_offset>] - 反汇编偏移范围
+>> dis --pc - 反汇编当前 pc 附近的指令（pc-0x20 ~ pc+0x24，dispc 即此命令）
+>> dis -m <module_name> <offset> - 指定模块
+>> 指令字节从磁盘上的二进制读取（读取不到时读取一次进程内存），nop / memwrite 修改过的范围从进程内存读取"""
+    LLDBScriptHandler.disassembleModule(debugger, command, exe_ctx, result, internal_dict)
+
+
+def crossReference(debugger, command, exe_ctx, result, internal_dict):
+    """[ 基于模块偏移的交叉引用（调用方 / 数据引用 / 被调用方） ]
+>> 使用方法：xref <offset> ... - 列出调用 / 跳转到偏移的位置，以及通过 ADRP + ADD / LDR 引用偏移的位置
+>> xref --callees <offset> - 列出偏移所在函数中的所有调用 / 跳转
+>> xref -m <module_name> <offset> - 指定模块（默认使用 using 指定的模块）
+>> xref --rebuild - 重新扫描并建立索引，--max <条数> 限制每个偏移显示的条数（默认 200）
+>> 索引按模块 UUID 保存在 cache 目录，第一次使用时扫描模块的可执行 section 建立"""
+    LLDBScriptHandler.crossReference(debugger, command, exe_ctx, result, internal_dict)
+
+
+def findStrings(debugger, command, exe_ctx, result, internal_dict):
+    """[ 在模块的 C 字符串 / CFString 常量中搜索，并列出引用位置 ]
+>> 使用方法：strfind <text> - 子串搜索（默认使用 using 指定的模块）
+>> strfind -r <regex> - 正则搜索（^ $ 对应单个字符串的开头和结尾），-i 忽略大小写
+>> strfind -m <module_name> <text> - 指定模块，--max <条数> 限制显示条数（默认 100），--rebuild 重新建立索引
+>> arm64 目标同时列出通过 ADRP + ADD / LDR 引用字符串的代码偏移，可直接用于 mark；--no-xref 不查询引用位置"""
+    LLDBScriptHandler.findStrings(debugger, command, exe_ctx, result, internal_dict)
+
+
+def decodeObjCObject(debugger, command, exe_ctx, result, internal_dict):
+    """[ 不经过表达式 JIT 解析 ObjC 对象 ]
+>> 使用方法：oc <reg|addr> ... [--depth <嵌套层数>] [--max <每个集合最多显示的元素个数>]
+>> 支持 NSString / NSData / NSArray / NSDictionary / NSNumber 以及 tagged pointer，只读取内存，不调用目标进程中的方法
+>> 例如：oc $x0、oc $x2 --depth 1、oc [$sp + 0x10]"""
+    LLDBScriptHandler.decodeObjCObject(debugger, command, exe_ctx, result, internal_dict)
+
+
+def coverModule(debugger, command, exe_ctx, result, internal_dict):
+    """[ 函数级覆盖率收集 ]
+>> 使用方法：cover [module_name] [-f <offsets_file>] - 在模块所有函数入口设置一次性断点（默认使用 using 指定的模块）
+>> cover --status - 查看覆盖率
+>> cover --export <file> [--format drcov|text] - 导出覆盖率（默认 drcov，可被 Lighthouse 等插件加载）
+>> cover --stop - 停止收集并删除断点"""
+    LLDBScriptHandler.coverModule(debugger, command, exe_ctx, result, internal_dict)
+
+
+def coverageHitCallback(frame, bp_loc, internal_dict):
+    """[ 覆盖率断点回调：记录命中并禁用该断点位置，自动继续运行 ]"""
+    session = CoverageSession.current(bp_loc.GetBreakpoint().GetTarget())
+    if session is None:
+        return True
+    return session.hit(bp_loc)
+
+
+def conditionCallback(frame, bp_loc, internal_dict):
+    """[ 条件断点回调：条件为假时返回 False，自动继续运行 ]"""
+    return BreakpointCondition.evaluate(frame, bp_loc)
+
 
 def help(debugger, command, exe_ctx, result, internal_dict):
     """[ ιldb 脚本的帮助文档 ]"""
     data_handler = DataHandler()
     print(data_handler.help_list)
 
+# 所有注册的命令都支持 --json / --jsonl（见 JSONOutput）
+for _func_name, _cmd_name in DataHandler().cmd_script.items():
+    if _func_name in globals():
+        globals()[_func_name] = JSONOutput.command(globals()[_func_name], _cmd_name)
+
+
 def __lldb_init_module(debugger, internal_dict):
     data_handler = DataHandler()
     